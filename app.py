@@ -1,11 +1,17 @@
 """
 ISO 27001 Compliance Tool - CLI Version
+
+Usage:
+    python app.py                                   # évaluation interactive
+    python app.py batch <fichiers|répertoires|glob> --output-dir <dir>
 """
 import os
+import sys
 from modules.compliance_checker import ComplianceChecker
 from modules.scoring import ComplianceScoring
 from modules.visualizations import ComplianceVisualizations
 from modules.report_generator import ReportGenerator
+from modules.instrumentation import tracer, span
 
 def main():
     print("=" * 60)
@@ -14,7 +20,8 @@ def main():
     print()
     
     # Initialiser le checker
-    checker = ComplianceChecker()
+    with span("catalog_load"):
+        checker = ComplianceChecker()
     
     # Démarrer une nouvelle évaluation
     org = input("Organization name: ")
@@ -33,16 +40,18 @@ def main():
         ("A.8.2", "Implemented", "Privileged access controls in place", ""),
     ]
     
-    for control_id, status, evidence, comments in sample_assessments:
-        checker.assess_control(control_id, status, evidence, comments)
-        print(f"  ✓ Assessed {control_id}: {status}")
+    with span("assessment", controls=len(sample_assessments)):
+        for control_id, status, evidence, comments in sample_assessments:
+            checker.assess_control(control_id, status, evidence, comments)
+            print(f"  ✓ Assessed {control_id}: {status}")
     
     print(f"\n✓ Assessment completed: {len(sample_assessments)} controls assessed\n")
     
     # Calculer les scores
-    scoring = ComplianceScoring(assessment)
-    stats = scoring.get_statistics()
-    gaps = scoring.get_gaps()
+    with span("scoring"):
+        scoring = ComplianceScoring(assessment)
+        stats = scoring.get_statistics()
+        gaps = scoring.get_gaps()
     
     print("=" * 60)
     print("  RESULTS")
@@ -57,9 +66,10 @@ def main():
     
     # Générer visualisations
     print("Generating visualizations...")
-    viz = ComplianceVisualizations(stats)
-    pie_chart = viz.generate_status_pie_chart()
-    bar_chart = viz.generate_domain_bar_chart()
+    with span("charts"):
+        viz = ComplianceVisualizations(stats)
+        pie_chart = viz.generate_status_pie_chart()
+        bar_chart = viz.generate_domain_bar_chart()
     
     charts = {
         'pie_chart': pie_chart,
@@ -73,10 +83,21 @@ def main():
     # Créer dossier si nécessaire
     os.makedirs("data/assessments", exist_ok=True)
     
-    report_path = report_gen.generate_pdf(f"{org.replace(' ', '_')}_ISO27001_Report", charts)
+    with span("pdf"):
+        report_path = report_gen.generate_pdf(f"{org.replace(' ', '_')}_ISO27001_Report", charts)
     
     print(f"\n✓ Report generated: {report_path}")
+    
+    # Exporter la trace si l'instrumentation est activée (ISO27001_TRACE=1)
+    if tracer.enabled:
+        trace_dir = os.environ.get('ISO27001_TRACE_DIR', 'data/traces')
+        tracer.export_json(os.path.join(trace_dir, 'trace.json'))
+        tracer.export_prometheus(os.path.join(trace_dir, 'metrics.prom'))
+        print(f"✓ Trace exported to {trace_dir}/")
     print("\nAssessment completed successfully!")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from modules.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
     main()
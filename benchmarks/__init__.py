@@ -0,0 +1,3 @@
+"""
+Benchmarks de performance pour ISO 27001 Compliance Tool
+"""
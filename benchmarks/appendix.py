@@ -0,0 +1,95 @@
+"""
+Benchmark de l'annexe des preuves (rapports volumineux)
+
+Alimente ReportGenerator depuis un générateur d'éléments (jamais matérialisé
+en liste) et mesure le temps et le pic mémoire tracemalloc. Le pic est
+comparé à la taille du contenu des pages PDF, que fpdf conserve en mémoire
+jusqu'à l'écriture : la différence (« overhead ») doit rester stable quand
+le nombre d'éléments augmente (hors objets de page de fpdf, ~2 Ko/page).
+Le temps est mesuré dans une passe séparée, sans tracemalloc.
+
+Usage:
+    python -m benchmarks.appendix --sizes 1000 5000 10000
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from modules.report_generator import ReportGenerator
+from benchmarks.synthetic import load_catalog, iter_items
+
+DEFAULT_SIZES = [1000, 5000, 10000]
+
+def _empty_report(organization: str = "Benchmark Corp") -> ReportGenerator:
+    """Générateur de rapport minimal (l'annexe est mesurée seule)"""
+    assessment = {
+        "metadata": {
+            "organization": organization,
+            "assessor": "Benchmark Runner",
+            "date": "2026-01-01T12:00:00",
+            "standard": "ISO/IEC 27001:2022"
+        },
+        "controls_assessment": []
+    }
+    stats = {
+        "total_controls": 0, "implemented": 0, "partially_implemented": 0,
+        "not_implemented": 0, "not_applicable": 0, "overall_score": 0.0,
+        "domain_scores": {}
+    }
+    return ReportGenerator(assessment, stats, [])
+
+def run_appendix_benchmark(sizes: List[int] = None, text_repeat: int = 8,
+                           seed: int = 42) -> List[Dict]:
+    """Mesure l'annexe pour chaque taille et retourne les résultats"""
+    sizes = sizes or DEFAULT_SIZES
+    controls = load_catalog()
+    results = []
+
+    for size in sizes:
+        start = time.perf_counter()
+        _empty_report()._build_pdf({}, appendix_items=iter_items(size, controls, seed, text_repeat))
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        pdf = _empty_report()._build_pdf({}, appendix_items=iter_items(size, controls, seed, text_repeat))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        document_bytes = sum(len(page.contents) for page in pdf.pages.values())
+        results.append({
+            "items": size,
+            "pages": pdf.page_no(),
+            "seconds": round(elapsed, 3),
+            "per_item_ms": round(elapsed / size * 1000, 4),
+            "peak_memory_bytes": peak,
+            "document_bytes": document_bytes,
+            "overhead_bytes": peak - document_bytes,
+            "overhead_per_page_bytes": (peak - document_bytes) // pdf.page_no()
+        })
+        print(f"  n={size:<7} {elapsed:7.2f} s  {pdf.page_no():5d} pages  "
+              f"peak {peak / 1e6:7.2f} MB  overhead {(peak - document_bytes) / 1e6:6.2f} MB")
+
+    return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evidence appendix benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--text-repeat', type=int, default=8,
+                        help="Facteur d'allongement des preuves/commentaires")
+    parser.add_argument('--output', help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    print("Running evidence appendix benchmark...")
+    results = run_appendix_benchmark(args.sizes, args.text_repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
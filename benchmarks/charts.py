@@ -0,0 +1,96 @@
+"""
+Benchmark des formats de graphiques (PNG / SVG / JSON)
+
+Mesure, pour le pie chart et le bar chart, la taille de la charge utile
+envoyée au client et le temps de rendu de chaque format, puis le débit de
+rendu PNG dans un pool de threads (modèles de figures par thread).
+
+Usage:
+    python -m benchmarks.charts --repeats 5 --threads 1 4
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from modules.scoring import ComplianceScoring
+from modules.visualizations import ComplianceVisualizations, CHART_FORMATS
+from benchmarks.pipeline import measure
+from benchmarks.synthetic import load_catalog, generate_assessment
+
+def _payload_bytes(chart) -> int:
+    """Taille telle qu'envoyée au client (JSON sérialisé pour les séries)"""
+    if isinstance(chart, str):
+        return len(chart.encode('utf-8'))
+    return len(json.dumps(chart, separators=(',', ':')).encode('utf-8'))
+
+def run_chart_benchmark(repeats: int = 5, size: int = 93, seed: int = 42) -> List[Dict]:
+    """Mesure chaque couple (graphique, format) et retourne les résultats"""
+    stats = ComplianceScoring(generate_assessment(size, load_catalog(), seed)).get_statistics()
+    viz = ComplianceVisualizations(stats)
+    charts = {
+        "status_pie": viz.generate_status_pie_chart,
+        "domain_bar": viz.generate_domain_bar_chart
+    }
+
+    results = []
+    for name, method in charts.items():
+        for fmt in CHART_FORMATS:
+            timing = measure(lambda: method(format=fmt), repeats)
+            payload = _payload_bytes(method(format=fmt))
+            results.append({"chart": name, "format": fmt, "payload_bytes": payload, **timing})
+            print(f"  {name:<11} {fmt:<5} {payload:9d} B  {timing['median_s'] * 1000:9.2f} ms")
+    return results
+
+def run_thread_benchmark(threads: List[int], renders: int = 40, size: int = 93,
+                         seed: int = 42) -> List[Dict]:
+    """Débit de rendu (pie + bar PNG) selon le nombre de threads"""
+    stats = ComplianceScoring(generate_assessment(size, load_catalog(), seed)).get_statistics()
+
+    def render(_):
+        viz = ComplianceVisualizations(stats)
+        return viz.generate_status_pie_chart(), viz.generate_domain_bar_chart()
+
+    results = []
+    for count in threads:
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            # Préchauffage : construction des modèles de chaque thread
+            list(executor.map(render, range(count)))
+            start = time.perf_counter()
+            list(executor.map(render, range(renders)))
+            elapsed = time.perf_counter() - start
+        results.append({
+            "threads": count,
+            "renders": renders,
+            "seconds": round(elapsed, 3),
+            "per_render_ms": round(elapsed / renders * 1000, 2)
+        })
+        print(f"  threads={count:<3} {renders} renders  {elapsed:7.2f} s  "
+              f"{elapsed / renders * 1000:8.2f} ms/render")
+    return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Chart output format benchmark")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--renders', type=int, default=40,
+                        help="Rendus pie + bar par mesure de débit")
+    parser.add_argument('--output', help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    print("Running chart format benchmark...")
+    results = {
+        "formats": run_chart_benchmark(args.repeats),
+        "threads": run_thread_benchmark(args.threads, args.renders)
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Benchmark de contention sur le stockage versionné des évaluations
+
+Deux scénarios, avec N threads écrivant chacun M contrôles :
+- "single" : tous les threads écrivent dans la même évaluation (conflits
+  de version, relances via retry_on_conflict)
+- "many" : chaque thread écrit dans sa propre évaluation (verrous
+  indépendants, aucun conflit attendu)
+
+Usage:
+    python -m benchmarks.contention --threads 16 --writes 50
+    python -m benchmarks.contention --directory /tmp/store   # avec persistance
+"""
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from modules.assessment_store import AssessmentStore, VersionConflictError, retry_on_conflict
+
+def _run_scenario(store: AssessmentStore, assessment_ids: List[str], threads: int,
+                  writes: int) -> Dict:
+    """Lance les écrivains et mesure débit et conflits"""
+    conflicts = [0] * threads
+    barrier = threading.Barrier(threads)
+
+    def writer(index: int) -> None:
+        assessment_id = assessment_ids[index % len(assessment_ids)]
+
+        def attempt():
+            try:
+                return store.assess_control(assessment_id, store.version(assessment_id),
+                                            "A.5.1", "Implemented", f"writer {index}")
+            except VersionConflictError:
+                conflicts[index] += 1
+                raise
+
+        barrier.wait()
+        for _ in range(writes):
+            retry_on_conflict(attempt, max_attempts=10000, base_delay=0.0005)
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    total = threads * writes
+    written = sum(len(store.get(a)['controls_assessment']) for a in assessment_ids)
+    return {
+        "threads": threads,
+        "writes": total,
+        "lost_updates": total - written,
+        "conflicts": sum(conflicts),
+        "seconds": round(elapsed, 4),
+        "writes_per_second": round(total / elapsed, 1)
+    }
+
+def run_contention_benchmark(threads: int = 16, writes: int = 50,
+                             directory: Optional[str] = None) -> Dict:
+    """Exécute les deux scénarios et retourne les résultats"""
+    results = {}
+    for scenario in ("single", "many"):
+        store = AssessmentStore(directory)
+        count = 1 if scenario == "single" else threads
+        assessment_ids = [store.create(f"Org {i}", "Benchmark")[0] for i in range(count)]
+        results[scenario] = _run_scenario(store, assessment_ids, threads, writes)
+        r = results[scenario]
+        print(f"  {scenario:<7} {r['writes']:6d} writes  {r['writes_per_second']:10.1f} w/s  "
+              f"{r['conflicts']:6d} conflicts  {r['lost_updates']} lost")
+    return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Assessment store contention benchmark")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=50, help="Écritures par thread")
+    parser.add_argument('--directory', help="Répertoire de persistance (défaut : mémoire)")
+    parser.add_argument('--disk', action='store_true',
+                        help="Persistance dans un répertoire temporaire")
+    parser.add_argument('--output', help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    print("Running assessment store contention benchmark...")
+    if args.disk and not args.directory:
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_contention_benchmark(args.threads, args.writes, directory)
+    else:
+        results = run_contention_benchmark(args.threads, args.writes, args.directory)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+
+    lost = sum(r['lost_updates'] for r in results.values())
+    return 1 if lost else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
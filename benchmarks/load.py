@@ -0,0 +1,368 @@
+"""
+Test de charge HTTP de l'application web
+
+Démarre l'application localement (gunicorn avec gunicorn.conf.py, ou le
+serveur werkzeug), puis simule N évaluateurs concurrents pendant une durée
+donnée. Chaque évaluateur virtuel garde sa connexion (keep-alive) et son
+cookie de session : il démarre une évaluation (/new-assessment), puis
+enchaîne, selon le mélange demandé, des évaluations de contrôles
+(/api/assess-control), des lectures de statistiques (/api/statistics) et
+des rapports PDF (/api/report). Après `--session-controls` contrôles, il
+recommence une nouvelle évaluation (le cookie de session grossit à chaque
+contrôle).
+
+Rapporte le débit et les latences p50/p95/p99 par endpoint, écrit les
+résultats en JSON et échoue (code 1) en cas de régression par rapport à
+une référence.
+
+Usage:
+    python -m benchmarks.load --users 16 --duration 30
+    python -m benchmarks.load --mix assess=6,statistics=3,report=1 --baseline load_baseline.json
+    python -m benchmarks.load --url http://127.0.0.1:8000   # serveur déjà démarré
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.synthetic import STATUSES, load_catalog
+
+DEFAULT_MIX = {'assess': 70, 'statistics': 25, 'report': 5}
+DEFAULT_THRESHOLD = 0.25
+# En dessous de ce delta absolu, une hausse de latence est considérée comme du bruit
+MIN_REGRESSION_DELTA_MS = 5.0
+# Hausse tolérée du taux d'erreur (absolue)
+MAX_ERROR_RATE_INCREASE = 0.01
+SERVER_START_TIMEOUT = 60
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = {
+    'new': ('POST', '/new-assessment'),
+    'assess': ('POST', '/api/assess-control'),
+    'statistics': ('GET', '/api/statistics'),
+    'report': ('GET', '/api/report')
+}
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Mélange de requêtes "assess=6,statistics=3,report=1" (poids relatifs)"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS or name == 'new':
+            raise ValueError(f"Unknown request type in mix: {name!r}")
+        mix[name] = int(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Mix weights must not all be zero")
+    return mix
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentile (rang le plus proche) d'une liste triée"""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))
+    return values[index]
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(server: str = 'gunicorn', workers: int = 2, threads: int = 4,
+                 data_dir: Optional[str] = None) -> Tuple[str, subprocess.Popen]:
+    """
+    Démarre l'application sur un port libre et attend qu'elle réponde
+
+    Les évaluations et pièces justificatives sont écrites dans `data_dir`
+    (répertoire temporaire) et non dans data/.
+
+    Returns:
+        (URL de base, processus serveur)
+    """
+    port = _free_port()
+    env = dict(os.environ)
+    if data_dir:
+        env.update(ASSESSMENTS_DIR=os.path.join(data_dir, 'assessments'),
+                   SHARED_ASSESSMENTS_DIR=os.path.join(data_dir, 'assessments', 'shared'),
+                   EVIDENCE_DIR=os.path.join(data_dir, 'evidence'))
+    if server == 'gunicorn':
+        env.update(GUNICORN_BIND=f'127.0.0.1:{port}', GUNICORN_WORKERS=str(workers),
+                   GUNICORN_THREADS=str(threads))
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'web_app:app']
+    elif server == 'werkzeug':
+        command = [sys.executable, '-c',
+                   "from werkzeug.serving import run_simple; from web_app import app; "
+                   f"run_simple('127.0.0.1', {port}, app, threaded=True)"]
+    else:
+        raise ValueError(f"Unknown server: {server!r}")
+
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} exited with code {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            connection.close()
+            return f'http://127.0.0.1:{port}', process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{server} did not start within {SERVER_START_TIMEOUT}s")
+
+class _VirtualUser:
+    """Évaluateur simulé : une connexion keep-alive et un cookie de session"""
+
+    def __init__(self, url: str, index: int, control_ids: List[str], session_controls: int,
+                 seed: int):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.index = index
+        self.control_ids = control_ids
+        self.session_controls = session_controls
+        self.rng = random.Random(seed + index)
+        self.connection = None
+        self.cookie = None
+        self.assessed = 0
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None) -> int:
+        headers = {'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.connection.request(method, path, payload, headers)
+                response = self.connection.getresponse()
+                response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # Connexion keep-alive fermée par le serveur : une seule reconnexion
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        for header in response.msg.get_all('Set-Cookie') or []:
+            if header.startswith('session='):
+                self.cookie = header.split(';', 1)[0]
+        return response.status
+
+    def next_request(self, kind: str) -> Tuple[str, str, Optional[Dict]]:
+        """Requête suivante (une nouvelle évaluation d'abord, puis tous les session_controls)"""
+        if self.cookie is None or self.assessed >= self.session_controls:
+            self.assessed = 0
+            return 'new', '/new-assessment', {'organization': f'Load Test {self.index}',
+                                              'assessor': 'Load Runner'}
+        method, path = ENDPOINTS[kind]
+        if kind == 'assess':
+            self.assessed += 1
+            return kind, path, {'control_id': self.rng.choice(self.control_ids),
+                                'status': self.rng.choice(STATUSES),
+                                'evidence': f'Evidence from user {self.index}'}
+        return kind, path, None
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+
+def _summarize(latencies: List[float], errors: int, seconds: float) -> Dict:
+    latencies.sort()
+    ms = lambda value: None if value is None else round(value * 1000, 2)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / seconds, 1),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None)
+    }
+
+def run_load_test(url: str, users: int = 8, duration: float = 10.0,
+                  mix: Optional[Dict[str, int]] = None, session_controls: int = 20,
+                  controls_file: str = "data/iso27001_controls.json", seed: int = 42) -> Dict:
+    """
+    Simule `users` évaluateurs concurrents pendant `duration` secondes
+
+    Returns:
+        {"metadata", "endpoints": {type: mesures}, "total": mesures} ;
+        mesures = requests, errors, error_rate, throughput_rps, p50/p95/p99/max_ms
+    """
+    mix = mix or DEFAULT_MIX
+    kinds, weights = list(mix), list(mix.values())
+    control_ids = [control['id'] for control in load_catalog(os.path.join(ROOT_DIR, controls_file))]
+    samples = [[] for _ in range(users)]
+    barrier = threading.Barrier(users + 1)
+    stop = threading.Event()
+
+    def worker(index: int) -> None:
+        user = _VirtualUser(url, index, control_ids, session_controls, seed)
+        barrier.wait()
+        try:
+            while not stop.is_set():
+                kind, path, body = user.next_request(user.rng.choices(kinds, weights)[0])
+                start = time.perf_counter()
+                try:
+                    ok = user.request(ENDPOINTS[kind][0], path, body) < 400
+                except (http.client.HTTPException, OSError):
+                    ok = False
+                samples[index].append((kind, time.perf_counter() - start, ok))
+        finally:
+            user.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    by_kind: Dict[str, Tuple[List[float], List[int]]] = {}
+    for kind, latency, ok in (sample for user in samples for sample in user):
+        latencies, errors = by_kind.setdefault(kind, ([], [0]))
+        latencies.append(latency)
+        errors[0] += not ok
+    endpoints = {kind: _summarize(latencies, errors[0], elapsed)
+                 for kind, (latencies, errors) in sorted(by_kind.items())}
+    total = _summarize([latency for latencies, _ in by_kind.values() for latency in latencies],
+                       sum(errors[0] for _, errors in by_kind.values()), elapsed)
+    return {
+        "metadata": {
+            "date": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "url": url,
+            "users": users,
+            "duration_s": round(elapsed, 2),
+            "mix": mix,
+            "session_controls": session_controls
+        },
+        "endpoints": endpoints,
+        "total": total
+    }
+
+def compare_results(baseline: Dict, current: Dict,
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare deux exécutions et retourne les régressions
+
+    Par endpoint (et au total) : débit inférieur de plus de `threshold`
+    (relatif), latence p50/p95/p99 supérieure de plus de `threshold` et de
+    plus de MIN_REGRESSION_DELTA_MS, taux d'erreur en hausse de plus de
+    MAX_ERROR_RATE_INCREASE.
+    """
+    regressions = []
+
+    def check(endpoint: str, base: Dict, result: Dict) -> None:
+        if result['throughput_rps'] < base['throughput_rps'] * (1 - threshold):
+            regressions.append({"endpoint": endpoint, "metric": "throughput_rps",
+                                "baseline": base['throughput_rps'],
+                                "current": result['throughput_rps']})
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if base[metric] is None or result[metric] is None:
+                continue
+            if (result[metric] > base[metric] * (1 + threshold)
+                    and result[metric] - base[metric] > MIN_REGRESSION_DELTA_MS):
+                regressions.append({"endpoint": endpoint, "metric": metric,
+                                    "baseline": base[metric], "current": result[metric]})
+        if result['error_rate'] > base['error_rate'] + MAX_ERROR_RATE_INCREASE:
+            regressions.append({"endpoint": endpoint, "metric": "error_rate",
+                                "baseline": base['error_rate'], "current": result['error_rate']})
+
+    for endpoint, result in current['endpoints'].items():
+        if endpoint in baseline['endpoints']:
+            check(endpoint, baseline['endpoints'][endpoint], result)
+    check('total', baseline['total'], current['total'])
+    return regressions
+
+def _print_results(results: Dict) -> None:
+    print(f"  {'endpoint':<12} {'requests':>9} {'errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = list(results['endpoints'].items()) + [('total', results['total'])]
+    fmt = lambda value: f"{'-':>8}" if value is None else f"{value:8.2f}"
+    for endpoint, r in rows:
+        print(f"  {endpoint:<12} {r['requests']:9d} {r['errors']:7d} {r['throughput_rps']:8.1f} "
+              f"{fmt(r['p50_ms'])} {fmt(r['p95_ms'])} {fmt(r['p99_ms'])}")
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP load test of the web application")
+    parser.add_argument('--url', help="Serveur déjà démarré (sinon démarré localement)")
+    parser.add_argument('--server', choices=['gunicorn', 'werkzeug'], default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help="Workers gunicorn")
+    parser.add_argument('--threads', type=int, default=4, help="Threads par worker gunicorn")
+    parser.add_argument('--users', type=int, default=8, help="Évaluateurs concurrents")
+    parser.add_argument('--duration', type=float, default=10.0, help="Durée (secondes)")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="Poids des requêtes, ex: assess=70,statistics=25,report=5")
+    parser.add_argument('--session-controls', type=int, default=20,
+                        help="Contrôles évalués avant de démarrer une nouvelle évaluation")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default="load_results.json", help="Fichier JSON de résultats")
+    parser.add_argument('--baseline', help="Résultats de référence à comparer")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Régression relative tolérée (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    process = None
+    with tempfile.TemporaryDirectory() as data_dir:
+        try:
+            url = args.url
+            if url is None:
+                print(f"Starting {args.server}...")
+                url, process = start_server(args.server, args.workers, args.threads, data_dir)
+            print(f"Running load test against {url} ({args.users} users, {args.duration:g}s)...")
+            results = run_load_test(url, args.users, args.duration, args.mix,
+                                    args.session_controls, seed=args.seed)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+    results['metadata']['server'] = 'external' if args.url else args.server
+    _print_results(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for reg in regressions:
+                print(f"  {reg['endpoint']} {reg['metric']}: "
+                      f"{reg['baseline']} -> {reg['current']}")
+            return 1
+        print("\n✓ No regression against baseline")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Benchmark de la chaîne complète d'évaluation
+
+Mesure le chargement du catalogue, assess_control, le scoring, chaque
+graphique et la génération du PDF pour plusieurs tailles d'évaluation, puis
+écrit les résultats en JSON pour comparaison entre commits.
+
+Usage:
+    python -m benchmarks.pipeline --sizes 1 100 10000 --output results.json
+    python -m benchmarks.pipeline --baseline old.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from modules.compliance_checker import ComplianceChecker
+from modules.scoring import ComplianceScoring
+from modules.visualizations import ComplianceVisualizations
+from modules.report_generator import ReportGenerator
+from benchmarks.synthetic import load_catalog, generate_assessment
+
+DEFAULT_SIZES = [1, 100, 10000]
+DEFAULT_THRESHOLD = 0.25
+# En dessous de ce delta absolu, une variation est considérée comme du bruit
+MIN_REGRESSION_DELTA_S = 0.002
+
+def measure(func: Callable[[], object], repeats: int = 3,
+            setup: Optional[Callable[[], object]] = None, warmup: int = 1) -> Dict:
+    """
+    Exécute `func` plusieurs fois et retourne les temps en secondes
+
+    Si `setup` est fourni, il est appelé avant chaque itération (hors mesure)
+    et son résultat est passé à `func`. Les `warmup` premières itérations
+    (imports paresseux, caches de polices...) ne sont pas comptées.
+    """
+    timings = []
+    for i in range(warmup + repeats):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        if i >= warmup:
+            timings.append(time.perf_counter() - start)
+
+    return {
+        "repeats": repeats,
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "max_s": max(timings)
+    }
+
+def _assess_all(checker: ComplianceChecker, items: List[Dict]) -> None:
+    """Rejoue les éléments synthétiques via assess_control"""
+    checker.start_assessment("Benchmark Corp", "Benchmark Runner")
+    for item in items:
+        checker.assess_control(item['control_id'], item['status'],
+                               item['evidence'], item['comments'])
+
+def _generate_report(assessment: Dict, stats: Dict, gaps: List[Dict],
+                     charts: Dict[str, str], size: int) -> None:
+    """Génère puis supprime un rapport PDF de benchmark"""
+    report_gen = ReportGenerator(assessment, stats, gaps)
+    os.makedirs("data/assessments", exist_ok=True)
+    report_path = report_gen.generate_pdf(f"benchmark_report_{size}", charts)
+    os.remove(report_path)
+
+def run_benchmarks(sizes: List[int] = None, repeats: int = 3,
+                   controls_file: str = "data/iso27001_controls.json",
+                   seed: int = 42) -> Dict:
+    """
+    Exécute tous les benchmarks
+
+    Returns:
+        Dict avec les métadonnées d'exécution et la liste des mesures
+    """
+    sizes = sizes or DEFAULT_SIZES
+    controls = load_catalog(controls_file)
+    results = []
+
+    def record(stage: str, size: Optional[int], timing: Dict) -> None:
+        results.append({"stage": stage, "size": size, **timing})
+        label = f"{stage}[n={size}]" if size is not None else stage
+        print(f"  {label:<40} median {timing['median_s'] * 1000:10.2f} ms")
+
+    record("catalog_load", None,
+           measure(lambda: ComplianceChecker(controls_file), repeats))
+
+    for size in sizes:
+        assessment = generate_assessment(size, controls, seed)
+        items = assessment['controls_assessment']
+
+        record("assess_control", size, measure(
+            lambda checker: _assess_all(checker, items), repeats,
+            setup=lambda: ComplianceChecker(controls_file)))
+
+        scoring = ComplianceScoring(assessment)
+        record("scoring.get_statistics", size,
+               measure(lambda: ComplianceScoring(assessment).get_statistics(), repeats))
+        record("scoring.get_gaps", size,
+               measure(lambda: ComplianceScoring(assessment).get_gaps(), repeats))
+
+        stats = scoring.get_statistics()
+        gaps = scoring.get_gaps()
+        viz = ComplianceVisualizations(stats)
+        record("chart.status_pie", size, measure(viz.generate_status_pie_chart, repeats))
+        record("chart.domain_bar", size, measure(viz.generate_domain_bar_chart, repeats))
+        record("chart.heatmap_plotly", size, measure(viz.generate_heatmap_plotly, repeats))
+
+        charts = {
+            'pie_chart': viz.generate_status_pie_chart(),
+            'bar_chart': viz.generate_domain_bar_chart()
+        }
+        record("report.generate_pdf", size, measure(
+            lambda: _generate_report(assessment, stats, gaps, charts, size), repeats))
+
+    return {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeats": repeats,
+            "seed": seed
+        },
+        "results": results
+    }
+
+def compare_results(baseline: Dict, current: Dict,
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare deux exécutions et retourne les régressions
+
+    Une mesure régresse si sa médiane dépasse celle de la référence de plus de
+    `threshold` (relatif) et de plus de MIN_REGRESSION_DELTA_S (absolu).
+    """
+    reference = {(r['stage'], r['size']): r for r in baseline['results']}
+    regressions = []
+
+    for result in current['results']:
+        base = reference.get((result['stage'], result['size']))
+        if base is None:
+            continue
+
+        delta = result['median_s'] - base['median_s']
+        ratio = result['median_s'] / base['median_s'] if base['median_s'] > 0 else float('inf')
+        if ratio > 1 + threshold and delta > MIN_REGRESSION_DELTA_S:
+            regressions.append({
+                "stage": result['stage'],
+                "size": result['size'],
+                "baseline_median_s": base['median_s'],
+                "current_median_s": result['median_s'],
+                "ratio": round(ratio, 3)
+            })
+
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="ISO 27001 pipeline benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Nombre d'éléments d'évaluation par scénario")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--controls-file', default="data/iso27001_controls.json")
+    parser.add_argument('--output', default="benchmark_results.json",
+                        help="Fichier JSON de résultats")
+    parser.add_argument('--baseline', help="Résultats de référence à comparer")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Régression relative tolérée (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+
+    print("Running pipeline benchmarks...")
+    results = run_benchmarks(args.sizes, args.repeats, args.controls_file, args.seed)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for reg in regressions:
+                print(f"  {reg['stage']}[n={reg['size']}]: "
+                      f"{reg['baseline_median_s'] * 1000:.2f} ms -> "
+                      f"{reg['current_median_s'] * 1000:.2f} ms (x{reg['ratio']})")
+            return 1
+        print("\n✓ No regression against baseline")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
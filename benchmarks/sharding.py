@@ -0,0 +1,156 @@
+"""
+Benchmark du stockage réparti en shards, simulé sur une seule machine
+
+Chaque shard est un répertoire temporaire distinct. Mesures :
+- répartition : évaluations par shard pour K organisations (écart au
+  shard moyen)
+- ajout d'un shard : part des évaluations à déplacer (idéal 1/(N+1)) et
+  durée du rééquilibrage
+- écritures concurrentes : répertoire unique contre N shards
+- parcours du portefeuille : shards lus l'un après l'autre contre en
+  parallèle (iter_sharded_assessments)
+
+Usage:
+    python -m benchmarks.sharding --shards 4 --organizations 400 --threads 8
+    python -m benchmarks.sharding --read-latency 0.002   # simule des volumes distants
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from modules import export
+from modules.assessment_store import AssessmentStore, retry_on_conflict
+from modules.sharding import ShardedAssessmentStore
+
+def _populate(store, organizations: int, controls: int) -> List[str]:
+    assessment_ids = []
+    for index in range(organizations):
+        assessment_id, _ = store.create(f"Org {index}", "Benchmark", sector=f"Sector {index % 5}")
+        for control in range(controls):
+            store.assess_control(assessment_id, control, f"A.5.{control + 1}", "Implemented")
+        assessment_ids.append(assessment_id)
+    return assessment_ids
+
+def _concurrent_writes(store, assessment_ids: List[str], threads: int, writes: int) -> Dict:
+    barrier = threading.Barrier(threads)
+
+    def writer(index: int) -> None:
+        barrier.wait()
+        for write in range(writes):
+            assessment_id = assessment_ids[(index * writes + write) % len(assessment_ids)]
+            retry_on_conflict(lambda: store.update(assessment_id, store.version(assessment_id),
+                                                   lambda assessment: None),
+                              max_attempts=10000, base_delay=0.0005)
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return {"writes": threads * writes, "seconds": round(elapsed, 4),
+            "writes_per_second": round(threads * writes / elapsed, 1)}
+
+def _timed_scan(assessments) -> Dict:
+    start = time.perf_counter()
+    count = sum(1 for _ in assessments)
+    return {"assessments": count, "seconds": round(time.perf_counter() - start, 4)}
+
+def run_sharding_benchmark(shards: int = 4, organizations: int = 400, controls: int = 5,
+                           threads: int = 8, writes: int = 50,
+                           read_latency: float = 0.0) -> Dict:
+    """Exécute les scénarios dans des répertoires temporaires et retourne les résultats"""
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        directories = [os.path.join(root, f"shard-{i:02d}") for i in range(shards)]
+        store = ShardedAssessmentStore(directories)
+        assessment_ids = _populate(store, organizations, controls)
+
+        counts = store.status()['shards']
+        mean = organizations / shards
+        results["distribution"] = {
+            "per_shard": counts,
+            "max_over_mean": round(max(counts.values()) / mean, 3)
+        }
+        print(f"  distribution   {shards} shards, {organizations} orgs: "
+              f"max/mean {results['distribution']['max_over_mean']}")
+
+        grown = ShardedAssessmentStore(directories + [os.path.join(root, f"shard-{shards:02d}")])
+        start = time.perf_counter()
+        moved = grown.rebalance()
+        results["add_shard"] = {
+            "moved": moved['moved'],
+            "moved_fraction": round(moved['moved'] / organizations, 3),
+            "ideal_fraction": round(1 / (shards + 1), 3),
+            "seconds": round(time.perf_counter() - start, 4)
+        }
+        print(f"  add shard      moved {results['add_shard']['moved_fraction']:.1%} "
+              f"(ideal {results['add_shard']['ideal_fraction']:.1%}) "
+              f"in {results['add_shard']['seconds']}s")
+        assert grown.status()['misplaced'] == 0
+
+        single = AssessmentStore(os.path.join(root, "single"))
+        single_ids = _populate(single, organizations, controls)
+        results["writes"] = {
+            "single": _concurrent_writes(single, single_ids, threads, writes),
+            "sharded": _concurrent_writes(grown, assessment_ids, threads, writes)
+        }
+        for layout, r in results["writes"].items():
+            print(f"  writes {layout:<8} {r['writes']:6d} writes  {r['writes_per_second']:10.1f} w/s")
+
+        shard_directories = list(grown.directories.values())
+        original_open = export.open if hasattr(export, 'open') else None
+        if read_latency:
+            # Volume distant simulé : chaque lecture de fichier attend read_latency
+            def slow_open(*args, **kwargs):
+                time.sleep(read_latency)
+                return open(*args, **kwargs)
+            export.open = slow_open
+        try:
+            sequential = _timed_scan(
+                item for directory in shard_directories
+                for item in export.iter_assessments(directory)
+            )
+            parallel = _timed_scan(export.iter_sharded_assessments(shard_directories))
+        finally:
+            if read_latency:
+                if original_open is None:
+                    del export.open
+                else:
+                    export.open = original_open
+        results["scan"] = {"sequential": sequential, "parallel": parallel,
+                           "read_latency": read_latency}
+        print(f"  scan           sequential {sequential['seconds']}s, "
+              f"parallel {parallel['seconds']}s ({parallel['assessments']} assessments)")
+    return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded assessment storage benchmark")
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--organizations', type=int, default=400)
+    parser.add_argument('--controls', type=int, default=5, help="Contrôles par évaluation")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=50, help="Écritures par thread")
+    parser.add_argument('--read-latency', type=float, default=0.0,
+                        help="Latence simulée (secondes) par lecture de fichier")
+    parser.add_argument('--output', help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    print("Running sharded storage benchmark...")
+    results = run_sharding_benchmark(args.shards, args.organizations, args.controls,
+                                     args.threads, args.writes, args.read_latency)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
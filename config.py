@@ -0,0 +1,40 @@
+"""
+Configuration de l'application web
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-me')
+    CONTROLS_FILE = os.environ.get('CONTROLS_FILE', 'data/iso27001_controls.json')
+    # Délai (secondes) entre deux vérifications du catalogue ; 0 = pas de rechargement
+    CATALOG_RELOAD_INTERVAL = float(os.environ.get('CATALOG_RELOAD_INTERVAL', '2'))
+    # Autres référentiels (catalogues et correspondances, voir modules/frameworks.py)
+    FRAMEWORKS_DIR = os.environ.get('FRAMEWORKS_DIR', 'data/frameworks')
+    ASSESSMENTS_DIR = os.environ.get('ASSESSMENTS_DIR', 'data/assessments')
+    SHARED_ASSESSMENTS_DIR = os.environ.get('SHARED_ASSESSMENTS_DIR', 'data/assessments/shared')
+    # Shards des évaluations partagées (répertoires séparés par os.pathsep) ;
+    # vide = répertoire unique SHARED_ASSESSMENTS_DIR
+    SHARD_DIRS = [d for d in os.environ.get('SHARD_DIRS', '').split(os.pathsep) if d]
+    SHARD_VNODES = int(os.environ.get('SHARD_VNODES', '64'))
+    EVIDENCE_DIR = os.environ.get('EVIDENCE_DIR', 'data/evidence')
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', '2'))
+    REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', '600'))
+    REPORT_USE_PROCESSES = os.environ.get('REPORT_USE_PROCESSES', '1') != '0'
+    STATS_CACHE_SIZE = int(os.environ.get('STATS_CACHE_SIZE', '256'))
+    # Comparaison aux pairs : taille minimale de la population, relecture de l'archive
+    PEER_MIN_COUNT = int(os.environ.get('PEER_MIN_COUNT', '5'))
+    PEER_SYNC_INTERVAL = float(os.environ.get('PEER_SYNC_INTERVAL', '60'))
+    # Heatmap du portefeuille : lignes par tuile (défaut et maximum demandable)
+    HEATMAP_ROWS = int(os.environ.get('HEATMAP_ROWS', '50'))
+    HEATMAP_MAX_ROWS = int(os.environ.get('HEATMAP_MAX_ROWS', '200'))
+    # Recherche (typeahead) : résultats maximum par requête
+    SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', '50'))
+    SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', '100'))
+    SSE_KEEPALIVE = float(os.environ.get('SSE_KEEPALIVE', '15'))
+    # Flux SSE : maximum par worker (chacun occupe un thread), relais entre workers
+    SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', '2'))
+    SSE_RELAY_DIR = os.environ.get('SSE_RELAY_DIR', 'data/cache/events')
+    SSE_POLL_INTERVAL = float(os.environ.get('SSE_POLL_INTERVAL', '1'))
@@ -0,0 +1,36 @@
+"""
+Configuration gunicorn
+
+    gunicorn web_app:app
+
+L'application est importée par le master avant le fork (preload_app) : le
+catalogue des contrôles, ses index, les métriques des polices PDF et les
+modules lourds (pandas, matplotlib) sont construits une seule fois et
+partagés par les workers en copie sur écriture. gc.freeze() déplace ces objets hors des générations
+suivies par le ramasse-miettes, dont les parcours toucheraient sinon leurs
+en-têtes et dupliqueraient les pages dans chaque worker.
+
+Flux SSE (/api/assessments/<id>/events) : chaque flux ouvert occupe un des
+`threads` de son worker tant que le client reste connecté. SSE_MAX_STREAMS
+(défaut 2) borne leur nombre par worker pour garder des threads aux
+requêtes ordinaires ; au-delà, réponse 503. Les écritures traitées par un
+autre worker sont relayées par SSE_RELAY_DIR, qui doit être partagé par
+tous les workers (même machine).
+"""
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+preload_app = True
+
+def when_ready(server):
+    from modules import pdf_fonts
+    from web_app import catalog_registry
+    pdf_fonts.preload()
+    catalog = catalog_registry.current()
+    server.log.info("Catalog %s preloaded (%d controls)", catalog.version, len(catalog))
+
+def pre_fork(server, worker):
+    gc.freeze()
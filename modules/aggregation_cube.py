@@ -0,0 +1,364 @@
+"""
+Module du cube d'agrégation (organisation × domaine × catégorie × période)
+
+Les tableaux de bord découpent les scores par domaine, par catégorie du
+catalogue (Access Control, Backup...) et par trimestre. Plutôt que de
+rescorer les évaluations à chaque vue, le cube conserve le nombre de
+contrôles par statut de chaque couple (organisation, période) présent :
+une ligne d'un tableau numpy int32 [(domaine, catégorie), statut, ligne],
+l'axe des lignes étant contigu pour que les sommes par groupe soient
+vectorisées.
+
+- domaine et catégorie forment un seul axe (les couples rencontrés, une
+  cinquantaine) au lieu d'un produit presque vide ;
+- seuls les couples (organisation, période) ayant une évaluation occupent
+  une ligne : la mémoire est bornée par le portefeuille réel, soit
+  cellules × 4 statuts × 4 octets par ligne (1 Kio pour 64 cellules,
+  20 Mio pour 20 000 organisations sur un trimestre, au plus le double
+  avec la réserve de croissance), et non par le produit organisations ×
+  cellules × périodes ;
+- enregistrer une évaluation réécrit sa ligne, en O(contrôles de
+  l'évaluation) ;
+- une requête (regroupement et filtres sur les dimensions) sélectionne les
+  lignes et les somme par groupe, en quelques millisecondes.
+
+Une organisation compte pour sa dernière évaluation de chaque période
+(date de metadata, comme PeerBenchmark) : deux évaluations du même
+trimestre ne s'additionnent pas. Les comptes suivent ComplianceScoring
+(chaque élément d'évaluation compte) et les scores se calculent de même.
+"""
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.catalog import Catalog, CatalogRegistry, load_catalog
+from modules.compliance_checker import VALID_STATUSES
+from modules.integrity import sync_archive
+from modules.peer_benchmark import organization_key
+
+DIMENSIONS = ('organization', 'domain', 'category', 'period')
+UNCATEGORIZED = 'Uncategorized'
+UNKNOWN_PERIOD = 'unknown'
+
+def period_of(date: str) -> str:
+    """Trimestre d'une date ISO ("2026-01-13..." -> "2026-Q1")"""
+    try:
+        year, month = int(date[:4]), int(date[5:7])
+    except (TypeError, ValueError):
+        return UNKNOWN_PERIOD
+    if not 1 <= month <= 12:
+        return UNKNOWN_PERIOD
+    return f"{year:04d}-Q{(month - 1) // 3 + 1}"
+
+def score_of(counts: Sequence[int]) -> Optional[float]:
+    """Score (0-100) de comptes par statut, hors Not Applicable ; None sans contrôle applicable"""
+    applicable = counts[0] + counts[1] + counts[2]
+    if not applicable:
+        return None
+    return round(float(counts[0] + 0.5 * counts[1]) / applicable * 100, 2)
+
+class _Axis:
+    """Libellés d'une dimension et leur position dans le tableau"""
+    __slots__ = ('labels', 'index')
+
+    def __init__(self):
+        self.labels: List = []
+        self.index: Dict = {}
+
+    def position(self, label) -> int:
+        position = self.index.get(label)
+        if position is None:
+            position = self.index[label] = len(self.labels)
+            self.labels.append(label)
+        return position
+
+class _Entry:
+    __slots__ = ('source', 'organization', 'period', 'rank', 'cells', 'counts')
+
+    def __init__(self, source: str, organization: int, period: int, rank: Tuple,
+                 cells: np.ndarray, counts: np.ndarray):
+        self.source = source
+        self.organization = organization
+        self.period = period
+        self.rank = rank
+        # Comptes non nuls de l'évaluation : positions (domaine, catégorie) et
+        # comptes par statut correspondants
+        self.cells = cells
+        self.counts = counts
+
+class AggregationCube:
+    def __init__(self, controls_file: str = "data/iso27001_controls.json",
+                 catalog_registry: Optional[CatalogRegistry] = None):
+        """
+        Initialise un cube vide
+
+        Args:
+            controls_file: Catalogue donnant la catégorie de chaque contrôle
+            catalog_registry: Catalogue partagé et rechargé à chaud ; s'il est
+                fourni, controls_file est ignoré
+        """
+        self.controls_file = controls_file
+        self.catalog_registry = catalog_registry
+        self._catalog: Optional[Catalog] = None
+        self._organizations = _Axis()
+        self._names: Dict[str, str] = {}
+        self._cells = _Axis()
+        self._periods = _Axis()
+        # Une ligne (dernier axe) par couple (organisation, période) ; les
+        # lignes libérées sont remises à zéro et réutilisées
+        self._counts = np.zeros((64, len(VALID_STATUSES), 64), dtype=np.int32)
+        self._row_organizations = np.full(64, -1, dtype=np.intp)
+        self._row_periods = np.full(64, -1, dtype=np.intp)
+        self._rows: Dict[Tuple[int, int], int] = {}
+        self._free_rows: List[int] = []
+        self._used_rows = 0
+        self._sources: Dict[str, _Entry] = {}
+        # Entrée retenue (la plus récente) par (organisation, période)
+        self._current: Dict[Tuple[int, int], _Entry] = {}
+        self._candidates: Dict[Tuple[int, int], Dict[str, _Entry]] = {}
+        self._signatures: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Nombre de couples (organisation, période) agrégés"""
+        return len(self._current)
+
+    def _categories(self) -> Dict[str, Dict]:
+        if self.catalog_registry is not None:
+            return self.catalog_registry.current().controls_by_id
+        if self._catalog is None:
+            self._catalog = load_catalog(self.controls_file)
+        return self._catalog.controls_by_id
+
+    def _grow(self) -> None:
+        """Agrandit le tableau (capacité doublée) si les lignes ou les cellules manquent"""
+        cells, _, rows = self._counts.shape
+        needed_rows = self._used_rows + (0 if self._free_rows else 1)
+        needed_cells = len(self._cells.labels)
+        if needed_rows <= rows and needed_cells <= cells:
+            return
+        new_rows = max(rows, 1 << (needed_rows - 1).bit_length())
+        new_cells = max(cells, 1 << (needed_cells - 1).bit_length())
+        counts = np.zeros((new_cells, len(VALID_STATUSES), new_rows), dtype=self._counts.dtype)
+        counts[:cells, :, :rows] = self._counts
+        self._counts = counts
+        for name in ('_row_organizations', '_row_periods'):
+            labels = np.full(new_rows, -1, dtype=np.intp)
+            labels[:rows] = getattr(self, name)
+            setattr(self, name, labels)
+
+    def update(self, source: str, assessment: Dict) -> None:
+        """
+        Enregistre (ou remplace) l'évaluation identifiée par `source`
+
+        Args:
+            source: Identifiant stable (chemin du fichier, ID de stockage)
+        """
+        meta = assessment.get('metadata', {})
+        controls = self._categories()
+        tallies: Dict[Tuple[str, str], List[int]] = {}
+        for item in assessment.get('controls_assessment', []):
+            try:
+                status = VALID_STATUSES.index(item.get('status'))
+            except ValueError:
+                continue
+            control = controls.get(item.get('control_id'), {})
+            key = (item.get('domain') or control.get('domain', ''),
+                   control.get('category') or UNCATEGORIZED)
+            tallies.setdefault(key, [0] * len(VALID_STATUSES))[status] += 1
+
+        with self._lock:
+            organization = organization_key(assessment)
+            self._names.setdefault(organization, meta.get('organization', '').strip())
+            entry = _Entry(
+                source,
+                self._organizations.position(organization),
+                self._periods.position(period_of(meta.get('date', ''))),
+                (meta.get('date', ''), meta.get('version', 0), source),
+                np.array([self._cells.position(key) for key in tallies], dtype=np.intp),
+                np.array(list(tallies.values()), dtype=np.int32).reshape(-1, len(VALID_STATUSES))
+            )
+            self._grow()
+            previous = self._sources.get(source)
+            self._sources[source] = entry
+            if previous is not None:
+                self._candidates[(previous.organization, previous.period)].pop(source, None)
+                self._elect((previous.organization, previous.period))
+            self._candidates.setdefault((entry.organization, entry.period), {})[source] = entry
+            self._elect((entry.organization, entry.period))
+
+    def remove(self, source: str) -> None:
+        with self._lock:
+            entry = self._sources.pop(source, None)
+            self._signatures.pop(source, None)
+            if entry is not None:
+                self._candidates[(entry.organization, entry.period)].pop(source, None)
+                self._elect((entry.organization, entry.period))
+
+    def _elect(self, key: Tuple[int, int]) -> None:
+        """Retient dans la ligne du couple la dernière évaluation de l'organisation pour la période"""
+        candidates = self._candidates.get(key)
+        latest = max(candidates.values(), key=lambda e: e.rank) if candidates else None
+        current = self._current.get(key)
+        if latest is current:
+            return
+        row = self._rows.get(key)
+        if row is not None:
+            self._counts[:, :, row] = 0
+        if latest is None:
+            self._current.pop(key, None)
+            self._candidates.pop(key, None)
+            self._rows.pop(key)
+            self._row_organizations[row] = self._row_periods[row] = -1
+            self._free_rows.append(row)
+            return
+        if row is None:
+            self._grow()
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = self._used_rows
+                self._used_rows += 1
+            self._rows[key] = row
+            self._row_organizations[row], self._row_periods[row] = key
+        self._counts[latest.cells, :, row] = latest.counts
+        self._current[key] = latest
+
+    def sync(self, root: str) -> int:
+        """
+        Met le cube à jour depuis une archive d'évaluations
+
+        Seuls les fichiers nouveaux ou modifiés (date, taille) sont relus ;
+        les fichiers disparus sont retirés.
+
+        Returns:
+            Nombre de fichiers (re)chargés
+        """
+        if not os.path.isdir(root):
+            return 0
+        with self._sync_lock:
+            return sync_archive(root, self._signatures, self.update, self.remove)
+
+    def dimension(self, name: str) -> List[str]:
+        """Valeurs connues d'une dimension, triées"""
+        with self._lock:
+            if name == 'organization':
+                return sorted(self._organizations.labels)
+            if name == 'period':
+                return sorted(self._periods.labels)
+            if name in ('domain', 'category'):
+                position = 0 if name == 'domain' else 1
+                return sorted({key[position] for key in self._cells.labels})
+        raise ValueError(f"Unknown dimension: {name!r} (expected one of {DIMENSIONS})")
+
+    def query(self, group_by: Sequence[str] = (),
+              filters: Optional[Dict[str, Iterable[str]]] = None) -> List[Dict]:
+        """
+        Comptes par statut et score, regroupés par les dimensions demandées
+
+        Sans regroupement : total du périmètre (roll-up complet). Ajouter une
+        dimension au regroupement ou un filtre revient à descendre d'un
+        niveau (drill-down).
+
+        Args:
+            group_by: Dimensions parmi DIMENSIONS
+            filters: {dimension: valeurs retenues} ; les organisations sont
+                désignées par leur nom (casse indifférente)
+
+        Returns:
+            [{dimension: valeur..., "counts": {statut: n}, "total", "score"}],
+            triés par valeurs des dimensions ; les groupes vides sont omis
+        """
+        group_by = list(group_by)
+        filters = {name: set(values) for name, values in (filters or {}).items()}
+        for name in group_by + list(filters):
+            if name not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension: {name!r} (expected one of {DIMENSIONS})")
+        if 'organization' in filters:
+            filters['organization'] = {value.strip().casefold() for value in filters['organization']}
+
+        cell_dimensions = [name for name in group_by if name in ('domain', 'category')]
+        with self._lock:
+            # Cellules retenues, ordonnées par groupe (domaine et/ou catégorie)
+            cells = sorted(
+                (tuple(label[0 if name == 'domain' else 1] for name in cell_dimensions), position)
+                for position, label in enumerate(self._cells.labels)
+                if ('domain' not in filters or label[0] in filters['domain'])
+                and ('category' not in filters or label[1] in filters['category'])
+            )
+            if not cells or not self._rows:
+                return []
+            names = [self._names[label] for label in self._organizations.labels]
+            period_labels = list(self._periods.labels)
+            positions = np.array([position for _, position in cells], dtype=np.intp)
+
+            # Lignes retenues (les lignes libres sont à zéro : sans filtre ni
+            # regroupement, toutes les lignes sont sommées sur place)
+            used = self._used_rows
+            organizations = self._row_organizations[:used]
+            periods = self._row_periods[:used]
+            by_organization = 'organization' in group_by
+            by_period = 'period' in group_by
+            rows = None
+            if 'organization' in filters or 'period' in filters or by_organization or by_period:
+                mask = organizations >= 0
+                if 'organization' in filters:
+                    mask &= np.isin(organizations, self._selected(self._organizations.labels,
+                                                                 filters['organization']))
+                if 'period' in filters:
+                    mask &= np.isin(periods, self._selected(self._periods.labels,
+                                                            filters['period']))
+                rows = np.flatnonzero(mask)
+                if not len(rows):
+                    return []
+
+            # Cellules retenues d'abord (blocs contigus), puis lignes
+            counts = self._counts[positions, :, :used]
+            if by_organization or by_period:
+                # Groupes (organisation, période) : lignes triées par groupe puis sommées
+                keys = ((organizations[rows] if by_organization else 0) * len(period_labels)
+                        + (periods[rows] if by_period else 0))
+                order = np.argsort(keys, kind='stable')
+                rows, keys = rows[order], keys[order]
+                starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+                group_keys = keys[starts].tolist()
+                counts = np.add.reduceat(np.take(counts, rows, axis=2), starts, axis=2)
+            else:
+                group_keys = [0]
+                if rows is not None:
+                    counts = np.take(counts, rows, axis=2)
+                counts = counts.sum(axis=2, keepdims=True, dtype=np.int64)
+            # [groupe (organisation, période), cellule, statut]
+            counts = counts.transpose(2, 0, 1)
+
+        keys = [key for key, _ in cells]
+        cell_starts = [i for i, key in enumerate(keys) if i == 0 or key != keys[i - 1]]
+        groups = [dict(zip(cell_dimensions, keys[i])) for i in cell_starts]
+        counts = np.add.reduceat(counts, cell_starts, axis=1)
+
+        rows = []
+        index = np.nonzero(counts.sum(axis=2))
+        for k, g, values in zip(*(axis.tolist() for axis in index), counts[index].tolist()):
+            organization, period = divmod(group_keys[k], len(period_labels))
+            row = {}
+            for name in group_by:
+                if name == 'organization':
+                    row[name] = names[organization]
+                elif name == 'period':
+                    row[name] = period_labels[period]
+                else:
+                    row[name] = groups[g][name]
+            row['counts'] = dict(zip(VALID_STATUSES, values))
+            row['total'] = sum(values)
+            row['score'] = score_of(values)
+            rows.append(row)
+        rows.sort(key=lambda row: tuple(row[name].casefold() for name in group_by))
+        return rows
+
+    @staticmethod
+    def _selected(labels: List, wanted: Optional[set]) -> np.ndarray:
+        return np.array([i for i, label in enumerate(labels) if wanted is None or label in wanted],
+                        dtype=np.intp)
@@ -0,0 +1,129 @@
+"""
+Module de comparaison d'évaluations (delta entre deux campagnes)
+
+Les évaluations sont indexées par control_id (dernier élément retenu en cas
+de doublon) en un seul passage : la comparaison est linéaire en nombre de
+contrôles. Les scores proviennent de ComplianceScoring pour rester
+identiques à ceux des rapports.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.scoring import ComplianceScoring
+
+GAP_STATUSES = {'Not Implemented', 'Partially Implemented'}
+
+def _index_by_control(assessment: Dict) -> Dict[str, Dict]:
+    """Indexe les éléments par control_id (le dernier l'emporte)"""
+    return {item['control_id']: item for item in assessment['controls_assessment']}
+
+def _summary(item: Dict) -> Dict:
+    return {
+        "control_id": item['control_id'],
+        "control_title": item.get('control_title', ''),
+        "domain": item.get('domain', ''),
+        "status": item['status']
+    }
+
+def diff_assessments(previous: Dict, current: Dict) -> Dict:
+    """
+    Compare deux évaluations d'une même organisation
+
+    Returns:
+        Dict avec status_changes, new_gaps, closed_gaps, added_controls,
+        removed_controls, overall (score précédent/actuel/delta) et
+        domain_deltas
+    """
+    before = _index_by_control(previous)
+    after = _index_by_control(current)
+
+    status_changes, new_gaps, closed_gaps, added = [], [], [], []
+    for control_id, item in after.items():
+        old = before.get(control_id)
+        is_gap = item['status'] in GAP_STATUSES
+
+        if old is None:
+            added.append(_summary(item))
+            if is_gap:
+                new_gaps.append(_summary(item))
+            continue
+
+        if old['status'] == item['status']:
+            continue
+
+        status_changes.append({**_summary(item), "previous_status": old['status']})
+        was_gap = old['status'] in GAP_STATUSES
+        if is_gap and not was_gap:
+            new_gaps.append(_summary(item))
+        elif was_gap and not is_gap:
+            closed_gaps.append(_summary(item))
+
+    removed = [_summary(item) for control_id, item in before.items() if control_id not in after]
+
+    previous_stats = ComplianceScoring(previous).get_statistics()
+    current_stats = ComplianceScoring(current).get_statistics()
+
+    domain_deltas = {}
+    for domain in sorted(set(previous_stats['domain_scores']) | set(current_stats['domain_scores'])):
+        old_score = previous_stats['domain_scores'].get(domain)
+        new_score = current_stats['domain_scores'].get(domain)
+        domain_deltas[domain] = {
+            "previous": old_score,
+            "current": new_score,
+            "delta": round(new_score - old_score, 2)
+                     if old_score is not None and new_score is not None else None
+        }
+
+    return {
+        "previous_date": previous.get('metadata', {}).get('date'),
+        "current_date": current.get('metadata', {}).get('date'),
+        "overall": {
+            "previous": previous_stats['overall_score'],
+            "current": current_stats['overall_score'],
+            "delta": round(current_stats['overall_score'] - previous_stats['overall_score'], 2)
+        },
+        "domain_deltas": domain_deltas,
+        "status_changes": status_changes,
+        "new_gaps": new_gaps,
+        "closed_gaps": closed_gaps,
+        "added_controls": added,
+        "removed_controls": removed
+    }
+
+def _diff_pair(pair: Tuple[Dict, Dict]) -> Dict:
+    return diff_assessments(*pair)
+
+def diff_pairs(pairs: Iterable[Tuple[Dict, Dict]], max_workers: Optional[int] = None,
+               use_processes: bool = True, chunksize: int = 16) -> List[Dict]:
+    """
+    Compare une série de paires (précédente, actuelle) en parallèle
+
+    Les résultats sont retournés dans l'ordre des paires.
+    """
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_class(max_workers=max_workers) as executor:
+        if use_processes:
+            return list(executor.map(_diff_pair, pairs, chunksize=chunksize))
+        return list(executor.map(_diff_pair, pairs))
+
+def diff_portfolio(histories: Dict[str, List[Dict]], max_workers: Optional[int] = None,
+                   use_processes: bool = True) -> Dict[str, List[Dict]]:
+    """
+    Compare les évaluations consécutives de chaque organisation
+
+    Args:
+        histories: {organisation: [évaluations triées par date]}
+
+    Returns:
+        {organisation: [diff(e0, e1), diff(e1, e2), ...]}
+    """
+    keys, pairs = [], []
+    for organization, assessments in histories.items():
+        for previous, current in zip(assessments, assessments[1:]):
+            keys.append(organization)
+            pairs.append((previous, current))
+
+    results: Dict[str, List[Dict]] = {organization: [] for organization in histories}
+    for organization, diff in zip(keys, diff_pairs(pairs, max_workers, use_processes)):
+        results[organization].append(diff)
+    return results
@@ -0,0 +1,275 @@
+"""
+Module de stockage versionné des évaluations (concurrence optimiste)
+
+Chaque écriture porte la version attendue de l'évaluation ; si elle ne
+correspond plus (un autre évaluateur a écrit entre-temps), l'écriture est
+refusée avec VersionConflictError au lieu d'écraser la modification.
+Chaque évaluation a son propre verrou, de sorte que des évaluations
+distinctes sont modifiées en parallèle.
+
+Avec un répertoire de persistance, les écritures sont en plus protégées par
+un verrou de fichier (fcntl) et relisent la version sur disque : plusieurs
+processus (workers gunicorn) peuvent partager les mêmes évaluations.
+"""
+import copy
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from modules.catalog import CatalogRegistry
+from modules.compliance_checker import ComplianceChecker, bump_version, get_version
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrouillage inter-processus indisponible
+    fcntl = None
+
+ASSESSMENT_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+logger = logging.getLogger(__name__)
+
+class AssessmentNotFoundError(KeyError):
+    """Évaluation inconnue"""
+
+class VersionConflictError(Exception):
+    """La version attendue ne correspond pas à la version courante"""
+
+    def __init__(self, assessment_id: str, expected: int, actual: int):
+        super().__init__(
+            f"Assessment {assessment_id}: expected version {expected}, current is {actual}"
+        )
+        self.assessment_id = assessment_id
+        self.expected = expected
+        self.actual = actual
+
+class AssessmentStore:
+    def __init__(self, directory: Optional[str] = None,
+                 controls_file: str = "data/iso27001_controls.json",
+                 catalog_registry: Optional[CatalogRegistry] = None,
+                 on_persist: Optional[Callable[[str, Dict], None]] = None):
+        """
+        Initialise le stockage
+
+        Args:
+            directory: Répertoire de persistance ({id}.json) ; None = mémoire seule
+            controls_file: Catalogue utilisé pour valider les contrôles
+            catalog_registry: Catalogue partagé et rechargé à chaud ; s'il est
+                fourni, controls_file est ignoré
+            on_persist: Appelé (assessment_id, évaluation) après chaque
+                écriture, sous le verrou de l'évaluation ; ses erreurs sont
+                journalisées sans faire échouer l'écriture, déjà persistée
+        """
+        self.directory = directory
+        self.catalog_registry = catalog_registry
+        self.on_persist = on_persist
+        if catalog_registry is not None:
+            self._checker = ComplianceChecker(catalog=catalog_registry.current())
+        else:
+            self._checker = ComplianceChecker(controls_file)
+        self._assessments: Dict[str, Dict] = {}
+        self._signatures: Dict[str, tuple] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def checker(self) -> ComplianceChecker:
+        """Checker lié à la version courante du catalogue"""
+        checker = self._checker
+        if self.catalog_registry is not None:
+            catalog = self.catalog_registry.current()
+            if checker.catalog is not catalog:
+                checker = self._checker = ComplianceChecker(catalog=catalog)
+        return checker
+
+    def _path(self, assessment_id: str, suffix: str = '.json') -> str:
+        return os.path.join(self.directory, f"{assessment_id}{suffix}")
+
+    def path(self, assessment_id: str) -> Optional[str]:
+        """Fichier de l'évaluation (None sans persistance)"""
+        return self._path(assessment_id) if self.directory else None
+
+    def exists(self, assessment_id: str) -> bool:
+        try:
+            self._check_exists(assessment_id)
+        except AssessmentNotFoundError:
+            return False
+        return True
+
+    def _lock_for(self, assessment_id: str) -> threading.Lock:
+        with self._registry_lock:
+            lock = self._locks.get(assessment_id)
+            if lock is None:
+                lock = self._locks[assessment_id] = threading.Lock()
+            return lock
+
+    def _check_exists(self, assessment_id: str) -> None:
+        """Rejette les identifiants invalides ou inconnus avant tout verrouillage"""
+        if not ASSESSMENT_ID_PATTERN.match(assessment_id):
+            raise AssessmentNotFoundError(assessment_id)
+        if assessment_id in self._assessments:
+            return
+        if not self.directory or not os.path.exists(self._path(assessment_id)):
+            raise AssessmentNotFoundError(assessment_id)
+
+    @contextmanager
+    def _locked(self, assessment_id: str):
+        """Verrou par évaluation (thread) + verrou de fichier (processus)"""
+        with self._lock_for(assessment_id):
+            if not self.directory or fcntl is None:
+                yield
+                return
+            with open(self._path(assessment_id, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_locked(self, assessment_id: str) -> Dict:
+        """Retourne l'évaluation courante (relue si un autre processus l'a modifiée)"""
+        cached = self._assessments.get(assessment_id)
+        if self.directory:
+            try:
+                stat = os.stat(self._path(assessment_id))
+            except FileNotFoundError:
+                stat = None
+            # Relecture seulement si le fichier a changé depuis notre écriture
+            signature = (stat.st_mtime_ns, stat.st_size) if stat else None
+            if stat is None:
+                # Fichier déplacé (rééquilibrage des shards) ou supprimé pendant
+                # l'attente du verrou : ne pas le réécrire ici
+                self._assessments.pop(assessment_id, None)
+                self._signatures.pop(assessment_id, None)
+                raise AssessmentNotFoundError(assessment_id)
+            if cached is None or signature != self._signatures.get(assessment_id):
+                with open(self._path(assessment_id), 'r', encoding='utf-8') as f:
+                    self._assessments[assessment_id] = cached = json.load(f)
+                self._signatures[assessment_id] = signature
+        if cached is None:
+            raise AssessmentNotFoundError(assessment_id)
+        return cached
+
+    def _persist_locked(self, assessment_id: str, assessment: Dict) -> None:
+        self._assessments[assessment_id] = assessment
+        if self.directory:
+            path = self._path(assessment_id)
+            tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(assessment, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            stat = os.stat(path)
+            self._signatures[assessment_id] = (stat.st_mtime_ns, stat.st_size)
+        if self.on_persist is not None:
+            try:
+                self.on_persist(assessment_id, assessment)
+            except Exception:
+                logger.exception("on_persist hook failed for assessment %s", assessment_id)
+
+    def create(self, organization: str, assessor: str, sector: Optional[str] = None,
+               assessment_id: Optional[str] = None) -> Tuple[str, Dict]:
+        """
+        Crée une nouvelle évaluation
+
+        Args:
+            assessment_id: Identifiant imposé (32 caractères hexadécimaux,
+                voir sharding.make_assessment_id) ; aléatoire par défaut
+
+        Returns:
+            (assessment_id, copie de l'évaluation)
+        """
+        if assessment_id is None:
+            assessment_id = uuid.uuid4().hex
+        elif not ASSESSMENT_ID_PATTERN.match(assessment_id):
+            raise ValueError(f"Invalid assessment id: {assessment_id!r}")
+        with self._registry_lock:
+            assessment = self.checker.start_assessment(organization, assessor, sector)
+        assessment['metadata']['assessment_id'] = assessment_id
+
+        with self._locked(assessment_id):
+            self._persist_locked(assessment_id, assessment)
+        return assessment_id, copy.deepcopy(assessment)
+
+    def get(self, assessment_id: str) -> Dict:
+        """Retourne une copie de l'évaluation (sa version est dans metadata.version)"""
+        self._check_exists(assessment_id)
+        with self._locked(assessment_id):
+            return copy.deepcopy(self._load_locked(assessment_id))
+
+    def version(self, assessment_id: str) -> int:
+        """Retourne la version courante sans copier l'évaluation"""
+        self._check_exists(assessment_id)
+        with self._locked(assessment_id):
+            return get_version(self._load_locked(assessment_id))
+
+    def update(self, assessment_id: str, expected_version: int,
+               mutator: Callable[[Dict], None]) -> int:
+        """
+        Applique `mutator` à l'évaluation si sa version est `expected_version`
+
+        Le mutateur travaille sur une copie, enregistrée seulement s'il
+        réussit : ses exceptions sont propagées sans modifier l'évaluation.
+
+        Returns:
+            Nouvelle version
+
+        Raises:
+            VersionConflictError: l'évaluation a été modifiée entre-temps
+            AssessmentNotFoundError: évaluation inconnue
+        """
+        self._check_exists(assessment_id)
+        with self._locked(assessment_id):
+            assessment = self._load_locked(assessment_id)
+            current = get_version(assessment)
+            if current != expected_version:
+                raise VersionConflictError(assessment_id, expected_version, current)
+
+            # Copie : une exception du mutateur laisse le cache intact
+            assessment = copy.deepcopy(assessment)
+            mutator(assessment)
+            new_version = bump_version(assessment)
+            self._persist_locked(assessment_id, assessment)
+            return new_version
+
+    def assess_control(self, assessment_id: str, expected_version: int, control_id: str,
+                       status: str, evidence: str = "", comments: str = "",
+                       attachments: Optional[List[Dict]] = None) -> int:
+        """
+        Évalue un contrôle avec contrôle de version
+
+        Raises:
+            ValueError: contrôle inconnu ou statut invalide
+            VersionConflictError: l'évaluation a été modifiée entre-temps
+        """
+        item = self.checker.build_assessment_item(control_id, status, evidence, comments,
+                                                  attachments)
+        if item is None:
+            raise ValueError(f"Unknown control: {control_id}")
+        return self.update(assessment_id, expected_version,
+                           lambda assessment: assessment['controls_assessment'].append(item))
+
+def retry_on_conflict(operation: Callable[[], object], max_attempts: int = 5,
+                      base_delay: float = 0.001, max_delay: float = 0.1):
+    """
+    Exécute `operation` en la relançant en cas de VersionConflictError
+
+    `operation` doit relire la version courante à chaque appel. Le délai
+    entre deux tentatives croît exponentiellement, avec une gigue aléatoire
+    pour désynchroniser les écrivains concurrents.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return operation()
+        except VersionConflictError:
+            if attempt == max_attempts - 1:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            time.sleep(random.uniform(0, delay))
@@ -0,0 +1,227 @@
+"""
+Module de traitement par lots des évaluations (mode non interactif)
+
+Régénère les scores, graphiques et rapports PDF d'un ensemble de fichiers
+d'évaluation (répertoires ou motifs glob) dans un pool de processus. Chaque
+fichier est traité indépendamment : une évaluation invalide est signalée
+sans interrompre le lot.
+
+Usage:
+    python app.py batch data/assessments --output-dir reports --workers 8
+    python -m modules.batch "archive/2026-*/*.json" --output-dir out --no-pdf
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+def iter_input_files(inputs: Iterable[str]) -> Iterator[str]:
+    """Fichiers JSON désignés par des chemins, répertoires ou motifs glob (sans doublon)"""
+    seen = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*.json')
+        for path in sorted(glob.glob(pattern)):
+            if os.path.isfile(path) and path not in seen:
+                seen.add(path)
+                yield path
+
+def _output_stems(paths: List[str]) -> List[str]:
+    """Nom de sortie de chaque fichier (suffixe -2, -3... en cas d'homonymes)"""
+    counts = Counter()
+    used = set()
+    stems = []
+    for path in paths:
+        base = os.path.splitext(os.path.basename(path))[0]
+        stem = base
+        # Un suffixe peut coïncider avec un autre nom de fichier (acme-2.json)
+        while stem in used:
+            counts[base] += 1
+            stem = f"{base}-{counts[base] + 1}"
+        used.add(stem)
+        stems.append(stem)
+    return stems
+
+def process_assessment(path: str, output_stem: str, options: Dict) -> Dict:
+    """
+    Score, graphiques et PDF d'un fichier d'évaluation
+
+    Fonction de module pour être exécutée dans un ProcessPoolExecutor ;
+    les erreurs sont capturées et retournées dans le résultat.
+
+    Returns:
+        {"path", "status": "ok"|"error", "outputs", "timings", "error"?}
+    """
+    timings: Dict[str, float] = {}
+    outputs: List[str] = []
+    result = {"path": path, "status": "ok", "outputs": outputs, "timings": timings}
+
+    def timed(stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage] = round(time.perf_counter() - start, 4)
+
+    try:
+        # Imports différés : le processus parent n'a pas besoin de matplotlib
+        from modules.scoring import ComplianceScoring
+
+        with open(path, 'r', encoding='utf-8') as f:
+            assessment = timed('load', json.load, f)
+
+        scoring = ComplianceScoring(assessment)
+        stats = timed('scoring', scoring.get_statistics)
+        gaps = timed('gaps', scoring.get_gaps)
+
+        base = os.path.join(options['output_dir'], output_stem)
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump({"statistics": stats, "gaps": gaps}, f, indent=2, ensure_ascii=False)
+        outputs.append(f"{base}.json")
+
+        charts = {}
+        if not options.get('skip_charts'):
+            from modules.visualizations import ComplianceVisualizations
+            viz = ComplianceVisualizations(stats)
+            charts = timed('charts', lambda: {
+                'pie_chart': viz.generate_status_pie_chart(),
+                'bar_chart': viz.generate_domain_bar_chart()
+            })
+
+        if not options.get('skip_pdf'):
+            from modules.report_generator import ReportGenerator
+            report_gen = ReportGenerator(assessment, stats, gaps)
+            pdf_bytes = timed('pdf', report_gen.generate_pdf_bytes, charts,
+                              include_appendix=options.get('include_appendix', False))
+            with open(f"{base}.pdf", 'wb') as f:
+                f.write(pdf_bytes)
+            outputs.append(f"{base}.pdf")
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+
+    return result
+
+def run_batch(paths: List[str], output_dir: str, workers: Optional[int] = None,
+              skip_charts: bool = False, skip_pdf: bool = False,
+              include_appendix: bool = False,
+              progress=None) -> Tuple[List[Dict], Dict]:
+    """
+    Traite les fichiers dans un pool de processus
+
+    Args:
+        progress: Fonction appelée avec (terminés, total, résultat)
+
+    Returns:
+        (résultats dans l'ordre de fin de traitement, synthèse)
+
+    Raises:
+        ValueError: une sortie ({stem}.json, {stem}.pdf) écraserait un
+            fichier d'entrée
+    """
+    stems = _output_stems(paths)
+    inputs = {os.path.realpath(path) for path in paths}
+    for stem in stems:
+        for extension in ('.json', '.pdf'):
+            output = os.path.join(output_dir, stem + extension)
+            if os.path.realpath(output) in inputs:
+                raise ValueError(f"Output {output} would overwrite an input file")
+
+    os.makedirs(output_dir, exist_ok=True)
+    options = {"output_dir": output_dir, "skip_charts": skip_charts, "skip_pdf": skip_pdf,
+               "include_appendix": include_appendix}
+
+    if not skip_pdf:
+        # Métriques des polices chargées une fois : héritées par les workers
+        # (fork) ou relues depuis le cache disque (spawn)
+        from modules import pdf_fonts
+        pdf_fonts.preload()
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_assessment, path, stem, options): path
+            for path, stem in zip(paths, stems)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # worker tué (mémoire, signal...)
+                result = {"path": futures[future], "status": "error", "outputs": [],
+                          "timings": {}, "error": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if progress is not None:
+                progress(len(results), len(paths), result)
+    elapsed = time.perf_counter() - start
+
+    stage_seconds = Counter()
+    for result in results:
+        stage_seconds.update(result['timings'])
+    failed = sum(1 for r in results if r['status'] == 'error')
+    summary = {
+        "files": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "files_per_second": round(len(results) / elapsed, 2) if elapsed else None,
+        "stage_seconds": {stage: round(s, 3) for stage, s in sorted(stage_seconds.items())}
+    }
+    return results, summary
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="app.py batch",
+                                     description="Regenerate reports for many assessments")
+    parser.add_argument('inputs', nargs='+', help="Fichiers, répertoires ou motifs glob")
+    parser.add_argument('--output-dir', '-o', required=True)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus (défaut : nombre de CPU)")
+    parser.add_argument('--no-charts', action='store_true', help="Ne pas générer les graphiques")
+    parser.add_argument('--no-pdf', action='store_true', help="Ne pas générer les PDF")
+    parser.add_argument('--appendix', action='store_true',
+                        help="Inclure l'annexe des preuves dans les PDF")
+    parser.add_argument('--summary', help="Fichier JSON de synthèse (avec le détail par fichier)")
+    parser.add_argument('--quiet', '-q', action='store_true')
+    args = parser.parse_args(argv)
+
+    paths = list(iter_input_files(args.inputs))
+    if not paths:
+        print("No assessment files found", file=sys.stderr)
+        return 2
+
+    def progress(done, total, result):
+        if args.quiet and result['status'] == 'ok':
+            return
+        duration = sum(result['timings'].values())
+        line = f"[{done}/{total}] {result['status']:<5} {result['path']} ({duration:.2f}s)"
+        if result['status'] == 'error':
+            line += f": {result['error']}"
+        print(line, file=sys.stderr)
+
+    try:
+        results, summary = run_batch(paths, args.output_dir, args.workers,
+                                     skip_charts=args.no_charts, skip_pdf=args.no_pdf,
+                                     include_appendix=args.appendix, progress=progress)
+    except ValueError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+
+    print(f"\n✓ {summary['succeeded']}/{summary['files']} assessments processed "
+          f"in {summary['seconds']}s ({summary['files_per_second']} files/s)")
+    for stage, seconds in summary['stage_seconds'].items():
+        print(f"  {stage:<8} {seconds:8.3f}s")
+    if summary['failed']:
+        print(f"✗ {summary['failed']} failed")
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2, ensure_ascii=False)
+
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
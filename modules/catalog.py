@@ -0,0 +1,171 @@
+"""
+Module de chargement et de rechargement à chaud du catalogue des contrôles
+
+Un Catalog est un instantané immuable du fichier (contrôles, index par ID,
+version = empreinte du contenu). Le CatalogRegistry conserve l'instantané
+courant et, au plus toutes les `check_interval` secondes, compare la date
+de modification du fichier : s'il a changé, le nouveau catalogue est
+chargé et validé à part, puis substitué par une simple affectation. Une
+requête en cours garde la référence qu'elle a obtenue et termine avec
+l'ancienne version ; un fichier invalide (édition en cours) est ignoré et
+l'ancienne version reste servie.
+
+Chargé à l'import de web_app, le registre est construit par le master
+gunicorn avant le fork (preload_app, voir gunicorn.conf.py) : les workers
+partagent ses pages en copie sur écriture tant qu'aucun rechargement n'a
+lieu.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+class CatalogError(ValueError):
+    """Fichier de catalogue illisible ou invalide"""
+
+class Catalog:
+    __slots__ = ('path', 'version', 'controls', 'controls_by_id', 'domains', 'signature',
+                 'loaded_at')
+
+    def __init__(self, path: str, version: str, controls: List[Dict], signature: tuple = None):
+        self.path = path
+        self.version = version
+        self.controls = controls
+        self.controls_by_id = {c['id']: c for c in controls}
+        self.domains = sorted({c['domain'] for c in controls})
+        # (mtime_ns, taille) du fichier lu
+        self.signature = signature
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.controls)
+
+def load_catalog(path: str) -> Catalog:
+    """
+    Charge et valide un fichier de catalogue
+
+    Raises:
+        CatalogError: JSON invalide, contrôles absents ou IDs en double
+    """
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        raw = f.read()
+    try:
+        controls = json.loads(raw.decode('utf-8'))['controls']
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise CatalogError(f"{path}: {type(e).__name__}: {e}") from e
+
+    if not isinstance(controls, list) or not controls:
+        raise CatalogError(f"{path}: 'controls' must be a non-empty list")
+    ids = set()
+    for control in controls:
+        if not isinstance(control, dict) or 'id' not in control or 'domain' not in control:
+            raise CatalogError(f"{path}: every control needs an id and a domain")
+        if control['id'] in ids:
+            raise CatalogError(f"{path}: duplicate control id {control['id']}")
+        ids.add(control['id'])
+
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    return Catalog(path, version, controls, (stat.st_mtime_ns, stat.st_size))
+
+class CatalogRegistry:
+    def __init__(self, path: str, check_interval: float = 2.0):
+        """
+        Charge le catalogue initial
+
+        Args:
+            path: Fichier du catalogue
+            check_interval: Délai minimal (secondes) entre deux vérifications
+                de la date de modification ; 0 désactive le rechargement
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_error: Optional[str] = None
+        # Signature (mtime, taille) de la dernière version rejetée : elle n'est
+        # relue qu'après modification, reload_errors compte des versions
+        self._rejected_signature: Optional[tuple] = None
+        self._catalog = load_catalog(path)
+        self._signature = self._catalog.signature
+        self._next_check = time.monotonic() + check_interval
+        self._reload_lock = threading.Lock()
+
+    def current(self) -> Catalog:
+        """Instantané courant (rechargé si le fichier a changé)"""
+        if self.check_interval > 0 and time.monotonic() >= self._next_check:
+            self.check_reload()
+        return self._catalog
+
+    def check_reload(self) -> bool:
+        """
+        Recharge le catalogue si le fichier a changé
+
+        Returns:
+            True si une nouvelle version a été substituée
+        """
+        # Un seul thread recharge ; les autres continuent avec l'instantané courant
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            catalog = self._catalog
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                self._record_error(f"{self.path}: {e}", (None, None))
+                return False
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature in (self._signature, self._rejected_signature):
+                return False
+
+            try:
+                new_catalog = load_catalog(self.path)
+            except (OSError, CatalogError) as e:
+                self._record_error(str(e), signature)
+                return False
+            self._signature = new_catalog.signature
+            self._rejected_signature = None
+            if new_catalog.version == catalog.version:
+                # Fichier touché sans changement de contenu
+                return False
+
+            self._catalog = new_catalog
+            self.reloads += 1
+            self.last_error = None
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def _record_error(self, message: str, signature: tuple) -> None:
+        """Compte une version rejetée (une seule fois tant que le fichier ne change pas)"""
+        if signature == self._rejected_signature:
+            return
+        self._rejected_signature = signature
+        self.reload_errors += 1
+        self.last_error = message
+
+    def prometheus_metrics(self, prefix: str = "iso27001") -> str:
+        """Métriques du catalogue servi par ce processus (format texte Prometheus)"""
+        catalog = self._catalog
+        pid = os.getpid()
+        lines = [
+            f"# HELP {prefix}_catalog_info Catalog version served by this worker",
+            f"# TYPE {prefix}_catalog_info gauge",
+            f'{prefix}_catalog_info{{version="{catalog.version}",pid="{pid}"}} 1',
+            f"# HELP {prefix}_catalog_controls Number of controls in the served catalog",
+            f"# TYPE {prefix}_catalog_controls gauge",
+            f'{prefix}_catalog_controls{{pid="{pid}"}} {len(catalog)}',
+            f"# HELP {prefix}_catalog_loaded_timestamp_seconds Load time of the served catalog",
+            f"# TYPE {prefix}_catalog_loaded_timestamp_seconds gauge",
+            f'{prefix}_catalog_loaded_timestamp_seconds{{pid="{pid}"}} {catalog.loaded_at:.3f}',
+            f"# HELP {prefix}_catalog_reloads_total Catalog versions swapped in since start",
+            f"# TYPE {prefix}_catalog_reloads_total counter",
+            f'{prefix}_catalog_reloads_total{{pid="{pid}"}} {self.reloads}',
+            f"# HELP {prefix}_catalog_reload_errors_total Rejected catalog reloads",
+            f"# TYPE {prefix}_catalog_reload_errors_total counter",
+            f'{prefix}_catalog_reload_errors_total{{pid="{pid}"}} {self.reload_errors}',
+        ]
+        return "\n".join(lines) + "\n"
@@ -3,33 +3,74 @@ Module de vérification de conformité ISO 27001
 """
 import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+from modules.search_index import SearchIndex
+from modules.catalog import Catalog, load_catalog
+
+VALID_STATUSES = ("Implemented", "Partially Implemented", "Not Implemented", "Not Applicable")
+
+def get_version(assessment: Dict) -> int:
+    """Version d'une évaluation (0 pour les évaluations antérieures au versioning)"""
+    return assessment.get('metadata', {}).get('version', 0)
+
+def bump_version(assessment: Dict) -> int:
+    """Incrémente la version d'une évaluation après une écriture"""
+    version = get_version(assessment) + 1
+    assessment.setdefault('metadata', {})['version'] = version
+    return version
 
 class ComplianceChecker:
-    def __init__(self, controls_file: str = "data/iso27001_controls.json"):
-        """Initialise le checker avec les contrôles ISO 27001"""
-        with open(controls_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            self.controls = data['controls']
+    def __init__(self, controls_file: str = "data/iso27001_controls.json",
+                 search_index: Optional[SearchIndex] = None,
+                 catalog: Optional[Catalog] = None):
+        """
+        Initialise le checker avec les contrôles ISO 27001
+        
+        Args:
+            controls_file: Catalogue des contrôles
+            search_index: Index de recherche optionnel, alimenté avec le
+                catalogue puis à chaque assess_control
+            catalog: Catalogue déjà chargé (partagé, voir CatalogRegistry) ;
+                controls_file n'est alors pas relu
+        """
+        if catalog is None:
+            catalog = load_catalog(controls_file)
+        self.catalog = catalog
+        self.controls = catalog.controls
+        self.controls_by_id = catalog.controls_by_id
         
         self.assessment = {}
         self.results = {}
+        
+        self.search_index = search_index
+        if search_index is not None:
+            search_index.index_controls(self.controls)
     
-    def start_assessment(self, organization: str, assessor: str) -> Dict:
-        """Démarre une nouvelle évaluation"""
+    def start_assessment(self, organization: str, assessor: str,
+                         sector: Optional[str] = None) -> Dict:
+        """
+        Démarre une nouvelle évaluation
+
+        Args:
+            sector: Secteur d'activité (population de comparaison aux pairs)
+        """
         self.assessment = {
             "metadata": {
                 "organization": organization,
                 "assessor": assessor,
                 "date": datetime.now().isoformat(),
-                "standard": "ISO/IEC 27001:2022"
+                "standard": "ISO/IEC 27001:2022",
+                "version": 0
             },
             "controls_assessment": []
         }
+        if sector:
+            self.assessment['metadata']['sector'] = sector
         return self.assessment
     
     def assess_control(self, control_id: str, status: str, 
-                       evidence: str = "", comments: str = "") -> bool:
+                       evidence: str = "", comments: str = "",
+                       attachments: Optional[List[Dict]] = None) -> bool:
         """
         Évalue un contrôle spécifique
         
@@ -38,15 +79,48 @@ class ComplianceChecker:
             status: "Implemented" | "Partially Implemented" | "Not Implemented" | "Not Applicable"
             evidence: Description de la preuve
             comments: Commentaires additionnels
+            attachments: Pièces justificatives, référencées par empreinte
+                ({"sha256", "filename", "size"}, voir EvidenceStore)
         
         Returns:
-            True si succès, False sinon
+            True si succès, False si le contrôle est inconnu
+
+        Raises:
+            ValueError: statut invalide
         """
-        control = next((c for c in self.controls if c['id'] == control_id), None)
-        if not control:
+        assessment_item = self.build_assessment_item(control_id, status, evidence, comments,
+                                                     attachments)
+        if assessment_item is None:
             return False
         
-        assessment_item = {
+        self.assessment['controls_assessment'].append(assessment_item)
+        bump_version(self.assessment)
+        
+        if self.search_index is not None:
+            self.search_index.index_assessment_item(
+                self.assessment, assessment_item,
+                len(self.assessment['controls_assessment']) - 1
+            )
+        return True
+    
+    def build_assessment_item(self, control_id: str, status: str,
+                              evidence: str = "", comments: str = "",
+                              attachments: Optional[List[Dict]] = None) -> Optional[Dict]:
+        """
+        Construit un élément d'évaluation sans modifier l'évaluation (None si ID inconnu)
+
+        Raises:
+            ValueError: ID qui n'est pas une chaîne ou statut hors VALID_STATUSES
+        """
+        if not isinstance(control_id, str):
+            raise ValueError(f"Invalid control_id: {control_id!r}")
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Invalid status: {status!r} (expected one of {', '.join(VALID_STATUSES)})")
+        control = self.controls_by_id.get(control_id)
+        if not control:
+            return None
+        
+        item = {
             "control_id": control_id,
             "control_title": control['title'],
             "domain": control['domain'],
@@ -55,9 +129,9 @@ class ComplianceChecker:
             "comments": comments,
             "assessed_at": datetime.now().isoformat()
         }
-        
-        self.assessment['controls_assessment'].append(assessment_item)
-        return True
+        if attachments:
+            item["attachments"] = list(attachments)
+        return item
     
     def get_domain_controls(self, domain: str) -> List[Dict]:
         """Retourne tous les contrôles d'un domaine"""
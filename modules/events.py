@@ -0,0 +1,298 @@
+"""
+Module de diffusion d'événements temps réel (Server-Sent Events)
+
+Un EventBroker par processus : chaque écriture publie un seul événement par
+évaluation, sérialisé une fois au format SSE puis déposé dans la file de
+chaque abonné. Les files sont bornées et la publication ne bloque jamais :
+un client trop lent perd ses événements en attente et reçoit à la place un
+événement "resync" l'invitant à recharger /api/statistics.
+
+Entre processus (workers gunicorn), les événements passent par un
+répertoire de relais partagé : un processus ayant des abonnés à une
+évaluation le signale par {canal}.watch, rafraîchi à chaque scrutation ;
+un processus qui publie sur un canal surveillé y dépose le dernier
+événement ({canal}.event), qu'un fil de scrutation par processus relaie
+à ses abonnés locaux. Des événements publiés entre deux scrutations sont
+fusionnés : l'abonné reçoit "resync" puis le dernier. Le départ du dernier
+abonné local supprime {canal}.watch (les autres processus le recréent à
+leur scrutation suivante) et la scrutation supprime les fichiers périmés.
+"""
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Set
+
+RESYNC_EVENT = "event: resync\ndata: {}\n\n"
+# Canaux relayables (les noms servent de noms de fichiers)
+CHANNEL_PATTERN = re.compile(r"^[0-9A-Za-z_-]+$")
+
+class SubscriberLimitError(Exception):
+    """Nombre maximal de flux ouverts atteint dans ce processus"""
+
+def format_sse(event: str, data: Dict, event_id: Optional[object] = None) -> str:
+    """Sérialise un événement au format text/event-stream"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", channel: str, max_queue: int):
+        """File bornée d'un abonné (créée par EventBroker.subscribe)"""
+        self.broker = broker
+        self.channel = channel
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.closed = False
+        self._events: deque = deque()
+        self._condition = threading.Condition()
+
+    def push(self, message: str) -> None:
+        """Dépose un message sans jamais bloquer l'écrivain"""
+        with self._condition:
+            if len(self._events) >= self.max_queue:
+                # Abonné en retard : inutile de garder des deltas périmés
+                self.dropped += len(self._events)
+                self._events.clear()
+                message = RESYNC_EVENT
+            self._events.append(message)
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Message suivant, ou None après `timeout` secondes (ou à la fermeture)"""
+        with self._condition:
+            if not self._events and not self.closed:
+                self._condition.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class EventBroker:
+    def __init__(self, max_queue: int = 100, max_subscribers: Optional[int] = None,
+                 relay_dir: Optional[str] = None, poll_interval: float = 1.0):
+        """
+        Initialise le diffuseur
+
+        Args:
+            max_queue: Nombre maximal de messages en attente par abonné
+            max_subscribers: Nombre maximal d'abonnés du processus (chaque
+                flux SSE occupe un thread du worker) ; None = illimité
+            relay_dir: Répertoire de relais partagé entre processus ; None =
+                diffusion locale au processus
+            poll_interval: Délai (secondes) entre deux scrutations du relais
+        """
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.relay_dir = relay_dir
+        self.poll_interval = poll_interval
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        # Dernier identifiant diffusé et dernier jeton de relais vu, par canal
+        self._last_ids: Dict[str, object] = {}
+        self._relay_signatures: Dict[str, tuple] = {}
+        self._relay_tokens: Dict[str, str] = {}
+        self._sequence = itertools.count()
+        self._poller: Optional[threading.Thread] = None
+        if relay_dir:
+            os.makedirs(relay_dir, exist_ok=True)
+
+    def subscribe(self, channel: str) -> Subscription:
+        """
+        Abonne un client aux événements d'une évaluation
+
+        Raises:
+            SubscriberLimitError: max_subscribers abonnés déjà servis
+        """
+        subscription = Subscription(self, channel, self.max_queue)
+        with self._lock:
+            if (self.max_subscribers is not None
+                    and sum(map(len, self._channels.values())) >= self.max_subscribers):
+                raise SubscriberLimitError(f"{self.max_subscribers} event streams already open")
+            if channel not in self._channels and self._relayed(channel):
+                # Les événements déjà déposés ne sont pas rejoués
+                self._relay_signatures.pop(channel, None)
+                self._relay_tokens[channel] = (self._read_relay(channel) or {}).get('token')
+            self._channels.setdefault(channel, set()).add(subscription)
+            if self.relay_dir and self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name='sse-relay', daemon=True)
+                self._poller.start()
+        if self._relayed(channel):
+            self._touch(self._relay_path(channel, '.watch'))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+                    if self._relayed(subscription.channel):
+                        self._relay_signatures.pop(subscription.channel, None)
+                        self._relay_tokens.pop(subscription.channel, None)
+                        try:
+                            os.remove(self._relay_path(subscription.channel, '.watch'))
+                        except OSError:
+                            pass
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def has_subscribers(self, channel: str) -> bool:
+        """Abonnés dans ce processus ou, via le relais, dans un autre"""
+        return bool(self.subscriber_count(channel)) or self._watched(channel)
+
+    def publish(self, channel: str, event: str, data: Dict,
+                event_id: Optional[object] = None) -> int:
+        """
+        Diffuse un événement à tous les abonnés d'une évaluation
+
+        Returns:
+            Nombre d'abonnés servis dans ce processus
+        """
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+            self._last_ids[channel] = event_id
+        watched = self._watched(channel)
+        if not subscribers and not watched:
+            return 0
+
+        message = format_sse(event, data, event_id)
+        if watched:
+            self._write_relay(channel, event_id, message)
+        for subscription in subscribers:
+            subscription.push(message)
+        return len(subscribers)
+
+    def _deliver(self, channel: str, event_id: Optional[object], message: str) -> None:
+        """Diffuse localement un événement relayé (resync s'il en manque)"""
+        with self._lock:
+            last = self._last_ids.get(channel)
+            self._last_ids[channel] = event_id
+            subscribers = list(self._channels.get(channel, ()))
+        if isinstance(event_id, int) and isinstance(last, int):
+            if event_id <= last:
+                return
+            if event_id > last + 1:
+                message = RESYNC_EVENT + message
+        for subscription in subscribers:
+            subscription.push(message)
+
+    # Relais entre processus
+
+    def _relayed(self, channel: str) -> bool:
+        return bool(self.relay_dir) and bool(CHANNEL_PATTERN.match(channel))
+
+    def _relay_path(self, channel: str, suffix: str) -> str:
+        return os.path.join(self.relay_dir, f"{channel}{suffix}")
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        with open(path, 'a'):
+            pass
+        os.utime(path)
+
+    def _watch_expiry(self) -> float:
+        """Date avant laquelle une marque .watch n'est plus rafraîchie"""
+        return time.time() - 3 * self.poll_interval
+
+    def _watched(self, channel: str) -> bool:
+        """Un processus a-t-il des abonnés à ce canal (marque récente) ?"""
+        if not self._relayed(channel):
+            return False
+        try:
+            watched_at = os.path.getmtime(self._relay_path(channel, '.watch'))
+        except OSError:
+            return False
+        return watched_at >= self._watch_expiry()
+
+    def _remove_stale_relays(self) -> None:
+        """
+        Supprime les marques .watch plus rafraîchies et les .event des canaux
+        sans marque récente (évaluations supprimées ou plus suivies)
+
+        Un .event récent est conservé : il n'est déposé que sur un canal
+        surveillé, dont la marque peut être en cours de recréation.
+        """
+        expiry = self._watch_expiry()
+        try:
+            entries = {entry.name: entry for entry in os.scandir(self.relay_dir)}
+        except OSError:
+            return
+        for name, entry in entries.items():
+            channel, suffix = os.path.splitext(name)
+            if suffix not in ('.watch', '.event') or not CHANNEL_PATTERN.match(channel):
+                continue
+            try:
+                if entry.stat().st_mtime >= expiry:
+                    continue
+                if suffix == '.event' and self._watched(channel):
+                    continue
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _write_relay(self, channel: str, event_id: Optional[object], message: str) -> None:
+        token = f"{os.getpid()}:{id(self)}:{next(self._sequence)}"
+        path = self._relay_path(channel, '.event')
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'token': token, 'id': event_id, 'message': message}, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            # Déjà diffusé localement
+            self._relay_tokens[channel] = token
+
+    def _read_relay(self, channel: str) -> Optional[Dict]:
+        """Dernier événement déposé (None s'il n'a pas changé depuis la dernière lecture)"""
+        path = self._relay_path(channel, '.event')
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if self._relay_signatures.get(channel) == signature:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                relay = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._relay_signatures[channel] = signature
+        return relay
+
+    def _poll(self) -> None:
+        """Fil de scrutation : marque les canaux surveillés et relaie les événements des autres processus"""
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                channels = [channel for channel in self._channels if self._relayed(channel)]
+                if not self._channels:
+                    self._poller = None
+                    return
+            for channel in channels:
+                try:
+                    self._touch(self._relay_path(channel, '.watch'))
+                except OSError:
+                    pass
+                with self._lock:
+                    relay = self._read_relay(channel)
+                    if relay is None or relay.get('token') == self._relay_tokens.get(channel):
+                        continue
+                    self._relay_tokens[channel] = relay.get('token')
+                self._deliver(channel, relay.get('id'), relay.get('message', ''))
+            self._remove_stale_relays()
@@ -0,0 +1,282 @@
+"""
+Module de stockage des pièces justificatives (adressage par contenu)
+
+Chaque fichier est identifié par l'empreinte SHA-256 de son contenu et
+stocké une seule fois sous {répertoire}/{2 premiers caractères}/{empreinte},
+quel que soit le nombre de contrôles ou d'organisations qui le citent. Le
+contenu est haché pendant sa copie, par blocs : un fichier volumineux ne
+transite jamais entièrement en mémoire.
+
+Les éléments d'évaluation référencent les pièces par empreinte (champ
+"attachments") ; le ramasse-miettes supprime les blobs qu'aucune
+évaluation ne référence plus. Les évaluations de session (cookie) ne sont
+pas sur disque : leurs références sont épinglées ({répertoire}/pins) et
+comptent comme des références.
+
+Usage:
+    python -m modules.evidence_store gc [répertoires...] [--evidence-dir data/evidence]
+
+Sans répertoire, la collecte parcourt ceux de la configuration
+(ASSESSMENTS_DIR, SHARED_ASSESSMENTS_DIR, SHARD_DIRS).
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set
+
+from modules.integrity import iter_assessment_files
+
+CHUNK_SIZE = 1024 * 1024
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+# Un blob déposé mais pas encore référencé n'est pas collecté avant ce délai
+DEFAULT_GC_GRACE_SECONDS = 3600
+
+class BlobNotFoundError(KeyError):
+    """Pièce justificative inconnue"""
+
+class EvidenceStore:
+    def __init__(self, directory: str = "data/evidence"):
+        """
+        Initialise le stockage
+
+        Args:
+            directory: Répertoire des blobs (créé si nécessaire)
+        """
+        self.directory = directory
+        self._tmp_dir = os.path.join(directory, 'tmp')
+        self._pins_dir = os.path.join(directory, 'pins')
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        os.makedirs(self._pins_dir, exist_ok=True)
+
+    def path(self, sha256: str) -> str:
+        """Chemin du blob (l'empreinte est validée)"""
+        if not isinstance(sha256, str) or not SHA256_PATTERN.match(sha256):
+            raise BlobNotFoundError(sha256)
+        return os.path.join(self.directory, sha256[:2], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        try:
+            return os.path.isfile(self.path(sha256))
+        except BlobNotFoundError:
+            return False
+
+    def size(self, sha256: str) -> int:
+        try:
+            return os.path.getsize(self.path(sha256))
+        except FileNotFoundError:
+            raise BlobNotFoundError(sha256) from None
+
+    def put(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Dict:
+        """
+        Enregistre le contenu d'un flux binaire
+
+        Le flux est copié par blocs dans un fichier temporaire tout en étant
+        haché, puis renommé atomiquement vers son chemin définitif ; si ce
+        contenu existe déjà, la copie est simplement supprimée.
+
+        Returns:
+            {"sha256", "size", "deduplicated"}
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            final_path = self.path(sha256)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+                # Rafraîchit le délai de grâce du ramasse-miettes
+                os.utime(final_path)
+                return {"sha256": sha256, "size": size, "deduplicated": True}
+
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, final_path)
+            return {"sha256": sha256, "size": size, "deduplicated": False}
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put_bytes(self, data: bytes) -> Dict:
+        """Enregistre un contenu déjà en mémoire"""
+        return self.put(io.BytesIO(data))
+
+    def put_file(self, path: str, chunk_size: int = CHUNK_SIZE) -> Dict:
+        """Enregistre un fichier local"""
+        with open(path, 'rb') as f:
+            return self.put(f, chunk_size)
+
+    def open(self, sha256: str) -> BinaryIO:
+        """Ouvre un blob en lecture binaire"""
+        try:
+            return open(self.path(sha256), 'rb')
+        except FileNotFoundError:
+            raise BlobNotFoundError(sha256) from None
+
+    def pin(self, sha256: str) -> None:
+        """
+        Épingle un blob référencé hors de l'archive (évaluation de session)
+
+        L'épingle est un fichier vide {répertoire}/pins/{empreinte}, dont la
+        date est rafraîchie à chaque nouvelle référence.
+        """
+        path = os.path.join(self._pins_dir, os.path.basename(self.path(sha256)))
+        with open(path, 'a'):
+            pass
+        os.utime(path)
+
+    def pinned(self) -> Dict[str, float]:
+        """Empreintes épinglées et date (mtime) de leur dernière référence"""
+        pins = {}
+        with os.scandir(self._pins_dir) as entries:
+            for entry in entries:
+                if SHA256_PATTERN.match(entry.name):
+                    pins[entry.name] = entry.stat().st_mtime
+        return pins
+
+    def iter_hashes(self) -> Iterator[str]:
+        """Parcourt les empreintes des blobs stockés"""
+        with os.scandir(self.directory) as shards:
+            for shard in shards:
+                if len(shard.name) != 2 or not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if SHA256_PATTERN.match(entry.name):
+                            yield entry.name
+
+    def gc(self, referenced: Iterable[str], grace_seconds: float = DEFAULT_GC_GRACE_SECONDS,
+           dry_run: bool = False, pin_max_age: Optional[float] = None) -> Dict:
+        """
+        Supprime les blobs non référencés
+
+        Les blobs (et fichiers temporaires) plus récents que `grace_seconds`
+        sont conservés : un dépôt en cours ou pas encore rattaché à un
+        contrôle n'est pas perdu. Les blobs épinglés sont conservés.
+
+        Args:
+            pin_max_age: Âge (secondes) au-delà duquel une épingle est
+                retirée (sessions expirées) ; None : les épingles sont gardées
+
+        Returns:
+            {"kept", "removed", "freed_bytes", "removed_hashes"}
+        """
+        referenced = set(referenced)
+        now = time.time()
+        cutoff = now - grace_seconds
+        for sha256, pinned_at in self.pinned().items():
+            if pin_max_age is None or pinned_at > now - pin_max_age:
+                referenced.add(sha256)
+            elif not dry_run:
+                os.unlink(os.path.join(self._pins_dir, sha256))
+        stats = {"kept": 0, "removed": 0, "freed_bytes": 0, "removed_hashes": []}
+
+        for sha256 in list(self.iter_hashes()):
+            path = self.path(sha256)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if sha256 in referenced or stat.st_mtime > cutoff:
+                stats["kept"] += 1
+                continue
+            if not dry_run:
+                os.unlink(path)
+            stats["removed"] += 1
+            stats["freed_bytes"] += stat.st_size
+            stats["removed_hashes"].append(sha256)
+
+        # Fichiers temporaires abandonnés (processus interrompu)
+        with os.scandir(self._tmp_dir) as entries:
+            for entry in entries:
+                if not dry_run and entry.stat().st_mtime <= cutoff:
+                    os.unlink(entry.path)
+
+        return stats
+
+def attachment_hashes(assessment: Dict) -> Set[str]:
+    """Empreintes des pièces référencées par une évaluation"""
+    return {
+        attachment['sha256']
+        for item in assessment.get('controls_assessment', [])
+        for attachment in item.get('attachments', ())
+    }
+
+def referenced_hashes(assessments: Iterable[Dict]) -> Set[str]:
+    """Empreintes référencées par un ensemble d'évaluations"""
+    referenced: Set[str] = set()
+    for assessment in assessments:
+        referenced |= attachment_hashes(assessment)
+    return referenced
+
+def default_roots(directories: List[str]) -> List[str]:
+    """
+    Répertoires existants à parcourir, sans ceux déjà inclus dans un autre
+
+    (le répertoire partagé est par défaut sous l'archive, parcourue
+    récursivement)
+    """
+    absolute = [os.path.join(os.path.abspath(d), '') for d in directories if os.path.isdir(d)]
+    return [os.path.dirname(d) for i, d in enumerate(absolute)
+            if d not in absolute[:i]
+            and not any(d != other and d.startswith(other) for other in absolute)]
+
+def _iter_archive(directories: List[str]) -> Iterator[Dict]:
+    for directory in directories:
+        for path in iter_assessment_files(directory):
+            with open(path, 'r', encoding='utf-8') as f:
+                yield json.load(f)
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evidence blob store maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    gc_parser = subparsers.add_parser('gc', help="Supprimer les blobs non référencés")
+    gc_parser.add_argument('assessments', nargs='*',
+                           help="Répertoires d'évaluations (parcourus récursivement) ; "
+                                "défaut : ceux de la configuration")
+    gc_parser.add_argument('--evidence-dir', default=None,
+                           help="Répertoire des blobs (défaut : EVIDENCE_DIR)")
+    gc_parser.add_argument('--grace', type=float, default=DEFAULT_GC_GRACE_SECONDS,
+                           help="Âge minimal (secondes) d'un blob supprimable")
+    gc_parser.add_argument('--pin-max-age', type=float, default=None,
+                           help="Âge (secondes) au-delà duquel une référence de session expire")
+    gc_parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args(argv)
+
+    directories = args.assessments
+    evidence_dir = args.evidence_dir
+    if not directories or evidence_dir is None:
+        from config import Config
+        directories = directories or default_roots(
+            [Config.ASSESSMENTS_DIR, Config.SHARED_ASSESSMENTS_DIR] + Config.SHARD_DIRS)
+        evidence_dir = evidence_dir or Config.EVIDENCE_DIR
+
+    store = EvidenceStore(evidence_dir)
+    # Toute l'archive est lue avant la moindre suppression : une évaluation
+    # illisible interrompt la collecte au lieu de perdre ses pièces
+    referenced = referenced_hashes(_iter_archive(directories))
+    stats = store.gc(referenced, args.grace, args.dry_run, args.pin_max_age)
+
+    action = "Would remove" if args.dry_run else "Removed"
+    print(f"✓ {action} {stats['removed']} blob(s), {stats['freed_bytes']} bytes; "
+          f"kept {stats['kept']} ({len(referenced)} referenced)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""
+Module d'export du portefeuille d'évaluations (CSV / JSON Lines)
+
+Les évaluations sont lues une à une depuis le répertoire de stockage et
+transformées par des générateurs en lignes :
+- "assessments" : une ligne par évaluation (métadonnées)
+- "controls" : une ligne par contrôle évalué
+- "scores" : score global et scores par domaine de chaque évaluation
+
+La mémoire utilisée ne dépend que de la plus grosse évaluation, pas de la
+taille du portefeuille. Un curseur ({sortie}.cursor) est enregistré
+régulièrement : après une interruption, --resume tronque la sortie au
+dernier point de reprise et repart de l'évaluation suivante. En gzip,
+chaque point de reprise termine un membre gzip (les membres concaténés
+forment un fichier gzip valide).
+
+Usage:
+    python -m modules.export controls portfolio.csv.gz --source data/assessments
+    python -m modules.export scores scores.jsonl --resume
+    python -m modules.export scores scores.jsonl --source /srv/a/shard-0 --source /srv/b/shard-1
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from modules.scoring import ComplianceScoring
+
+EXPORT_KINDS = ('assessments', 'controls', 'scores')
+EXPORT_FORMATS = ('csv', 'jsonl')
+DEFAULT_CHECKPOINT_EVERY = 100
+
+FIELDS = {
+    'assessments': ['assessment', 'organization', 'assessor', 'date', 'standard', 'version',
+                    'controls'],
+    'controls': ['assessment', 'organization', 'date', 'control_id', 'control_title', 'domain',
+                 'status', 'evidence', 'comments', 'assessed_at', 'attachments'],
+    'scores': ['assessment', 'organization', 'date', 'scope', 'score', 'total_controls',
+               'implemented', 'partially_implemented', 'not_implemented', 'not_applicable']
+}
+
+def iter_assessment_paths(root: str, after: Optional[str] = None) -> Iterator[str]:
+    """
+    Chemins relatifs des évaluations, dans l'ordre lexicographique
+
+    Seul le contenu du répertoire en cours de parcours est trié en mémoire.
+    Avec `after`, les chemins inférieurs ou égaux sont ignorés (reprise).
+    """
+    def walk(directory: str, prefix: str) -> Iterator[str]:
+        with os.scandir(directory) as entries:
+            # Clé "nom/" pour les répertoires : l'ordre de parcours est
+            # celui des chemins complets ("a.json" < "a/b.json")
+            names = sorted(
+                (entry.name + "/" if entry.is_dir(follow_symlinks=False) else entry.name)
+                for entry in entries
+            )
+        for name in names:
+            relative = f"{prefix}{name}"
+            if name.endswith("/"):
+                # Sous-arbre entièrement exporté : inutile de le parcourir
+                if after is None or after < relative or after.startswith(relative):
+                    yield from walk(os.path.join(directory, name[:-1]), relative)
+            elif name.endswith('.json') and (after is None or relative > after):
+                yield relative
+
+    yield from walk(root, "")
+
+def _load_assessment(root: str, relative: str) -> Dict:
+    with open(os.path.join(root, relative), 'r', encoding='utf-8') as f:
+        assessment = json.load(f)
+    if not isinstance(assessment, dict):
+        raise ValueError("top-level JSON value is not an object")
+    return assessment
+
+def iter_assessments(root: str, after: Optional[str] = None,
+                     errors: Optional[List[Dict]] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    (chemin relatif, évaluation) chargées une à une
+
+    Avec `errors`, les fichiers illisibles y sont consignés et ignorés au
+    lieu d'interrompre le parcours.
+    """
+    for relative in iter_assessment_paths(root, after):
+        try:
+            assessment = _load_assessment(root, relative)
+        except (OSError, ValueError) as e:  # JSONDecodeError et UnicodeDecodeError inclus
+            if errors is None:
+                raise
+            errors.append({"path": relative, "error": f"{type(e).__name__}: {e}"})
+            continue
+        yield relative, assessment
+
+def shard_name(directory: str) -> str:
+    """Nom d'un shard (dernier composant de son répertoire)"""
+    return os.path.basename(os.path.normpath(directory))
+
+def iter_sharded_assessments(roots: Sequence[str], after: Optional[str] = None,
+                             errors: Optional[List[Dict]] = None,
+                             workers: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    ("shard/chemin relatif", évaluation) de plusieurs répertoires (shards)
+
+    Les fichiers sont lus en parallèle par un pool de threads (par défaut
+    2 par shard), avec une fenêtre bornée de lectures d'avance, mais
+    restitués dans un ordre stable : shards par nom puis chemins dans
+    l'ordre de iter_assessment_paths. Le curseur `after` d'un export
+    interrompu reste donc valable.
+    """
+    shards = sorted((shard_name(root), root) for root in roots)
+    names = [name for name, _ in shards]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Shard directories must have distinct names: {names}")
+    after_shard, _, after_relative = (after or '').partition('/')
+
+    def paths() -> Iterator[Tuple[str, str, str]]:
+        for name, root in shards:
+            if after and name < after_shard:
+                continue
+            shard_after = after_relative if after and name == after_shard else None
+            for relative in iter_assessment_paths(root, shard_after):
+                yield name, root, relative
+
+    workers = workers or 2 * max(1, len(shards))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    window: deque = deque()
+
+    def next_result() -> Iterator[Tuple[str, Dict]]:
+        name, relative, future = window.popleft()
+        try:
+            assessment = future.result()
+        except (OSError, ValueError) as e:
+            if errors is None:
+                raise
+            errors.append({"path": f"{name}/{relative}", "error": f"{type(e).__name__}: {e}"})
+            return
+        yield f"{name}/{relative}", assessment
+
+    try:
+        for name, root, relative in paths():
+            window.append((name, relative, pool.submit(_load_assessment, root, relative)))
+            if len(window) >= 4 * workers:
+                yield from next_result()
+        while window:
+            yield from next_result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _assessment_key(relative: str) -> str:
+    return relative[:-len('.json')]
+
+def assessment_rows(key: str, assessment: Dict) -> Iterator[Dict]:
+    meta = assessment.get('metadata', {})
+    yield {
+        'assessment': key,
+        'organization': meta.get('organization', ''),
+        'assessor': meta.get('assessor', ''),
+        'date': meta.get('date', ''),
+        'standard': meta.get('standard', ''),
+        'version': meta.get('version', 0),
+        'controls': len(assessment.get('controls_assessment', []))
+    }
+
+def control_rows(key: str, assessment: Dict) -> Iterator[Dict]:
+    meta = assessment.get('metadata', {})
+    for item in assessment.get('controls_assessment', []):
+        yield {
+            'assessment': key,
+            'organization': meta.get('organization', ''),
+            'date': meta.get('date', ''),
+            'control_id': item.get('control_id', ''),
+            'control_title': item.get('control_title', ''),
+            'domain': item.get('domain', ''),
+            'status': item.get('status', ''),
+            'evidence': item.get('evidence', ''),
+            'comments': item.get('comments', ''),
+            'assessed_at': item.get('assessed_at', ''),
+            'attachments': ' '.join(a['sha256'] for a in item.get('attachments', ()))
+        }
+
+def score_rows(key: str, assessment: Dict) -> Iterator[Dict]:
+    meta = assessment.get('metadata', {})
+    stats = ComplianceScoring(assessment).get_statistics()
+    base = {'assessment': key, 'organization': meta.get('organization', ''),
+            'date': meta.get('date', '')}
+    yield {
+        **base,
+        'scope': 'overall',
+        'score': stats['overall_score'],
+        **{field: stats[field] for field in FIELDS['scores'][5:]}
+    }
+    for domain, score in stats['domain_scores'].items():
+        yield {**base, 'scope': domain, 'score': score}
+
+ROW_GENERATORS = {
+    'assessments': assessment_rows,
+    'controls': control_rows,
+    'scores': score_rows
+}
+
+class _Sink:
+    """Sortie texte (gzip optionnel) pouvant être coupée proprement à un point de reprise"""
+
+    def __init__(self, path: str, kind: str, fmt: str, compress: bool, offset: int = 0):
+        self.kind = kind
+        self.fmt = fmt
+        self.compress = compress
+        self._raw = open(path, 'r+b' if offset else 'wb')
+        # Supprime ce qui a été écrit après le dernier point de reprise
+        self._raw.truncate(offset)
+        self._raw.seek(offset)
+        self._open_member()
+        if not offset and fmt == 'csv':
+            self._writer.writeheader()
+
+    def _open_member(self) -> None:
+        self._binary = gzip.GzipFile(fileobj=self._raw, mode='wb') if self.compress else self._raw
+        self._text = io.TextIOWrapper(self._binary, encoding='utf-8', newline='')
+        if self.fmt == 'csv':
+            self._writer = csv.DictWriter(self._text, fieldnames=FIELDS[self.kind],
+                                          extrasaction='ignore')
+
+    def write(self, row: Dict) -> None:
+        if self.fmt == 'csv':
+            self._writer.writerow(row)
+        else:
+            self._text.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def _close_member(self) -> None:
+        self._text.flush()
+        self._text.detach()
+        if self.compress:
+            self._binary.close()  # écrit la fin du membre gzip, pas le fichier
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def checkpoint(self) -> int:
+        """Rend la sortie cohérente sur disque et retourne la position de reprise"""
+        self._close_member()
+        offset = self._raw.tell()
+        self._open_member()
+        return offset
+
+    def close(self) -> int:
+        self._close_member()
+        offset = self._raw.tell()
+        self._raw.close()
+        return offset
+
+def _cursor_path(output: str) -> str:
+    return f"{output}.cursor"
+
+def _save_cursor(output: str, cursor: Dict) -> None:
+    path = _cursor_path(output)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cursor, f)
+    os.replace(tmp_path, path)
+
+def load_cursor(output: str) -> Optional[Dict]:
+    """Curseur de reprise d'un export interrompu (None s'il n'y en a pas)"""
+    try:
+        with open(_cursor_path(output), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def export_portfolio(source: Union[str, Sequence[str]], output: str, kind: str = 'controls',
+                     fmt: Optional[str] = None, compress: Optional[bool] = None,
+                     resume: bool = False, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                     limit: Optional[int] = None) -> Dict:
+    """
+    Exporte le portefeuille en flux
+
+    Args:
+        source: Répertoire des évaluations (parcouru récursivement), ou
+            liste des répertoires des shards, lus en parallèle (les clés
+            d'évaluation sont alors préfixées par le nom du shard)
+        output: Fichier de sortie ; format et gzip déduits de l'extension
+            (.csv, .jsonl, .gz) s'ils ne sont pas précisés
+        kind: "assessments", "controls" ou "scores"
+        resume: Reprendre au curseur enregistré (s'il existe)
+        checkpoint_every: Évaluations entre deux points de reprise
+        limit: Nombre maximal d'évaluations traitées par cet appel (le
+            curseur est conservé pour l'appel suivant)
+
+    Returns:
+        {"assessments", "rows", "complete", "bytes"} cumulés depuis le début
+        de l'export, et "skipped" (fichiers illisibles ou mal structurés
+        ignorés par cet appel)
+
+    Raises:
+        ValueError: type, format ou curseur incompatible
+    """
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"Unknown export kind: {kind!r}")
+    stem = output[:-3] if output.endswith('.gz') else output
+    compress = output.endswith('.gz') if compress is None else compress
+    fmt = fmt or ('csv' if stem.endswith('.csv') else 'jsonl')
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+
+    sharded = not isinstance(source, str)
+    source_setting = ([os.path.abspath(root) for root in source] if sharded
+                      else os.path.abspath(source))
+    settings = {"source": source_setting, "kind": kind, "format": fmt, "gzip": compress}
+    cursor = load_cursor(output) if resume else None
+    if cursor is not None:
+        if cursor['settings'] != settings:
+            raise ValueError(f"Cursor {_cursor_path(output)} was written with other settings")
+    else:
+        cursor = {"settings": settings, "last": None, "offset": 0, "assessments": 0, "rows": 0}
+
+    rows_for = ROW_GENERATORS[kind]
+    skipped: List[Dict] = []
+    sink = _Sink(output, kind, fmt, compress, cursor['offset'])
+    processed = 0
+    complete = True
+    assessments = (iter_sharded_assessments(source, cursor['last'], skipped) if sharded
+                   else iter_assessments(source, cursor['last'], skipped))
+    try:
+        for relative, assessment in assessments:
+            if limit is not None and processed >= limit:
+                complete = False
+                break
+            # Lignes générées avant écriture : une évaluation mal structurée
+            # est ignorée sans laisser de lignes partielles
+            try:
+                rows = list(rows_for(_assessment_key(relative), assessment))
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                skipped.append({"path": relative, "error": f"{type(e).__name__}: {e}"})
+                continue
+            for row in rows:
+                sink.write(row)
+            cursor['rows'] += len(rows)
+            cursor['assessments'] += 1
+            cursor['last'] = relative
+            processed += 1
+            if processed % checkpoint_every == 0:
+                cursor['offset'] = sink.checkpoint()
+                _save_cursor(output, cursor)
+    finally:
+        # Arrête la lecture anticipée des shards
+        assessments.close()
+        # En cas d'erreur, le curseur reste au dernier point de reprise
+        offset = sink.close()
+
+    if complete:
+        if os.path.exists(_cursor_path(output)):
+            os.unlink(_cursor_path(output))
+    else:
+        cursor['offset'] = offset
+        _save_cursor(output, cursor)
+
+    return {"assessments": cursor['assessments'], "rows": cursor['rows'],
+            "complete": complete, "bytes": offset, "skipped": skipped}
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream the assessment portfolio to CSV/JSONL")
+    parser.add_argument('kind', choices=EXPORT_KINDS)
+    parser.add_argument('output', help="Fichier de sortie (.csv, .jsonl, suffixe .gz pour gzip)")
+    parser.add_argument('--source', action='append',
+                        help="Répertoire des évaluations (défaut data/assessments) ; "
+                             "répéter l'option pour exporter plusieurs shards")
+    parser.add_argument('--format', choices=EXPORT_FORMATS,
+                        help="Format (défaut : déduit de l'extension)")
+    parser.add_argument('--gzip', action='store_true', default=None,
+                        help="Compresser (défaut : si la sortie se termine par .gz)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre un export interrompu au dernier curseur")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_CHECKPOINT_EVERY)
+    parser.add_argument('--limit', type=int, help="Nombre maximal d'évaluations pour cet appel")
+    args = parser.parse_args(argv)
+
+    sources = args.source or ["data/assessments"]
+    source = sources[0] if len(sources) == 1 else sources
+    try:
+        result = export_portfolio(source, args.output, args.kind, args.format, args.gzip,
+                                  args.resume, args.checkpoint_every, args.limit)
+    except ValueError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+
+    state = "complete" if result['complete'] else "partial (resume with --resume)"
+    print(f"✓ {result['rows']} rows from {result['assessments']} assessments "
+          f"written to {args.output} ({state})")
+    for skipped in result['skipped']:
+        print(f"✗ skipped {skipped['path']}: {skipped['error']}", file=sys.stderr)
+    return 1 if result['skipped'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+Module multi-référentiels (ISO 27001:2022, 2013, autres)
+
+Charge plusieurs catalogues de contrôles et des fichiers de correspondance
+entre identifiants, puis les compile en tables creuses (format COO trié :
+indices source, indices cible, poids) pour projeter une évaluation sur tous
+les autres référentiels en une seule passe vectorisée numpy.
+
+Format d'un catalogue : celui de data/iso27001_controls.json, avec une clé
+optionnelle "framework": {"id": "...", "name": "..."}.
+
+Format d'un fichier de correspondance :
+    {
+      "source": "iso27001-2022",
+      "target": "iso27001-2013",
+      "mappings": [{"source": "A.5.1", "target": "A.5.1.1", "weight": 1.0}]
+    }
+
+Usage:
+    python -m modules.frameworks evaluation.json --frameworks-dir data/frameworks
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_FRAMEWORK_ID = "iso27001-2022"
+
+STATUS_WEIGHTS = {
+    'Implemented': 1.0,
+    'Partially Implemented': 0.5,
+    'Not Implemented': 0.0
+}
+
+class FrameworkError(ValueError):
+    """Catalogue ou correspondance invalide"""
+
+class _CompiledProjection:
+    """Tables précalculées pour projeter un référentiel source"""
+
+    def __init__(self, src_idx: np.ndarray, tgt_idx: np.ndarray, weights: np.ndarray,
+                 target_slices: Dict[str, slice], n_targets: int,
+                 domain_idx: np.ndarray, domain_labels: List[tuple]):
+        self.src_idx = src_idx
+        self.tgt_idx = tgt_idx
+        self.weights = weights
+        self.target_slices = target_slices
+        self.n_targets = n_targets
+        self.domain_idx = domain_idx
+        self.domain_labels = domain_labels
+
+class FrameworkRegistry:
+    def __init__(self):
+        """Initialise un registre vide"""
+        self.frameworks: Dict[str, Dict] = {}
+        self.mappings: Dict[tuple, List[Dict]] = {}
+        self._compiled: Dict[str, _CompiledProjection] = {}
+
+    @classmethod
+    def with_default_catalog(cls, controls_file: str = "data/iso27001_controls.json") -> 'FrameworkRegistry':
+        """Crée un registre contenant le catalogue ISO 27001:2022 par défaut"""
+        registry = cls()
+        registry.load_catalog(controls_file, DEFAULT_FRAMEWORK_ID)
+        return registry
+
+    def load_catalog(self, path: str, framework_id: Optional[str] = None) -> str:
+        """
+        Charge un catalogue de contrôles
+
+        Returns:
+            Identifiant du référentiel chargé
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        info = data.get('framework', {})
+        framework_id = framework_id or info.get('id')
+        if not framework_id:
+            raise FrameworkError(f"{path}: framework id missing")
+
+        self.add_catalog(framework_id, data['controls'], info.get('name', framework_id))
+        return framework_id
+
+    def add_catalog(self, framework_id: str, controls: List[Dict], name: str = None) -> None:
+        """Enregistre un catalogue déjà chargé"""
+        ids = [c['id'] for c in controls]
+        if len(set(ids)) != len(ids):
+            raise FrameworkError(f"{framework_id}: duplicate control ids")
+
+        self.frameworks[framework_id] = {
+            "name": name or framework_id,
+            "controls": controls,
+            "index": pd.Index(ids),
+            "domains": [c.get('domain', '') for c in controls]
+        }
+        self._compiled.clear()
+
+    def load_directory(self, directory: str) -> List[str]:
+        """
+        Charge les catalogues puis les correspondances (*.json) d'un répertoire
+
+        Un fichier contenant "mappings" est une correspondance, les autres
+        sont des catalogues.
+
+        Returns:
+            Identifiants des référentiels chargés
+        """
+        catalogs, mappings = [], []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, 'r', encoding='utf-8') as f:
+                (mappings if 'mappings' in json.load(f) else catalogs).append(path)
+        loaded = [self.load_catalog(path) for path in catalogs]
+        for path in mappings:
+            self.load_mapping(path)
+        return loaded
+
+    def load_mapping(self, path: str) -> tuple:
+        """Charge un fichier de correspondance entre deux référentiels"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.add_mapping(data['source'], data['target'], data['mappings'])
+        return data['source'], data['target']
+
+    def add_mapping(self, source: str, target: str, mappings: List[Dict]) -> None:
+        """Enregistre une correspondance (les IDs doivent exister dans les catalogues)"""
+        for framework_id in (source, target):
+            if framework_id not in self.frameworks:
+                raise FrameworkError(f"Unknown framework: {framework_id}")
+
+        src_index = self.frameworks[source]['index']
+        tgt_index = self.frameworks[target]['index']
+        unknown = [m for m in mappings
+                   if m['source'] not in src_index or m['target'] not in tgt_index]
+        if unknown:
+            raise FrameworkError(
+                f"{source}->{target}: {len(unknown)} mapping(s) reference unknown controls "
+                f"(first: {unknown[0]['source']} -> {unknown[0]['target']})"
+            )
+
+        self.mappings[(source, target)] = mappings
+        self._compiled.pop(source, None)
+
+    def compile(self, source: str) -> _CompiledProjection:
+        """
+        Compile les correspondances d'un référentiel source
+
+        Tous les référentiels cibles partagent un même espace d'indices
+        (concaténation), de sorte qu'un seul np.bincount projette
+        l'évaluation sur toutes les cibles à la fois.
+        """
+        if source in self._compiled:
+            return self._compiled[source]
+
+        src_parts, tgt_parts, weight_parts, domain_parts = [], [], [], []
+        target_slices, domain_labels = {}, []
+        offset = 0
+
+        for (src, target), mappings in sorted(self.mappings.items()):
+            if src != source:
+                continue
+            framework = self.frameworks[target]
+            size = len(framework['index'])
+
+            if mappings:
+                src_parts.append(self.frameworks[source]['index'].get_indexer(
+                    [m['source'] for m in mappings]))
+                tgt_parts.append(framework['index'].get_indexer(
+                    [m['target'] for m in mappings]) + offset)
+                weight_parts.append(np.array(
+                    [float(m.get('weight', 1.0)) for m in mappings]))
+
+            # Domaines de la cible : indices globaux (cible, domaine)
+            codes, uniques = pd.factorize(pd.Series(framework['domains']))
+            domain_parts.append(codes + len(domain_labels))
+            domain_labels.extend((target, domain) for domain in uniques)
+
+            target_slices[target] = slice(offset, offset + size)
+            offset += size
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.array([], dtype=dtype)
+
+        src_idx = concat(src_parts, np.int64)
+        tgt_idx = concat(tgt_parts, np.int64)
+        order = np.argsort(tgt_idx, kind='stable')
+
+        compiled = _CompiledProjection(
+            src_idx[order], tgt_idx[order], concat(weight_parts, np.float64)[order],
+            target_slices, offset, concat(domain_parts, np.int64), domain_labels
+        )
+        self._compiled[source] = compiled
+        return compiled
+
+    def source_scores(self, assessment: Dict, source: str) -> tuple:
+        """
+        Vecteurs (score, applicable) par contrôle du référentiel source
+
+        Plusieurs éléments pour un même contrôle (multi-sites) sont moyennés ;
+        les contrôles non évalués ou "Not Applicable" ne sont pas applicables.
+        """
+        framework = self.frameworks[source]
+        size = len(framework['index'])
+        items = assessment['controls_assessment']
+        if not items:
+            return np.zeros(size), np.zeros(size)
+
+        df = pd.DataFrame(items, columns=['control_id', 'status'])
+        idx = framework['index'].get_indexer(df['control_id'])
+        weights = df['status'].map(STATUS_WEIGHTS).to_numpy(dtype=float)
+        valid = (idx >= 0) & ~np.isnan(weights)
+
+        totals = np.bincount(idx[valid], weights=weights[valid], minlength=size)
+        counts = np.bincount(idx[valid], minlength=size).astype(float)
+        scores = np.divide(totals, counts, out=np.zeros(size), where=counts > 0)
+        return scores, (counts > 0).astype(float)
+
+    def project(self, assessment: Dict, source: str = DEFAULT_FRAMEWORK_ID) -> Dict[str, Dict]:
+        """
+        Projette une évaluation sur tous les référentiels cibles
+
+        Returns:
+            {framework_id: {"overall_score", "domain_scores", "covered_controls",
+                            "total_controls", "control_scores"}}
+        """
+        compiled = self.compile(source)
+        scores, applicable = self.source_scores(assessment, source)
+
+        # Passe vectorisée unique sur toutes les cibles
+        contribution = compiled.weights * applicable[compiled.src_idx]
+        numerator = np.bincount(compiled.tgt_idx, weights=contribution * scores[compiled.src_idx],
+                                minlength=compiled.n_targets)
+        denominator = np.bincount(compiled.tgt_idx, weights=contribution,
+                                  minlength=compiled.n_targets)
+        covered = denominator > 0
+        target_scores = np.divide(numerator, denominator,
+                                  out=np.zeros(compiled.n_targets), where=covered)
+
+        n_domains = len(compiled.domain_labels)
+        domain_sum = np.bincount(compiled.domain_idx, weights=target_scores * covered,
+                                 minlength=n_domains)
+        domain_count = np.bincount(compiled.domain_idx, weights=covered.astype(float),
+                                   minlength=n_domains)
+
+        results = {}
+        for target, part in compiled.target_slices.items():
+            target_covered = covered[part]
+            n_covered = int(target_covered.sum())
+            overall = target_scores[part][target_covered].mean() * 100 if n_covered else 0.0
+            results[target] = {
+                "overall_score": round(float(overall), 2),
+                "domain_scores": {},
+                "covered_controls": n_covered,
+                "total_controls": part.stop - part.start,
+                "control_scores": {
+                    control_id: round(float(score) * 100, 2)
+                    for control_id, score, ok in zip(
+                        self.frameworks[target]['index'], target_scores[part], target_covered)
+                    if ok
+                }
+            }
+
+        for (target, domain), total, count in zip(compiled.domain_labels, domain_sum, domain_count):
+            if count > 0:
+                results[target]['domain_scores'][domain] = round(float(total / count) * 100, 2)
+
+        return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Project an assessment onto other frameworks")
+    parser.add_argument('assessment', help="Fichier d'évaluation (JSON)")
+    parser.add_argument('--controls-file', default="data/iso27001_controls.json")
+    parser.add_argument('--frameworks-dir', default="data/frameworks",
+                        help="Catalogues et correspondances supplémentaires")
+    args = parser.parse_args(argv)
+
+    registry = FrameworkRegistry.with_default_catalog(args.controls_file)
+    if os.path.isdir(args.frameworks_dir):
+        registry.load_directory(args.frameworks_dir)
+    with open(args.assessment, 'r', encoding='utf-8') as f:
+        assessment = json.load(f)
+
+    for framework_id, result in registry.project(assessment).items():
+        print(f"{framework_id}: {result['overall_score']}% "
+              f"({result['covered_controls']}/{result['total_controls']} controls covered)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Module d'instrumentation (temps et mémoire par étape)
+
+Les spans sont désactivés par défaut et ne coûtent alors qu'un test de
+booléen. On les active avec `tracer.enable()` ou la variable d'environnement
+ISO27001_TRACE=1, puis on exporte une trace JSON et un fichier au format
+texte Prometheus (lisible par le textfile collector de node_exporter).
+
+tracemalloc n'a qu'un pic mémoire par processus : le pic d'un span n'est
+mesuré que si aucun span d'un autre thread ne s'exécute en même temps
+(peak_memory_bytes vaut sinon None).
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+class _Frame:
+    """Span en cours d'exécution sur un thread"""
+    __slots__ = ('name', 'attrs', 'parent', 'start_wall', 'start_cpu',
+                 'start_memory', 'max_peak', 'started_at', 'overlaps', 'concurrent')
+
+    def __init__(self, name: str, attrs: Dict, parent: Optional[str]):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.started_at = datetime.now().isoformat()
+        self.start_memory = 0
+        self.max_peak = 0
+        self.start_wall = 0.0
+        self.start_cpu = 0.0
+        self.overlaps = 0
+        self.concurrent = False
+
+class Tracer:
+    def __init__(self):
+        """Initialise un traceur désactivé"""
+        self.enabled = False
+        self.track_memory = False
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        # Spans ouverts mesurant la mémoire, par thread, et nombre de
+        # chevauchements entre threads (un span qui en voit un invalide son pic)
+        self._memory_threads: Dict[int, int] = {}
+        self._overlaps = 0
+
+    def enable(self, track_memory: bool = True) -> None:
+        """
+        Active l'enregistrement des spans
+
+        Args:
+            track_memory: Mesure le pic mémoire via tracemalloc (coûteux :
+                ralentit sensiblement les allocations Python)
+        """
+        self.enabled = True
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def disable(self) -> None:
+        """Désactive l'enregistrement (les spans déjà collectés sont conservés)"""
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self) -> None:
+        """Vide les spans collectés"""
+        with self._lock:
+            self.spans = []
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        Mesure un bloc de code
+
+        Enregistre le temps mur, le temps CPU du thread et le pic mémoire
+        atteint pendant le bloc (au-dessus de la mémoire allouée à l'entrée).
+        Le pic est None si un span d'un autre thread s'est exécuté pendant
+        le bloc : le pic de tracemalloc est commun à tout le processus.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        frame = _Frame(name, attrs, stack[-1].name if stack else None)
+        measure_memory = self.track_memory and tracemalloc.is_tracing()
+
+        if measure_memory:
+            ident = threading.get_ident()
+            with self._lock:
+                frame.concurrent = any(t != ident for t in self._memory_threads)
+                if frame.concurrent and ident not in self._memory_threads:
+                    self._overlaps += 1
+                self._memory_threads[ident] = self._memory_threads.get(ident, 0) + 1
+                frame.overlaps = self._overlaps
+
+        if measure_memory and not frame.concurrent:
+            current, peak = tracemalloc.get_traced_memory()
+            # Le pic courant appartient au parent avant qu'on le réinitialise
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, peak)
+            tracemalloc.reset_peak()
+            frame.start_memory = current
+            frame.max_peak = current
+
+        stack.append(frame)
+        frame.start_wall = time.perf_counter()
+        frame.start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame.start_wall
+            cpu = time.thread_time() - frame.start_cpu
+            stack.pop()
+
+            peak_memory = 0
+            if measure_memory:
+                with self._lock:
+                    self._memory_threads[ident] -= 1
+                    if not self._memory_threads[ident]:
+                        del self._memory_threads[ident]
+                    if self._overlaps != frame.overlaps:
+                        frame.concurrent = True
+            if measure_memory and frame.concurrent:
+                peak_memory = None
+            elif measure_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                frame.max_peak = max(frame.max_peak, peak)
+                peak_memory = frame.max_peak - frame.start_memory
+                if stack:
+                    stack[-1].max_peak = max(stack[-1].max_peak, frame.max_peak)
+
+            record = {
+                "name": name,
+                "parent": frame.parent,
+                "started_at": frame.started_at,
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "peak_memory_bytes": peak_memory,
+                "thread": threading.current_thread().name,
+                "attributes": attrs
+            }
+            with self._lock:
+                self.spans.append(record)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Agrège les spans par nom (nombre, sommes de temps, pic mémoire max des spans mesurés)"""
+        with self._lock:
+            spans = list(self.spans)
+
+        summary = {}
+        for span in spans:
+            entry = summary.setdefault(span['name'], {
+                "count": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_memory_bytes": None
+            })
+            entry['count'] += 1
+            entry['wall_s'] += span['wall_s']
+            entry['cpu_s'] += span['cpu_s']
+            if span['peak_memory_bytes'] is not None:
+                entry['peak_memory_bytes'] = max(entry['peak_memory_bytes'] or 0,
+                                                 span['peak_memory_bytes'])
+        return summary
+
+    def export_json(self, path: str) -> str:
+        """Exporte la trace complète en JSON"""
+        with self._lock:
+            spans = list(self.spans)
+
+        payload = {
+            "generated_at": datetime.now().isoformat(),
+            "pid": os.getpid(),
+            "spans": spans,
+            "summary": self.summary()
+        }
+        _atomic_write(path, json.dumps(payload, indent=2, default=str))
+        return path
+
+    def export_prometheus(self, path: str, prefix: str = "iso27001") -> str:
+        """
+        Exporte les agrégats au format texte Prometheus
+
+        Le fichier est remplacé atomiquement pour qu'un scraper ne lise
+        jamais un fichier partiel.
+        """
+        summary = self.summary()
+        metrics = [
+            ("span_count_total", "counter", "Number of recorded spans", 'count'),
+            ("span_wall_seconds_total", "counter", "Total wall time per span", 'wall_s'),
+            ("span_cpu_seconds_total", "counter", "Total thread CPU time per span", 'cpu_s'),
+            ("span_peak_memory_bytes", "gauge",
+             "Max traced memory peak per span (spans overlapping another thread excluded)",
+             'peak_memory_bytes'),
+        ]
+
+        lines = []
+        for suffix, metric_type, help_text, key in metrics:
+            metric = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for name in sorted(summary):
+                if summary[name][key] is None:  # aucun pic mesuré pour ce span
+                    continue
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{metric}{{span="{label}"}} {summary[name][key]}')
+
+        _atomic_write(path, "\n".join(lines) + "\n")
+        return path
+
+def _atomic_write(path: str, content: str) -> None:
+    """Écrit un fichier via un fichier temporaire puis os.replace"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+# Traceur global du processus
+tracer = Tracer()
+
+if os.environ.get('ISO27001_TRACE', '').lower() in ('1', 'true', 'yes'):
+    tracer.enable(track_memory=os.environ.get('ISO27001_TRACE_MEMORY', '1') != '0')
+
+def span(name: str, **attrs):
+    """Raccourci vers `tracer.span` sur le traceur global"""
+    return tracer.span(name, **attrs)
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Décorateur qui enveloppe une fonction dans un span
+
+    Args:
+        name: Nom du span (par défaut le nom qualifié de la fonction)
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
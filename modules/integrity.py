@@ -0,0 +1,270 @@
+"""
+Module de vérification d'intégrité de l'archive des évaluations
+
+Parcourt data/assessments/ (récursivement) et valide chaque fichier JSON :
+structure, métadonnées, IDs de contrôle connus du catalogue, statuts,
+doublons et horodatages. Les fichiers sont validés dans un pool de
+processus et les résultats écrits au fil de l'eau en JSON Lines, avec une
+ligne de synthèse finale : la mémoire ne dépend pas de la taille de
+l'archive.
+
+Usage:
+    python -m modules.integrity data/assessments --workers 8 --output report.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from modules.compliance_checker import VALID_STATUSES
+
+REQUIRED_METADATA = ('organization', 'assessor', 'date', 'standard')
+REQUIRED_ITEM_FIELDS = ('control_id', 'status')
+
+# Index du catalogue chargé une fois par processus worker
+_CATALOG: Dict[str, Dict] = {}
+
+def load_catalog_index(controls_file: str) -> Dict[str, Dict]:
+    """Index {control_id: contrôle} du catalogue"""
+    with open(controls_file, 'r', encoding='utf-8') as f:
+        return {c['id']: c for c in json.load(f)['controls']}
+
+def _init_worker(controls_file: str) -> None:
+    global _CATALOG
+    _CATALOG = load_catalog_index(controls_file)
+
+def _issue(severity: str, code: str, message: str, **context) -> Dict:
+    return {"severity": severity, "code": code, "message": message, **context}
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Horodatage ISO 8601 ramené en heure locale naïve (None si invalide)"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is None else parsed.astimezone().replace(tzinfo=None)
+
+def validate_assessment(data: Any, catalog: Dict[str, Dict],
+                        now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Valide le contenu d'une évaluation
+
+    Returns:
+        Liste de problèmes {"severity": "error"|"warning", "code", "message", ...}
+    """
+    now = now or datetime.now()
+    issues = []
+
+    if not isinstance(data, dict):
+        return [_issue("error", "not_an_object", "Top-level JSON value is not an object")]
+
+    metadata = data.get('metadata')
+    assessment_date = None
+    if not isinstance(metadata, dict):
+        issues.append(_issue("error", "missing_metadata", "metadata is missing or not an object"))
+    else:
+        for field in REQUIRED_METADATA:
+            if not isinstance(metadata.get(field), str) or not metadata.get(field):
+                issues.append(_issue("error", "missing_field", f"metadata.{field} is missing",
+                                     field=f"metadata.{field}"))
+        if 'date' in metadata:
+            assessment_date = _parse_timestamp(metadata['date'])
+            if assessment_date is None:
+                issues.append(_issue("error", "invalid_timestamp",
+                                     f"metadata.date is not ISO 8601: {metadata['date']!r}",
+                                     field="metadata.date"))
+            elif assessment_date > now:
+                issues.append(_issue("warning", "future_timestamp", "metadata.date is in the future",
+                                     field="metadata.date"))
+        version = metadata.get('version', 0)
+        if not isinstance(version, int) or isinstance(version, bool) or version < 0:
+            issues.append(_issue("error", "invalid_version",
+                                 f"metadata.version is not a non-negative integer: {version!r}",
+                                 field="metadata.version"))
+
+    items = data.get('controls_assessment')
+    if not isinstance(items, list):
+        issues.append(_issue("error", "missing_controls",
+                             "controls_assessment is missing or not a list"))
+        return issues
+
+    seen = Counter()
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            issues.append(_issue("error", "invalid_item", "Item is not an object", index=position))
+            continue
+
+        if 'control_id' not in item or 'status' not in item:
+            missing = [f for f in REQUIRED_ITEM_FIELDS if f not in item]
+            issues.append(_issue("error", "missing_field",
+                                 f"Item is missing {', '.join(missing)}", index=position))
+            continue
+
+        if not isinstance(item['control_id'], str) or not isinstance(item['status'], str):
+            issues.append(_issue("error", "invalid_item",
+                                 "control_id and status must be strings", index=position))
+            continue
+
+        control_id = item['control_id']
+        control = catalog.get(control_id)
+        if control is None:
+            issues.append(_issue("error", "unknown_control", f"Unknown control id {control_id!r}",
+                                 index=position, control_id=control_id))
+        elif item.get('domain') not in (None, control['domain']):
+            issues.append(_issue("warning", "domain_mismatch",
+                                 f"{control_id}: domain {item['domain']!r} does not match catalog",
+                                 index=position, control_id=control_id))
+
+        if item['status'] not in VALID_STATUSES:
+            issues.append(_issue("error", "invalid_status", f"Invalid status {item['status']!r}",
+                                 index=position, control_id=control_id))
+
+        if 'assessed_at' in item:
+            assessed_at = _parse_timestamp(item['assessed_at'])
+            if assessed_at is None:
+                issues.append(_issue("error", "invalid_timestamp",
+                                     f"assessed_at is not ISO 8601: {item['assessed_at']!r}",
+                                     index=position, control_id=control_id))
+            elif assessed_at > now:
+                issues.append(_issue("warning", "future_timestamp", "assessed_at is in the future",
+                                     index=position, control_id=control_id))
+
+        seen[control_id] += 1
+
+    for control_id, count in seen.items():
+        if count > 1:
+            issues.append(_issue("warning", "duplicate_control",
+                                 f"{control_id} assessed {count} times", control_id=control_id))
+
+    return issues
+
+def validate_file(path: str, catalog: Optional[Dict[str, Dict]] = None) -> Dict:
+    """Valide un fichier d'évaluation et retourne son résultat"""
+    catalog = _CATALOG if catalog is None else catalog
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        issues = [_issue("error", "unreadable", f"{type(e).__name__}: {e}")]
+    else:
+        issues = validate_assessment(data, catalog)
+
+    return {
+        "path": path,
+        "valid": not any(i['severity'] == 'error' for i in issues),
+        "issues": issues
+    }
+
+def iter_assessment_files(root: str) -> Iterator[str]:
+    """Parcourt l'archive sans lister tout le répertoire en mémoire"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.json') and entry.is_file():
+                    yield entry.path
+
+def sync_archive(root: str, signatures: Dict[str, tuple], update: Callable[[str, Dict], None],
+                 remove: Callable[[str], None]) -> int:
+    """
+    Relit les fichiers nouveaux ou modifiés de l'archive pour un index incrémental
+
+    Args:
+        signatures: {chemin absolu: (mtime_ns, taille)} des fichiers déjà
+            lus, mis à jour sur place
+        update: Appelé (chemin absolu, évaluation) pour chaque fichier relu
+        remove: Appelé pour un fichier disparu ou illisible (hors index)
+
+    Returns:
+        Nombre de fichiers (re)chargés
+    """
+    prefix = os.path.join(os.path.abspath(root), '')
+    seen = set()
+    loaded = 0
+    for path in iter_assessment_files(root):
+        source = os.path.abspath(path)
+        seen.add(source)
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            continue
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signatures.get(source) == signature:
+            continue
+        try:
+            with open(source, 'r', encoding='utf-8') as f:
+                update(source, json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Fichier illisible ou non conforme : hors index
+            remove(source)
+        signatures[source] = signature
+        loaded += 1
+
+    for source in [s for s in list(signatures) if s.startswith(prefix) and s not in seen]:
+        remove(source)
+    return loaded
+
+def scan_archive(root: str, controls_file: str = "data/iso27001_controls.json",
+                 workers: Optional[int] = None, chunksize: int = 64) -> Iterator[Dict]:
+    """Valide tous les fichiers de l'archive en parallèle (ordre non garanti)"""
+    with Pool(processes=workers, initializer=_init_worker, initargs=(controls_file,)) as pool:
+        yield from pool.imap_unordered(validate_file, iter_assessment_files(root),
+                                       chunksize=chunksize)
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate the assessment archive")
+    parser.add_argument('directory', nargs='?', default="data/assessments")
+    parser.add_argument('--controls-file', default="data/iso27001_controls.json")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus (défaut : nombre de CPU)")
+    parser.add_argument('--chunksize', type=int, default=64)
+    parser.add_argument('--output', help="Fichier JSON Lines (défaut : sortie standard)")
+    parser.add_argument('--all', action='store_true',
+                        help="Inclure aussi les fichiers sans problème")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    totals = Counter()
+    start = time.perf_counter()
+    try:
+        for result in scan_archive(args.directory, args.controls_file,
+                                   args.workers, args.chunksize):
+            totals['files'] += 1
+            totals['valid' if result['valid'] else 'invalid'] += 1
+            for issue in result['issues']:
+                totals[issue['severity'] + 's'] += 1
+            if args.all or result['issues']:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "summary": {
+                "directory": args.directory,
+                "files": totals['files'],
+                "valid": totals['valid'],
+                "invalid": totals['invalid'],
+                "errors": totals['errors'],
+                "warnings": totals['warnings'],
+                "seconds": round(elapsed, 3),
+                "files_per_second": round(totals['files'] / elapsed, 1) if elapsed else None
+            }
+        }
+        out.write(json.dumps(summary) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    return 1 if totals['invalid'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
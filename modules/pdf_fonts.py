@@ -0,0 +1,198 @@
+"""
+Module des polices TrueType (Unicode) des rapports PDF
+
+Les polices PDF standard (Arial/Helvetica) sont limitées au latin-1 : pas
+de tiret cadratin, de guillemets typographiques ni d'écritures non
+latines. Les rapports utilisent donc DejaVu Sans (fournie avec
+matplotlib), intégrée au PDF sous forme de sous-ensemble : seuls les
+glyphes utilisés sont embarqués (fpdf2 fait le découpage à l'écriture).
+
+Analyser une police (table des largeurs, cmap, ~6000 glyphes) coûte
+~40 ms par style avec FPDF.add_font. Les métriques analysées sont mises
+en cache pour tout le processus et sur disque (JSON) : un rapport ne fait
+plus qu'ouvrir le fichier TTF paresseusement (< 1 ms), et un worker de
+batch neuf relit le cache au lieu de réanalyser les polices.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+import fpdf
+import matplotlib
+from fontTools import ttLib
+from fpdf.enums import FontDescriptorFlags, TextEmphasis
+from fpdf.fonts import PDFFontDescriptor, SubsetMap, TTFFont
+
+logger = logging.getLogger(__name__)
+
+FONT_FAMILY = 'dejavu'
+FONT_DIR = os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf')
+FONT_FILES = {
+    '': 'DejaVuSans.ttf',
+    'B': 'DejaVuSans-Bold.ttf',
+    'I': 'DejaVuSans-Oblique.ttf',
+    'BI': 'DejaVuSans-BoldOblique.ttf'
+}
+FONT_CACHE_DIR = os.environ.get('PDF_FONT_CACHE_DIR', os.path.join('data', 'cache', 'fonts'))
+# À incrémenter si le contenu du cache change
+CACHE_FORMAT = 1
+
+class FontMetrics:
+    """Métriques analysées d'un fichier TTF, partagées par tous les documents"""
+
+    __slots__ = ('path', 'name', 'scale', 'default_width', 'descriptor', 'up', 'ut',
+                 'cmap', 'cw', 'glyph_ids')
+
+    @classmethod
+    def parse(cls, path: str) -> 'FontMetrics':
+        """Analyse le fichier avec le code de fpdf2 (mêmes valeurs que add_font)"""
+        font = TTFFont(fpdf.FPDF(), path, 'metrics', '')
+        try:
+            metrics = cls()
+            metrics.path = path
+            metrics.name = font.name
+            metrics.scale = font.scale
+            metrics.default_width = font.desc.missing_width
+            metrics.descriptor = {
+                'ascent': font.desc.ascent,
+                'descent': font.desc.descent,
+                'cap_height': font.desc.cap_height,
+                'flags': font.desc.flags.value,
+                'font_b_box': font.desc.font_b_box,
+                'italic_angle': font.desc.italic_angle,
+                'stem_v': font.desc.stem_v,
+                'missing_width': font.desc.missing_width
+            }
+            metrics.up = font.up
+            metrics.ut = font.ut
+            metrics.cmap = dict(font.cmap)
+            metrics.cw = {char: font.cw[char] for char in font.cmap}
+            metrics.glyph_ids = dict(font.glyph_ids)
+            return metrics
+        finally:
+            font.close()
+
+    def to_json(self) -> Dict:
+        return {
+            'name': self.name, 'scale': self.scale, 'default_width': self.default_width,
+            'descriptor': self.descriptor, 'up': self.up, 'ut': self.ut,
+            # Une liste par code point : [nom du glyphe, largeur, identifiant]
+            'glyphs': {str(char): [glyph, self.cw[char], self.glyph_ids[char]]
+                       for char, glyph in self.cmap.items()}
+        }
+
+    @classmethod
+    def from_json(cls, path: str, data: Dict) -> 'FontMetrics':
+        metrics = cls()
+        metrics.path = path
+        for field in ('name', 'scale', 'default_width', 'descriptor', 'up', 'ut'):
+            setattr(metrics, field, data[field])
+        glyphs = {int(char): entry for char, entry in data['glyphs'].items()}
+        metrics.cmap = {char: entry[0] for char, entry in glyphs.items()}
+        metrics.cw = {char: entry[1] for char, entry in glyphs.items()}
+        metrics.glyph_ids = {char: entry[2] for char, entry in glyphs.items()}
+        return metrics
+
+    def create_font(self, pdf: fpdf.FPDF, fontkey: str, style: str) -> TTFFont:
+        """
+        Police prête pour un document, sans réanalyse
+
+        Les tables de métriques sont partagées (lecture seule) ; l'état
+        propre au document (sous-ensemble de glyphes, fichier TTF ouvert
+        paresseusement et découpé à l'écriture) est neuf.
+        """
+        font = TTFFont.__new__(TTFFont)
+        font.i = len(pdf.fonts) + 1
+        font.type = "TTF"
+        font.ttffile = self.path
+        font.fontkey = fontkey
+        font.ttfont = ttLib.TTFont(self.path, recalcTimestamp=False, fontNumber=0, lazy=True)
+        font.hbfont = None
+        font.scale = self.scale
+        font.desc = PDFFontDescriptor(**{**self.descriptor,
+                                         'flags': FontDescriptorFlags(self.descriptor['flags'])})
+        font.cw = defaultdict(lambda: self.default_width, self.cw)
+        font.cmap = self.cmap
+        font.glyph_ids = self.glyph_ids
+        font.missing_glyphs = []
+        font.name = self.name
+        font.up = self.up
+        font.ut = self.ut
+        font.emphasis = TextEmphasis.coerce(style)
+        # Mêmes caractères réservés que TTFFont.__init__
+        reserved = "\x00 \r\n"
+        if pdf.str_alias_nb_pages:
+            reserved += "0123456789" + pdf.str_alias_nb_pages
+        font.subset = SubsetMap(font, [ord(char) for char in reserved])
+        return font
+
+_metrics: Dict[str, FontMetrics] = {}
+_metrics_lock = threading.Lock()
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{fpdf.__version__}|{CACHE_FORMAT}"
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(path)}.{digest}.json")
+
+def _load_metrics(path: str, cache_dir: Optional[str]) -> FontMetrics:
+    if not cache_dir:
+        return FontMetrics.parse(path)
+    cache_path = _cache_path(path, cache_dir)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return FontMetrics.from_json(path, json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    metrics = FontMetrics.parse(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(metrics.to_json(), f, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # Cache disque facultatif (répertoire en lecture seule...)
+        logger.warning("Font cache not written to %s: %s", cache_dir, e)
+    return metrics
+
+def get_metrics(path: str, cache_dir: Optional[str] = FONT_CACHE_DIR) -> FontMetrics:
+    """Métriques d'un fichier TTF : mémoire du processus, sinon cache disque, sinon analyse"""
+    metrics = _metrics.get(path)
+    if metrics is None:
+        with _metrics_lock:
+            metrics = _metrics.get(path)
+            if metrics is None:
+                metrics = _metrics[path] = _load_metrics(path, cache_dir)
+    return metrics
+
+def font_path(style: str) -> str:
+    return os.path.join(FONT_DIR, FONT_FILES[style])
+
+def unicode_fonts_available() -> bool:
+    return all(os.path.isfile(font_path(style)) for style in FONT_FILES)
+
+def install_font(pdf: fpdf.FPDF, style: str = '', cache_dir: Optional[str] = FONT_CACHE_DIR) -> None:
+    """Déclare un style de la police Unicode dans un document (si ce n'est déjà fait)"""
+    fontkey = FONT_FAMILY + style
+    if fontkey not in pdf.fonts:
+        pdf.fonts[fontkey] = get_metrics(font_path(style), cache_dir).create_font(
+            pdf, fontkey, style
+        )
+
+def preload(cache_dir: Optional[str] = FONT_CACHE_DIR) -> None:
+    """
+    Charge les métriques de tous les styles
+
+    À appeler avant de créer des processus (pool du batch, preload
+    gunicorn) : les enfants héritent des tables au lieu de les recharger.
+    """
+    if unicode_fonts_available():
+        for style in FONT_FILES:
+            get_metrics(font_path(style), cache_dir)
@@ -0,0 +1,257 @@
+"""
+Module de comparaison aux pairs (rang centile dans le portefeuille)
+
+Pour chaque population (tout le portefeuille, puis chaque secteur) et
+chaque métrique (score global, score de chaque domaine), les scores sont
+conservés dans une liste triée. Enregistrer une évaluation retire ses
+anciens scores et insère les nouveaux (bisect) ; le rang centile d'un score
+se lit alors par deux recherches dichotomiques, en O(log n), sans
+recalculer les autres évaluations.
+
+Chaque organisation compte pour un pair : seule sa dernière évaluation
+(date de metadata) est retenue, l'historique ne pèse pas dans la
+distribution. Le rang d'une organisation est calculé sans sa propre entrée.
+"""
+import bisect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from modules.integrity import sync_archive
+from modules.scoring import ComplianceScoring
+
+ALL_SECTORS = '*'
+OVERALL = 'overall'
+# En dessous, le rang n'est pas publié (il révélerait le score d'un pair)
+MIN_PEERS = 5
+
+class _Entry:
+    __slots__ = ('source', 'organization', 'name', 'sector', 'date', 'version', 'scores')
+
+    def __init__(self, source: str, assessment: Dict, statistics: Dict):
+        meta = assessment.get('metadata', {})
+        self.source = source
+        self.organization = organization_key(assessment)
+        self.name = meta.get('organization', '').strip()
+        self.sector = meta.get('sector') or None
+        self.date = meta.get('date', '')
+        self.version = meta.get('version', 0)
+        self.scores = {OVERALL: statistics['overall_score'], **statistics['domain_scores']}
+
+    def rank_key(self) -> Tuple:
+        return (self.date, self.version, self.source)
+
+    def scopes(self) -> Tuple[str, ...]:
+        return (ALL_SECTORS, self.sector) if self.sector else (ALL_SECTORS,)
+
+def organization_key(assessment: Dict) -> str:
+    return assessment.get('metadata', {}).get('organization', '').strip().casefold()
+
+def percentile_rank(values: List[float], score: float,
+                    exclude: Optional[float] = None) -> Tuple[Optional[float], int]:
+    """
+    Rang centile d'un score dans une liste triée (ex aequo comptés pour moitié)
+
+    Args:
+        exclude: Valeur retirée de la population avant le calcul (le score
+            de l'organisation elle-même)
+
+    Returns:
+        (rang centile 0-100 ou None si la population est vide, taille)
+    """
+    below = bisect.bisect_left(values, score)
+    not_above = bisect.bisect_right(values, score)
+    peers = len(values)
+    if exclude is not None:
+        peers -= 1
+        if exclude < score:
+            below -= 1
+            not_above -= 1
+        elif exclude == score:
+            not_above -= 1
+    if peers <= 0:
+        return None, 0
+    return round(100 * (below + (not_above - below) / 2) / peers, 1), peers
+
+class PeerBenchmark:
+    def __init__(self, min_peers: int = MIN_PEERS):
+        """
+        Initialise un index vide
+
+        Args:
+            min_peers: Nombre minimal de pairs pour publier un rang
+        """
+        self.min_peers = min_peers
+        self._values: Dict[Tuple[str, str], List[float]] = {}
+        self._sources: Dict[str, _Entry] = {}
+        self._by_organization: Dict[str, Dict[str, _Entry]] = {}
+        # Entrée retenue (la plus récente) de chaque organisation
+        self._current: Dict[str, _Entry] = {}
+        # Incrémenté à chaque changement des entrées retenues (invalidation
+        # des vues dérivées, ex: heatmap du portefeuille)
+        self.generation = 0
+        # Signatures des fichiers lus, par racine : chaque shard relu en
+        # parallèle n'accède qu'à son propre dictionnaire
+        self._signatures: Dict[str, Dict[str, tuple]] = {}
+        self._lock = threading.Lock()
+        # Un verrou par racine : plusieurs shards sont relus en parallèle
+        self._sync_locks: Dict[str, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def update(self, source: str, assessment: Dict, statistics: Optional[Dict] = None) -> None:
+        """
+        Enregistre (ou remplace) l'évaluation identifiée par `source`
+
+        Args:
+            source: Identifiant stable (chemin du fichier, ID de stockage)
+            statistics: Statistiques déjà calculées ; sinon l'évaluation est
+                scorée ici
+        """
+        if statistics is None:
+            statistics = ComplianceScoring(assessment).get_statistics()
+        entry = _Entry(source, assessment, statistics)
+        with self._lock:
+            previous = self._sources.get(source)
+            self._sources[source] = entry
+            self._by_organization.setdefault(entry.organization, {})[source] = entry
+            if previous is not None and previous.organization != entry.organization:
+                self._by_organization[previous.organization].pop(source, None)
+                self._elect(previous.organization)
+            self._elect(entry.organization)
+
+    def remove(self, source: str) -> None:
+        with self._lock:
+            entry = self._sources.pop(source, None)
+            for signatures in self._signatures.values():
+                signatures.pop(source, None)
+            if entry is not None:
+                self._by_organization[entry.organization].pop(source, None)
+                self._elect(entry.organization)
+
+    def _elect(self, organization: str) -> None:
+        """Retient la dernière évaluation de l'organisation dans les listes triées"""
+        candidates = self._by_organization.get(organization)
+        latest = max(candidates.values(), key=_Entry.rank_key) if candidates else None
+        current = self._current.get(organization)
+        if latest is current:
+            return
+        self.generation += 1
+        if current is not None:
+            self._index(current, insert=False)
+        if latest is None:
+            self._current.pop(organization, None)
+            self._by_organization.pop(organization, None)
+        else:
+            self._current[organization] = latest
+            self._index(latest, insert=True)
+
+    def _index(self, entry: _Entry, insert: bool) -> None:
+        for scope in entry.scopes():
+            for metric, score in entry.scores.items():
+                values = self._values.setdefault((scope, metric), [])
+                if insert:
+                    bisect.insort(values, score)
+                else:
+                    del values[bisect.bisect_left(values, score)]
+
+    def has_sector(self, sector: str) -> bool:
+        """Vrai si au moins une organisation retenue appartient au secteur"""
+        with self._lock:
+            return bool(self._values.get((sector, OVERALL)))
+
+    def latest_scores(self, sector: Optional[str] = None) -> List[Tuple[str, Dict[str, float]]]:
+        """
+        Scores de la dernière évaluation de chaque organisation
+
+        Returns:
+            [(nom de l'organisation, {"overall": score, domaine: score...})]
+        """
+        with self._lock:
+            return [(entry.name, entry.scores) for entry in self._current.values()
+                    if sector is None or entry.sector == sector]
+
+    def sync(self, root: str) -> int:
+        """
+        Met l'index à jour depuis une archive d'évaluations
+
+        Seuls les fichiers nouveaux ou modifiés (date, taille) sont relus et
+        rescorés ; les fichiers disparus sont retirés.
+
+        Returns:
+            Nombre de fichiers (re)chargés
+        """
+        if not os.path.isdir(root):
+            return 0
+        key = os.path.abspath(root)
+        with self._lock:
+            lock = self._sync_locks.setdefault(key, threading.Lock())
+            signatures = self._signatures.setdefault(key, {})
+        with lock:
+            return sync_archive(root, signatures, self.update, self.remove)
+
+    def sync_all(self, roots: Sequence[str]) -> int:
+        """Met l'index à jour depuis plusieurs racines (shards), relues en parallèle"""
+        if len(roots) <= 1:
+            return sum(self.sync(root) for root in roots)
+        with ThreadPoolExecutor(max_workers=len(roots)) as pool:
+            return sum(pool.map(self.sync, roots))
+
+    def percentile(self, score: float, metric: str = OVERALL, sector: Optional[str] = None,
+                   organization: Optional[str] = None) -> Dict:
+        """
+        Rang centile d'un score parmi les pairs
+
+        Args:
+            metric: 'overall' ou nom de domaine
+            sector: Restreint la population au secteur
+            organization: Organisation évaluée (clé organization_key), exclue
+                de la population
+
+        Returns:
+            {"percentile": rang 0-100 ou None (pairs insuffisants), "peers"}
+        """
+        scope = sector or ALL_SECTORS
+        with self._lock:
+            values = self._values.get((scope, metric), [])
+            exclude = None
+            own = self._current.get(organization) if organization else None
+            if own is not None and scope in own.scopes():
+                exclude = own.scores.get(metric)
+            rank, peers = percentile_rank(values, score, exclude)
+        if peers < self.min_peers:
+            rank = None
+        return {"percentile": rank, "peers": peers}
+
+    def benchmark(self, assessment: Dict, statistics: Dict) -> Dict:
+        """
+        Positionnement d'une évaluation (score global et domaines), pour le
+        portefeuille entier et pour son secteur
+
+        Returns:
+            {"sector", "overall": {...}, "domains": {domaine: {...}},
+             "sector_overall": {...} | None, "sector_domains": {...}}
+        """
+        organization = organization_key(assessment)
+        sector = assessment.get('metadata', {}).get('sector') or None
+        result = {
+            "sector": sector,
+            "overall": self.percentile(statistics['overall_score'], OVERALL,
+                                       organization=organization),
+            "domains": {
+                domain: self.percentile(score, domain, organization=organization)
+                for domain, score in statistics['domain_scores'].items()
+            },
+            "sector_overall": None,
+            "sector_domains": {}
+        }
+        if sector:
+            result["sector_overall"] = self.percentile(statistics['overall_score'], OVERALL,
+                                                       sector, organization)
+            result["sector_domains"] = {
+                domain: self.percentile(score, domain, sector, organization)
+                for domain, score in statistics['domain_scores'].items()
+            }
+        return result
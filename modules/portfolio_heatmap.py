@@ -0,0 +1,126 @@
+"""
+Module de heatmap du portefeuille (organisations × domaines)
+
+Au-delà de quelques centaines d'organisations, une ligne par organisation
+rend la figure illisible et son contenu volumineux. Les organisations sont
+donc triées par score global (les plus faibles en premier) puis regroupées
+en tranches contiguës, c'est-à-dire en organisations de niveau voisin :
+chaque cellule d'une tranche est la moyenne des scores du domaine.
+
+Des sommes cumulées par domaine, calculées une fois, donnent la moyenne de
+n'importe quelle tranche en O(1). Une tuile (plage d'organisations
+découpée en au plus max_rows lignes) coûte O(max_rows × domaines) quel que
+soit le nombre d'organisations ; le zoom demande la tuile d'une plage plus
+étroite, jusqu'aux organisations individuelles.
+
+Avec min_bucket (MIN_PEERS de la comparaison aux pairs), aucune tranche ne
+compte moins de min_bucket organisations : le zoom s'arrête à ce niveau et
+le score d'une organisation nommée n'est jamais publié.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.peer_benchmark import OVERALL
+
+# Nombre de lignes par défaut d'une tuile
+MAX_ROWS = 50
+
+def _cumulative(values: np.ndarray) -> np.ndarray:
+    """Sommes cumulées le long des organisations, précédées d'une ligne de zéros"""
+    sums = np.zeros((values.shape[0] + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=sums[1:])
+    return sums
+
+def _rounded(values: np.ndarray) -> List:
+    """Valeurs arrondies pour le JSON (None pour les cellules sans score)"""
+    return [None if np.isnan(value) else round(float(value), 1) for value in values]
+
+class PortfolioHeatmap:
+    def __init__(self, rows: Iterable[Tuple[str, Dict[str, float]]],
+                 domains: Optional[Sequence[str]] = None, min_bucket: int = 1):
+        """
+        Prépare la heatmap à partir des scores de chaque organisation
+
+        Args:
+            rows: (organisation, {"overall": score, domaine: score...}), par
+                exemple PeerBenchmark.latest_scores()
+            domains: Colonnes, dans l'ordre ; par défaut tous les domaines
+                rencontrés, triés
+            min_bucket: Taille minimale d'une tranche (1 : jusqu'aux
+                organisations individuelles)
+        """
+        if min_bucket < 1:
+            raise ValueError("min_bucket must be at least 1")
+        self.min_bucket = min_bucket
+        rows = sorted(rows, key=lambda row: (row[1].get(OVERALL, 0.0), row[0].casefold()))
+        if domains is None:
+            domains = sorted({domain for _, scores in rows for domain in scores} - {OVERALL})
+        self.domains = list(domains)
+        self.organizations = [name for name, _ in rows]
+        self.overall = np.array([scores.get(OVERALL, 0.0) for _, scores in rows], dtype=float)
+
+        values = np.array([[scores.get(domain, np.nan) for domain in self.domains]
+                           for _, scores in rows], dtype=float).reshape(len(rows), len(self.domains))
+        scored = ~np.isnan(values)
+        self._sums = _cumulative(np.where(scored, values, 0.0))
+        self._counts = _cumulative(scored.astype(float))
+
+    def __len__(self) -> int:
+        return len(self.organizations)
+
+    def tile(self, start: int = 0, end: Optional[int] = None, max_rows: int = MAX_ROWS) -> Dict:
+        """
+        Tuile de la plage d'organisations [start, end) (ordre du score global)
+
+        La plage est découpée en au plus max_rows tranches de tailles égales
+        (à une organisation près) ; une tranche d'une seule organisation
+        porte son nom. Une plage non vide plus étroite que min_bucket est élargie ;
+        sans min_bucket organisations au total, la tuile est vide.
+
+        Returns:
+            {"domains", "total", "start", "end", "rows": [{"label", "start",
+             "end", "count", "min_overall", "max_overall"}], "z": lignes de
+             scores moyens (None si aucun score)}
+        """
+        if max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+        total = len(self)
+        start = min(max(start, 0), total)
+        end = total if end is None else min(max(end, start), total)
+        if total < self.min_bucket:
+            start = end = total
+        elif 0 < end - start < self.min_bucket:
+            start = min(start, total - self.min_bucket)
+            end = start + self.min_bucket
+        count = end - start
+        buckets = min(max_rows, count // self.min_bucket)
+
+        if buckets:
+            edges = start + (np.arange(buckets + 1) * count) // buckets
+        else:
+            edges = np.array([start], dtype=int)
+        lows, highs = edges[:-1], edges[1:]
+        sums = self._sums[highs] - self._sums[lows]
+        counts = self._counts[highs] - self._counts[lows]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+
+        rows = []
+        for low, high in zip(lows.tolist(), highs.tolist()):
+            first, last = self.overall[low], self.overall[high - 1]
+            if high - low == 1:
+                label = self.organizations[low]
+            else:
+                label = f"{high - low} organizations ({first:g}% - {last:g}%)"
+            rows.append({"label": label, "start": low, "end": high, "count": high - low,
+                         "min_overall": round(float(first), 1),
+                         "max_overall": round(float(last), 1)})
+        return {
+            "domains": self.domains,
+            "total": total,
+            "start": start,
+            "end": end,
+            "rows": rows,
+            "z": [_rounded(line) for line in means]
+        }
@@ -0,0 +1,234 @@
+"""
+Module de suivi des remédiations (responsable, échéance, état)
+
+Chaque gap de l'évaluation donne un élément de remédiation, conservé dans
+l'évaluation elle-même (liste "remediation") : il est donc persisté,
+versionné et partagé comme les contrôles évalués. L'échéance par défaut
+suit la priorité du gap (délais du rapport : 30, 90 ou 180 jours).
+
+Le RemediationIndex répertorie les éléments encore ouverts de tout le
+portefeuille dans des listes triées par échéance (bisect), globale et par
+responsable : « en retard » et « à échéance dans les 7 jours pour un
+responsable » se lisent par une recherche dichotomique puis les k
+éléments trouvés, en O(log n + k).
+"""
+import bisect
+import os
+import threading
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from modules.integrity import sync_archive
+from modules.scoring import ComplianceScoring
+
+STATES = ('Open', 'In Progress', 'Done')
+OPEN_STATES = ('Open', 'In Progress')
+GAP_STATUSES = ('Not Implemented', 'Partially Implemented')
+# Délai (jours) par priorité, comme la section Timeline du rapport
+PRIORITY_DEADLINES = {'Critical': 30, 'High': 90, 'Medium': 180}
+
+class RemediationItemNotFoundError(KeyError):
+    """Élément de remédiation inconnu"""
+
+def _parse_date(value: str) -> str:
+    """Date ISO (AAAA-MM-JJ) validée"""
+    try:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r} (expected YYYY-MM-DD)") from None
+
+def owner_key(owner: str) -> str:
+    return (owner or '').strip().casefold()
+
+def _parse_owner(value: object) -> str:
+    """Responsable normalisé (ValueError s'il n'est pas textuel)"""
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid owner: {value!r} (expected a string)")
+    return value.strip()
+
+def gap_priority(gap: Dict, control: Optional[Dict] = None) -> str:
+    """Critical : contrôle obligatoire non implémenté ; High : non implémenté ; Medium : partiel"""
+    if gap['status'] == 'Not Implemented':
+        return 'Critical' if control and control.get('mandatory') else 'High'
+    return 'Medium'
+
+def add_remediation_items(assessment: Dict, owner: str = '', start: Optional[str] = None,
+                          controls_by_id: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """
+    Crée un élément de remédiation par contrôle en gap
+
+    Seul le dernier statut de chaque contrôle compte (un contrôle réévalué
+    Implemented n'est plus un gap). Les contrôles ayant déjà un élément
+    ouvert sont ignorés : l'appel peut être répété après de nouvelles
+    évaluations.
+
+    Args:
+        owner: Responsable initial (None : aucun)
+        start: Date de départ des échéances (défaut : aujourd'hui)
+        controls_by_id: Catalogue, pour repérer les contrôles obligatoires
+
+    Returns:
+        Éléments créés
+
+    Raises:
+        ValueError: responsable non textuel ou date invalide
+    """
+    owner = _parse_owner('' if owner is None else owner)
+    start_date = date.fromisoformat(_parse_date(start)) if start else date.today()
+    items = assessment.setdefault('remediation', [])
+    tracked = {item['control_id'] for item in items if item['state'] in OPEN_STATES}
+    now = datetime.now().isoformat()
+    latest = {item['control_id']: item['status'] for item in assessment['controls_assessment']}
+    created = []
+    for gap in ComplianceScoring(assessment).get_gaps():
+        status = latest[gap['control_id']]
+        if gap['control_id'] in tracked or status not in GAP_STATUSES:
+            continue
+        tracked.add(gap['control_id'])
+        gap = {**gap, 'status': status}
+        priority = gap_priority(gap, (controls_by_id or {}).get(gap['control_id']))
+        item = {
+            "id": uuid.uuid4().hex[:12],
+            "control_id": gap['control_id'],
+            "control_title": gap['control_title'],
+            "domain": gap['domain'],
+            "gap_status": gap['status'],
+            "priority": priority,
+            "owner": owner,
+            "due_date": (start_date + timedelta(days=PRIORITY_DEADLINES[priority])).isoformat(),
+            "state": 'Open',
+            "created_at": now,
+            "updated_at": now
+        }
+        items.append(item)
+        created.append(item)
+    return created
+
+def update_remediation_item(assessment: Dict, item_id: str, owner: Optional[str] = None,
+                            due_date: Optional[str] = None, state: Optional[str] = None) -> Dict:
+    """
+    Modifie le responsable, l'échéance ou l'état d'un élément
+
+    Raises:
+        RemediationItemNotFoundError: élément inconnu
+        ValueError: état, date ou responsable invalide
+    """
+    item = next((i for i in assessment.get('remediation', []) if i['id'] == item_id), None)
+    if item is None:
+        raise RemediationItemNotFoundError(item_id)
+    # Tous les champs sont validés avant la moindre modification
+    if state is not None and state not in STATES:
+        raise ValueError(f"Invalid state: {state!r} (expected one of {', '.join(STATES)})")
+    changes = {}
+    if due_date is not None:
+        changes['due_date'] = _parse_date(due_date)
+    if owner is not None:
+        changes['owner'] = _parse_owner(owner)
+    if state is not None:
+        changes['state'] = state
+    item.update(changes)
+    item['updated_at'] = datetime.now().isoformat()
+    return item
+
+def open_items(assessment: Dict) -> List[Dict]:
+    """Éléments ouverts de l'évaluation, par échéance"""
+    return sorted((item for item in assessment.get('remediation', [])
+                   if item['state'] in OPEN_STATES),
+                  key=lambda item: (item['due_date'], item['control_id']))
+
+class RemediationIndex:
+    def __init__(self):
+        """Initialise un index vide"""
+        # Clés (échéance, source, id) des éléments ouverts, triées
+        self._due: List[Tuple[str, str, str]] = []
+        self._by_owner: Dict[str, List[Tuple[str, str, str]]] = {}
+        self._items: Dict[Tuple[str, str], Dict] = {}
+        self._sources: Dict[str, List[Tuple[str, str, str]]] = {}
+        self._signatures: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def update(self, source: str, assessment: Dict) -> None:
+        """
+        Remplace les éléments ouverts de l'évaluation identifiée par `source`
+
+        Args:
+            source: Identifiant stable (chemin du fichier, ID de stockage)
+        """
+        organization = assessment.get('metadata', {}).get('organization', '')
+        items = [{**item, 'organization': organization, 'source': source}
+                 for item in open_items(assessment)]
+        with self._lock:
+            self._remove_locked(source)
+            if items:
+                self._sources[source] = []
+            for item in items:
+                key = (item['due_date'], source, item['id'])
+                self._items[(source, item['id'])] = item
+                self._sources[source].append(key)
+                bisect.insort(self._due, key)
+                bisect.insort(self._by_owner.setdefault(owner_key(item['owner']), []), key)
+
+    def remove(self, source: str) -> None:
+        with self._lock:
+            self._signatures.pop(source, None)
+            self._remove_locked(source)
+
+    def _remove_locked(self, source: str) -> None:
+        for key in self._sources.pop(source, []):
+            item = self._items.pop((source, key[2]))
+            del self._due[bisect.bisect_left(self._due, key)]
+            owned = self._by_owner[owner_key(item['owner'])]
+            del owned[bisect.bisect_left(owned, key)]
+            if not owned:
+                del self._by_owner[owner_key(item['owner'])]
+
+    def sync(self, root: str) -> int:
+        """
+        Met l'index à jour depuis une archive d'évaluations
+
+        Returns:
+            Nombre de fichiers (re)chargés
+        """
+        if not os.path.isdir(root):
+            return 0
+        with self._sync_lock:
+            return sync_archive(root, self._signatures, self.update, self.remove)
+
+    def _range(self, start: Optional[str], end: str, owner: Optional[str],
+               limit: Optional[int]) -> List[Dict]:
+        """Éléments dont l'échéance est dans [start, end) (start None : depuis le début)"""
+        with self._lock:
+            keys = self._due if owner is None else self._by_owner.get(owner_key(owner), [])
+            low = 0 if start is None else bisect.bisect_left(keys, (start,))
+            high = bisect.bisect_left(keys, (end,))
+            if limit is not None:
+                high = min(high, low + limit)
+            return [dict(self._items[(source, item_id)]) for _, source, item_id in keys[low:high]]
+
+    def overdue(self, today: Optional[str] = None, owner: Optional[str] = None,
+                limit: Optional[int] = None) -> List[Dict]:
+        """Éléments ouverts dont l'échéance est dépassée, les plus anciens d'abord"""
+        return self._range(None, _parse_date(today) if today else date.today().isoformat(),
+                           owner, limit)
+
+    def due_within(self, days: int = 7, owner: Optional[str] = None, today: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[Dict]:
+        """
+        Éléments ouverts à échéance entre aujourd'hui et aujourd'hui + `days` (inclus)
+
+        Raises:
+            ValueError: `days` négatif ou hors du calendrier
+        """
+        if days < 0:
+            raise ValueError(f"Invalid days: {days} (expected a non-negative integer)")
+        start = date.fromisoformat(_parse_date(today)) if today else date.today()
+        try:
+            end = start + timedelta(days=days + 1)
+        except OverflowError:
+            raise ValueError(f"Invalid days: {days} (out of range)") from None
+        return self._range(start.isoformat(), end.isoformat(), owner, limit)
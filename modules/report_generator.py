@@ -3,43 +3,139 @@ Module de génération de rapports PDF
 """
 from fpdf import FPDF
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Union
 import base64
-import tempfile
-import os
+import io
+from modules import pdf_fonts
+from modules.instrumentation import traced
+from modules.remediation import PRIORITY_DEADLINES, open_items
+
+# Annexe : nombre d'éléments préparés à la fois et colonnes du tableau
+APPENDIX_CHUNK_SIZE = 200
+APPENDIX_MAX_TEXT = 1500
+APPENDIX_COLUMNS = [('Control', 22), ('Status', 33), ('Evidence', 70), ('Comments', 65)]
+APPENDIX_LINE_HEIGHT = 4
+# Section delta : nombre maximal de gaps listés par catégorie
+DELTA_MAX_LISTED = 15
+# Plan de remédiation : colonnes du tableau
+REMEDIATION_COLUMNS = [('Control', 20), ('Title', 62), ('Owner', 38), ('Priority', 20),
+                       ('Due date', 25), ('State', 25)]
+
+def _pdf_text(text: str) -> str:
+    """Rend un texte compatible avec les polices PDF standard (latin-1)"""
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+def _format_rank(rank: Dict) -> str:
+    """Rang centile lisible (ou mention des pairs insuffisants)"""
+    if rank['percentile'] is None:
+        return f"not ranked ({rank['peers']} peers)"
+    return f"percentile {rank['percentile']:g} ({rank['peers']} peers)"
 
 class ISO27001Report(FPDF):
+    def __init__(self, report_font: str = 'Arial', **kwargs):
+        super().__init__(**kwargs)
+        self.report_font = report_font
+    
+    def set_font(self, family=None, style='', size=0):
+        """Déclare à la demande les styles de la police Unicode (métriques en cache)"""
+        if family and family.lower() == pdf_fonts.FONT_FAMILY:
+            pdf_fonts.install_font(self, ''.join(sorted(style.upper())).replace('U', ''))
+        super().set_font(family, style, size)
+    
     def header(self):
         """En-tête du PDF"""
-        self.set_font('Arial', 'B', 16)
+        self.set_font(self.report_font, 'B', 16)
         self.cell(0, 10, 'ISO/IEC 27001:2022 Compliance Report', 0, 1, 'C')
         self.ln(5)
     
     def footer(self):
         """Pied de page du PDF"""
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
+        self.set_font(self.report_font, 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
 
 class ReportGenerator:
-    def __init__(self, assessment: Dict, statistics: Dict, gaps: List[Dict]):
-        """Initialise le générateur de rapport"""
+    def __init__(self, assessment: Dict, statistics: Dict, gaps: List[Dict],
+                 delta: Optional[Dict] = None, benchmark: Optional[Dict] = None,
+                 unicode: bool = True):
+        """
+        Initialise le générateur de rapport
+        
+        Args:
+            delta: Résultat optionnel de assessment_diff.diff_assessments
+                (évaluation précédente -> celle-ci) ; ajoute une section delta
+            benchmark: Résultat optionnel de PeerBenchmark.benchmark ; ajoute
+                le positionnement par rapport aux pairs au résumé exécutif
+            unicode: Utilise la police TTF intégrée (DejaVu Sans) si elle est
+                disponible ; sinon Arial, les caractères hors latin-1 étant
+                remplacés par '?'
+        """
         self.assessment = assessment
         self.stats = statistics
         self.gaps = gaps
+        self.delta = delta
+        self.benchmark = benchmark
+        self.remediation = open_items(assessment)
+        self.today = datetime.now().date().isoformat()
+        self.unicode = unicode and pdf_fonts.unicode_fonts_available()
+        self.report_font = pdf_fonts.FONT_FAMILY if self.unicode else 'Arial'
     
-    def generate_pdf(self, output_filename: str, charts: Dict[str, str]) -> str:
+    def _text(self, text: str) -> str:
+        """Texte tel quel avec la police Unicode, sinon limité au latin-1"""
+        return text if self.unicode else _pdf_text(text)
+    
+    @traced()
+    def generate_pdf(self, output_filename: Optional[str], charts: Dict[str, str],
+                     output: Optional[BinaryIO] = None, include_appendix: bool = False,
+                     appendix_items: Optional[Iterable[Dict]] = None) -> Union[str, BinaryIO]:
         """
         Génère le rapport PDF complet
         
         Args:
-            output_filename: Nom du fichier de sortie
+            output_filename: Nom du fichier de sortie (dans data/assessments/)
             charts: Dict contenant les graphiques en base64
+            output: Objet fichier binaire de destination ; si fourni, le PDF y
+                est écrit et rien n'est écrit sur disque
+            include_appendix: Ajoute l'annexe des preuves et commentaires
+            appendix_items: Itérable (ex: générateur) d'éléments d'évaluation
+                pour l'annexe ; par défaut ceux de l'évaluation. Implique
+                include_appendix.
         
         Returns:
-            Chemin du fichier généré
+            Chemin du fichier généré, ou `output` si un objet fichier est fourni
+        
+        Raises:
+            ValueError: ni output_filename ni output
         """
-        pdf = ISO27001Report()
+        if output is None and not output_filename:
+            raise ValueError("output_filename or output is required")
+        pdf = self._build_pdf(charts, include_appendix, appendix_items)
+        
+        if output is not None:
+            output.write(pdf.output())
+            return output
+        
+        # Sauvegarder
+        output_path = f"data/assessments/{output_filename}.pdf"
+        pdf.output(output_path)
+        
+        return output_path
+    
+    def generate_pdf_bytes(self, charts: Dict[str, str], include_appendix: bool = False,
+                           appendix_items: Optional[Iterable[Dict]] = None) -> bytes:
+        """Génère le rapport PDF en mémoire et retourne son contenu"""
+        return bytes(self._build_pdf(charts, include_appendix, appendix_items).output())
+    
+    def iter_assessment_items(self) -> Iterator[Dict]:
+        """Parcourt paresseusement les éléments de l'évaluation"""
+        yield from self.assessment['controls_assessment']
+    
+    def _build_pdf(self, charts: Dict[str, str], include_appendix: bool = False,
+                   appendix_items: Optional[Iterable[Dict]] = None) -> FPDF:
+        """Construit le document PDF (sans l'écrire)"""
+        pdf = ISO27001Report(self.report_font)
         pdf.add_page()
         
         # Section 1: Executive Summary
@@ -63,6 +159,9 @@ class ReportGenerator:
         pdf.add_page()
         self._add_domain_scores(pdf)
         
+        if self.delta:
+            self._add_delta(pdf)
+        
         # Section 6: Identified Gaps
         pdf.add_page()
         self._add_gaps_analysis(pdf)
@@ -71,17 +170,26 @@ class ReportGenerator:
         pdf.add_page()
         self._add_recommendations(pdf)
         
-        # Sauvegarder
-        output_path = f"data/assessments/{output_filename}.pdf"
-        pdf.output(output_path)
+        if self.remediation:
+            pdf.add_page()
+            self._add_remediation_plan(pdf)
         
-        return output_path
+        # Section 8: Evidence Appendix
+        if include_appendix or appendix_items is not None:
+            pdf.add_page()
+            self._add_evidence_appendix(
+                pdf,
+                appendix_items if appendix_items is not None else self.iter_assessment_items()
+            )
+        
+        return pdf
     
+    @traced()
     def _add_executive_summary(self, pdf: FPDF):
         """Ajoute le résumé exécutif"""
-        pdf.set_font('Arial', 'B', 14)
+        pdf.set_font(self.report_font, 'B', 14)
         pdf.cell(0, 10, '1. Executive Summary', 0, 1)
-        pdf.set_font('Arial', '', 11)
+        pdf.set_font(self.report_font, '', 11)
         
         overall_score = self.stats['overall_score']
         status = "Compliant" if overall_score >= 80 else "Non-Compliant"
@@ -101,14 +209,39 @@ Total Controls Assessed: {self.stats['total_controls']}
 Identified Gaps: {len(self.gaps)} controls require attention.
         """
         
-        pdf.multi_cell(0, 6, summary.strip())
+        pdf.multi_cell(0, 6, self._text(summary.strip()))
+        pdf.ln(5)
+        
+        if self.benchmark:
+            self._add_peer_benchmark(pdf)
+    
+    def _add_peer_benchmark(self, pdf: FPDF):
+        """Ajoute le rang centile parmi les pairs (portefeuille et secteur)"""
+        benchmark = self.benchmark
+        sector = benchmark.get('sector')
+        
+        pdf.set_font(self.report_font, 'B', 11)
+        pdf.cell(0, 7, 'Peer Benchmark', 0, 1)
+        pdf.set_font(self.report_font, '', 10)
+        lines = [f"Overall score across the portfolio: {_format_rank(benchmark['overall'])}"]
+        if sector:
+            lines.append(f"Overall score in sector {sector}: "
+                         f"{_format_rank(benchmark['sector_overall'])}")
+        for domain, rank in benchmark['domains'].items():
+            line = f"   {domain}: {_format_rank(rank)}"
+            if sector and domain in benchmark['sector_domains']:
+                line += f" (sector: {_format_rank(benchmark['sector_domains'][domain])})"
+            lines.append(line)
+        for line in lines:
+            pdf.cell(0, 6, self._text(line), 0, 1)
         pdf.ln(5)
     
+    @traced()
     def _add_metadata(self, pdf: FPDF):
         """Ajoute les métadonnées"""
-        pdf.set_font('Arial', 'B', 14)
+        pdf.set_font(self.report_font, 'B', 14)
         pdf.cell(0, 10, '2. Assessment Information', 0, 1)
-        pdf.set_font('Arial', '', 11)
+        pdf.set_font(self.report_font, '', 11)
         
         meta = self.assessment['metadata']
         info = f"""
@@ -118,87 +251,131 @@ Assessment Date: {meta['date'][:10]}
 Standard: {meta['standard']}
         """
         
-        pdf.multi_cell(0, 6, info.strip())
+        pdf.multi_cell(0, 6, self._text(info.strip()))
         pdf.ln(5)
     
+    @traced()
     def _add_overall_score(self, pdf: FPDF):
         """Ajoute le score global"""
-        pdf.set_font('Arial', 'B', 14)
+        pdf.set_font(self.report_font, 'B', 14)
         pdf.cell(0, 10, '3. Overall Compliance Score', 0, 1)
         
         score = self.stats['overall_score']
         color = (40, 167, 69) if score >= 80 else (220, 53, 69)
         
-        pdf.set_font('Arial', 'B', 36)
+        pdf.set_font(self.report_font, 'B', 36)
         pdf.set_text_color(*color)
         pdf.cell(0, 15, f"{score}%", 0, 1, 'C')
         pdf.set_text_color(0, 0, 0)
         pdf.ln(5)
     
+    @traced()
     def _add_chart(self, pdf: FPDF, chart_base64: str, title: str):
         """Ajoute un graphique au PDF"""
-        pdf.set_font('Arial', 'B', 12)
+        pdf.set_font(self.report_font, 'B', 12)
         pdf.cell(0, 10, title, 0, 1)
         
-        # Décoder base64 et insérer image
+        # Décoder base64 et insérer l'image directement depuis la mémoire
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp:
-                tmp.write(base64.b64decode(chart_base64))
-                tmp_path = tmp.name
-            
-            pdf.image(tmp_path, x=10, w=190)
-            
-            # Nettoyer le fichier temporaire
-            os.unlink(tmp_path)
+            pdf.image(io.BytesIO(base64.b64decode(chart_base64)), x=10, w=190)
         except Exception as e:
-            pdf.set_font('Arial', 'I', 10)
-            pdf.cell(0, 10, f'[Chart could not be generated: {str(e)}]', 0, 1)
+            pdf.set_font(self.report_font, 'I', 10)
+            pdf.cell(0, 10, self._text(f'[Chart could not be generated: {str(e)}]'), 0, 1)
         
         pdf.ln(5)
     
+    @traced()
     def _add_domain_scores(self, pdf: FPDF):
         """Ajoute les scores par domaine"""
-        pdf.set_font('Arial', 'B', 14)
+        pdf.set_font(self.report_font, 'B', 14)
         pdf.cell(0, 10, '4. Compliance Score by Domain', 0, 1)
         
-        pdf.set_font('Arial', 'B', 10)
+        pdf.set_font(self.report_font, 'B', 10)
         pdf.cell(120, 8, 'Domain', 1)
         pdf.cell(40, 8, 'Score (%)', 1)
         pdf.cell(30, 8, 'Status', 1)
         pdf.ln()
         
-        pdf.set_font('Arial', '', 10)
+        pdf.set_font(self.report_font, '', 10)
         for domain, score in self.stats['domain_scores'].items():
-            # Pas de caractères Unicode - texte simple
             status = "COMPLIANT" if score >= 80 else "GAP"
-            pdf.cell(120, 8, domain, 1)
+            pdf.cell(120, 8, self._text(domain), 1)
             pdf.cell(40, 8, f"{score}%", 1, 0, 'C')
             pdf.cell(30, 8, status, 1)
             pdf.ln()
     
+    @traced()
+    def _add_delta(self, pdf: FPDF):
+        """Ajoute la synthèse des changements depuis l'évaluation précédente"""
+        delta = self.delta
+        pdf.ln(5)
+        pdf.set_font(self.report_font, 'B', 12)
+        pdf.cell(0, 10, '4.1 Changes Since Previous Assessment', 0, 1)
+        
+        overall = delta['overall']
+        pdf.set_font(self.report_font, '', 10)
+        previous_date = (delta.get('previous_date') or '')[:10]
+        pdf.cell(0, 6, f"Overall score: {overall['previous']}% -> {overall['current']}% "
+                       f"({overall['delta']:+.2f} pts) since {previous_date}", 0, 1)
+        pdf.cell(0, 6, f"Status changes: {len(delta['status_changes'])} | "
+                       f"New gaps: {len(delta['new_gaps'])} | "
+                       f"Closed gaps: {len(delta['closed_gaps'])}", 0, 1)
+        pdf.ln(2)
+        
+        pdf.set_font(self.report_font, 'B', 10)
+        pdf.cell(100, 7, 'Domain', 1)
+        pdf.cell(30, 7, 'Previous', 1)
+        pdf.cell(30, 7, 'Current', 1)
+        pdf.cell(30, 7, 'Delta', 1)
+        pdf.ln()
+        
+        pdf.set_font(self.report_font, '', 10)
+        for domain, scores in delta['domain_deltas'].items():
+            fmt = lambda value: '-' if value is None else f"{value}%"
+            pdf.cell(100, 7, self._text(domain), 1)
+            pdf.cell(30, 7, fmt(scores['previous']), 1, 0, 'C')
+            pdf.cell(30, 7, fmt(scores['current']), 1, 0, 'C')
+            pdf.cell(30, 7, '-' if scores['delta'] is None else f"{scores['delta']:+.2f}", 1, 0, 'C')
+            pdf.ln()
+        
+        for title, entries in (('New gaps', delta['new_gaps']), ('Closed gaps', delta['closed_gaps'])):
+            if not entries:
+                continue
+            pdf.ln(2)
+            pdf.set_font(self.report_font, 'B', 10)
+            pdf.cell(0, 6, f"{title}:", 0, 1)
+            pdf.set_font(self.report_font, '', 9)
+            for entry in entries[:DELTA_MAX_LISTED]:
+                pdf.cell(0, 5, self._text(f"   {entry['control_id']} - {entry['control_title']} "
+                                          f"({entry['status']})"), 0, 1)
+            if len(entries) > DELTA_MAX_LISTED:
+                pdf.cell(0, 5, f"   ... and {len(entries) - DELTA_MAX_LISTED} more", 0, 1)
+    
+    @traced()
     def _add_gaps_analysis(self, pdf: FPDF):
         """Ajoute l'analyse des gaps"""
-        pdf.set_font('Arial', 'B', 14)
+        pdf.set_font(self.report_font, 'B', 14)
         pdf.cell(0, 10, '5. Identified Gaps', 0, 1)
         
         if not self.gaps:
-            pdf.set_font('Arial', 'I', 11)
+            pdf.set_font(self.report_font, 'I', 11)
             pdf.cell(0, 8, 'No gaps identified. Full compliance achieved!', 0, 1)
             return
         
-        pdf.set_font('Arial', '', 10)
+        pdf.set_font(self.report_font, '', 10)
         for idx, gap in enumerate(self.gaps, 1):
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(0, 6, f"{idx}. {gap['control_id']} - {gap['control_title']}", 0, 1)
-            pdf.set_font('Arial', '', 9)
-            pdf.cell(0, 5, f"   Domain: {gap['domain']} | Status: {gap['status']}", 0, 1)
+            pdf.set_font(self.report_font, 'B', 10)
+            pdf.cell(0, 6, self._text(f"{idx}. {gap['control_id']} - {gap['control_title']}"), 0, 1)
+            pdf.set_font(self.report_font, '', 9)
+            pdf.cell(0, 5, self._text(f"   Domain: {gap['domain']} | Status: {gap['status']}"), 0, 1)
             pdf.ln(2)
     
+    @traced()
     def _add_recommendations(self, pdf: FPDF):
         """Ajoute les recommandations"""
-        pdf.set_font('Arial', 'B', 14)
+        pdf.set_font(self.report_font, 'B', 14)
         pdf.cell(0, 10, '6. Recommendations', 0, 1)
-        pdf.set_font('Arial', '', 11)
+        pdf.set_font(self.report_font, '', 11)
         
         not_implemented_count = len([g for g in self.gaps if g['status'] == 'Not Implemented'])
         partially_implemented_count = len([g for g in self.gaps if g['status'] == 'Partially Implemented'])
@@ -211,14 +388,10 @@ Based on the assessment findings, the following actions are recommended:
    - Complete {partially_implemented_count} partially implemented controls
 
 2. Timeline:
-   - Critical gaps: 30 days
-   - High priority gaps: 90 days
-   - Medium priority gaps: 180 days
+{self._timeline()}
 
 3. Next Steps:
-   - Create detailed remediation plan
-   - Assign ownership for each gap
-   - Schedule follow-up assessment in 6 months
+{self._next_steps()}
 
 4. Resources:
    - Allocate budget for security controls implementation
@@ -235,10 +408,181 @@ Based on the assessment findings, the following actions are recommended:
         pdf.ln(5)
         
         # Ajouter note de bas de page
-        pdf.set_font('Arial', 'I', 9)
+        pdf.set_font(self.report_font, 'I', 9)
         pdf.set_text_color(100, 100, 100)
         pdf.multi_cell(0, 5, 
             "Note: This assessment is for internal use only. Official ISO 27001 certification "
             "requires audit by an accredited certification body."
         )
         pdf.set_text_color(0, 0, 0)
+    
+    def _timeline(self) -> str:
+        """Échéances réelles du plan de remédiation, sinon délais indicatifs"""
+        if not self.remediation:
+            return ("   - Critical gaps: 30 days\n"
+                    "   - High priority gaps: 90 days\n"
+                    "   - Medium priority gaps: 180 days")
+        lines = []
+        for priority in PRIORITY_DEADLINES:
+            items = [item for item in self.remediation if item['priority'] == priority]
+            if items:
+                lines.append(f"   - {priority} priority: {len(items)} open items, "
+                             f"next due {items[0]['due_date']}, last due "
+                             f"{max(item['due_date'] for item in items)}")
+        overdue = sum(1 for item in self.remediation if item['due_date'] < self.today)
+        lines.append(f"   - Overdue: {overdue} of {len(self.remediation)} open items "
+                     f"(see Remediation Plan)")
+        return "\n".join(lines)
+    
+    def _next_steps(self) -> str:
+        if not self.remediation:
+            steps = ["Create detailed remediation plan", "Assign ownership for each gap"]
+        else:
+            unassigned = sum(1 for item in self.remediation if not item['owner'])
+            steps = ["Track the remediation plan against its due dates"]
+            if unassigned:
+                steps.append(f"Assign ownership for {unassigned} unassigned items")
+        steps.append("Schedule follow-up assessment in 6 months")
+        return "\n".join(f"   - {step}" for step in steps)
+    
+    @traced()
+    def _add_remediation_plan(self, pdf: FPDF):
+        """Ajoute le plan de remédiation (éléments ouverts, par échéance)"""
+        pdf.set_font(self.report_font, 'B', 14)
+        pdf.cell(0, 10, '6.1 Remediation Plan', 0, 1)
+        
+        self._add_remediation_header(pdf)
+        for item in self.remediation:
+            if pdf.get_y() + 7 > pdf.page_break_trigger:
+                pdf.add_page()
+                self._add_remediation_header(pdf)
+            overdue = item['due_date'] < self.today
+            values = [item['control_id'], item['control_title'], item['owner'] or '-',
+                      item['priority'], item['due_date'], item['state']]
+            for value, (_, width) in zip(values, REMEDIATION_COLUMNS):
+                text = self._text(value)
+                while len(text) > 1 and pdf.get_string_width(text) > width - 2:
+                    text = text[:-1]
+                if overdue and value == item['due_date']:
+                    pdf.set_text_color(220, 53, 69)
+                pdf.cell(width, 7, text, 1)
+                pdf.set_text_color(0, 0, 0)
+            pdf.ln()
+    
+    def _add_remediation_header(self, pdf: FPDF):
+        pdf.set_font(self.report_font, 'B', 9)
+        for title, width in REMEDIATION_COLUMNS:
+            pdf.cell(width, 7, title, 1)
+        pdf.ln()
+        pdf.set_font(self.report_font, '', 8)
+    
+    @traced()
+    def _add_evidence_appendix(self, pdf: FPDF, items: Iterable[Dict]):
+        """
+        Ajoute l'annexe des preuves et commentaires de chaque contrôle
+        
+        Les éléments sont consommés par blocs de APPENDIX_CHUNK_SIZE : seul le
+        bloc courant est découpé en lignes, quel que soit le nombre total
+        d'éléments. Le tableau est dessiné avec text()/rect() et un retour à
+        la ligne maison, bien plus rapide que multi_cell() pour des milliers
+        de lignes.
+        """
+        pdf.set_font(self.report_font, 'B', 14)
+        pdf.cell(0, 10, '7. Appendix: Evidence and Comments', 0, 1)
+        
+        self._add_appendix_header(pdf)
+        
+        # Largeurs des mots mises en cache : la police ne change plus ici
+        measure = lru_cache(maxsize=65536)(pdf.get_string_width)
+        
+        items = iter(items)
+        count = 0
+        while True:
+            chunk = list(islice(items, APPENDIX_CHUNK_SIZE))
+            if not chunk:
+                break
+            
+            rows = [self._wrap_appendix_row(item, measure) for item in chunk]
+            for row in rows:
+                self._draw_appendix_row(pdf, row)
+            count += len(chunk)
+        
+        if count == 0:
+            pdf.set_font(self.report_font, 'I', 10)
+            pdf.cell(0, 8, 'No assessed controls.', 0, 1)
+    
+    def _add_appendix_header(self, pdf: FPDF):
+        """Dessine l'en-tête du tableau de l'annexe"""
+        pdf.set_font(self.report_font, 'B', 9)
+        for title, width in APPENDIX_COLUMNS:
+            pdf.cell(width, 7, title, 1)
+        pdf.ln()
+        pdf.set_font(self.report_font, '', 8)
+    
+    def _wrap_appendix_row(self, item: Dict,
+                           measure: Callable[[str], float]) -> List[List[str]]:
+        """Découpe les cellules d'un élément en lignes adaptées aux colonnes"""
+        values = [
+            item.get('control_id', ''),
+            item.get('status', ''),
+            item.get('evidence', '') or '',
+            item.get('comments', '') or ''
+        ]
+        cells = []
+        for value, (_, width) in zip(values, APPENDIX_COLUMNS):
+            text = self._text(str(value))
+            if len(text) > APPENDIX_MAX_TEXT:
+                text = text[:APPENDIX_MAX_TEXT] + '...'
+            cells.append(_wrap_text(text, width - 2, measure))
+        return cells
+    
+    def _draw_appendix_row(self, pdf: FPDF, cells: List[List[str]]):
+        """Dessine une ligne du tableau, avec saut de page si nécessaire"""
+        height = max(len(lines) for lines in cells) * APPENDIX_LINE_HEIGHT + 1.5
+        
+        if pdf.get_y() + height > pdf.page_break_trigger:
+            pdf.add_page()
+            self._add_appendix_header(pdf)
+        
+        x = pdf.l_margin
+        y = pdf.get_y()
+        for lines, (_, width) in zip(cells, APPENDIX_COLUMNS):
+            pdf.rect(x, y, width, height)
+            for idx, line in enumerate(lines):
+                pdf.text(x + 1, y + 3.5 + idx * APPENDIX_LINE_HEIGHT, line)
+            x += width
+        pdf.set_xy(pdf.l_margin, y + height)
+
+def _wrap_text(text: str, width: float, measure: Callable[[str], float]) -> List[str]:
+    """
+    Retour à la ligne glouton mot par mot (coupe les mots trop longs)
+    
+    `measure` retourne la largeur d'un texte dans la police courante ; les
+    largeurs des mots sont additionnées plutôt que de remesurer la ligne.
+    """
+    space = measure(' ')
+    lines = []
+    for paragraph in text.splitlines() or ['']:
+        current, current_width = '', 0.0
+        for word in paragraph.split(' '):
+            word_width = measure(word)
+            if current and current_width + space + word_width <= width:
+                current += ' ' + word
+                current_width += space + word_width
+                continue
+            if not current and word_width <= width:
+                current, current_width = word, word_width
+                continue
+            if current:
+                lines.append(current)
+            # Mot plus large que la colonne : découpe par caractères
+            while word_width > width and len(word) > 1:
+                cut = len(word) - 1
+                while cut > 1 and measure(word[:cut]) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = measure(word)
+            current, current_width = word, word_width
+        lines.append(current)
+    return lines
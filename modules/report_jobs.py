@@ -0,0 +1,185 @@
+"""
+Module de génération asynchrone des rapports PDF
+
+Les rapports (graphiques matplotlib + mise en page fpdf) sont générés dans
+un pool de workers local pour ne pas bloquer les workers HTTP. Les demandes
+identiques (même contenu d'évaluation et mêmes options) sont regroupées en
+un seul job, dont le résultat reste en cache pendant un TTL.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from modules.scoring import ComplianceScoring
+from modules.visualizations import ComplianceVisualizations
+from modules.report_generator import ReportGenerator
+
+class JobNotFoundError(KeyError):
+    """Job inconnu ou expiré"""
+
+class JobNotReadyError(RuntimeError):
+    """Le job n'est pas encore terminé"""
+
+def render_report(assessment: Dict, options: Dict) -> bytes:
+    """
+    Calcule les scores, les graphiques et le PDF d'une évaluation
+
+    Fonction de module (et non méthode) pour pouvoir être exécutée dans un
+    ProcessPoolExecutor.
+    """
+    scoring = ComplianceScoring(assessment)
+    stats = scoring.get_statistics()
+    viz = ComplianceVisualizations(stats)
+    charts = {
+        'pie_chart': viz.generate_status_pie_chart(),
+        'bar_chart': viz.generate_domain_bar_chart()
+    }
+    report_gen = ReportGenerator(assessment, stats, scoring.get_gaps(),
+                                 benchmark=options.get('benchmark'))
+    return report_gen.generate_pdf_bytes(
+        charts, include_appendix=options.get('include_appendix', False)
+    )
+
+def job_key(assessment: Dict, options: Dict) -> str:
+    """Clé de déduplication : empreinte SHA-256 de l'évaluation et des options"""
+    payload = json.dumps({"assessment": assessment, "options": options},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class _Job:
+    __slots__ = ('job_id', 'key', 'future', 'created_at', 'finished_at')
+
+    def __init__(self, job_id: str, key: str, future: Future):
+        self.job_id = job_id
+        self.key = key
+        self.future = future
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+class ReportJobQueue:
+    def __init__(self, max_workers: int = 2, ttl_seconds: float = 600,
+                 use_processes: bool = True, executor: Optional[Executor] = None):
+        """
+        Initialise la file de jobs
+
+        Args:
+            max_workers: Taille du pool de workers
+            ttl_seconds: Durée de conservation d'un rapport terminé
+            use_processes: Pool de processus (par défaut) ou de threads
+            executor: Executor fourni par l'appelant (prioritaire)
+        """
+        self.max_workers = max_workers
+        self.ttl_seconds = ttl_seconds
+        self.use_processes = use_processes
+        self._executor = executor
+        self._jobs: Dict[str, _Job] = {}
+        self._by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        # Création paresseuse : pas de processus démarrés avant un fork gunicorn
+        if self._executor is None:
+            pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool_class(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, assessment: Dict, options: Optional[Dict] = None) -> Dict:
+        """
+        Soumet un rapport à générer
+
+        Returns:
+            Statut du job (nouveau, ou existant si une demande identique est
+            en cours ou en cache)
+        """
+        options = options or {}
+        key = job_key(assessment, options)
+
+        with self._lock:
+            self._purge_expired()
+
+            job_id = self._by_key.get(key)
+            if job_id is not None:
+                job = self._jobs[job_id]
+                # Un job en échec n'est pas réutilisé : on relance
+                if not (job.future.done() and job.future.exception() is not None):
+                    return self._describe(job)
+
+            job_id = uuid.uuid4().hex
+            future = self._get_executor().submit(render_report, assessment, options)
+            job = _Job(job_id, key, future)
+            self._jobs[job_id] = job
+            self._by_key[key] = job_id
+
+        future.add_done_callback(lambda _: self._mark_finished(job))
+        return self._describe(job)
+
+    def status(self, job_id: str) -> Dict:
+        """Retourne le statut d'un job"""
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobNotFoundError(job_id)
+            return self._describe(job)
+
+    def result(self, job_id: str) -> bytes:
+        """
+        Retourne le PDF d'un job terminé
+
+        Raises:
+            JobNotFoundError: job inconnu ou expiré
+            JobNotReadyError: job en attente ou en cours
+            Exception: l'erreur levée par la génération si le job a échoué
+        """
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        if not job.future.done():
+            raise JobNotReadyError(job_id)
+        return job.future.result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le pool de workers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _mark_finished(self, job: _Job) -> None:
+        with self._lock:
+            job.finished_at = time.time()
+
+    def _purge_expired(self) -> None:
+        """Supprime les jobs terminés depuis plus de ttl_seconds (verrou tenu)"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.ttl_seconds]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+    @staticmethod
+    def _describe(job: _Job) -> Dict:
+        future = job.future
+        if future.done():
+            status = 'failed' if future.exception() is not None else 'done'
+        elif future.running():
+            status = 'running'
+        else:
+            status = 'queued'
+
+        info = {
+            "job_id": job.job_id,
+            "status": status,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at
+        }
+        if status == 'failed':
+            info['error'] = str(future.exception())
+        return info
@@ -4,11 +4,17 @@ Module de calcul de scoring de conformité
 from typing import Dict, List
 import pandas as pd
 
+# Colonnes garanties même pour une évaluation vide
+ASSESSMENT_COLUMNS = ['control_id', 'control_title', 'domain', 'status',
+                      'evidence', 'comments', 'assessed_at']
+
 class ComplianceScoring:
     def __init__(self, assessment: Dict):
         """Initialise avec une évaluation"""
         self.assessment = assessment
         self.controls_df = pd.DataFrame(assessment['controls_assessment'])
+        if self.controls_df.empty:
+            self.controls_df = pd.DataFrame(columns=ASSESSMENT_COLUMNS)
     
     def calculate_overall_score(self) -> float:
         """
@@ -0,0 +1,265 @@
+"""
+Module de recherche plein texte (contrôles et preuves)
+
+Index inversé en mémoire sur les champs title/description/category du
+catalogue et evidence/comments des évaluations. Le vocabulaire est conservé
+trié pour répondre aux requêtes par préfixe (typeahead) par bisection, et
+l'index est mis à jour élément par élément, sans reconstruction.
+
+Pour le portefeuille, update/remove/sync indexent les évaluations par
+source (chemin du fichier), comme les autres index du portefeuille.
+"""
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+
+CONTROL_FIELDS = ('id', 'title', 'description', 'category')
+ITEM_FIELDS = ('control_id', 'evidence', 'comments')
+
+# Candidats classés au plus par requête : les suivants sont ignorés
+CANDIDATE_LIMIT = 100
+# Au-delà, un terme est vérifié sur les jetons du document plutôt que sur ses postings
+EXPANSION_LOOKUP_LIMIT = 8
+# Requêtes récentes mémorisées (vidé à chaque modification de l'index)
+QUERY_CACHE_SIZE = 256
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en jetons minuscules sans accents ("A.5.1" reste entier)"""
+    normalized = unicodedata.normalize('NFKD', str(text).lower())
+    ascii_text = normalized.encode('ascii', 'ignore').decode('ascii')
+    return TOKEN_PATTERN.findall(ascii_text)
+
+def assessment_key(assessment: Dict) -> str:
+    """Identifiant d'une évaluation dans l'index (organisation + date)"""
+    meta = assessment.get('metadata', {})
+    return f"{meta.get('organization', '')}|{meta.get('date', '')}"
+
+class SearchIndex:
+    def __init__(self):
+        """Initialise un index vide"""
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.documents: Dict[str, Dict] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._terms: List[str] = []
+        self._docs_by_type: Dict[str, Set[str]] = defaultdict(set)
+        self._query_cache: Dict[tuple, List[Dict]] = {}
+        # Nombre d'éléments indexés par source, signatures des fichiers lus
+        self._sources: Dict[str, int] = {}
+        self._signatures: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add_document(self, doc_id: str, fields: Dict[str, str], meta: Dict) -> None:
+        """Ajoute (ou remplace) un document"""
+        counts: Dict[str, int] = defaultdict(int)
+        for value in fields.values():
+            for token in tokenize(value or ''):
+                counts[token] += 1
+
+        with self._lock:
+            self._query_cache.clear()
+            if doc_id in self.documents:
+                self._remove_locked(doc_id)
+
+            for token, count in counts.items():
+                posting = self.postings[token]
+                if not posting:
+                    insort(self._terms, token)
+                posting[doc_id] = count
+
+            self.documents[doc_id] = meta
+            self._doc_terms[doc_id] = dict(counts)
+            self._docs_by_type[meta['type']].add(doc_id)
+
+    def remove_document(self, doc_id: str) -> None:
+        """Retire un document de l'index"""
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        self._query_cache.clear()
+        for token in self._doc_terms.pop(doc_id, []):
+            posting = self.postings[token]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[token]
+                pos = bisect_left(self._terms, token)
+                if pos < len(self._terms) and self._terms[pos] == token:
+                    del self._terms[pos]
+        meta = self.documents.pop(doc_id, None)
+        if meta is not None:
+            self._docs_by_type[meta['type']].discard(doc_id)
+
+    def index_controls(self, controls: Iterable[Dict]) -> None:
+        """Indexe les contrôles du catalogue (ceux qui n'y figurent plus sont retirés)"""
+        indexed = set()
+        for control in controls:
+            doc_id = f"control:{control['id']}"
+            indexed.add(doc_id)
+            self.add_document(
+                doc_id,
+                {field: control.get(field, '') for field in CONTROL_FIELDS},
+                {"type": "control", "control_id": control['id'], "title": control.get('title', '')}
+            )
+        with self._lock:
+            for doc_id in self._docs_by_type['control'] - indexed:
+                self._remove_locked(doc_id)
+
+    def index_assessment_item(self, assessment: Dict, item: Dict, position: int) -> None:
+        """Indexe la preuve et les commentaires d'un élément d'évaluation"""
+        key = assessment_key(assessment)
+        self.add_document(
+            f"item:{key}:{position}",
+            {field: item.get(field, '') for field in ITEM_FIELDS},
+            {
+                "type": "assessment_item",
+                "assessment": key,
+                "organization": assessment.get('metadata', {}).get('organization', ''),
+                "control_id": item['control_id'],
+                "status": item.get('status', '')
+            }
+        )
+
+    def index_assessment(self, assessment: Dict) -> None:
+        """Indexe tous les éléments d'une évaluation"""
+        for position, item in enumerate(assessment.get('controls_assessment', [])):
+            self.index_assessment_item(assessment, item, position)
+
+    def remove_assessment(self, assessment: Dict) -> None:
+        """Retire tous les éléments d'une évaluation"""
+        prefix = f"item:{assessment_key(assessment)}:"
+        with self._lock:
+            for doc_id in [d for d in self._docs_by_type['assessment_item'] if d.startswith(prefix)]:
+                self._remove_locked(doc_id)
+
+    def update(self, source: str, assessment: Dict) -> None:
+        """
+        Remplace les éléments indexés de l'évaluation identifiée par `source`
+
+        Args:
+            source: Identifiant stable (chemin du fichier, ID de stockage)
+        """
+        organization = assessment.get('metadata', {}).get('organization', '')
+        items = assessment['controls_assessment']
+        for position, item in enumerate(items):
+            self.add_document(
+                f"item:{source}:{position}",
+                {field: item.get(field, '') for field in ITEM_FIELDS},
+                {
+                    "type": "assessment_item",
+                    "source": source,
+                    "organization": organization,
+                    "control_id": item['control_id'],
+                    "status": item.get('status', '')
+                }
+            )
+        with self._lock:
+            for position in range(len(items), self._sources.get(source, 0)):
+                self._remove_locked(f"item:{source}:{position}")
+            self._sources[source] = len(items)
+
+    def remove(self, source: str) -> None:
+        with self._lock:
+            self._signatures.pop(source, None)
+            for position in range(self._sources.pop(source, 0)):
+                self._remove_locked(f"item:{source}:{position}")
+
+    def sync(self, root: str) -> int:
+        """
+        Met l'index à jour depuis une archive d'évaluations
+
+        Returns:
+            Nombre de fichiers (re)chargés
+        """
+        # Import local : integrity importe compliance_checker, qui importe ce module
+        from modules.integrity import sync_archive
+        if not os.path.isdir(root):
+            return 0
+        with self._sync_lock:
+            return sync_archive(root, self._signatures, self.update, self.remove)
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """Jetons du vocabulaire commençant par `prefix` (bisection)"""
+        with self._lock:
+            # Jetons ASCII : tous ceux commençant par `prefix` précèdent prefix + "\uffff"
+            return self._terms[bisect_left(self._terms, prefix):
+                               bisect_left(self._terms, prefix + "\uffff")]
+
+    def _contains(self, term: str, tokens: List[str]) -> Callable[[str], bool]:
+        """Prédicat : le document contient-il un jeton commençant par `term` ?"""
+        if len(tokens) <= EXPANSION_LOOKUP_LIMIT:
+            postings = [self.postings[t] for t in tokens]
+            return lambda doc_id: any(doc_id in posting for posting in postings)
+        return lambda doc_id: any(t.startswith(term) for t in self._doc_terms[doc_id])
+
+    def search(self, query: str, limit: int = 10, doc_type: Optional[str] = None) -> List[Dict]:
+        """
+        Recherche les documents contenant tous les termes de la requête
+
+        Chaque terme est traité comme un préfixe ("enc" trouve "encryption").
+        Les candidats sont énumérés depuis le terme le plus sélectif et
+        vérifiés sur les jetons de chaque document ; l'énumération s'arrête
+        à CANDIDATE_LIMIT candidats, classés par nombre d'occurrences. Un
+        préfixe très large ("a") coûte donc autant qu'une requête précise,
+        au prix de résultats pris parmi les premiers documents indexés.
+
+        Args:
+            query: Texte saisi
+            limit: Nombre maximal de résultats
+            doc_type: "control" ou "assessment_item" pour filtrer
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        cache_key = (frozenset(terms), limit, doc_type)
+        with self._lock:
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                return [dict(result) for result in cached]
+
+            expanded = {term: self.expand_prefix(term) for term in terms}
+            pivot = min(terms, key=lambda term: sum(len(self.postings[t]) for t in expanded[term]))
+            checks = [self._contains(term, expanded[term]) for term in terms if term != pivot]
+            candidates = []
+            seen = set()
+            for token in expanded[pivot]:
+                for doc_id in self.postings[token]:
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    if doc_type is not None and self.documents[doc_id]['type'] != doc_type:
+                        continue
+                    if all(check(doc_id) for check in checks):
+                        candidates.append(doc_id)
+                        if len(candidates) >= CANDIDATE_LIMIT:
+                            break
+                if len(candidates) >= CANDIDATE_LIMIT:
+                    break
+
+            tokens = [t for term in terms for t in expanded[term]]
+            if len(tokens) <= EXPANSION_LOOKUP_LIMIT:
+                postings = [self.postings[t] for t in tokens]
+                def occurrences(doc_id):
+                    return sum(posting.get(doc_id, 0) for posting in postings)
+            else:
+                prefixes = tuple(terms)
+                def occurrences(doc_id):
+                    return sum(count for t, count in self._doc_terms[doc_id].items()
+                               if t.startswith(prefixes))
+            scored = sorted(candidates, key=lambda doc_id: (-occurrences(doc_id), doc_id))[:limit]
+
+            results = [{"doc_id": doc_id, **self.documents[doc_id]} for doc_id in scored]
+            if len(self._query_cache) >= QUERY_CACHE_SIZE:
+                self._query_cache.pop(next(iter(self._query_cache)))
+            self._query_cache[cache_key] = results
+            return [dict(result) for result in results]
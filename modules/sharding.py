@@ -0,0 +1,318 @@
+"""
+Module de stockage des évaluations réparti en shards (hachage cohérent)
+
+Les évaluations partagées sont réparties entre plusieurs répertoires
+(disques locaux, volumes propres à chaque nœud...), chacun géré par un
+AssessmentStore. Le shard d'une évaluation est choisi par hachage cohérent
+de son organisation : l'identifiant commence par l'empreinte de
+l'organisation, si bien que la création (par organisation) et les lectures
+(par identifiant) aboutissent au même shard sans table de correspondance,
+et que toutes les évaluations d'une organisation sont regroupées.
+
+Chaque shard occupe DEFAULT_VNODES points de l'anneau : ajouter un shard à
+N shards ne déplace qu'environ 1/(N+1) des évaluations. La commande
+rebalance déplace les fichiers vers leur nouveau shard ; d'ici là, une
+évaluation absente de son shard cible est cherchée dans les autres.
+
+Usage:
+    python -m modules.sharding status --shard /srv/a/assessments --shard /srv/b/assessments
+    python -m modules.sharding rebalance --shard ... --shard ... --from data/assessments/shared
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from modules.assessment_store import (
+    ASSESSMENT_ID_PATTERN, AssessmentNotFoundError, AssessmentStore
+)
+from modules.catalog import CatalogRegistry
+from modules.compliance_checker import ComplianceChecker
+from modules.export import iter_sharded_assessments, shard_name
+
+DEFAULT_VNODES = 64
+# Caractères de l'identifiant réservés à l'empreinte de l'organisation
+FINGERPRINT_LENGTH = 8
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrouillage inter-processus indisponible
+    fcntl = None
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def organization_fingerprint(organization: str) -> str:
+    """Empreinte (hexadécimale) d'une organisation, insensible à la casse"""
+    key = organization.strip().casefold().encode('utf-8')
+    return hashlib.sha256(key).hexdigest()[:FINGERPRINT_LENGTH]
+
+def make_assessment_id(organization: str) -> str:
+    """Identifiant d'évaluation (32 hex) préfixé par l'empreinte de l'organisation"""
+    return organization_fingerprint(organization) + uuid.uuid4().hex[FINGERPRINT_LENGTH:]
+
+class HashRing:
+    def __init__(self, shards: Sequence[str], vnodes: int = DEFAULT_VNODES):
+        """
+        Anneau de hachage cohérent
+
+        Args:
+            shards: Noms des shards (distincts)
+            vnodes: Points de l'anneau par shard (équilibre de la répartition)
+        """
+        if not shards:
+            raise ValueError("At least one shard is required")
+        if len(set(shards)) != len(shards):
+            raise ValueError(f"Shard names must be distinct: {list(shards)}")
+        points = sorted((_hash64(f"{shard}#{index}"), shard)
+                        for shard in shards for index in range(vnodes))
+        self.shards = list(shards)
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> str:
+        """Shard propriétaire d'une clé (premier point de l'anneau après son hachage)"""
+        index = bisect.bisect_right(self._hashes, _hash64(key))
+        return self._owners[index % len(self._owners)]
+
+class ShardedAssessmentStore:
+    def __init__(self, directories: Sequence[str], vnodes: int = DEFAULT_VNODES,
+                 controls_file: str = "data/iso27001_controls.json",
+                 catalog_registry: Optional[CatalogRegistry] = None,
+                 on_persist: Optional[Callable[[str, Dict], None]] = None):
+        """
+        Initialise un AssessmentStore par shard
+
+        Args:
+            directories: Répertoires des shards ; le nom d'un shard est le
+                dernier composant de son répertoire (il fixe sa place dans
+                l'anneau, le répertoire peut donc être déplacé)
+            vnodes, controls_file, catalog_registry, on_persist: voir
+                HashRing et AssessmentStore
+        """
+        names = [shard_name(directory) for directory in directories]
+        self.ring = HashRing(names, vnodes)
+        self.directories: Dict[str, str] = dict(zip(names, directories))
+        self.shards: Dict[str, AssessmentStore] = {
+            name: AssessmentStore(directory, controls_file, catalog_registry, on_persist)
+            for name, directory in self.directories.items()
+        }
+
+    @property
+    def checker(self) -> ComplianceChecker:
+        return next(iter(self.shards.values())).checker
+
+    def shard_for_id(self, assessment_id: str) -> str:
+        return self.ring.shard_for(assessment_id[:FINGERPRINT_LENGTH])
+
+    def shard_for_organization(self, organization: str) -> str:
+        return self.ring.shard_for(organization_fingerprint(organization))
+
+    def _store_for(self, assessment_id: str) -> AssessmentStore:
+        """Shard qui détient l'évaluation : le shard cible, sinon (rééquilibrage en attente) un autre"""
+        if not ASSESSMENT_ID_PATTERN.match(assessment_id):
+            raise AssessmentNotFoundError(assessment_id)
+        primary = self.shards[self.shard_for_id(assessment_id)]
+        if primary.exists(assessment_id):
+            return primary
+        for store in self.shards.values():
+            if store is not primary and store.exists(assessment_id):
+                return store
+        raise AssessmentNotFoundError(assessment_id)
+
+    def path(self, assessment_id: str) -> Optional[str]:
+        try:
+            return self._store_for(assessment_id).path(assessment_id)
+        except AssessmentNotFoundError:
+            return self.shards[self.shard_for_id(assessment_id)].path(assessment_id)
+
+    def exists(self, assessment_id: str) -> bool:
+        try:
+            self._store_for(assessment_id)
+        except AssessmentNotFoundError:
+            return False
+        return True
+
+    def create(self, organization: str, assessor: str,
+               sector: Optional[str] = None) -> Tuple[str, Dict]:
+        """Crée une évaluation dans le shard de son organisation"""
+        assessment_id = make_assessment_id(organization)
+        store = self.shards[self.shard_for_id(assessment_id)]
+        return store.create(organization, assessor, sector, assessment_id)
+
+    def _call(self, assessment_id: str, operation: Callable[[AssessmentStore], object]):
+        """
+        Exécute `operation` sur le shard de l'évaluation
+
+        Si l'évaluation a été déplacée par un rééquilibrage pendant l'attente
+        du verrou, l'opération est relancée dans son nouveau shard.
+        """
+        store = self._store_for(assessment_id)
+        try:
+            return operation(store)
+        except AssessmentNotFoundError:
+            moved = self._store_for(assessment_id)
+            if moved is store:
+                raise
+            return operation(moved)
+
+    def get(self, assessment_id: str) -> Dict:
+        return self._call(assessment_id, lambda store: store.get(assessment_id))
+
+    def version(self, assessment_id: str) -> int:
+        return self._call(assessment_id, lambda store: store.version(assessment_id))
+
+    def update(self, assessment_id: str, expected_version: int,
+               mutator: Callable[[Dict], None]) -> int:
+        return self._call(assessment_id,
+                          lambda store: store.update(assessment_id, expected_version, mutator))
+
+    def assess_control(self, assessment_id: str, expected_version: int, control_id: str,
+                       status: str, evidence: str = "", comments: str = "",
+                       attachments: Optional[List[Dict]] = None) -> int:
+        return self._call(assessment_id, lambda store: store.assess_control(
+            assessment_id, expected_version, control_id, status, evidence, comments, attachments
+        ))
+
+    def map_shards(self, func: Callable[[str], object],
+                   max_workers: Optional[int] = None) -> Dict[str, object]:
+        """
+        Exécute `func(répertoire)` sur tous les shards en parallèle
+
+        Returns:
+            {nom du shard: résultat}
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or len(self.directories)) as pool:
+            futures = {name: pool.submit(func, directory)
+                       for name, directory in self.directories.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def iter_assessments(self, after: Optional[str] = None,
+                         errors: Optional[List[Dict]] = None) -> Iterator[Tuple[str, Dict]]:
+        """("shard/chemin relatif", évaluation) de tous les shards, lus en parallèle"""
+        return iter_sharded_assessments(list(self.directories.values()), after, errors)
+
+    def _iter_files(self, directories: Sequence[str]) -> Iterator[Tuple[str, str]]:
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    assessment_id = entry.name[:-len('.json')]
+                    if (entry.name.endswith('.json') and ASSESSMENT_ID_PATTERN.match(assessment_id)
+                            and entry.is_file()):
+                        yield directory, assessment_id
+
+    def status(self) -> Dict:
+        """Nombre d'évaluations par shard et évaluations hors de leur shard cible"""
+        counts = {name: 0 for name in self.directories}
+        misplaced = 0
+        for name, directory in self.directories.items():
+            for _, assessment_id in self._iter_files([directory]):
+                counts[name] += 1
+                misplaced += self.shard_for_id(assessment_id) != name
+        return {"shards": counts, "total": sum(counts.values()), "misplaced": misplaced}
+
+    def rebalance(self, sources: Sequence[str] = (), dry_run: bool = False) -> Dict:
+        """
+        Déplace chaque évaluation vers son shard cible
+
+        À lancer après un changement de la liste des shards, de préférence
+        pendant une fenêtre sans écriture : chaque fichier est copié puis
+        renommé atomiquement dans le shard cible avant d'être supprimé de
+        l'ancien, sous le verrou de fichier de l'évaluation. Un écrivain qui
+        attendait ce verrou ne trouve plus le fichier (AssessmentNotFoundError)
+        et ShardedAssessmentStore relance son écriture dans le shard cible.
+
+        Args:
+            sources: Répertoires supplémentaires à vider (shard retiré,
+                ancien répertoire unique)
+
+        Returns:
+            {"scanned", "moved", "moves": {"source -> cible": nombre}}
+        """
+        result = {"scanned": 0, "moved": 0, "moves": {}}
+        for directory, assessment_id in list(self._iter_files(
+                list(self.directories.values()) + list(sources))):
+            result["scanned"] += 1
+            target = self.shard_for_id(assessment_id)
+            target_directory = self.directories[target]
+            if os.path.abspath(directory) == os.path.abspath(target_directory):
+                continue
+            if not dry_run:
+                _move_assessment(directory, target_directory, assessment_id)
+            result["moved"] += 1
+            move = f"{shard_name(directory)} -> {target}"
+            result["moves"][move] = result["moves"].get(move, 0) + 1
+        return result
+
+def _move_assessment(source_directory: str, target_directory: str, assessment_id: str) -> None:
+    source = os.path.join(source_directory, f"{assessment_id}.json")
+    target = os.path.join(target_directory, f"{assessment_id}.json")
+    lock_path = os.path.join(source_directory, f"{assessment_id}.lock")
+    os.makedirs(target_directory, exist_ok=True)
+
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        with open(source, 'rb') as f:
+            data = f.read()
+        if os.path.exists(target):
+            # Copie déjà présente (déplacement interrompu) : la plus récente gagne
+            with open(target, 'r', encoding='utf-8') as f:
+                existing = json.load(f).get('metadata', {}).get('version', 0)
+            if existing >= json.loads(data).get('metadata', {}).get('version', 0):
+                data = None
+        if data is not None:
+            fd, tmp_path = tempfile.mkstemp(dir=target_directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, target)
+        os.unlink(source)
+    os.unlink(lock_path)
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded assessment storage maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, help_text in (('status', "Répartition des évaluations par shard"),
+                               ('rebalance', "Déplacer les évaluations vers leur shard cible")):
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument('--shard', action='append', required=True,
+                         help="Répertoire d'un shard (option répétée, liste complète)")
+        sub.add_argument('--vnodes', type=int, default=DEFAULT_VNODES)
+    rebalance_parser = subparsers.choices['rebalance']
+    rebalance_parser.add_argument('--from', dest='sources', action='append', default=[],
+                                  help="Répertoire supplémentaire à vider dans les shards")
+    rebalance_parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args(argv)
+
+    try:
+        store = ShardedAssessmentStore(args.shard, args.vnodes)
+    except ValueError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+
+    if args.command == 'status':
+        status = store.status()
+        for name, count in status['shards'].items():
+            print(f"  {name:<20} {count:8d}")
+        print(f"✓ {status['total']} assessments, {status['misplaced']} outside their shard")
+        return 1 if status['misplaced'] else 0
+
+    result = store.rebalance(args.sources, args.dry_run)
+    for move, count in sorted(result['moves'].items()):
+        print(f"  {move:<40} {count:8d}")
+    action = "Would move" if args.dry_run else "Moved"
+    print(f"✓ {action} {result['moved']} of {result['scanned']} assessments")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
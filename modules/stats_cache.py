@@ -0,0 +1,89 @@
+"""
+Module de cache des statistiques par version d'évaluation
+
+Une évaluation ne change qu'à travers assess_control, qui incrémente
+metadata.version : le couple (identifiant, version) identifie donc son
+contenu. Il sert d'ETag aux réponses HTTP (304 si le client a déjà cette
+version) et de clé au cache des statistiques, gaps et graphiques, calculés
+une seule fois par version.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from modules.scoring import ComplianceScoring
+
+def assessment_etag(assessment: Dict, assessment_id: Optional[str] = None) -> str:
+    """
+    ETag d'une évaluation
+
+    "{id}-v{version}" si l'évaluation est identifiée et versionnée, sinon
+    empreinte SHA-256 de son contenu (évaluations antérieures au versioning).
+    """
+    version = assessment.get('metadata', {}).get('version')
+    if assessment_id and isinstance(version, int):
+        return f"{assessment_id}-v{version}"
+    payload = json.dumps(assessment, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+class StatisticsCache:
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialise le cache
+
+        Args:
+            max_entries: Nombre de versions conservées (les moins récemment
+                utilisées sont évincées)
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_or_compute(self, key: str, field: str, compute: Callable[[], object]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if field in entry:
+                    self.hits += 1
+                    return entry[field]
+
+        # Calcul hors verrou : deux requêtes simultanées peuvent calculer la
+        # même version, le résultat étant identique la seconde écrase la première
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries.setdefault(key, {})[field] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def statistics(self, key: str, assessment: Dict) -> Dict:
+        """
+        Statistiques et gaps de l'évaluation pour la version `key`
+
+        Returns:
+            {"statistics": ..., "gaps": ...} (partagé entre les appels : ne
+            pas modifier)
+        """
+        def compute() -> Dict:
+            scoring = ComplianceScoring(assessment)
+            return {"statistics": scoring.get_statistics(), "gaps": scoring.get_gaps()}
+
+        return self._get_or_compute(key, 'statistics', compute)
+
+    def charts(self, key: str, build: Callable[[], Dict], fmt: str = 'png') -> Dict:
+        """Graphiques de la version `key` au format `fmt`, générés par `build` au premier appel"""
+        return self._get_or_compute(key, f'charts:{fmt}', build)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,89 +1,223 @@
 """
 Module de génération de graphiques
+
+Les graphiques matplotlib utilisent l'API objet (Figure + canevas Agg) et
+non l'automate global de pyplot : chaque thread possède ses propres
+figures « modèles », construites une seule fois (axes, titres, légende,
+polices) puis mises à jour sur place à chaque rendu. Plusieurs threads
+peuvent ainsi générer des graphiques en parallèle.
 """
-import matplotlib.pyplot as plt
+import math
+import threading
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import plotly.graph_objects as go
-from typing import Dict
+from typing import Dict, List, Union
 import io
 import base64
+from modules.instrumentation import traced
 
-class ComplianceVisualizations:
-    def __init__(self, statistics: Dict):
-        """Initialise avec les statistiques"""
-        self.stats = statistics
+CHART_FORMATS = ('png', 'svg', 'json')
+
+STATUS_LABELS = ['Implemented', 'Partially Implemented', 'Not Implemented', 'Not Applicable']
+STATUS_COLORS = ['#28a745', '#ffc107', '#dc3545', '#6c757d']
+BAR_COLOR = '#007bff'
+TARGET_SCORE = 80
+
+PIE_TITLE = 'ISO 27001 Controls Status Distribution'
+BAR_TITLE = 'ISO 27001 Compliance Score by Domain'
+PORTFOLIO_HEATMAP_TITLE = 'Portfolio Compliance Heatmap'
+
+# Les rcParams sont globaux : l'export SVG (qui en modifie un) est sérialisé
+_SVG_LOCK = threading.Lock()
+
+def _export_figure(fig: Figure, fmt: str) -> str:
+    """Exporte une figure : base64 PNG (PDF) ou SVG compact (web)"""
+    buffer = io.BytesIO()
+    if fmt == 'svg':
+        # Texte conservé en <text> (et non en chemins), sans métadonnées et
+        # identifiants déterministes (même version => même SVG)
+        with _SVG_LOCK, matplotlib.rc_context({'svg.fonttype': 'none',
+                                               'svg.hashsalt': 'iso27001'}):
+            fig.savefig(buffer, format='svg', bbox_inches='tight', metadata={'Date': None})
+        svg = buffer.getvalue().decode('utf-8')
+        # Prologue XML/DOCTYPE retiré : le SVG est inséré tel quel dans le HTML
+        return svg[svg.index('<svg'):]
     
-    def generate_status_pie_chart(self) -> str:
-        """Génère un pie chart du statut des contrôles (base64 PNG)"""
-        labels = ['Implemented', 'Partially Implemented', 'Not Implemented', 'Not Applicable']
-        sizes = [
-            self.stats['implemented'],
-            self.stats['partially_implemented'],
-            self.stats['not_implemented'],
-            self.stats['not_applicable']
-        ]
-        colors = ['#28a745', '#ffc107', '#dc3545', '#6c757d']
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+class _PieTemplate:
+    """Pie chart des statuts, construit une fois et mis à jour sur place"""
+    
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+    START_ANGLE = 90
+    
+    def __init__(self):
+        self.fig = Figure(figsize=(8, 6))
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        # Parts provisoires : pie() crée et met en forme les artistes
+        self.wedges, self.labels, self.pcts = self.ax.pie(
+            [1] * len(STATUS_LABELS), labels=STATUS_LABELS, colors=STATUS_COLORS,
+            autopct='%1.1f%%', startangle=self.START_ANGLE
+        )
+        self.ax.set_aspect('equal')
+        self.ax.axis('off')
+        self.ax.set_title(PIE_TITLE, fontsize=14, fontweight='bold')
+        self.empty_text = self.ax.text(0.5, 0.5, 'No data available', transform=self.ax.transAxes,
+                                       ha='center', va='center', fontsize=16, color='gray')
+    
+    def render(self, sizes: List[float], fmt: str) -> str:
+        total = sum(sizes)
+        self.empty_text.set_visible(total == 0)
         
-        fig, ax = plt.subplots(figsize=(8, 6))
+        # Même géométrie que Axes.pie (sens trigonométrique depuis 90°)
+        theta1 = self.START_ANGLE / 360
+        for wedge, label, pct, size in zip(self.wedges, self.labels, self.pcts, sizes):
+            for artist in (wedge, label, pct):
+                artist.set_visible(total > 0)
+            if total == 0:
+                continue
+            frac = size / total
+            theta2 = theta1 + frac
+            wedge.set_theta1(360 * theta1)
+            wedge.set_theta2(360 * theta2)
+            
+            angle = math.pi * (theta1 + theta2)
+            x, y = math.cos(angle), math.sin(angle)
+            label.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            pct.set_text(f"{100 * frac:.1f}%")
+            theta1 = theta2
         
-        # Gérer le cas où toutes les valeurs sont à 0
-        if sum(sizes) == 0:
-            ax.text(0.5, 0.5, 'No data available', 
-                    ha='center', va='center', fontsize=16, color='gray')
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.axis('off')
-        else:
-            ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-            ax.axis('equal')
+        return _export_figure(self.fig, fmt)
+
+class _BarTemplate:
+    """Bar chart des scores par domaine, construit une fois et mis à jour sur place"""
+    
+    def __init__(self):
+        self.fig = Figure(figsize=(12, 6))
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        self.bars = None
         
-        plt.title('ISO 27001 Controls Status Distribution', fontsize=14, fontweight='bold')
+        # Ligne de référence 80% (conformité acceptable)
+        self.target = self.ax.axhline(y=TARGET_SCORE, color='green', linestyle='--',
+                                      label=f'Target ({TARGET_SCORE}%)')
+        self.ax.set_xlabel('Domains', fontsize=12)
+        self.ax.set_ylabel('Compliance Score (%)', fontsize=12)
+        self.ax.set_ylim(0, 100)
+        self.ax.grid(axis='y', alpha=0.3)
+        self.legend = self.ax.legend()
+        self.ax.set_title(BAR_TITLE, fontsize=14, fontweight='bold')
+        self.empty_text = self.ax.text(0.5, 0.5, 'No domain data available',
+                                       transform=self.ax.transAxes,
+                                       ha='center', va='center', fontsize=16, color='gray')
+    
+    def render(self, labels: List[str], values: List[float], fmt: str) -> str:
+        has_data = bool(labels)
+        self.ax.set_axis_on() if has_data else self.ax.set_axis_off()
+        self.empty_text.set_visible(not has_data)
+        self.target.set_visible(has_data)
+        self.legend.set_visible(has_data)
         
-        # Convertir en base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
+        if self.bars is not None and len(self.bars) != len(values):
+            self.bars.remove()
+            self.bars = None
+        if has_data:
+            if self.bars is None:
+                # Nouveau nombre de domaines : seul cas où les barres sont recréées
+                self.bars = self.ax.bar(range(len(values)), values, color=BAR_COLOR, alpha=0.7)
+            else:
+                for bar, value in zip(self.bars, values):
+                    bar.set_height(value)
+            self.ax.set_xticks(range(len(labels)), labels, rotation=45, ha='right')
         
-        return image_base64
+        return _export_figure(self.fig, fmt)
+
+_templates = threading.local()
+
+def _template(name: str, factory):
+    """Modèle de figure propre au thread courant"""
+    template = getattr(_templates, name, None)
+    if template is None:
+        template = factory()
+        setattr(_templates, name, template)
+    return template
+
+class ComplianceVisualizations:
+    def __init__(self, statistics: Dict):
+        """Initialise avec les statistiques"""
+        self.stats = statistics
+    
+    @staticmethod
+    def _check_format(fmt: str) -> None:
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Unsupported chart format: {fmt!r} (expected one of {CHART_FORMATS})")
     
-    def generate_domain_bar_chart(self) -> str:
-        """Génère un bar chart des scores par domaine (base64 PNG)"""
+    def status_pie_data(self) -> Dict:
+        """Série de données du pie chart (rendu côté client)"""
+        return {
+            "type": "pie",
+            "title": PIE_TITLE,
+            "labels": STATUS_LABELS,
+            "values": [
+                self.stats['implemented'],
+                self.stats['partially_implemented'],
+                self.stats['not_implemented'],
+                self.stats['not_applicable']
+            ],
+            "colors": STATUS_COLORS
+        }
+    
+    def domain_bar_data(self) -> Dict:
+        """Série de données du bar chart (rendu côté client)"""
         domains = self.stats['domain_scores']
+        return {
+            "type": "bar",
+            "title": BAR_TITLE,
+            "labels": list(domains.keys()),
+            "values": list(domains.values()),
+            "color": BAR_COLOR,
+            "target": TARGET_SCORE,
+            "y_max": 100
+        }
+    
+    @traced()
+    def generate_status_pie_chart(self, format: str = 'png') -> Union[str, Dict]:
+        """
+        Génère un pie chart du statut des contrôles
         
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Gérer le cas où il n'y a pas de domaines
-        if not domains:
-            ax.text(0.5, 0.5, 'No domain data available', 
-                    ha='center', va='center', fontsize=16, color='gray')
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.axis('off')
-        else:
-            bars = ax.bar(domains.keys(), domains.values(), color='#007bff', alpha=0.7)
-            
-            # Ligne de référence 80% (conformité acceptable)
-            ax.axhline(y=80, color='green', linestyle='--', label='Target (80%)')
-            
-            ax.set_xlabel('Domains', fontsize=12)
-            ax.set_ylabel('Compliance Score (%)', fontsize=12)
-            ax.set_ylim(0, 100)
-            plt.xticks(rotation=45, ha='right')
-            plt.legend()
-            plt.grid(axis='y', alpha=0.3)
-        
-        ax.set_title('ISO 27001 Compliance Score by Domain', fontsize=14, fontweight='bold')
-        
-        # Convertir en base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
+        Args:
+            format: 'png' (base64, pour le PDF), 'svg' (balisage SVG) ou
+                'json' (série de données)
+        """
+        self._check_format(format)
+        data = self.status_pie_data()
+        if format == 'json':
+            return data
+        return _template('pie', _PieTemplate).render(data['values'], format)
+    
+    @traced()
+    def generate_domain_bar_chart(self, format: str = 'png') -> Union[str, Dict]:
+        """
+        Génère un bar chart des scores par domaine
         
-        return image_base64
+        Args:
+            format: 'png' (base64, pour le PDF), 'svg' (balisage SVG) ou
+                'json' (série de données)
+        """
+        self._check_format(format)
+        data = self.domain_bar_data()
+        if format == 'json':
+            return data
+        return _template('bar', _BarTemplate).render(data['labels'], data['values'], format)
     
+    @traced()
     def generate_heatmap_plotly(self) -> str:
         """Génère une heatmap interactive (HTML Plotly)"""
         domains = list(self.stats['domain_scores'].keys())
@@ -111,3 +245,27 @@ class ComplianceVisualizations:
         )
         
         return fig.to_html(full_html=False, include_plotlyjs='cdn')
+
+def portfolio_heatmap_data(tile: Dict) -> Dict:
+    """
+    Série de données de la heatmap du portefeuille (rendu côté client)
+
+    Args:
+        tile: Résultat de PortfolioHeatmap.tile ; "ranges" donne la plage
+            d'organisations de chaque ligne, à redemander pour zoomer
+    """
+    return {
+        "type": "heatmap",
+        "title": PORTFOLIO_HEATMAP_TITLE,
+        "x": tile['domains'],
+        "y": [row['label'] for row in tile['rows']],
+        "z": tile['z'],
+        "counts": [row['count'] for row in tile['rows']],
+        "ranges": [[row['start'], row['end']] for row in tile['rows']],
+        "total": tile['total'],
+        "start": tile['start'],
+        "end": tile['end'],
+        "colorscale": 'RdYlGn',
+        "zmin": 0,
+        "zmax": 100
+    }
@@ -0,0 +1,116 @@
+"""
+Tests pour le module aggregation_cube
+"""
+import json
+
+import pytest
+
+from benchmarks.synthetic import generate_assessment, load_catalog
+from modules.aggregation_cube import AggregationCube, period_of
+from modules.scoring import ComplianceScoring
+
+@pytest.fixture(scope='module')
+def controls():
+    return load_catalog()
+
+def _assessment(controls, organization, date, seed=1, count=93):
+    assessment = generate_assessment(count, controls, seed=seed, organization=organization)
+    assessment['metadata']['date'] = date
+    return assessment
+
+class TestAggregationCube:
+
+    def test_period_of(self):
+        """Test le trimestre d'une date (unknown si invalide)"""
+        assert period_of('2026-01-13T12:00:00') == '2026-Q1'
+        assert period_of('2025-12-31') == '2025-Q4'
+        assert period_of('') == 'unknown'
+        assert period_of('2026-13-01') == 'unknown'
+
+    def test_scores_match_compliance_scoring(self, controls):
+        """Test que les scores du cube égalent ceux de ComplianceScoring"""
+        assessment = _assessment(controls, 'Acme', '2026-02-01')
+        cube = AggregationCube()
+        cube.update('a', assessment)
+        stats = ComplianceScoring(assessment).get_statistics()
+
+        total = cube.query()[0]
+        assert total['score'] == stats['overall_score']
+        assert total['counts']['Not Applicable'] == stats['not_applicable']
+        assert {row['domain']: row['score'] for row in cube.query(['domain'])} == stats['domain_scores']
+
+    def test_roll_up_and_drill_down(self, controls):
+        """Test l'agrégation et le détail par organisation, domaine et période"""
+        cube = AggregationCube()
+        cube.update('a1', _assessment(controls, 'Acme', '2026-01-10', seed=1))
+        cube.update('b1', _assessment(controls, 'Beta', '2026-02-10', seed=2))
+        cube.update('a2', _assessment(controls, 'Acme', '2026-04-10', seed=3))
+
+        assert cube.dimension('period') == ['2026-Q1', '2026-Q2']
+        assert cube.query()[0]['total'] == 3 * 93
+        by_period = cube.query(['period'])
+        assert [(row['period'], row['total']) for row in by_period] == [('2026-Q1', 186),
+                                                                         ('2026-Q2', 93)]
+        # Drill-down : domaine -> catégories du domaine, pour une organisation
+        domain_rows = cube.query(['domain'], {'organization': ['ACME'], 'period': ['2026-Q1']})
+        technological = next(row for row in domain_rows if row['domain'] == 'Technological controls')
+        categories = cube.query(['category'], {'organization': ['acme'], 'period': ['2026-Q1'],
+                                               'domain': ['Technological controls']})
+        assert sum(row['total'] for row in categories) == technological['total']
+        assert {'Access Control', 'Development'} <= {row['category'] for row in categories}
+        assert [row['organization'] for row in cube.query(['organization'])] == ['Acme', 'Beta']
+
+        with pytest.raises(ValueError):
+            cube.query(['sector'])
+
+    def test_latest_assessment_per_period(self, controls):
+        """Test que seule la dernière évaluation de la période compte"""
+        cube = AggregationCube()
+        cube.update('old', _assessment(controls, 'Acme', '2026-01-10', count=10))
+        cube.update('new', _assessment(controls, 'Acme', '2026-03-10', count=20))
+        assert len(cube) == 1
+        assert cube.query()[0]['total'] == 20
+
+        # Réenregistrement : les anciens comptes sont retirés
+        cube.update('new', _assessment(controls, 'Acme', '2026-03-10', count=5))
+        assert cube.query()[0]['total'] == 5
+        cube.remove('new')
+        assert cube.query()[0]['total'] == 10
+        cube.remove('old')
+        assert cube.query() == []
+
+    def test_rows_reused_and_grown(self, controls):
+        """Test une ligne par couple (organisation, période), réutilisée après retrait"""
+        cube = AggregationCube()
+        for index in range(100):
+            cube.update(f's{index}', _assessment(controls, f'Org {index}', '2026-01-10',
+                                                 seed=index, count=10))
+        assert len(cube) == 100
+        assert cube.query()[0]['total'] == 1000
+        capacity = cube._counts.shape[2]
+        assert 100 <= capacity < 256
+
+        for index in range(50):
+            cube.remove(f's{index}')
+        for index in range(50):
+            cube.update(f't{index}', _assessment(controls, f'New {index}', '2026-04-10',
+                                                 seed=index, count=4))
+        assert cube._counts.shape[2] == capacity
+        assert [(row['period'], row['total']) for row in cube.query(['period'])] == \
+            [('2026-Q1', 500), ('2026-Q2', 200)]
+        assert len(cube.query(['organization'], {'period': ['2026-Q2']})) == 50
+
+    def test_sync_from_archive(self, controls, tmp_path):
+        """Test la mise à jour du cube depuis une archive"""
+        for index in range(3):
+            (tmp_path / f'{index}.json').write_text(json.dumps(
+                _assessment(controls, f'Org {index}', '2026-01-10', seed=index, count=30)),
+                encoding='utf-8')
+        cube = AggregationCube()
+        assert cube.sync(str(tmp_path)) == 3
+        assert cube.sync(str(tmp_path)) == 0
+        assert cube.query()[0]['total'] == 90
+
+        (tmp_path / '1.json').unlink()
+        cube.sync(str(tmp_path))
+        assert cube.query()[0]['total'] == 60
@@ -0,0 +1,100 @@
+"""
+Tests pour le module assessment_diff
+"""
+import pytest
+from modules.assessment_diff import diff_assessments, diff_pairs, diff_portfolio
+
+def _assessment(date, *items):
+    return {
+        'metadata': {'organization': 'Test Corp', 'assessor': 'Jane Doe',
+                     'date': date, 'standard': 'ISO/IEC 27001:2022'},
+        'controls_assessment': [
+            {'control_id': control_id, 'control_title': f"Control {control_id}",
+             'domain': domain, 'status': status, 'evidence': '', 'comments': '',
+             'assessed_at': date}
+            for control_id, domain, status in items
+        ]
+    }
+
+@pytest.fixture
+def previous():
+    return _assessment(
+        '2026-01-01T00:00:00',
+        ("A.5.1", "Organizational controls", "Implemented"),
+        ("A.5.2", "Organizational controls", "Not Implemented"),
+        ("A.8.1", "Technological controls", "Implemented"),
+        ("A.8.2", "Technological controls", "Partially Implemented"),
+    )
+
+@pytest.fixture
+def current():
+    return _assessment(
+        '2026-04-01T00:00:00',
+        ("A.5.1", "Organizational controls", "Implemented"),
+        ("A.5.2", "Organizational controls", "Implemented"),
+        ("A.8.1", "Technological controls", "Not Implemented"),
+        ("A.6.1", "People controls", "Partially Implemented"),
+    )
+
+class TestDiffAssessments:
+    
+    def test_status_changes(self, previous, current):
+        """Test la détection des changements de statut"""
+        diff = diff_assessments(previous, current)
+        
+        changes = {c['control_id']: (c['previous_status'], c['status'])
+                   for c in diff['status_changes']}
+        assert changes == {
+            "A.5.2": ("Not Implemented", "Implemented"),
+            "A.8.1": ("Implemented", "Not Implemented"),
+        }
+    
+    def test_new_and_closed_gaps(self, previous, current):
+        """Test les gaps ouverts et fermés"""
+        diff = diff_assessments(previous, current)
+        
+        assert {g['control_id'] for g in diff['new_gaps']} == {"A.8.1", "A.6.1"}
+        assert [g['control_id'] for g in diff['closed_gaps']] == ["A.5.2"]
+        assert [c['control_id'] for c in diff['added_controls']] == ["A.6.1"]
+        assert [c['control_id'] for c in diff['removed_controls']] == ["A.8.2"]
+    
+    def test_score_deltas(self, previous, current):
+        """Test les deltas de score global et par domaine"""
+        diff = diff_assessments(previous, current)
+        
+        assert diff['overall'] == {"previous": 62.5, "current": 62.5, "delta": 0.0}
+        assert diff['domain_deltas']["Organizational controls"] == {
+            "previous": 50.0, "current": 100.0, "delta": 50.0
+        }
+        assert diff['domain_deltas']["People controls"]['previous'] is None
+        assert diff['domain_deltas']["People controls"]['delta'] is None
+    
+    def test_identical_assessments(self, previous):
+        """Test une comparaison sans changement"""
+        diff = diff_assessments(previous, previous)
+        
+        assert diff['status_changes'] == []
+        assert diff['new_gaps'] == []
+        assert diff['overall']['delta'] == 0.0
+
+class TestPortfolioDiff:
+    
+    def test_diff_pairs_preserves_order(self, previous, current):
+        """Test la comparaison parallèle de paires"""
+        results = diff_pairs([(previous, current), (current, previous)], max_workers=2)
+        
+        assert results[0]['current_date'] == '2026-04-01T00:00:00'
+        assert results[1]['current_date'] == '2026-01-01T00:00:00'
+    
+    def test_diff_portfolio(self, previous, current):
+        """Test les paires consécutives par organisation"""
+        histories = {
+            "Test Corp": [previous, current, previous],
+            "Solo Corp": [current],
+        }
+        
+        results = diff_portfolio(histories, max_workers=2, use_processes=False)
+        
+        assert len(results["Test Corp"]) == 2
+        assert results["Solo Corp"] == []
+        assert results["Test Corp"][1]['closed_gaps'][0]['control_id'] == "A.8.1"
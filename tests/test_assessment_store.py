@@ -0,0 +1,149 @@
+"""
+Tests pour le module assessment_store
+"""
+import pytest
+import threading
+from modules.assessment_store import (
+    AssessmentStore, AssessmentNotFoundError, VersionConflictError, retry_on_conflict
+)
+
+@pytest.fixture(params=['memory', 'disk'])
+def store(request, tmp_path):
+    """Stockage en mémoire et persistant"""
+    if request.param == 'memory':
+        return AssessmentStore()
+    return AssessmentStore(str(tmp_path / "shared"))
+
+class TestAssessmentStore:
+    
+    def test_create_and_get(self, store):
+        """Test la création d'une évaluation versionnée"""
+        assessment_id, assessment = store.create("Test Corp", "Jane Doe")
+        
+        assert assessment['metadata']['version'] == 0
+        assert store.get(assessment_id)['metadata']['organization'] == "Test Corp"
+        assert store.version(assessment_id) == 0
+    
+    def test_assess_control_bumps_version(self, store):
+        """Test l'incrément de version à chaque écriture"""
+        assessment_id, _ = store.create("Test Corp", "Jane Doe")
+        
+        assert store.assess_control(assessment_id, 0, "A.5.1", "Implemented") == 1
+        assert store.assess_control(assessment_id, 1, "A.5.2", "Not Implemented") == 2
+        assert len(store.get(assessment_id)['controls_assessment']) == 2
+    
+    def test_stale_write_is_rejected(self, store):
+        """Test le refus d'une écriture avec une version périmée"""
+        assessment_id, _ = store.create("Test Corp", "Jane Doe")
+        store.assess_control(assessment_id, 0, "A.5.1", "Implemented")
+        
+        with pytest.raises(VersionConflictError) as exc:
+            store.assess_control(assessment_id, 0, "A.5.2", "Implemented")
+        
+        assert exc.value.expected == 0
+        assert exc.value.actual == 1
+        assert len(store.get(assessment_id)['controls_assessment']) == 1
+    
+    def test_unknown_control_and_assessment(self, store):
+        """Test les erreurs de contrôle et d'évaluation inconnus"""
+        assessment_id, _ = store.create("Test Corp", "Jane Doe")
+        
+        with pytest.raises(ValueError):
+            store.assess_control(assessment_id, 0, "A.99.99", "Implemented")
+        with pytest.raises(AssessmentNotFoundError):
+            store.get("0" * 32)
+        with pytest.raises(AssessmentNotFoundError):
+            store.get("../../etc/passwd")
+    
+    def test_failed_mutator_leaves_assessment_unchanged(self, store):
+        """Test qu'un mutateur en erreur ne laisse aucune modification partielle"""
+        assessment_id, _ = store.create("Test Corp", "Jane Doe")
+        
+        def mutator(assessment):
+            assessment['metadata']['organization'] = "Changed Corp"
+            raise ValueError("rejected")
+        
+        with pytest.raises(ValueError):
+            store.update(assessment_id, 0, mutator)
+        assessment = store.get(assessment_id)
+        assert assessment['metadata']['organization'] == "Test Corp"
+        assert assessment['metadata']['version'] == 0
+        assert store.assess_control(assessment_id, 0, "A.5.1", "Implemented") == 1
+        assert store.get(assessment_id)['metadata']['organization'] == "Test Corp"
+    
+    def test_get_returns_copy(self, store):
+        """Test que les lectures ne peuvent pas modifier l'évaluation stockée"""
+        assessment_id, _ = store.create("Test Corp", "Jane Doe")
+        
+        snapshot = store.get(assessment_id)
+        snapshot['controls_assessment'].append({'control_id': 'A.5.1'})
+        
+        assert store.get(assessment_id)['controls_assessment'] == []
+    
+    def test_concurrent_writers_lose_no_update(self, store):
+        """Test qu'aucune écriture n'est perdue sous contention"""
+        assessment_id, _ = store.create("Test Corp", "Jane Doe")
+        
+        def writer():
+            for _ in range(10):
+                retry_on_conflict(
+                    lambda: store.assess_control(
+                        assessment_id, store.version(assessment_id), "A.5.1", "Implemented"),
+                    max_attempts=1000
+                )
+        
+        threads = [threading.Thread(target=writer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assessment = store.get(assessment_id)
+        assert len(assessment['controls_assessment']) == 80
+        assert assessment['metadata']['version'] == 80
+    
+    def test_shared_directory_between_stores(self, tmp_path):
+        """Test deux stockages (deux workers) sur le même répertoire"""
+        first = AssessmentStore(str(tmp_path))
+        second = AssessmentStore(str(tmp_path))
+        
+        assessment_id, _ = first.create("Test Corp", "Jane Doe")
+        second.assess_control(assessment_id, 0, "A.5.1", "Implemented")
+        
+        with pytest.raises(VersionConflictError):
+            first.assess_control(assessment_id, 0, "A.5.2", "Implemented")
+        assert first.assess_control(assessment_id, 1, "A.5.2", "Implemented") == 2
+    
+    def test_failing_on_persist_hook_does_not_fail_write(self, tmp_path, caplog):
+        """Test qu'une erreur du hook on_persist est journalisée sans faire échouer l'écriture"""
+        def hook(assessment_id, assessment):
+            raise RuntimeError("index unavailable")
+        
+        store = AssessmentStore(str(tmp_path), on_persist=hook)
+        assessment_id, _ = store.create("Test Corp", "Jane Doe")
+        assert store.assess_control(assessment_id, 0, "A.5.1", "Implemented") == 1
+        assert store.version(assessment_id) == 1
+        assert "on_persist hook failed" in caplog.text
+
+class TestRetryOnConflict:
+    
+    def test_retries_then_succeeds(self):
+        """Test la relance après des conflits"""
+        calls = []
+        
+        def operation():
+            calls.append(1)
+            if len(calls) < 3:
+                raise VersionConflictError("x", 0, 1)
+            return "ok"
+        
+        assert retry_on_conflict(operation, base_delay=0) == "ok"
+        assert len(calls) == 3
+    
+    def test_gives_up(self):
+        """Test l'abandon après le nombre maximal de tentatives"""
+        def operation():
+            raise VersionConflictError("x", 0, 1)
+        
+        with pytest.raises(VersionConflictError):
+            retry_on_conflict(operation, max_attempts=2, base_delay=0)
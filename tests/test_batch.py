@@ -0,0 +1,88 @@
+"""
+Tests pour le module batch
+"""
+import json
+import os
+import pytest
+from modules.batch import _output_stems, iter_input_files, process_assessment, run_batch, main
+
+ASSESSMENT = {
+    'metadata': {'organization': 'Test Corp', 'assessor': 'Jane Doe',
+                 'date': '2026-01-13T12:00:00', 'standard': 'ISO/IEC 27001:2022'},
+    'controls_assessment': [
+        {'control_id': 'A.5.1', 'control_title': 'Policies', 'domain': 'Organizational controls',
+         'status': 'Implemented', 'evidence': 'Policy v2', 'comments': ''},
+        {'control_id': 'A.8.1', 'control_title': 'Endpoints', 'domain': 'Technological controls',
+         'status': 'Not Implemented', 'evidence': '', 'comments': 'Missing EDR'}
+    ]
+}
+
+@pytest.fixture
+def inputs(tmp_path):
+    directory = tmp_path / "in"
+    (directory / "sub").mkdir(parents=True)
+    for path in (directory / "acme.json", directory / "globex.json", directory / "sub" / "acme.json"):
+        path.write_text(json.dumps(ASSESSMENT), encoding='utf-8')
+    (directory / "broken.json").write_text("{", encoding='utf-8')
+    return directory
+
+class TestBatch:
+
+    def test_iter_input_files(self, inputs):
+        """Test l'expansion des répertoires, motifs et fichiers d'entrée"""
+        files = list(iter_input_files([str(inputs), str(inputs / "*" / "*.json"),
+                                       str(inputs / "acme.json")]))
+        assert [os.path.relpath(f, inputs) for f in files] == [
+            'acme.json', 'broken.json', 'globex.json', os.path.join('sub', 'acme.json')
+        ]
+
+    def test_output_stems_are_unique(self):
+        """Test des noms de sortie distincts, y compris quand un suffixe existe déjà"""
+        stems = _output_stems(['a/acme.json', 'b/acme.json', 'c/acme-2.json', 'd/acme.json',
+                               'e/acme-2.json', 'globex.json'])
+        assert stems == ['acme', 'acme-2', 'acme-2-2', 'acme-3', 'acme-2-3', 'globex']
+        assert len(set(stems)) == len(stems)
+
+    def test_process_assessment_with_pdf(self, inputs, tmp_path):
+        """Test le traitement d'une évaluation jusqu'au PDF, avec ses durées"""
+        result = process_assessment(str(inputs / "acme.json"), "acme",
+                                    {"output_dir": str(tmp_path), "skip_charts": True})
+        assert result['status'] == 'ok'
+        assert set(result['timings']) == {'load', 'scoring', 'gaps', 'pdf'}
+        assert (tmp_path / "acme.pdf").read_bytes().startswith(b'%PDF')
+        scores = json.loads((tmp_path / "acme.json").read_text())
+        assert scores['statistics']['implemented'] == 1
+
+    def test_run_batch_isolates_errors(self, inputs, tmp_path):
+        """Test qu'un fichier en erreur n'interrompt pas le lot"""
+        output_dir = tmp_path / "out"
+        paths = list(iter_input_files([str(inputs), str(inputs / "sub")]))
+        results, summary = run_batch(paths, str(output_dir), workers=2,
+                                     skip_charts=True, skip_pdf=True)
+
+        assert summary['files'] == 4
+        assert summary['failed'] == 1
+        assert 'pdf' not in summary['stage_seconds']
+        errors = [r for r in results if r['status'] == 'error']
+        assert errors[0]['path'].endswith('broken.json')
+        # Homonymes de sous-répertoires : pas d'écrasement
+        assert sorted(os.listdir(output_dir)) == ['acme-2.json', 'acme.json', 'globex.json']
+
+    def test_output_dir_must_not_overwrite_inputs(self, inputs):
+        """Test le refus d'un répertoire de sortie où un résultat écraserait une entrée"""
+        original = (inputs / "acme.json").read_text()
+        paths = list(iter_input_files([str(inputs)]))
+        with pytest.raises(ValueError):
+            run_batch(paths, str(inputs), workers=1, skip_charts=True, skip_pdf=True)
+        assert (inputs / "acme.json").read_text() == original
+        assert main([str(inputs), '-o', str(inputs), '--no-pdf', '-q']) == 2
+
+    def test_main_exit_codes(self, inputs, tmp_path):
+        """Test la synthèse et les codes de sortie de la commande"""
+        summary_path = tmp_path / "summary.json"
+        assert main([str(inputs / "g*.json"), '-o', str(tmp_path / "out"), '--workers', '1',
+                     '--no-charts', '--no-pdf', '-q', '--summary', str(summary_path)]) == 0
+        assert json.loads(summary_path.read_text())['summary']['succeeded'] == 1
+        assert main([str(inputs), '-o', str(tmp_path / "out"), '--no-pdf', '--no-charts',
+                     '-q']) == 1
+        assert main([str(tmp_path / "missing"), '-o', str(tmp_path / "out")]) == 2
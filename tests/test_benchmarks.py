@@ -0,0 +1,141 @@
+"""
+Tests pour la suite de benchmarks
+"""
+import pytest
+from benchmarks.synthetic import load_catalog, generate_assessment
+from benchmarks.pipeline import run_benchmarks, compare_results
+
+@pytest.fixture
+def controls():
+    """Catalogue de contrôles réel"""
+    return load_catalog()
+
+def _run(stage, size, median):
+    return {"stage": stage, "size": size, "repeats": 1,
+            "min_s": median, "median_s": median, "max_s": median}
+
+class TestSyntheticGenerator:
+    
+    def test_generation_is_deterministic(self, controls):
+        """Test qu'une même graine produit la même évaluation"""
+        first = generate_assessment(200, controls, seed=7)
+        second = generate_assessment(200, controls, seed=7)
+        
+        assert first == second
+        assert len(first['controls_assessment']) == 200
+    
+    def test_different_seeds_differ(self, controls):
+        """Test que la graine change les statuts"""
+        first = generate_assessment(200, controls, seed=1)
+        second = generate_assessment(200, controls, seed=2)
+        
+        assert first['controls_assessment'] != second['controls_assessment']
+    
+    def test_items_reference_catalog(self, controls):
+        """Test que les éléments générés utilisent des IDs du catalogue"""
+        known_ids = {c['id'] for c in controls}
+        assessment = generate_assessment(150, controls)
+        
+        assert all(item['control_id'] in known_ids
+                   for item in assessment['controls_assessment'])
+
+class TestCompareResults:
+    
+    def test_detects_regression(self):
+        """Test la détection d'une régression au-delà du seuil"""
+        baseline = {"results": [_run("scoring.get_gaps", 100, 0.010)]}
+        current = {"results": [_run("scoring.get_gaps", 100, 0.020)]}
+        
+        regressions = compare_results(baseline, current, threshold=0.25)
+        
+        assert len(regressions) == 1
+        assert regressions[0]['stage'] == "scoring.get_gaps"
+        assert regressions[0]['ratio'] == 2.0
+    
+    def test_ignores_noise_and_improvements(self):
+        """Test que le bruit et les améliorations ne sont pas signalés"""
+        baseline = {"results": [_run("a", 1, 0.0001), _run("b", 1, 0.5)]}
+        current = {"results": [_run("a", 1, 0.0005), _run("b", 1, 0.3)]}
+        
+        assert compare_results(baseline, current) == []
+    
+    def test_ignores_unknown_stages(self):
+        """Test qu'une nouvelle mesure sans référence est ignorée"""
+        baseline = {"results": []}
+        current = {"results": [_run("new_stage", 1, 1.0)]}
+        
+        assert compare_results(baseline, current) == []
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_run_benchmarks_smoke():
+    """Test une exécution complète réduite de la suite"""
+    results = run_benchmarks(sizes=[1], repeats=1)
+    
+    stages = {r['stage'] for r in results['results']}
+    assert {"catalog_load", "assess_control", "scoring.get_statistics",
+            "scoring.get_gaps", "chart.status_pie", "chart.domain_bar",
+            "chart.heatmap_plotly", "report.generate_pdf"} <= stages
+    assert all(r['median_s'] >= 0 for r in results['results'])
+
+def _load(throughput, p95, error_rate=0.0):
+    measures = {"requests": 100, "errors": 0, "error_rate": error_rate,
+                "throughput_rps": throughput, "p50_ms": 10.0, "p95_ms": p95,
+                "p99_ms": p95, "max_ms": p95}
+    return {"endpoints": {"assess": measures}, "total": measures}
+
+class TestLoadHarness:
+    
+    def test_percentile_nearest_rank(self):
+        """Test le percentile au rang le plus proche"""
+        from benchmarks.load import percentile
+        values = list(range(1, 101))
+        
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7], 95) == 7
+        assert percentile([], 50) is None
+    
+    def test_parse_mix(self):
+        """Test la lecture du mélange de requêtes"""
+        from benchmarks.load import parse_mix
+        
+        assert parse_mix("assess=6,statistics=3,report=1") == {
+            'assess': 6, 'statistics': 3, 'report': 1}
+        with pytest.raises(ValueError):
+            parse_mix("assess=1,unknown=2")
+    
+    def test_compare_results(self):
+        """Test la détection des régressions de débit, latence et erreurs"""
+        from benchmarks.load import compare_results
+        baseline = _load(100.0, 50.0)
+        
+        assert compare_results(baseline, _load(90.0, 55.0)) == []
+        regressions = compare_results(baseline, _load(60.0, 50.0))
+        assert {(r['endpoint'], r['metric']) for r in regressions} == {
+            ('assess', 'throughput_rps'), ('total', 'throughput_rps')}
+        assert {r['metric'] for r in compare_results(baseline, _load(100.0, 80.0))} == {
+            'p95_ms', 'p99_ms'}
+        assert compare_results(baseline, _load(100.0, 50.0, error_rate=0.05))[0]['metric'] == 'error_rate'
+    
+    def test_run_against_local_server(self):
+        """Test une courte charge contre l'application servie dans le processus"""
+        import threading
+        from werkzeug.serving import make_server
+        from benchmarks.load import run_load_test
+        from web_app import app
+        
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            results = run_load_test(f'http://127.0.0.1:{server.server_port}', users=2,
+                                    duration=0.5, mix={'assess': 3, 'statistics': 1},
+                                    session_controls=5)
+        finally:
+            server.shutdown()
+        
+        assert set(results['endpoints']) <= {'new', 'assess', 'statistics'}
+        assert results['endpoints']['new']['requests'] >= 2
+        assert results['total']['errors'] == 0
+        assert results['total']['p50_ms'] <= results['total']['p99_ms']
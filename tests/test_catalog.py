@@ -0,0 +1,144 @@
+"""
+Tests pour le module catalog
+"""
+import json
+import os
+
+import pytest
+
+from modules.assessment_store import AssessmentStore
+from modules.catalog import CatalogError, CatalogRegistry, load_catalog
+from modules.compliance_checker import ComplianceChecker
+
+CONTROLS = [
+    {'id': 'A.5.1', 'title': 'Policies', 'domain': 'Organizational controls'},
+    {'id': 'A.8.1', 'title': 'User endpoint devices', 'domain': 'Technological controls'}
+]
+
+def _write(path, controls, mtime_ns=None):
+    path.write_text(json.dumps({'controls': controls}), encoding='utf-8')
+    if mtime_ns is not None:
+        # Horodatage explicite : deux écritures rapprochées restent distinctes
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    path = tmp_path / 'controls.json'
+    _write(path, CONTROLS, 1_000_000_000_000_000_000)
+    return path
+
+class TestLoadCatalog:
+
+    def test_indexes(self, catalog_file):
+        """Test les index du catalogue (contrôles par ID, domaines)"""
+        catalog = load_catalog(str(catalog_file))
+        assert len(catalog) == 2
+        assert catalog.controls_by_id['A.8.1']['domain'] == 'Technological controls'
+        assert catalog.domains == ['Organizational controls', 'Technological controls']
+        assert len(catalog.version) == 12
+
+    def test_version_depends_on_content(self, catalog_file, tmp_path):
+        """Test que la version dépend du contenu du catalogue"""
+        other = tmp_path / 'other.json'
+        _write(other, CONTROLS[:1])
+        assert load_catalog(str(other)).version != load_catalog(str(catalog_file)).version
+
+    @pytest.mark.parametrize('content', [
+        '{"controls": [',
+        '{"controls": []}',
+        '{"controls": [{"id": "A.5.1"}]}',
+        json.dumps({'controls': CONTROLS + CONTROLS[:1]})
+    ])
+    def test_invalid(self, tmp_path, content):
+        """Test le rejet d'un catalogue invalide"""
+        path = tmp_path / 'controls.json'
+        path.write_text(content, encoding='utf-8')
+        with pytest.raises(CatalogError):
+            load_catalog(str(path))
+
+    def test_checker_shares_catalog(self, catalog_file):
+        """Test que le checker partage le catalogue sans le recharger"""
+        catalog = load_catalog(str(catalog_file))
+        checker = ComplianceChecker(catalog=catalog)
+        assert checker.controls is catalog.controls
+        assert checker.get_domain_controls('Technological controls') == CONTROLS[1:]
+
+class TestCatalogRegistry:
+
+    def test_reload_on_mtime_change(self, catalog_file):
+        """Test le rechargement quand le fichier change"""
+        registry = CatalogRegistry(str(catalog_file), check_interval=0)
+        before = registry.current()
+        assert not registry.check_reload()
+
+        _write(catalog_file, CONTROLS[:1], 2_000_000_000_000_000_000)
+        assert registry.check_reload()
+        assert registry.current() is not before
+        assert len(registry.current()) == 1
+        assert registry.reloads == 1
+        # L'instantané obtenu avant le rechargement reste intact
+        assert len(before) == 2
+
+    def test_touch_without_change(self, catalog_file):
+        """Test qu'un fichier touché sans modification garde la version"""
+        registry = CatalogRegistry(str(catalog_file), check_interval=0)
+        before = registry.current()
+        os.utime(catalog_file, ns=(3_000_000_000_000_000_000,) * 2)
+        assert not registry.check_reload()
+        assert registry.current() is before
+        assert registry.reloads == 0
+
+    def test_invalid_edit_keeps_current_version(self, catalog_file):
+        """Test qu'une édition invalide laisse servir la version courante"""
+        registry = CatalogRegistry(str(catalog_file), check_interval=0)
+        version = registry.current().version
+        catalog_file.write_text('{"controls": [', encoding='utf-8')
+        os.utime(catalog_file, ns=(2_000_000_000_000_000_000,) * 2)
+
+        assert not registry.check_reload()
+        assert registry.current().version == version
+        assert registry.reload_errors == 1
+        assert registry.last_error
+
+        # La même version invalide n'est ni relue ni recomptée à chaque vérification
+        for _ in range(3):
+            assert not registry.check_reload()
+        assert registry.reload_errors == 1
+
+        catalog_file.write_text('{"controls": []}', encoding='utf-8')
+        os.utime(catalog_file, ns=(2_500_000_000_000_000_000,) * 2)
+        assert not registry.check_reload()
+        assert not registry.check_reload()
+        assert registry.reload_errors == 2
+
+        _write(catalog_file, CONTROLS[:1], 3_000_000_000_000_000_000)
+        assert registry.check_reload()
+        assert registry.last_error is None
+
+    def test_interval_throttles_checks(self, catalog_file):
+        """Test que l'intervalle espace les vérifications du fichier"""
+        registry = CatalogRegistry(str(catalog_file), check_interval=3600)
+        before = registry.current()
+        _write(catalog_file, CONTROLS[:1], 2_000_000_000_000_000_000)
+        assert registry.current() is before
+
+    def test_store_follows_reload(self, catalog_file):
+        """Test que le stockage valide avec le catalogue rechargé"""
+        registry = CatalogRegistry(str(catalog_file), check_interval=0)
+        store = AssessmentStore(catalog_registry=registry)
+        assessment_id, _ = store.create('Test Corp', 'Jane Doe')
+        store.assess_control(assessment_id, 0, 'A.8.1', 'Implemented')
+
+        _write(catalog_file, CONTROLS[:1], 2_000_000_000_000_000_000)
+        assert registry.check_reload()
+        with pytest.raises(ValueError):
+            store.assess_control(assessment_id, 1, 'A.8.1', 'Implemented')
+
+    def test_prometheus_metrics(self, catalog_file):
+        """Test les métriques Prometheus du catalogue"""
+        registry = CatalogRegistry(str(catalog_file), check_interval=0)
+        text = registry.prometheus_metrics()
+        version = registry.current().version
+        assert f'iso27001_catalog_info{{version="{version}",pid="{os.getpid()}"}} 1' in text
+        assert f'iso27001_catalog_controls{{pid="{os.getpid()}"}} 2' in text
+        assert '# TYPE iso27001_catalog_reloads_total counter' in text
@@ -63,6 +63,16 @@ class TestComplianceChecker:
         assert result is False
         assert len(checker.assessment['controls_assessment']) == 0
     
+    def test_assess_control_invalid_status(self, checker, sample_assessment):
+        """Test le refus d'un statut hors VALID_STATUSES ou d'un ID non textuel"""
+        with pytest.raises(ValueError):
+            checker.assess_control("A.5.1", "Bogus")
+        with pytest.raises(ValueError):
+            checker.assess_control(["A.5.1"], "Implemented")
+        
+        assert len(checker.assessment['controls_assessment']) == 0
+        assert checker.assessment['metadata']['version'] == 0
+    
     def test_assess_multiple_controls(self, checker, sample_assessment):
         """Test l'évaluation de plusieurs contrôles"""
         controls = [
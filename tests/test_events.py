@@ -0,0 +1,121 @@
+"""
+Tests pour le module events
+"""
+import json
+import os
+import threading
+import time
+import pytest
+
+from modules.events import EventBroker, RESYNC_EVENT, SubscriberLimitError, format_sse
+
+def _data(message):
+    return json.loads(message.split("data: ", 1)[1])
+
+class TestEventBroker:
+
+    def test_format_sse(self):
+        """Test la sérialisation d'un événement au format SSE"""
+        message = format_sse('control', {'version': 2}, event_id=2)
+        assert message == 'id: 2\nevent: control\ndata: {"version":2}\n\n'
+
+    def test_fan_out_to_channel_subscribers(self):
+        """Test la diffusion aux seuls abonnés du canal"""
+        broker = EventBroker()
+        first, second = broker.subscribe('a'), broker.subscribe('a')
+        other = broker.subscribe('b')
+
+        assert broker.publish('a', 'control', {'version': 1}) == 2
+        assert _data(first.get(timeout=0)) == {'version': 1}
+        assert _data(second.get(timeout=0)) == {'version': 1}
+        assert other.get(timeout=0) is None
+
+        first.close()
+        second.close()
+        assert broker.subscriber_count('a') == 0
+        assert broker.publish('a', 'control', {'version': 2}) == 0
+
+    def test_slow_subscriber_gets_resync(self):
+        """Test qu'un abonné trop lent reçoit resync puis le dernier événement"""
+        broker = EventBroker(max_queue=3)
+        subscription = broker.subscribe('a')
+        for version in range(5):
+            broker.publish('a', 'control', {'version': version})
+
+        assert subscription.get(timeout=0) == RESYNC_EVENT
+        assert _data(subscription.get(timeout=0)) == {'version': 4}
+        assert subscription.get(timeout=0) is None
+        assert subscription.dropped == 3
+
+    def test_get_wakes_on_publish_and_close(self):
+        """Test le réveil de get() par une publication ou la fermeture"""
+        broker = EventBroker()
+        subscription = broker.subscribe('a')
+        timer = threading.Timer(0.05, broker.publish, ('a', 'control', {'version': 1}))
+        timer.start()
+        assert _data(subscription.get(timeout=5)) == {'version': 1}
+
+        threading.Timer(0.05, subscription.close).start()
+        assert subscription.get(timeout=5) is None
+        assert subscription.closed
+
+    def test_subscriber_limit(self):
+        """Test que le nombre de flux ouverts par processus est borné"""
+        broker = EventBroker(max_subscribers=2)
+        first = broker.subscribe('a')
+        broker.subscribe('b')
+        with pytest.raises(SubscriberLimitError):
+            broker.subscribe('a')
+        first.close()
+        broker.subscribe('a')
+
+    def test_relay_between_processes(self, tmp_path):
+        """Test que les événements publiés par un autre worker sont relayés"""
+        # Deux diffuseurs partageant le répertoire de relais : deux workers
+        publisher = EventBroker(relay_dir=str(tmp_path), poll_interval=0.02)
+        listener = EventBroker(relay_dir=str(tmp_path), poll_interval=0.02)
+        assert not publisher.has_subscribers('a')
+        # Publication sans abonné nulle part : rien n'est déposé
+        publisher.publish('a', 'control', {'version': 0}, event_id=0)
+
+        subscription = listener.subscribe('a')
+        assert publisher.has_subscribers('a')
+        assert publisher.publish('a', 'control', {'version': 1}, event_id=1) == 0
+        assert _data(subscription.get(timeout=5)) == {'version': 1}
+
+        # Événements fusionnés entre deux scrutations : resync puis le dernier
+        with listener._lock:
+            publisher.publish('a', 'control', {'version': 2}, event_id=2)
+            publisher.publish('a', 'control', {'version': 3}, event_id=3)
+        message = subscription.get(timeout=5)
+        assert message.startswith(RESYNC_EVENT)
+        assert _data(message[len(RESYNC_EVENT):]) == {'version': 3}
+
+        # Les événements du processus lui-même ne sont pas diffusés deux fois
+        listener.publish('a', 'control', {'version': 4}, event_id=4)
+        assert _data(subscription.get(timeout=0)) == {'version': 4}
+        assert subscription.get(timeout=0.1) is None
+        subscription.close()
+
+    def test_relay_files_removed(self, tmp_path):
+        """Test la suppression des fichiers de relais des canaux plus suivis"""
+        publisher = EventBroker(relay_dir=str(tmp_path), poll_interval=0.02)
+        listener = EventBroker(relay_dir=str(tmp_path), poll_interval=0.02)
+
+        subscription = listener.subscribe('a')
+        publisher.publish('a', 'control', {'version': 1}, event_id=1)
+        assert (tmp_path / 'a.event').exists()
+        subscription.close()
+        assert not (tmp_path / 'a.watch').exists()
+        assert not publisher.has_subscribers('a')
+
+        # Marque et événement abandonnés (évaluation supprimée, worker arrêté)
+        for name in ('b.watch', 'b.event'):
+            (tmp_path / name).write_text('', encoding='utf-8')
+            os.utime(tmp_path / name, (0, 0))
+        with listener.subscribe('c') as other:
+            deadline = time.monotonic() + 5
+            while (tmp_path / 'a.event').exists() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert sorted(path.name for path in tmp_path.iterdir()) == ['c.watch']
+            assert other.get(timeout=0) is None
@@ -0,0 +1,155 @@
+"""
+Tests pour le module evidence_store
+"""
+import hashlib
+import io
+import json
+import os
+import pytest
+from modules.evidence_store import (EvidenceStore, BlobNotFoundError, attachment_hashes,
+                                    default_roots, referenced_hashes, main)
+
+class _ChunkedStream(io.RawIOBase):
+    """Flux qui enregistre la taille des lectures demandées"""
+
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+        self.reads = []
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return self._buffer.read(size)
+
+@pytest.fixture
+def store(tmp_path):
+    return EvidenceStore(str(tmp_path / "evidence"))
+
+def _age(store, sha256, seconds=7200):
+    stat = os.stat(store.path(sha256))
+    os.utime(store.path(sha256), (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+class TestEvidenceStore:
+
+    def test_put_streams_and_hashes(self, store):
+        """Test le stockage par morceaux et le hachage pendant la copie"""
+        data = os.urandom(300_000)
+        stream = _ChunkedStream(data)
+        blob = store.put(stream, chunk_size=64 * 1024)
+
+        assert blob == {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data),
+                        "deduplicated": False}
+        assert set(stream.reads) == {64 * 1024}
+        with store.open(blob['sha256']) as f:
+            assert f.read() == data
+        assert store.path(blob['sha256']).endswith(os.path.join(blob['sha256'][:2], blob['sha256']))
+
+    def test_identical_content_stored_once(self, store, tmp_path):
+        """Test qu'un même contenu n'est stocké qu'une fois"""
+        first = store.put_bytes(b"policy v1")
+        source = tmp_path / "copy.pdf"
+        source.write_bytes(b"policy v1")
+        second = store.put_file(str(source))
+
+        assert second['sha256'] == first['sha256']
+        assert second['deduplicated']
+        assert list(store.iter_hashes()) == [first['sha256']]
+        assert os.listdir(os.path.join(store.directory, 'tmp')) == []
+
+    def test_unknown_or_invalid_hash(self, store):
+        """Test le rejet des empreintes inconnues ou invalides"""
+        with pytest.raises(BlobNotFoundError):
+            store.open("0" * 64)
+        with pytest.raises(BlobNotFoundError):
+            store.path("../../etc/passwd")
+        assert not store.exists("not-a-hash")
+
+    def test_gc_removes_unreferenced_blobs(self, store):
+        """Test la suppression des seuls blobs anciens et non référencés"""
+        kept = store.put_bytes(b"referenced")['sha256']
+        orphan = store.put_bytes(b"orphan")['sha256']
+        recent = store.put_bytes(b"just uploaded")['sha256']
+        _age(store, kept)
+        _age(store, orphan)
+
+        assert store.gc([kept], dry_run=True)['removed'] == 1
+        assert store.exists(orphan)
+
+        stats = store.gc([kept])
+        assert stats['removed_hashes'] == [orphan]
+        assert stats['freed_bytes'] == len(b"orphan")
+        assert stats['kept'] == 2
+        assert store.exists(kept) and store.exists(recent) and not store.exists(orphan)
+
+    def test_referenced_hashes(self):
+        """Test la collecte des empreintes référencées par les évaluations"""
+        assessment = {'controls_assessment': [
+            {'control_id': 'A.5.1', 'attachments': [{'sha256': 'a' * 64}, {'sha256': 'b' * 64}]},
+            {'control_id': 'A.5.2'},
+            {'control_id': 'A.5.3', 'attachments': [{'sha256': 'a' * 64}]}
+        ]}
+        assert attachment_hashes(assessment) == {'a' * 64, 'b' * 64}
+        assert referenced_hashes([assessment, {'controls_assessment': []}]) == {'a' * 64, 'b' * 64}
+
+    def test_gc_command(self, store, tmp_path):
+        """Test la commande gc (simulation puis suppression)"""
+        kept = store.put_bytes(b"referenced")['sha256']
+        orphan = store.put_bytes(b"orphan")['sha256']
+        _age(store, kept)
+        _age(store, orphan)
+        archive = tmp_path / "assessments"
+        archive.mkdir()
+        (archive / "org.json").write_text(json.dumps({'controls_assessment': [
+            {'control_id': 'A.5.1', 'attachments': [{'sha256': kept}]}
+        ]}))
+
+        assert main(['gc', str(archive), '--evidence-dir', store.directory]) == 0
+        assert store.exists(kept)
+        assert not store.exists(orphan)
+
+    def test_gc_keeps_pinned_blobs(self, store):
+        """Test la conservation des pièces épinglées par une évaluation de session"""
+        pinned = store.put_bytes(b"session evidence")['sha256']
+        _age(store, pinned)
+        store.pin(pinned)
+        with pytest.raises(BlobNotFoundError):
+            store.pin("../../etc/passwd")
+
+        assert store.gc([])['removed'] == 0
+        assert store.exists(pinned)
+
+        # Épingle expirée : retirée, puis le blob est collecté
+        pin = os.path.join(store.directory, 'pins', pinned)
+        os.utime(pin, (0, 0))
+        assert store.gc([], pin_max_age=3600)['removed_hashes'] == [pinned]
+        assert store.pinned() == {}
+
+    def test_gc_default_roots_from_config(self, store, tmp_path, monkeypatch):
+        """Test les répertoires parcourus par défaut : archive, partagé et shards"""
+        from config import Config
+
+        archive = tmp_path / "assessments"
+        (archive / "shared").mkdir(parents=True)
+        shard = tmp_path / "shard-b"
+        shard.mkdir()
+        monkeypatch.setattr(Config, 'ASSESSMENTS_DIR', str(archive))
+        monkeypatch.setattr(Config, 'SHARED_ASSESSMENTS_DIR', str(archive / "shared"))
+        monkeypatch.setattr(Config, 'SHARD_DIRS', [str(shard), str(tmp_path / "missing")])
+        monkeypatch.setattr(Config, 'EVIDENCE_DIR', store.directory)
+
+        assert default_roots([str(archive), str(archive / "shared"), str(shard)]) == \
+            [str(archive), str(shard)]
+
+        in_shard = store.put_bytes(b"shard evidence")['sha256']
+        orphan = store.put_bytes(b"orphan")['sha256']
+        _age(store, in_shard)
+        _age(store, orphan)
+        (shard / "org.json").write_text(json.dumps({'controls_assessment': [
+            {'control_id': 'A.5.1', 'attachments': [{'sha256': in_shard}]}
+        ]}))
+
+        assert main(['gc']) == 0
+        assert store.exists(in_shard)
+        assert not store.exists(orphan)
@@ -0,0 +1,139 @@
+"""
+Tests pour le module export
+"""
+import csv
+import gzip
+import io
+import json
+import pytest
+from modules.export import (iter_assessment_paths, export_portfolio, load_cursor, main)
+
+def _assessment(organization, *items):
+    return {
+        'metadata': {'organization': organization, 'assessor': 'Jane Doe',
+                     'date': '2026-01-13T12:00:00', 'standard': 'ISO/IEC 27001:2022',
+                     'version': len(items)},
+        'controls_assessment': [
+            {'control_id': control_id, 'control_title': f"Control {control_id}", 'domain': domain,
+             'status': status, 'evidence': 'Doc, "v2"', 'comments': '',
+             'assessed_at': '2026-01-13T12:00:00'}
+            for control_id, domain, status in items
+        ]
+    }
+
+@pytest.fixture
+def portfolio(tmp_path):
+    source = tmp_path / "assessments"
+    (source / "shared").mkdir(parents=True)
+    items = [("A.5.1", "Organizational controls", "Implemented"),
+             ("A.8.1", "Technological controls", "Not Implemented")]
+    for name in ("acme", "globex", "initech", "shared/umbrella", "zenith"):
+        (source / f"{name}.json").write_text(json.dumps(_assessment(name, *items)))
+    (source / "notes.txt").write_text("ignored")
+    return source
+
+def _read(path):
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        return f.read()
+
+class TestExport:
+
+    def test_paths_in_order_and_after_cursor(self, portfolio):
+        """Test l'ordre des fichiers et la reprise après un curseur"""
+        paths = list(iter_assessment_paths(str(portfolio)))
+        assert paths == ['acme.json', 'globex.json', 'initech.json', 'shared/umbrella.json',
+                         'zenith.json']
+        assert list(iter_assessment_paths(str(portfolio), after='initech.json')) == paths[3:]
+        assert list(iter_assessment_paths(str(portfolio), after='shared/umbrella.json')) == paths[4:]
+
+    def test_controls_csv(self, portfolio, tmp_path):
+        """Test l'export CSV des contrôles"""
+        output = tmp_path / "controls.csv"
+        result = export_portfolio(str(portfolio), str(output), 'controls')
+
+        rows = list(csv.DictReader(io.StringIO(_read(output))))
+        assert result == {'assessments': 5, 'rows': 10, 'complete': True,
+                          'bytes': output.stat().st_size, 'skipped': []}
+        assert rows[0]['assessment'] == 'acme'
+        assert rows[0]['evidence'] == 'Doc, "v2"'
+        assert rows[-1]['organization'] == 'zenith'
+
+    def test_scores_jsonl_gzip(self, portfolio, tmp_path):
+        """Test l'export des scores en JSON Lines compressé"""
+        output = tmp_path / "scores.jsonl.gz"
+        export_portfolio(str(portfolio), str(output), 'scores')
+
+        rows = [json.loads(line) for line in _read(output).splitlines()]
+        overall = [r for r in rows if r['scope'] == 'overall']
+        assert len(overall) == 5
+        assert overall[0]['score'] == 50.0
+        assert {r['scope'] for r in rows} == {'overall', 'Organizational controls',
+                                               'Technological controls'}
+
+    @pytest.mark.parametrize("name", ["controls.csv", "controls.csv.gz"])
+    def test_resume_after_interruption(self, portfolio, tmp_path, name):
+        """Test que la reprise après interruption donne le même fichier"""
+        expected = tmp_path / f"expected-{name}"
+        export_portfolio(str(portfolio), str(expected), 'controls')
+
+        output = tmp_path / name
+        partial = export_portfolio(str(portfolio), str(output), 'controls',
+                                   checkpoint_every=1, limit=2)
+        assert not partial['complete']
+        assert load_cursor(str(output))['last'] == 'globex.json'
+
+        # Écriture interrompue après le point de reprise : tronquée à la reprise
+        with open(output, 'ab') as f:
+            f.write(b'garbage from a crashed run')
+
+        result = export_portfolio(str(portfolio), str(output), 'controls', resume=True)
+        assert result['complete'] and result['rows'] == 10
+        assert _read(output) == _read(expected)
+        assert load_cursor(str(output)) is None
+
+    def test_resume_rejects_other_settings(self, portfolio, tmp_path):
+        """Test le refus d'une reprise avec d'autres paramètres"""
+        output = tmp_path / "export.csv"
+        export_portfolio(str(portfolio), str(output), 'controls', limit=1)
+        with pytest.raises(ValueError):
+            export_portfolio(str(portfolio), str(output), 'assessments', resume=True)
+
+    def test_main(self, portfolio, tmp_path):
+        """Test l'export en ligne de commande"""
+        output = tmp_path / "assessments.jsonl"
+        assert main(['assessments', str(output), '--source', str(portfolio)]) == 0
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [r['assessment'] for r in rows][-2:] == ['shared/umbrella', 'zenith']
+        assert rows[0]['controls'] == 2
+
+    def test_unreadable_files_are_skipped(self, portfolio, tmp_path):
+        """Test que les fichiers illisibles sont ignorés et comptés"""
+        (portfolio / "broken.json").write_text("{")
+        output = tmp_path / "assessments.jsonl"
+        result = export_portfolio(str(portfolio), str(output), 'assessments')
+
+        assert result['assessments'] == 5
+        assert [s['path'] for s in result['skipped']] == ['broken.json']
+        assert main(['assessments', str(output), '--source', str(portfolio)]) == 1
+
+    @pytest.mark.parametrize('kind, skipped', [
+        ('controls', {'not-a-list.json'}),
+        ('scores', {'missing-status.json', 'not-a-list.json'})
+    ])
+    def test_malformed_assessments_are_skipped(self, portfolio, tmp_path, kind, skipped):
+        """Test qu'un JSON valide mais mal structuré est ignoré sans lignes partielles"""
+        expected = export_portfolio(str(portfolio), str(tmp_path / f"clean.{kind}.jsonl"), kind)
+        (portfolio / "missing-status.json").write_text(json.dumps(
+            {'controls_assessment': [{'control_id': 'A.5.1'}]}))
+        (portfolio / "not-a-list.json").write_text(json.dumps(
+            {'metadata': {'organization': 'Oops'},
+             'controls_assessment': [{'control_id': 'A.5.1', 'status': 'Implemented'}, 'oops']}))
+        output = tmp_path / f"{kind}.jsonl"
+        result = export_portfolio(str(portfolio), str(output), kind)
+
+        assert {s['path'] for s in result['skipped']} == skipped
+        assert result['assessments'] == 7 - len(skipped)
+        assert len(output.read_text().splitlines()) == result['rows']
+        assert result['rows'] >= expected['rows']
+        assert 'Oops' not in output.read_text()
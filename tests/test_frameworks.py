@@ -0,0 +1,117 @@
+"""
+Tests pour le module frameworks
+"""
+import pytest
+import json
+from modules.frameworks import FrameworkRegistry, FrameworkError, DEFAULT_FRAMEWORK_ID, main
+
+@pytest.fixture
+def registry(tmp_path):
+    """Registre ISO 27001:2022 + un référentiel 2013 réduit et sa correspondance"""
+    catalog_2013 = {
+        "framework": {"id": "iso27001-2013", "name": "ISO/IEC 27001:2013"},
+        "controls": [
+            {"id": "A.5.1.1", "title": "Policies", "domain": "A.5 Policies"},
+            {"id": "A.6.1.1", "title": "Roles", "domain": "A.6 Organization"},
+            {"id": "A.12.2.1", "title": "Malware", "domain": "A.12 Operations"},
+        ]
+    }
+    mapping = {
+        "source": DEFAULT_FRAMEWORK_ID,
+        "target": "iso27001-2013",
+        "mappings": [
+            {"source": "A.5.1", "target": "A.5.1.1"},
+            {"source": "A.5.2", "target": "A.6.1.1"},
+            {"source": "A.5.3", "target": "A.6.1.1", "weight": 0.5},
+            {"source": "A.8.7", "target": "A.12.2.1"},
+        ]
+    }
+    catalog_path = tmp_path / "iso27001_2013.json"
+    mapping_path = tmp_path / "2022_to_2013.json"
+    catalog_path.write_text(json.dumps(catalog_2013), encoding='utf-8')
+    mapping_path.write_text(json.dumps(mapping), encoding='utf-8')
+    
+    registry = FrameworkRegistry.with_default_catalog()
+    registry.load_catalog(str(catalog_path))
+    registry.load_mapping(str(mapping_path))
+    return registry
+
+def _assessment(*items):
+    return {
+        'metadata': {'organization': 'Test Corp'},
+        'controls_assessment': [
+            {'control_id': control_id, 'status': status} for control_id, status in items
+        ]
+    }
+
+class TestFrameworkRegistry:
+    
+    def test_load_catalogs(self, registry):
+        """Test le chargement de plusieurs catalogues"""
+        assert DEFAULT_FRAMEWORK_ID in registry.frameworks
+        assert registry.frameworks['iso27001-2013']['name'] == "ISO/IEC 27001:2013"
+    
+    def test_unknown_control_in_mapping(self, registry):
+        """Test le rejet d'une correspondance vers un contrôle inconnu"""
+        with pytest.raises(FrameworkError):
+            registry.add_mapping(DEFAULT_FRAMEWORK_ID, 'iso27001-2013',
+                                 [{"source": "A.5.1", "target": "A.99.9"}])
+    
+    def test_project_scores(self, registry):
+        """Test la projection pondérée sur le référentiel cible"""
+        assessment = _assessment(
+            ("A.5.1", "Implemented"),
+            ("A.5.2", "Implemented"),
+            ("A.5.3", "Not Implemented"),
+            ("A.8.7", "Not Applicable"),
+        )
+        
+        result = registry.project(assessment)['iso27001-2013']
+        
+        assert result['control_scores']['A.5.1.1'] == 100.0
+        # (1.0 * 1 + 0.0 * 0.5) / 1.5
+        assert result['control_scores']['A.6.1.1'] == pytest.approx(66.67)
+        # Not Applicable : contrôle non couvert
+        assert 'A.12.2.1' not in result['control_scores']
+        assert result['covered_controls'] == 2
+        assert result['total_controls'] == 3
+        assert result['overall_score'] == pytest.approx(83.33)
+        assert result['domain_scores'] == {
+            'A.5 Policies': 100.0,
+            'A.6 Organization': pytest.approx(66.67)
+        }
+    
+    def test_project_averages_repeated_controls(self, registry):
+        """Test la moyenne des éléments multi-sites d'un même contrôle"""
+        assessment = _assessment(("A.5.1", "Implemented"), ("A.5.1", "Not Implemented"))
+        
+        result = registry.project(assessment)['iso27001-2013']
+        
+        assert result['control_scores']['A.5.1.1'] == 50.0
+    
+    def test_project_empty_assessment(self, registry):
+        """Test la projection d'une évaluation vide"""
+        result = registry.project(_assessment())['iso27001-2013']
+        
+        assert result['overall_score'] == 0.0
+        assert result['covered_controls'] == 0
+    
+    def test_compiled_tables_are_cached(self, registry):
+        """Test la réutilisation des tables compilées"""
+        assert registry.compile(DEFAULT_FRAMEWORK_ID) is registry.compile(DEFAULT_FRAMEWORK_ID)
+    
+    def test_load_directory(self, registry, tmp_path):
+        """Test le chargement d'un répertoire (catalogues avant correspondances)"""
+        loaded = FrameworkRegistry.with_default_catalog()
+        
+        assert loaded.load_directory(str(tmp_path)) == ['iso27001-2013']
+        assert loaded.mappings == registry.mappings
+    
+    def test_main(self, registry, tmp_path, capsys):
+        """Test la projection en ligne de commande"""
+        assessment_path = tmp_path / "assessment.data"
+        assessment_path.write_text(json.dumps(_assessment(("A.5.1", "Implemented"))),
+                                   encoding='utf-8')
+        
+        assert main([str(assessment_path), '--frameworks-dir', str(tmp_path)]) == 0
+        assert "iso27001-2013: 100.0% (1/3 controls covered)" in capsys.readouterr().out
@@ -0,0 +1,129 @@
+"""
+Tests pour le module instrumentation
+"""
+import pytest
+import json
+import threading
+from modules.instrumentation import Tracer, traced, tracer as global_tracer
+
+@pytest.fixture
+def tracer():
+    """Traceur activé avec suivi mémoire"""
+    t = Tracer()
+    t.enable(track_memory=True)
+    yield t
+    t.disable()
+
+class TestTracer:
+    
+    def test_disabled_by_default(self):
+        """Test qu'un traceur neuf n'enregistre rien"""
+        t = Tracer()
+        with t.span("noop"):
+            pass
+        
+        assert t.spans == []
+    
+    def test_span_records_timings(self, tracer):
+        """Test l'enregistrement du temps mur et CPU"""
+        with tracer.span("work", size=10):
+            sum(range(10000))
+        
+        assert len(tracer.spans) == 1
+        span = tracer.spans[0]
+        assert span['name'] == "work"
+        assert span['wall_s'] >= 0
+        assert span['cpu_s'] >= 0
+        assert span['attributes'] == {'size': 10}
+    
+    def test_nested_spans_memory(self, tracer):
+        """Test le pic mémoire et la propagation au span parent"""
+        with tracer.span("outer"):
+            with tracer.span("inner"):
+                buffer = bytearray(2_000_000)
+                del buffer
+        
+        spans = {s['name']: s for s in tracer.spans}
+        assert spans['inner']['parent'] == "outer"
+        assert spans['inner']['peak_memory_bytes'] >= 2_000_000
+        assert spans['outer']['peak_memory_bytes'] >= spans['inner']['peak_memory_bytes']
+    
+    def test_concurrent_spans_skip_memory_peak(self, tracer, tmp_path):
+        """Test que les spans chevauchant un autre thread n'ont pas de pic mémoire"""
+        barrier = threading.Barrier(2)
+
+        def work(name):
+            with tracer.span(name):
+                barrier.wait()
+                buffer = bytearray(1_000_000)
+                barrier.wait()
+                del buffer
+
+        threads = [threading.Thread(target=work, args=(f"worker{i}",)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with tracer.span("alone"):
+            buffer = bytearray(1_000_000)
+            del buffer
+
+        spans = {s['name']: s for s in tracer.spans}
+        assert spans['worker0']['peak_memory_bytes'] is None
+        assert spans['worker1']['peak_memory_bytes'] is None
+        assert spans['alone']['peak_memory_bytes'] >= 1_000_000
+        assert tracer.summary()['worker0']['peak_memory_bytes'] is None
+
+        content = open(tracer.export_prometheus(str(tmp_path / "spans.prom"))).read()
+        assert 'iso27001_span_peak_memory_bytes{span="alone"}' in content
+        assert 'iso27001_span_peak_memory_bytes{span="worker0"}' not in content
+        assert 'iso27001_span_count_total{span="worker0"} 1' in content
+    
+    def test_span_recorded_on_exception(self, tracer):
+        """Test qu'un span est enregistré même si le bloc lève"""
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("boom")
+        
+        assert tracer.spans[0]['name'] == "failing"
+    
+    def test_traced_decorator(self):
+        """Test le décorateur sur le traceur global"""
+        @traced("decorated")
+        def add(a, b):
+            return a + b
+        
+        global_tracer.enable(track_memory=False)
+        try:
+            assert add(1, 2) == 3
+            assert any(s['name'] == "decorated" for s in global_tracer.spans)
+        finally:
+            global_tracer.disable()
+            global_tracer.reset()
+
+class TestExports:
+    
+    def test_export_json(self, tracer, tmp_path):
+        """Test l'export de la trace JSON"""
+        with tracer.span("stage"):
+            pass
+        
+        path = tracer.export_json(str(tmp_path / "trace.json"))
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['spans'][0]['name'] == "stage"
+        assert data['summary']['stage']['count'] == 1
+    
+    def test_export_prometheus(self, tracer, tmp_path):
+        """Test l'export au format texte Prometheus"""
+        for _ in range(3):
+            with tracer.span("pdf"):
+                pass
+        
+        path = tracer.export_prometheus(str(tmp_path / "metrics.prom"))
+        content = open(path, encoding='utf-8').read()
+        
+        assert '# TYPE iso27001_span_wall_seconds_total counter' in content
+        assert 'iso27001_span_count_total{span="pdf"} 3' in content
+        assert content.endswith("\n")
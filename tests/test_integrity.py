@@ -0,0 +1,133 @@
+"""
+Tests pour le module integrity
+"""
+import json
+import pytest
+from modules.integrity import (load_catalog_index, validate_assessment, validate_file,
+                               iter_assessment_files, scan_archive, main)
+
+CONTROLS_FILE = "data/iso27001_controls.json"
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog_index(CONTROLS_FILE)
+
+def _assessment(*items):
+    return {
+        'metadata': {'organization': 'Test Corp', 'assessor': 'Jane Doe',
+                     'date': '2026-01-01T00:00:00', 'standard': 'ISO/IEC 27001:2022',
+                     'version': len(items)},
+        'controls_assessment': [
+            {'control_id': control_id, 'status': status, 'evidence': '', 'comments': '',
+             'assessed_at': '2026-01-01T00:00:00'}
+            for control_id, status in items
+        ]
+    }
+
+def _codes(issues):
+    return sorted(issue['code'] for issue in issues)
+
+def _write(path, data):
+    path.write_text(json.dumps(data) if not isinstance(data, str) else data, encoding='utf-8')
+    return str(path)
+
+class TestValidateAssessment:
+
+    def test_valid_assessment(self, catalog):
+        """Test qu'une évaluation conforme ne produit aucun problème"""
+        data = _assessment(("A.5.1", "Implemented"), ("A.8.1", "Not Applicable"))
+        assert validate_assessment(data, catalog) == []
+
+    def test_unknown_control_and_invalid_status(self, catalog):
+        """Test la détection des contrôles inconnus et des statuts invalides"""
+        data = _assessment(("Z.9.9", "Implemented"), ("A.5.1", "Done"))
+        assert _codes(validate_assessment(data, catalog)) == ['invalid_status', 'unknown_control']
+
+    def test_duplicate_control_is_warning(self, catalog):
+        """Test qu'un contrôle évalué deux fois est un avertissement"""
+        data = _assessment(("A.5.1", "Implemented"), ("A.5.1", "Not Implemented"))
+        issues = validate_assessment(data, catalog)
+        assert _codes(issues) == ['duplicate_control']
+        assert issues[0]['severity'] == 'warning'
+
+    def test_timestamps(self, catalog):
+        """Test les horodatages invalides ou dans le futur"""
+        data = _assessment(("A.5.1", "Implemented"), ("A.5.2", "Implemented"))
+        data['metadata']['date'] = 'yesterday'
+        data['controls_assessment'][1]['assessed_at'] = '2999-01-01T00:00:00+00:00'
+        assert _codes(validate_assessment(data, catalog)) == ['future_timestamp', 'invalid_timestamp']
+
+    def test_structure_errors(self, catalog):
+        """Test les erreurs de structure (objet, métadonnées, version)"""
+        assert _codes(validate_assessment([], catalog)) == ['not_an_object']
+        assert _codes(validate_assessment({}, catalog)) == ['missing_controls', 'missing_metadata']
+
+        data = _assessment(("A.5.1", "Implemented"))
+        data['metadata']['version'] = -1
+        data['controls_assessment'].append({'status': 'Implemented'})
+        data['controls_assessment'].append("A.5.2")
+        assert _codes(validate_assessment(data, catalog)) == ['invalid_item', 'invalid_version',
+                                                             'missing_field']
+
+    def test_non_string_control_id_or_status(self, catalog):
+        """Test un ID ou un statut non textuel (liste, objet) sans exception"""
+        data = _assessment(("A.5.1", "Implemented"))
+        data['controls_assessment'] += [
+            {'control_id': ['A.5.2'], 'status': 'Implemented'},
+            {'control_id': {'id': 'A.5.3'}, 'status': 'Implemented'},
+            {'control_id': 'A.5.4', 'status': ['Implemented']}
+        ]
+        issues = validate_assessment(data, catalog)
+        assert _codes(issues) == ['invalid_item'] * 3
+        assert [issue['index'] for issue in issues] == [1, 2, 3]
+
+class TestArchiveScan:
+
+    def test_validate_unreadable_file(self, tmp_path, catalog):
+        """Test qu'un fichier JSON illisible est signalé"""
+        result = validate_file(_write(tmp_path / "broken.json", "{not json"), catalog)
+        assert not result['valid']
+        assert _codes(result['issues']) == ['unreadable']
+
+    def test_scan_archive_recurses(self, tmp_path):
+        """Test le parcours récursif de l'archive (fichiers .json seulement)"""
+        (tmp_path / "2026").mkdir()
+        _write(tmp_path / "ok.json", _assessment(("A.5.1", "Implemented")))
+        _write(tmp_path / "2026" / "bad.json", _assessment(("Z.1", "Implemented")))
+        _write(tmp_path / "notes.txt", "ignored")
+
+        assert len(list(iter_assessment_files(str(tmp_path)))) == 2
+        results = {r['path'].rsplit('/', 1)[-1]: r
+                   for r in scan_archive(str(tmp_path), CONTROLS_FILE, workers=2, chunksize=1)}
+        assert set(results) == {"ok.json", "bad.json"}
+        assert results["ok.json"]['valid']
+        assert not results["bad.json"]['valid']
+
+    def test_scan_archive_survives_malformed_item(self, tmp_path):
+        """Test qu'un fichier modifié à la main n'interrompt pas le scan de l'archive"""
+        data = _assessment(("A.5.1", "Implemented"))
+        data['controls_assessment'].append({'control_id': ['A.5.2'], 'status': 'Implemented'})
+        _write(tmp_path / "edited.json", data)
+        _write(tmp_path / "ok.json", _assessment(("A.5.1", "Implemented")))
+
+        results = {r['path'].rsplit('/', 1)[-1]: r
+                   for r in scan_archive(str(tmp_path), CONTROLS_FILE, workers=2, chunksize=1)}
+        assert results["ok.json"]['valid']
+        assert _codes(results["edited.json"]['issues']) == ['invalid_item']
+
+    def test_main_writes_jsonl_and_exit_code(self, tmp_path):
+        """Test le rapport JSON Lines et le code de sortie de la commande"""
+        archive = tmp_path / "archive"
+        archive.mkdir()
+        _write(archive / "ok.json", _assessment(("A.5.1", "Implemented")))
+        output = tmp_path / "report.jsonl"
+
+        assert main([str(archive), '--workers', '1', '--output', str(output), '--all']) == 0
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert lines[0]['valid']
+        assert lines[-1]['summary']['files'] == 1
+
+        _write(archive / "bad.json", _assessment(("A.5.1", "Unknown")))
+        assert main([str(archive), '--workers', '1', '--output', str(output)]) == 1
+        summary = json.loads(output.read_text().splitlines()[-1])['summary']
+        assert summary['invalid'] == 1 and summary['errors'] == 1
@@ -0,0 +1,58 @@
+"""
+Tests pour le module pdf_fonts
+"""
+import os
+from datetime import datetime, timezone
+
+import pytest
+from fpdf import FPDF
+
+from modules import pdf_fonts
+
+CREATION_DATE = datetime(2026, 1, 13, tzinfo=timezone.utc)
+
+pytestmark = pytest.mark.skipif(not pdf_fonts.unicode_fonts_available(),
+                                reason="DejaVu fonts not available")
+
+def _document(text):
+    pdf = FPDF()
+    pdf.set_creation_date(CREATION_DATE)
+    pdf.add_page()
+    pdf_fonts.install_font(pdf, '', cache_dir=None)
+    pdf.set_font(pdf_fonts.FONT_FAMILY, '', 12)
+    pdf.cell(0, 10, text)
+    return bytes(pdf.output())
+
+class TestPdfFonts:
+    
+    def test_disk_cache_round_trip(self, tmp_path):
+        """Test que les métriques relues du cache disque sont identiques"""
+        path = pdf_fonts.font_path('')
+        parsed = pdf_fonts.FontMetrics.parse(path)
+        pdf_fonts._load_metrics(path, str(tmp_path))
+        assert len(os.listdir(tmp_path)) == 1
+
+        cached = pdf_fonts._load_metrics(path, str(tmp_path))
+        assert cached.cmap == parsed.cmap
+        assert cached.cw == parsed.cw
+        assert cached.glyph_ids == parsed.glyph_ids
+        assert cached.descriptor == parsed.descriptor
+    
+    def test_metrics_parsed_once_per_process(self, monkeypatch):
+        """Test que la police n'est analysée qu'une fois par processus"""
+        pdf_fonts.get_metrics(pdf_fonts.font_path(''), cache_dir=None)
+        monkeypatch.setattr(pdf_fonts.FontMetrics, 'parse',
+                            lambda path: pytest.fail("font parsed again"))
+        _document("Déjà vu")
+        _document("Encore")
+    
+    def test_same_output_as_add_font(self):
+        """Test que le PDF produit est identique à celui de FPDF.add_font"""
+        text = "Société Générale — Zürich “Ω” → ✓"
+        reference = FPDF()
+        reference.set_creation_date(CREATION_DATE)
+        reference.add_page()
+        reference.add_font(pdf_fonts.FONT_FAMILY, '', pdf_fonts.font_path(''))
+        reference.set_font(pdf_fonts.FONT_FAMILY, '', 12)
+        reference.cell(0, 10, text)
+        assert _document(text) == bytes(reference.output())
@@ -0,0 +1,169 @@
+"""
+Tests pour le module peer_benchmark
+"""
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+from modules.assessment_store import AssessmentStore
+from modules.peer_benchmark import PeerBenchmark, percentile_rank
+
+def _assessment(organization, implemented, total=4, sector=None, date='2026-01-13T12:00:00'):
+    metadata = {'organization': organization, 'assessor': 'Jane Doe', 'date': date,
+                'standard': 'ISO/IEC 27001:2022'}
+    if sector:
+        metadata['sector'] = sector
+    return {
+        'metadata': metadata,
+        'controls_assessment': [
+            {'control_id': f'A.5.{i}', 'control_title': 'Control', 'domain': 'Organizational controls',
+             'status': 'Implemented' if i < implemented else 'Not Implemented',
+             'evidence': '', 'comments': ''}
+            for i in range(total)
+        ]
+    }
+
+def _stats(overall):
+    return {'overall_score': overall, 'domain_scores': {'Organizational controls': overall}}
+
+class TestPercentileRank:
+
+    def test_ties_count_half(self):
+        """Test que les ex aequo comptent pour moitié dans le rang centile"""
+        assert percentile_rank([10, 20, 20, 30], 20) == (50.0, 4)
+        assert percentile_rank([10, 20, 30], 5) == (0.0, 3)
+        assert percentile_rank([10, 20, 30], 35) == (100.0, 3)
+
+    def test_exclude_own_score(self):
+        """Test l'exclusion du score de l'organisation évaluée"""
+        assert percentile_rank([10, 20, 30], 20, exclude=20) == (50.0, 2)
+        assert percentile_rank([10, 20, 30], 25, exclude=10) == (50.0, 2)
+        assert percentile_rank([20], 20, exclude=20) == (None, 0)
+
+class TestPeerBenchmark:
+
+    def test_rank_excludes_own_organization(self):
+        """Test que l'organisation n'est pas comparée à elle-même"""
+        benchmark = PeerBenchmark(min_peers=1)
+        for index, score in enumerate([0, 25, 50, 75, 100]):
+            benchmark.update(f'src{index}', _assessment(f'Org {index}', 0), _stats(score))
+
+        assert benchmark.percentile(50)['percentile'] == 50.0
+        rank = benchmark.percentile(50, organization='org 2')
+        assert rank == {'percentile': 50.0, 'peers': 4}
+
+    def test_latest_assessment_per_organization(self):
+        """Test que seule la dernière évaluation d'une organisation compte"""
+        benchmark = PeerBenchmark(min_peers=1)
+        benchmark.update('old', _assessment('Acme', 0, date='2025-01-01'), _stats(10))
+        benchmark.update('new', _assessment('Acme', 0, date='2026-01-01'), _stats(90))
+        assert len(benchmark) == 1
+        assert benchmark.percentile(50) == {'percentile': 0.0, 'peers': 1}
+
+        benchmark.remove('new')
+        assert benchmark.percentile(50) == {'percentile': 100.0, 'peers': 1}
+        benchmark.remove('old')
+        assert benchmark.percentile(50) == {'percentile': None, 'peers': 0}
+
+    def test_resave_replaces_scores(self):
+        """Test qu'une évaluation réenregistrée remplace ses scores"""
+        benchmark = PeerBenchmark(min_peers=1)
+        benchmark.update('a', _assessment('Acme', 0), _stats(10))
+        benchmark.update('a', _assessment('Acme', 0), _stats(90))
+        assert benchmark.percentile(50) == {'percentile': 0.0, 'peers': 1}
+
+    def test_sector_population(self):
+        """Test la population de comparaison par secteur"""
+        benchmark = PeerBenchmark(min_peers=1)
+        benchmark.update('a', _assessment('A', 0, sector='Finance'), _stats(90))
+        benchmark.update('b', _assessment('B', 0, sector='Health'), _stats(10))
+        benchmark.update('c', _assessment('C', 0, sector='Finance'), _stats(30))
+
+        assert benchmark.percentile(50)['peers'] == 3
+        assert benchmark.percentile(50, sector='Finance') == {'percentile': 50.0, 'peers': 2}
+
+        result = benchmark.benchmark(_assessment('D', 0, sector='Finance'), _stats(50))
+        assert result['sector'] == 'Finance'
+        assert result['overall'] == {'percentile': 66.7, 'peers': 3}
+        assert result['sector_overall'] == {'percentile': 50.0, 'peers': 2}
+        assert result['domains']['Organizational controls']['peers'] == 3
+
+    def test_min_peers_hides_rank(self):
+        """Test que le rang est masqué sous le nombre minimal de pairs"""
+        benchmark = PeerBenchmark(min_peers=5)
+        benchmark.update('a', _assessment('A', 0), _stats(90))
+        assert benchmark.percentile(50) == {'percentile': None, 'peers': 1}
+
+    def test_sync_reloads_changed_files_only(self, tmp_path):
+        """Test que la relecture de l'archive ne relit que les fichiers modifiés"""
+        for index in range(3):
+            (tmp_path / f'{index}.json').write_text(
+                json.dumps(_assessment(f'Org {index}', index)), encoding='utf-8')
+        (tmp_path / 'broken.json').write_text('{', encoding='utf-8')
+
+        benchmark = PeerBenchmark(min_peers=1)
+        assert benchmark.sync(str(tmp_path)) == 4
+        assert len(benchmark) == 3
+        assert benchmark.sync(str(tmp_path)) == 0
+
+        path = tmp_path / '0.json'
+        path.write_text(json.dumps(_assessment('Org 0', 4)), encoding='utf-8')
+        os.utime(path, ns=(2_000_000_000_000_000_000,) * 2)
+        os.unlink(tmp_path / '1.json')
+        assert benchmark.sync(str(tmp_path)) == 1
+        assert len(benchmark) == 2
+        assert benchmark.percentile(60) == {'percentile': 50.0, 'peers': 2}
+
+    def test_sync_all_uneven_roots_concurrently(self, tmp_path):
+        """Test la relecture parallèle de racines de tailles inégales"""
+        roots = []
+        for shard, count in enumerate((10, 4000, 4000)):
+            root = tmp_path / f'shard-{shard}'
+            root.mkdir()
+            for index in range(count):
+                (root / f'{index}.json').write_text(
+                    json.dumps(_assessment(f'Org {shard}-{index}', 1, total=1)), encoding='utf-8')
+            roots.append(str(root))
+
+        # Bascules entre threads fréquentes : les parcours se chevauchent
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for _ in range(3):
+                benchmark = PeerBenchmark(min_peers=1)
+                update = benchmark.update
+                loaded = []
+                started = threading.Event()
+                def scored_update(source, assessment):
+                    # La petite racine termine pendant que les grandes sont relues
+                    if os.path.basename(os.path.dirname(source)) == 'shard-0':
+                        started.wait(5)
+                    else:
+                        loaded.append(source)
+                        if len(loaded) == 2000:
+                            started.set()
+                    update(source, assessment, _stats(50))
+                benchmark.update = scored_update
+                assert benchmark.sync_all(roots) == 8010
+        finally:
+            sys.setswitchinterval(switch_interval)
+        assert len(benchmark) == 8010
+        assert benchmark.sync_all(roots) == 0
+
+        for index in range(10):
+            os.unlink(tmp_path / 'shard-0' / f'{index}.json')
+        assert benchmark.sync_all(roots) == 0
+        assert len(benchmark) == 8000
+
+    def test_store_updates_on_save(self):
+        """Test la mise à jour à chaque écriture du stockage partagé"""
+        benchmark = PeerBenchmark(min_peers=1)
+        store = AssessmentStore(on_persist=benchmark.update)
+        assessment_id, _ = store.create('Acme', 'Jane Doe', sector='Finance')
+        assert benchmark.percentile(50, sector='Finance') == {'percentile': 100.0, 'peers': 1}
+
+        store.assess_control(assessment_id, 0, 'A.5.1', 'Implemented')
+        assert benchmark.percentile(50, sector='Finance') == {'percentile': 0.0, 'peers': 1}
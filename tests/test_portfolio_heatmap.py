@@ -0,0 +1,73 @@
+"""
+Tests pour le module portfolio_heatmap
+"""
+import pytest
+
+from modules.peer_benchmark import PeerBenchmark
+from modules.portfolio_heatmap import PortfolioHeatmap
+from modules.visualizations import portfolio_heatmap_data
+
+def _rows(count):
+    return [(f"Org {i}", {'overall': float(i), 'Organizational controls': float(i),
+                          'Technological controls': 100.0 - i})
+            for i in range(count)]
+
+class TestPortfolioHeatmap:
+
+    def test_tile_is_bounded(self):
+        """Test qu'une tuile regroupe les organisations en un nombre borné de tranches"""
+        heatmap = PortfolioHeatmap(_rows(1000))
+        tile = heatmap.tile(max_rows=40)
+        assert tile['domains'] == ['Organizational controls', 'Technological controls']
+        assert len(tile['rows']) == len(tile['z']) == 40
+        assert sum(row['count'] for row in tile['rows']) == 1000
+        # Tranches de 25 organisations consécutives (scores 0-24, 25-49...)
+        assert tile['rows'][0] == {'label': '25 organizations (0% - 24%)', 'start': 0, 'end': 25,
+                                   'count': 25, 'min_overall': 0.0, 'max_overall': 24.0}
+        assert tile['z'][0] == [12.0, 88.0]
+
+    def test_drill_down_to_organizations(self):
+        """Test le zoom jusqu'aux organisations et les plages hors limites"""
+        heatmap = PortfolioHeatmap(reversed(_rows(100)))
+        tile = heatmap.tile(10, 20, max_rows=50)
+        assert [row['label'] for row in tile['rows']] == [f"Org {i}" for i in range(10, 20)]
+        assert tile['z'][0] == [10.0, 90.0]
+        # Plage hors limites : ramenée aux organisations existantes
+        assert heatmap.tile(90, 500)['end'] == 100
+        assert heatmap.tile(200)['rows'] == []
+        with pytest.raises(ValueError):
+            heatmap.tile(max_rows=0)
+
+    def test_min_bucket_hides_individual_scores(self):
+        """Test qu'aucune tranche ne compte moins de min_bucket organisations"""
+        heatmap = PortfolioHeatmap(_rows(23), min_bucket=5)
+        tile = heatmap.tile(max_rows=50)
+        assert [row['count'] for row in tile['rows']] == [5, 6, 6, 6]
+        # Zoom sur une tranche : élargie à min_bucket, sans nom d'organisation
+        zoomed = heatmap.tile(3, 4)
+        assert (zoomed['start'], zoomed['end']) == (3, 8)
+        assert [row['label'] for row in zoomed['rows']] == ['5 organizations (3% - 7%)']
+        assert heatmap.tile(21, 23)['start'] == 18
+        assert PortfolioHeatmap(_rows(4), min_bucket=5).tile()['rows'] == []
+        with pytest.raises(ValueError):
+            PortfolioHeatmap(_rows(4), min_bucket=0)
+
+    def test_missing_domain_scores(self):
+        """Test les domaines sans score pour une partie des organisations"""
+        heatmap = PortfolioHeatmap([('A', {'overall': 10.0, 'D1': 10.0}),
+                                    ('B', {'overall': 20.0, 'D2': 20.0}),
+                                    ('C', {'overall': 30.0, 'D2': 40.0})])
+        assert heatmap.tile(max_rows=3)['z'] == [[10.0, None], [None, 20.0], [None, 40.0]]
+        # Moyenne sur les seules organisations ayant un score dans le domaine
+        assert heatmap.tile(max_rows=1)['z'] == [[10.0, 30.0]]
+
+    def test_from_peer_benchmark(self):
+        """Test la heatmap construite depuis les scores des pairs"""
+        peers = PeerBenchmark()
+        for index, score in enumerate([80.0, 20.0]):
+            peers.update(f'src{index}', {'metadata': {'organization': f'Org {index}'}},
+                         {'overall_score': score, 'domain_scores': {'D1': score}})
+        data = portfolio_heatmap_data(PortfolioHeatmap(peers.latest_scores()).tile())
+        assert data['y'] == ['Org 1', 'Org 0']
+        assert data['ranges'] == [[0, 1], [1, 2]]
+        assert data['z'] == [[20.0], [80.0]]
@@ -0,0 +1,155 @@
+"""
+Tests pour le module remediation
+"""
+import json
+
+import pytest
+
+from modules.remediation import (
+    RemediationIndex, RemediationItemNotFoundError, add_remediation_items, open_items,
+    update_remediation_item
+)
+
+def _assessment(organization='Acme', statuses=None):
+    statuses = statuses or [('A.5.1', 'Implemented'), ('A.5.2', 'Partially Implemented'),
+                            ('A.8.1', 'Not Implemented'), ('A.8.5', 'Not Implemented')]
+    return {
+        'metadata': {'organization': organization, 'date': '2026-01-13T12:00:00', 'version': 0},
+        'controls_assessment': [
+            {'control_id': control_id, 'control_title': f'Control {control_id}',
+             'domain': 'Technological controls' if control_id.startswith('A.8') else
+                       'Organizational controls', 'status': status}
+            for control_id, status in statuses
+        ]
+    }
+
+class TestRemediationItems:
+
+    def test_items_from_gaps(self):
+        """Test la création des éléments depuis les gaps (priorité, échéance)"""
+        assessment = _assessment()
+        created = add_remediation_items(assessment, ' Alice ', '2026-01-01',
+                                        {'A.8.5': {'mandatory': True}})
+
+        by_control = {item['control_id']: item for item in created}
+        assert set(by_control) == {'A.5.2', 'A.8.1', 'A.8.5'}
+        assert by_control['A.8.5']['priority'] == 'Critical'
+        assert by_control['A.8.5']['due_date'] == '2026-01-31'
+        assert by_control['A.8.1']['priority'] == 'High'
+        assert by_control['A.8.1']['due_date'] == '2026-04-01'
+        assert by_control['A.5.2']['priority'] == 'Medium'
+        assert all(item['owner'] == 'Alice' and item['state'] == 'Open' for item in created)
+        assert assessment['remediation'] == created
+
+    def test_repeated_call_skips_tracked_and_fixed_controls(self):
+        """Test qu'un nouvel appel ignore les contrôles suivis ou corrigés"""
+        assessment = _assessment()
+        first = add_remediation_items(assessment)
+        assert add_remediation_items(assessment) == []
+
+        # Réévaluation : A.8.1 corrigé, A.5.1 régresse
+        assessment['controls_assessment'] += [
+            {'control_id': 'A.8.1', 'control_title': 'Control A.8.1',
+             'domain': 'Technological controls', 'status': 'Implemented'},
+            {'control_id': 'A.5.1', 'control_title': 'Control A.5.1',
+             'domain': 'Organizational controls', 'status': 'Not Implemented'}
+        ]
+        done = next(item for item in first if item['control_id'] == 'A.5.2')
+        update_remediation_item(assessment, done['id'], state='Done')
+        created = add_remediation_items(assessment)
+        assert sorted(item['control_id'] for item in created) == ['A.5.1', 'A.5.2']
+
+    def test_update_validation(self):
+        """Test la modification et la validation d'un élément"""
+        assessment = _assessment()
+        item = add_remediation_items(assessment, start='2026-01-01')[0]
+
+        updated = update_remediation_item(assessment, item['id'], owner='Bob',
+                                          due_date='2026-02-15', state='In Progress')
+        assert (updated['owner'], updated['due_date'], updated['state']) == \
+            ('Bob', '2026-02-15', 'In Progress')
+        with pytest.raises(ValueError):
+            update_remediation_item(assessment, item['id'], state='Closed')
+        with pytest.raises(ValueError):
+            update_remediation_item(assessment, item['id'], due_date='15/02/2026')
+        with pytest.raises(RemediationItemNotFoundError):
+            update_remediation_item(assessment, 'unknown', owner='Bob')
+        with pytest.raises(ValueError):
+            update_remediation_item(assessment, item['id'], owner=42)
+        # Requête rejetée : aucun champ modifié
+        with pytest.raises(ValueError):
+            update_remediation_item(assessment, item['id'], due_date='2030-01-01', owner=5)
+        assert item['due_date'] == '2026-02-15'
+        with pytest.raises(ValueError):
+            add_remediation_items(_assessment(), owner=['Bob'])
+        assert add_remediation_items(_assessment(), owner=None)[0]['owner'] == ''
+
+        update_remediation_item(assessment, item['id'], state='Done')
+        assert item['id'] not in {i['id'] for i in open_items(assessment)}
+
+class TestRemediationIndex:
+
+    def _index(self):
+        index = RemediationIndex()
+        acme = _assessment('Acme')
+        add_remediation_items(acme, 'Alice', '2026-01-01', {'A.8.5': {'mandatory': True}})
+        beta = _assessment('Beta', [('A.5.3', 'Not Implemented')])
+        add_remediation_items(beta, 'bob', '2026-03-01')
+        index.update('acme', acme)
+        index.update('beta', beta)
+        return index, acme, beta
+
+    def test_overdue_and_due_within(self):
+        """Test les éléments en retard ou à échéance proche"""
+        index, _, _ = self._index()
+        assert len(index) == 4
+
+        overdue = index.overdue('2026-05-01')
+        assert [item['due_date'] for item in overdue] == ['2026-01-31', '2026-04-01']
+        assert overdue[0]['organization'] == 'Acme'
+        assert index.overdue('2026-05-01', limit=1) == overdue[:1]
+
+        # Échéance du jour incluse, à J+7 incluse
+        assert [item['control_id'] for item in index.due_within(7, today='2026-01-31')] == ['A.8.5']
+        assert [item['control_id'] for item in index.due_within(7, today='2026-01-24')] == ['A.8.5']
+        assert index.due_within(7, today='2026-01-23') == []
+
+        assert [item['control_id'] for item in index.overdue('2026-07-01', owner='BOB')] == ['A.5.3']
+        assert index.due_within(7, owner='Alice', today='2026-05-30') == []
+        assert index.overdue('2026-07-01', owner='nobody') == []
+        for days in (-1, 10 ** 10):
+            with pytest.raises(ValueError):
+                index.due_within(days, today='2026-01-24')
+
+    def test_update_replaces_and_remove(self):
+        """Test le remplacement et la suppression des éléments d'une évaluation"""
+        index, acme, _ = self._index()
+        item = next(i for i in acme['remediation'] if i['control_id'] == 'A.8.5')
+        update_remediation_item(acme, item['id'], owner='Carol', state='Done')
+        index.update('acme', acme)
+
+        assert len(index) == 3
+        assert 'A.8.5' not in {i['control_id'] for i in index.overdue('2027-01-01')}
+        assert index.overdue('2027-01-01', owner='Carol') == []
+
+        index.remove('acme')
+        assert [item['organization'] for item in index.overdue('2027-01-01')] == ['Beta']
+        index.remove('unknown')
+
+    def test_sync_directory(self, tmp_path):
+        """Test la mise à jour de l'index depuis un répertoire"""
+        assessment = _assessment()
+        add_remediation_items(assessment, 'Alice', '2026-01-01')
+        path = tmp_path / 'acme.json'
+        path.write_text(json.dumps(assessment))
+        (tmp_path / 'broken.json').write_text('{')
+
+        index = RemediationIndex()
+        index.sync(str(tmp_path))
+        assert len(index) == 3
+        assert index.sync(str(tmp_path)) == 0
+
+        path.unlink()
+        index.sync(str(tmp_path))
+        assert len(index) == 0
+        assert index.sync(str(tmp_path / 'missing')) == 0
@@ -127,3 +127,182 @@ class TestReportGenerator:
         
         # Nettoyer
         os.remove(report_path)
+    
+    def test_generate_pdf_to_file_object(self, sample_data):
+        """Test la génération vers un objet fichier (sans disque)"""
+        import io
+        
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        
+        buffer = io.BytesIO()
+        result = report_gen.generate_pdf(None, sample_data['charts'], output=buffer)
+        
+        assert result is buffer
+        assert buffer.getvalue().startswith(b'%PDF')
+    
+    def test_generate_pdf_requires_destination(self, sample_data):
+        """Test le refus d'une génération sans nom de fichier ni objet fichier"""
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        
+        with pytest.raises(ValueError):
+            report_gen.generate_pdf(None, sample_data['charts'])
+        assert not os.path.exists("data/assessments/None.pdf")
+    
+    def test_generate_pdf_bytes(self, sample_data):
+        """Test la génération du PDF en mémoire"""
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        
+        pdf_bytes = report_gen.generate_pdf_bytes(sample_data['charts'])
+        
+        assert isinstance(pdf_bytes, bytes)
+        assert pdf_bytes.startswith(b'%PDF')
+    
+    def test_generate_pdf_with_appendix(self, sample_data):
+        """Test l'annexe alimentée par l'évaluation"""
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        
+        with_appendix = report_gen.generate_pdf_bytes({}, include_appendix=True)
+        without_appendix = report_gen.generate_pdf_bytes({})
+        
+        assert with_appendix.startswith(b'%PDF')
+        assert len(with_appendix) > len(without_appendix)
+    
+    def test_appendix_from_generator(self, sample_data):
+        """Test l'annexe alimentée par un générateur avec textes longs"""
+        consumed = []
+        
+        def items():
+            for i in range(500):
+                consumed.append(i)
+                yield {
+                    'control_id': f"A.5.{i}",
+                    'status': 'Implemented',
+                    'evidence': "Politique de sécurité — version " + "longue " * 80,
+                    'comments': "x" * 300
+                }
+        
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        pdf_bytes = report_gen.generate_pdf_bytes({}, appendix_items=items())
+        
+        assert len(consumed) == 500
+        assert pdf_bytes.startswith(b'%PDF')
+    
+    def test_wrap_text_fits_width(self):
+        """Test le retour à la ligne de l'annexe"""
+        from modules.report_generator import _wrap_text
+        
+        measure = lambda text: float(len(text))
+        lines = _wrap_text("aaa bbb ccc " + "d" * 25, 10, measure)
+        
+        assert lines[0] == "aaa bbb"
+        assert all(measure(line) <= 10 for line in lines)
+        assert "".join(lines).replace(" ", "") == "aaabbbccc" + "d" * 25
+    
+    def test_generate_pdf_with_delta(self, sample_data):
+        """Test la section delta du rapport"""
+        from modules.assessment_diff import diff_assessments
+        import copy
+        
+        previous = copy.deepcopy(sample_data['assessment'])
+        previous['controls_assessment'][2]['status'] = 'Implemented'
+        delta = diff_assessments(previous, sample_data['assessment'])
+        
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps'],
+            delta=delta
+        )
+        
+        with_delta = report_gen.generate_pdf_bytes({})
+        report_gen.delta = None
+        
+        assert len(with_delta) > len(report_gen.generate_pdf_bytes({}))
+    
+    def test_generate_pdf_with_peer_benchmark(self, sample_data):
+        """Test le positionnement par rapport aux pairs dans le résumé exécutif"""
+        from modules.peer_benchmark import PeerBenchmark
+        
+        peers = PeerBenchmark(min_peers=2)
+        for index, score in enumerate([20.0, 60.0, 90.0]):
+            peers.update(f'peer{index}', {'metadata': {'organization': f'Peer {index}'}}, {
+                'overall_score': score,
+                'domain_scores': {domain: score for domain in sample_data['statistics']['domain_scores']}
+            })
+        benchmark = peers.benchmark(sample_data['assessment'], sample_data['statistics'])
+        assert benchmark['overall']['peers'] == 3
+        
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps'],
+            benchmark=benchmark
+        )
+        
+        with_benchmark = report_gen.generate_pdf_bytes({})
+        report_gen.benchmark = None
+        
+        assert len(with_benchmark) > len(report_gen.generate_pdf_bytes({}))
+    
+    def test_generate_pdf_unicode_text(self, sample_data):
+        """Test les caractères hors latin-1 avec la police TTF intégrée"""
+        sample_data['assessment']['metadata']['organization'] = "Société Générale — Zürich “Ω”"
+        sample_data['assessment']['controls_assessment'][0]['evidence'] = "Politique validée → ✓"
+        
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        assert report_gen.report_font == 'dejavu'
+        pdf_bytes = report_gen.generate_pdf_bytes({}, include_appendix=True)
+        assert pdf_bytes.startswith(b'%PDF')
+        assert b'/FontFile2' in pdf_bytes
+        
+        # Repli sur Arial : caractères non latin-1 remplacés
+        latin = ReportGenerator(sample_data['assessment'], sample_data['statistics'],
+                                sample_data['gaps'], unicode=False)
+        assert latin.report_font == 'Arial'
+        assert b'/FontFile2' not in latin.generate_pdf_bytes({}, include_appendix=True)
+    
+    def test_generate_pdf_with_remediation_plan(self, sample_data):
+        """Test le plan de remédiation (échéances réelles) dans le rapport"""
+        from modules.remediation import add_remediation_items
+        
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        without_plan = report_gen.generate_pdf_bytes({})
+        assert 'Critical gaps: 30 days' in report_gen._timeline()
+        
+        add_remediation_items(sample_data['assessment'], 'Alice', '2026-01-01')
+        report_gen = ReportGenerator(
+            sample_data['assessment'],
+            sample_data['statistics'],
+            sample_data['gaps']
+        )
+        assert [item['control_id'] for item in report_gen.remediation] == ['A.8.1', 'A.5.2']
+        assert '2026-04-01' in report_gen._timeline()
+        assert len(report_gen.generate_pdf_bytes({})) > len(without_plan)
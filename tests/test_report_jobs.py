@@ -0,0 +1,121 @@
+"""
+Tests pour le module report_jobs
+"""
+import pytest
+import time
+from modules.report_jobs import (
+    ReportJobQueue, JobNotFoundError, JobNotReadyError, job_key
+)
+
+@pytest.fixture
+def assessment():
+    """Évaluation de test"""
+    return {
+        'metadata': {
+            'organization': 'Test Corp',
+            'assessor': 'Jane Doe',
+            'date': '2026-01-13T12:00:00',
+            'standard': 'ISO/IEC 27001:2022'
+        },
+        'controls_assessment': [{
+            'control_id': 'A.5.1',
+            'control_title': 'Policies for information security',
+            'domain': 'Organizational controls',
+            'status': 'Implemented',
+            'evidence': 'Policy',
+            'comments': '',
+            'assessed_at': '2026-01-13T12:00:00'
+        }]
+    }
+
+@pytest.fixture
+def queue():
+    """File de jobs avec un pool de threads"""
+    q = ReportJobQueue(max_workers=1, ttl_seconds=60, use_processes=False)
+    yield q
+    q.shutdown()
+
+def _wait(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status['status'] in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    pytest.fail("job did not finish in time")
+
+class TestReportJobQueue:
+    
+    def test_job_key_depends_on_content_and_options(self, assessment):
+        """Test la clé de déduplication"""
+        assert job_key(assessment, {}) == job_key(dict(assessment), {})
+        assert job_key(assessment, {}) != job_key(assessment, {'include_appendix': True})
+    
+    def test_submit_and_download(self, queue, assessment):
+        """Test la génération complète d'un rapport"""
+        job = queue.submit(assessment)
+        
+        assert job['status'] in ('queued', 'running', 'done')
+        assert _wait(queue, job['job_id'])['status'] == 'done'
+        assert queue.result(job['job_id']).startswith(b'%PDF')
+    
+    def test_identical_requests_are_coalesced(self, queue, assessment):
+        """Test que deux demandes identiques partagent le même job"""
+        first = queue.submit(assessment)
+        second = queue.submit(assessment)
+        third = queue.submit(assessment, {'include_appendix': True})
+        
+        assert first['job_id'] == second['job_id']
+        assert third['job_id'] != first['job_id']
+        
+        _wait(queue, first['job_id'])
+        # Résultat en cache : toujours le même job
+        assert queue.submit(assessment)['job_id'] == first['job_id']
+        _wait(queue, third['job_id'])
+    
+    def test_result_not_ready(self, assessment):
+        """Test la lecture d'un job pas encore terminé"""
+        from concurrent.futures import ThreadPoolExecutor
+        import threading
+        
+        gate = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.submit(gate.wait)
+        queue = ReportJobQueue(executor=executor)
+        
+        job = queue.submit(assessment)
+        with pytest.raises(JobNotReadyError):
+            queue.result(job['job_id'])
+        assert queue.status(job['job_id'])['status'] == 'queued'
+        
+        gate.set()
+        _wait(queue, job['job_id'])
+        queue.shutdown()
+    
+    def test_expired_jobs_are_purged(self, assessment):
+        """Test l'expiration du cache après le TTL"""
+        queue = ReportJobQueue(max_workers=1, ttl_seconds=0.5, use_processes=False)
+        job = queue.submit(assessment)
+        _wait(queue, job['job_id'])
+        time.sleep(0.6)
+        
+        with pytest.raises(JobNotFoundError):
+            queue.status(job['job_id'])
+        assert queue.submit(assessment)['job_id'] != job['job_id']
+        queue.shutdown()
+    
+    def test_failed_job_is_retried(self, queue):
+        """Test qu'un job en échec n'est pas réutilisé"""
+        broken = {'controls_assessment': []}
+        
+        job = queue.submit(broken)
+        status = _wait(queue, job['job_id'])
+        
+        assert status['status'] == 'failed'
+        assert 'error' in status
+        assert queue.submit(broken)['job_id'] != job['job_id']
+    
+    def test_unknown_job(self, queue):
+        """Test un identifiant de job inconnu"""
+        with pytest.raises(JobNotFoundError):
+            queue.status('missing')
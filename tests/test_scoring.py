@@ -159,3 +159,15 @@ class TestComplianceScoring:
         score = scoring.calculate_overall_score()
         
         assert score == 0.0
+    
+    def test_statistics_empty_assessment(self):
+        """Test les statistiques et gaps d'une évaluation vide"""
+        checker = ComplianceChecker()
+        assessment = checker.start_assessment("Empty Org", "Tester")
+        scoring = ComplianceScoring(assessment)
+        
+        stats = scoring.get_statistics()
+        
+        assert stats['total_controls'] == 0
+        assert stats['domain_scores'] == {}
+        assert scoring.get_gaps() == []
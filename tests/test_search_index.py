@@ -0,0 +1,143 @@
+"""
+Tests pour le module search_index
+"""
+import pytest
+from modules.compliance_checker import ComplianceChecker
+from modules.search_index import CANDIDATE_LIMIT, SearchIndex, tokenize
+
+@pytest.fixture
+def index():
+    """Index vide"""
+    return SearchIndex()
+
+@pytest.fixture
+def checker(index):
+    """Checker relié à l'index, avec une évaluation démarrée"""
+    checker = ComplianceChecker(search_index=index)
+    checker.start_assessment("Test Corp", "Jane Doe")
+    return checker
+
+class TestTokenize:
+    
+    def test_lowercase_and_accents(self):
+        """Test la normalisation des jetons"""
+        assert tokenize("Sécurité Réseau") == ["securite", "reseau"]
+    
+    def test_control_ids_kept_whole(self):
+        """Test que les IDs de contrôle restent un seul jeton"""
+        assert tokenize("See A.5.1, then A.8.24.") == ["see", "a.5.1", "then", "a.8.24"]
+
+class TestSearchIndex:
+    
+    def test_catalog_indexed_on_init(self, checker, index):
+        """Test l'indexation du catalogue par le checker"""
+        results = index.search("cryptography", doc_type="control")
+        
+        assert any(r['control_id'] == "A.8.24" for r in results)
+    
+    def test_prefix_search(self, checker, index):
+        """Test la recherche par préfixe (typeahead)"""
+        results = index.search("crypt")
+        
+        assert "A.8.24" in [r['control_id'] for r in results]
+        assert index.search("zzzz") == []
+    
+    def test_all_terms_required(self, checker, index):
+        """Test que tous les termes doivent correspondre"""
+        results = index.search("access control", doc_type="control", limit=100)
+        
+        assert results
+        assert index.search("access zzzz") == []
+    
+    def test_assess_control_updates_index(self, checker, index):
+        """Test la mise à jour incrémentale par assess_control"""
+        assert index.search("sharepoint") == []
+        
+        checker.assess_control("A.5.1", "Implemented", "Policy stored in SharePoint", "Approuvé")
+        
+        results = index.search("sharepoint")
+        assert len(results) == 1
+        assert results[0]['type'] == "assessment_item"
+        assert results[0]['control_id'] == "A.5.1"
+        assert results[0]['organization'] == "Test Corp"
+        assert index.search("approuve")[0]['control_id'] == "A.5.1"
+    
+    def test_ranking_by_occurrences(self, index):
+        """Test le classement par nombre d'occurrences"""
+        index.add_document("a", {"text": "backup"}, {"type": "note"})
+        index.add_document("b", {"text": "backup backup restore"}, {"type": "note"})
+        
+        assert [r['doc_id'] for r in index.search("backup")] == ["b", "a"]
+    
+    def test_replace_and_remove_document(self, index):
+        """Test le remplacement et la suppression d'un document"""
+        index.add_document("a", {"text": "firewall"}, {"type": "note"})
+        index.add_document("a", {"text": "antivirus"}, {"type": "note"})
+        
+        assert index.search("firewall") == []
+        assert len(index.search("antivirus")) == 1
+        
+        index.remove_document("a")
+        assert index.search("antivirus") == []
+        assert index.expand_prefix("anti") == []
+        assert len(index) == 0
+    
+    def test_remove_assessment(self, checker, index):
+        """Test la suppression des éléments d'une évaluation"""
+        checker.assess_control("A.5.1", "Implemented", "Notarized policy")
+        
+        index.remove_assessment(checker.assessment)
+        
+        assert index.search("notarized") == []
+        assert index.search("policies", doc_type="control")
+    
+    def test_cache_invalidated_on_write(self, index):
+        """Test que le cache de requêtes est invalidé par une écriture"""
+        index.add_document("a", {"text": "logging"}, {"type": "note"})
+        assert len(index.search("log")) == 1
+        
+        index.add_document("b", {"text": "logs"}, {"type": "note"})
+        assert len(index.search("log")) == 2
+    
+    def test_broad_prefix_is_capped(self, index):
+        """Test que les candidats d'un préfixe très large sont bornés avant le classement"""
+        for position in range(CANDIDATE_LIMIT * 3):
+            index.add_document(f"doc{position:04d}", {"text": f"audit{position} trail"},
+                               {"type": "note"})
+        
+        results = index.search("a", limit=5)
+        assert len(results) == 5
+        assert len(index.search("a", limit=CANDIDATE_LIMIT * 3)) == CANDIDATE_LIMIT
+        # Terme sélectif : trouvé même au-delà des premiers candidats
+        assert index.search("audit250 trail")[0]['doc_id'] == "doc0250"
+    
+    def test_catalog_reindex_removes_retired_controls(self, checker, index):
+        """Test qu'un nouveau catalogue remplace les contrôles de l'ancien"""
+        index.index_controls([{'id': 'A.5.1', 'title': 'Renamed policies'}])
+        
+        assert [r['control_id'] for r in index.search("renamed")] == ["A.5.1"]
+        assert index.search("cryptography", doc_type="control") == []
+    
+    def test_portfolio_sources(self, index, tmp_path):
+        """Test l'indexation du portefeuille par source et la relecture d'une archive"""
+        import json
+        assessment = {'metadata': {'organization': 'Acme'},
+                      'controls_assessment': [{'control_id': 'A.5.1', 'status': 'Implemented',
+                                               'evidence': 'Kerberos tickets'},
+                                              {'control_id': 'A.5.2', 'status': 'Implemented',
+                                               'evidence': 'Kerberos realm'}]}
+        index.update('acme', assessment)
+        assert len(index.search("kerberos")) == 2
+        
+        assessment['controls_assessment'].pop()
+        index.update('acme', assessment)
+        assert [r['control_id'] for r in index.search("kerberos")] == ['A.5.1']
+        index.remove('acme')
+        assert index.search("kerberos") == []
+        
+        (tmp_path / "acme.json").write_text(json.dumps(assessment), encoding='utf-8')
+        assert index.sync(str(tmp_path)) == 1
+        assert index.search("kerberos")[0]['organization'] == 'Acme'
+        (tmp_path / "acme.json").unlink()
+        index.sync(str(tmp_path))
+        assert len(index) == 0
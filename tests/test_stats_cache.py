@@ -0,0 +1,59 @@
+"""
+Tests pour le module stats_cache
+"""
+from modules.stats_cache import StatisticsCache, assessment_etag
+
+def _assessment(version=None):
+    metadata = {'organization': 'Test Corp', 'assessor': 'Jane Doe',
+                'date': '2026-01-13T12:00:00', 'standard': 'ISO/IEC 27001:2022'}
+    if version is not None:
+        metadata['version'] = version
+    return {
+        'metadata': metadata,
+        'controls_assessment': [
+            {'control_id': 'A.5.1', 'control_title': 'Policies', 'domain': 'Organizational controls',
+             'status': 'Implemented', 'evidence': '', 'comments': ''},
+            {'control_id': 'A.5.2', 'control_title': 'Roles', 'domain': 'Organizational controls',
+             'status': 'Not Implemented', 'evidence': '', 'comments': ''}
+        ]
+    }
+
+class TestAssessmentEtag:
+
+    def test_versioned_etag(self):
+        """Test l'ETag dérivé de l'identifiant et de la version"""
+        assert assessment_etag(_assessment(3), 'abc') == 'abc-v3'
+        assert assessment_etag(_assessment(3), 'abc') != assessment_etag(_assessment(4), 'abc')
+
+    def test_content_hash_fallback(self):
+        """Test l'ETag par empreinte du contenu pour une évaluation sans version"""
+        legacy = _assessment()
+        etag = assessment_etag(legacy)
+        assert etag == assessment_etag(_assessment())
+        legacy['controls_assessment'][0]['status'] = 'Not Implemented'
+        assert assessment_etag(legacy) != etag
+
+class TestStatisticsCache:
+
+    def test_computed_once_per_version(self):
+        """Test que les statistiques sont calculées une fois par version"""
+        cache = StatisticsCache()
+        first = cache.statistics('abc-v1', _assessment(1))
+        assert cache.statistics('abc-v1', _assessment(1)) is first
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert first['statistics']['implemented'] == 1
+        assert len(first['gaps']) == 1
+
+        calls = []
+        build = lambda: calls.append(1) or {'pie_chart': 'png'}
+        assert cache.charts('abc-v1', build) == cache.charts('abc-v1', build)
+        assert len(calls) == 1
+
+    def test_lru_eviction(self):
+        """Test l'éviction des versions les moins récemment utilisées"""
+        cache = StatisticsCache(max_entries=2)
+        for version in range(3):
+            cache.statistics(f'abc-v{version}', _assessment(version))
+        assert len(cache) == 2
+        cache.statistics('abc-v0', _assessment(0))
+        assert cache.misses == 4
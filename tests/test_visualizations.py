@@ -84,3 +84,66 @@ class TestComplianceVisualizations:
         
         bar_chart = viz.generate_domain_bar_chart()
         assert isinstance(bar_chart, str)
+    
+    def test_svg_format(self, viz):
+        """Test la sortie SVG (insérable directement dans le HTML)"""
+        pie_svg = viz.generate_status_pie_chart(format='svg')
+        bar_svg = viz.generate_domain_bar_chart(format='svg')
+        
+        assert pie_svg.startswith('<svg')
+        assert bar_svg.rstrip().endswith('</svg>')
+        # Texte conservé en <text> : les libellés restent lisibles
+        assert 'Technological controls' in bar_svg
+        assert len(bar_svg) < len(viz.generate_domain_bar_chart())
+    
+    def test_json_format(self, viz, sample_statistics):
+        """Test la série de données pour un rendu côté client"""
+        pie = viz.generate_status_pie_chart(format='json')
+        bar = viz.generate_domain_bar_chart(format='json')
+        
+        assert pie['labels'][0] == 'Implemented'
+        assert pie['values'] == [6, 2, 1, 1]
+        assert dict(zip(bar['labels'], bar['values'])) == sample_statistics['domain_scores']
+        assert bar['target'] == 80
+    
+    def test_unknown_format(self, viz):
+        """Test le rejet d'un format inconnu"""
+        with pytest.raises(ValueError):
+            viz.generate_status_pie_chart(format='gif')
+    
+    def test_templates_reused_and_updated_in_place(self, viz, sample_statistics):
+        """Test que les figures modèles sont réutilisées d'un rendu à l'autre"""
+        from modules import visualizations
+        
+        first = viz.generate_status_pie_chart()
+        template = visualizations._templates.pie
+        
+        changed = dict(sample_statistics, implemented=0, not_implemented=7)
+        second = ComplianceVisualizations(changed).generate_status_pie_chart()
+        assert visualizations._templates.pie is template
+        assert second != first
+        # Le rendu d'origine est reproduit à l'identique après mise à jour
+        assert viz.generate_status_pie_chart() == first
+        
+        # Changement du nombre de domaines, puis retour à l'état initial
+        bar = viz.generate_domain_bar_chart()
+        two_domains = dict(sample_statistics, domain_scores={'People controls': 50.0,
+                                                             'Physical controls': 90.0})
+        ComplianceVisualizations(two_domains).generate_domain_bar_chart()
+        assert viz.generate_domain_bar_chart() == bar
+    
+    def test_concurrent_rendering_in_threads(self, viz):
+        """Test le rendu concurrent dans un pool de threads"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        expected = (viz.generate_status_pie_chart(format='svg'),
+                    viz.generate_domain_bar_chart(format='svg'))
+        
+        def render(_):
+            return (viz.generate_status_pie_chart(format='svg'),
+                    viz.generate_domain_bar_chart(format='svg'))
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(render, range(8)))
+        
+        assert all(result == expected for result in results)
@@ -0,0 +1,640 @@
+"""
+Tests pour l'application Flask
+"""
+import pytest
+
+# Essayer d'importer web_app, skip si non disponible
+try:
+    from web_app import app
+    WEB_APP_AVAILABLE = True
+except ImportError:
+    WEB_APP_AVAILABLE = False
+
+pytestmark = pytest.mark.skipif(
+    not WEB_APP_AVAILABLE,
+    reason="web_app module not available"
+)
+
+@pytest.fixture
+def client():
+    """Créer un client de test Flask"""
+    if not WEB_APP_AVAILABLE:
+        pytest.skip("web_app not available")
+    
+    app.config['TESTING'] = True
+    app.config['SECRET_KEY'] = 'test-secret-key'
+    
+    with app.test_client() as client:
+        yield client
+
+class TestWebApp:
+    
+    def test_index_page(self, client):
+        """Test la page d'accueil"""
+        response = client.get('/')
+        
+        assert response.status_code == 200
+        assert b'ISO 27001' in response.data
+    
+    def test_new_assessment(self, client):
+        """Test le démarrage d'une nouvelle évaluation"""
+        import json
+        
+        data = {
+            'organization': 'Test Corp',
+            'assessor': 'Jane Doe'
+        }
+        
+        response = client.post('/new-assessment',
+                              data=json.dumps(data),
+                              content_type='application/json')
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert 'message' in json_data
+        assert 'assessment_id' in json_data
+    
+    def test_new_assessment_missing_data(self, client):
+        """Test avec des données manquantes"""
+        import json
+        
+        data = {
+            'organization': 'Test Corp'
+            # assessor manquant
+        }
+        
+        response = client.post('/new-assessment',
+                              data=json.dumps(data),
+                              content_type='application/json')
+        
+        assert response.status_code == 400
+    
+    def test_dashboard_without_assessment(self, client):
+        """Test l'accès au dashboard sans évaluation"""
+        response = client.get('/dashboard')
+        
+        assert response.status_code == 200
+        assert b'No active assessment' in response.data or b'ISO 27001' in response.data
+    
+    def test_dashboard_with_assessment(self, client):
+        """Test l'accès au dashboard avec une évaluation active"""
+        # Créer une évaluation d'abord
+        with client.session_transaction() as sess:
+            sess['assessment'] = {
+                'metadata': {
+                    'organization': 'Test Corp',
+                    'assessor': 'Jane Doe',
+                    'date': '2026-01-13T12:00:00',
+                    'standard': 'ISO/IEC 27001:2022'
+                },
+                'controls_assessment': []
+            }
+            sess['organization'] = 'Test Corp'
+        
+        response = client.get('/dashboard')
+        
+        assert response.status_code == 200
+        assert b'Test Corp' in response.data
+    
+    def test_assess_control_api(self, client):
+        """Test l'API d'évaluation de contrôle"""
+        import json
+        
+        # Créer une session avec évaluation
+        with client.session_transaction() as sess:
+            sess['assessment'] = {
+                'metadata': {
+                    'organization': 'Test Corp',
+                    'assessor': 'Jane Doe',
+                    'date': '2026-01-13T12:00:00',
+                    'standard': 'ISO/IEC 27001:2022'
+                },
+                'controls_assessment': []
+            }
+        
+        data = {
+            'control_id': 'A.5.1',
+            'status': 'Implemented',
+            'evidence': 'Test evidence',
+            'comments': 'Test comment'
+        }
+        
+        response = client.post('/api/assess-control',
+                              data=json.dumps(data),
+                              content_type='application/json')
+        
+        assert response.status_code == 200
+    
+    def test_assess_control_rejects_invalid_input(self, client):
+        """Test le refus d'un statut invalide ou d'un ID qui n'est pas une chaîne"""
+        with client.session_transaction() as sess:
+            sess['assessment'] = {
+                'metadata': {'organization': 'Test Corp', 'version': 0},
+                'controls_assessment': []
+            }
+        
+        for data in ({'control_id': 'A.5.1', 'status': 'Bogus'},
+                     {'control_id': 'A.5.1', 'status': ''},
+                     {'control_id': ['A.5.1'], 'status': 'Implemented'}):
+            response = client.post('/api/assess-control', json=data)
+            assert response.status_code == 400
+        
+        with client.session_transaction() as sess:
+            assert sess['assessment']['controls_assessment'] == []
+            assert sess['assessment']['metadata']['version'] == 0
+    
+    def test_shared_assess_control_rejects_invalid_input(self, client, tmp_path, monkeypatch):
+        """Test le refus d'un statut invalide sur une évaluation partagée"""
+        import web_app
+        from modules.assessment_store import AssessmentStore
+        
+        monkeypatch.setattr(web_app, 'assessment_store', AssessmentStore(str(tmp_path)))
+        assessment_id = client.post('/api/assessments', json={
+            'organization': 'Test Corp', 'assessor': 'Jane Doe'}).get_json()['assessment_id']
+        url = f'/api/assessments/{assessment_id}/controls'
+        
+        for data in ({'control_id': 'A.5.1', 'status': 'Bogus'},
+                     {'control_id': 'A.5.1', 'status': ''},
+                     {'control_id': ['A.5.1'], 'status': 'Implemented'}):
+            response = client.post(url, json={**data, 'expected_version': 0})
+            assert response.status_code == 400
+        
+        assert client.get(f'/api/assessments/{assessment_id}').get_json()['version'] == 0
+    
+    def test_get_statistics_api(self, client):
+        """Test l'API des statistiques"""
+        # Créer une session avec évaluation
+        with client.session_transaction() as sess:
+            sess['assessment'] = {
+                'metadata': {
+                    'organization': 'Test Corp',
+                    'assessor': 'Jane Doe',
+                    'date': '2026-01-13T12:00:00',
+                    'standard': 'ISO/IEC 27001:2022'
+                },
+                'controls_assessment': []
+            }
+        
+        response = client.get('/api/statistics')
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert 'statistics' in json_data
+        assert 'gaps' in json_data
+    
+    def test_download_report_streams_pdf(self, client):
+        """Test le téléchargement du rapport généré en mémoire"""
+        with client.session_transaction() as sess:
+            sess['assessment'] = {
+                'metadata': {
+                    'organization': 'Test Corp',
+                    'assessor': 'Jane Doe',
+                    'date': '2026-01-13T12:00:00',
+                    'standard': 'ISO/IEC 27001:2022'
+                },
+                'controls_assessment': []
+            }
+        
+        response = client.get('/api/report')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/pdf'
+        assert response.data.startswith(b'%PDF')
+        assert 'Test_Corp_ISO27001_Report.pdf' in response.headers['Content-Disposition']
+    
+    def test_download_report_without_assessment(self, client):
+        """Test le téléchargement sans évaluation active"""
+        response = client.get('/api/report')
+        
+        assert response.status_code == 400
+    
+    def test_report_job_flow(self, client):
+        """Test la génération du rapport en arrière-plan"""
+        import time
+        
+        with client.session_transaction() as sess:
+            sess['assessment'] = {
+                'metadata': {
+                    'organization': 'Test Corp',
+                    'assessor': 'Jane Doe',
+                    'date': '2026-01-13T12:00:00',
+                    'standard': 'ISO/IEC 27001:2022'
+                },
+                'controls_assessment': []
+            }
+        
+        response = client.post('/api/reports', json={})
+        assert response.status_code == 202
+        job = response.get_json()
+        
+        # Une demande identique est regroupée avec la première
+        assert client.post('/api/reports', json={}).get_json()['job_id'] == job['job_id']
+        
+        for _ in range(300):
+            status = client.get(job['status_url']).get_json()
+            if status['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.1)
+        assert status['status'] == 'done'
+        
+        response = client.get(job['download_url'])
+        assert response.status_code == 200
+        assert response.data.startswith(b'%PDF')
+    
+    def test_report_job_unknown(self, client):
+        """Test un job de rapport inconnu"""
+        assert client.get('/api/reports/unknown').status_code == 404
+        assert client.get('/api/reports/unknown/download').status_code == 404
+    
+    def test_shared_assessment_versioning(self, client, tmp_path, monkeypatch):
+        """Test les écritures versionnées sur une évaluation partagée"""
+        import web_app
+        from modules.assessment_store import AssessmentStore
+        
+        monkeypatch.setattr(web_app, 'assessment_store', AssessmentStore(str(tmp_path)))
+        
+        response = client.post('/api/assessments',
+                               json={'organization': 'Test Corp', 'assessor': 'Jane Doe'})
+        assert response.status_code == 201
+        assessment_id = response.get_json()['assessment_id']
+        url = f'/api/assessments/{assessment_id}/controls'
+        
+        response = client.post(url, json={'control_id': 'A.5.1', 'status': 'Implemented',
+                                          'expected_version': 0})
+        assert response.status_code == 200
+        assert response.get_json()['version'] == 1
+        
+        # Écriture concurrente avec une version périmée
+        response = client.post(url, json={'control_id': 'A.5.2', 'status': 'Implemented',
+                                          'expected_version': 0})
+        assert response.status_code == 409
+        assert response.get_json()['current_version'] == 1
+        
+        response = client.post(url, json={'control_id': 'A.5.2', 'status': 'Implemented'},
+                               headers={'If-Match': '"1"'})
+        assert response.status_code == 200
+        
+        assert client.post(url, json={'control_id': 'A.5.3'}).status_code == 428
+        assert client.get(f'/api/assessments/{"0" * 32}').status_code == 404
+        assert client.get(f'/api/assessments/{assessment_id}').get_json()['version'] == 2
+    
+    def test_statistics_etag_and_not_modified(self, client):
+        """Test l'ETag par version et la réponse 304"""
+        client.post('/new-assessment', json={'organization': 'Test Corp', 'assessor': 'Jane Doe'})
+        
+        response = client.get('/api/statistics')
+        etag = response.headers['ETag']
+        assert response.status_code == 200
+        assert response.get_json()['version'] == 0
+        
+        response = client.get('/api/statistics', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.data == b''
+        
+        dashboard = client.get('/dashboard')
+        assert dashboard.headers['ETag'] == etag
+        assert client.get('/dashboard', headers={'If-None-Match': etag}).status_code == 304
+        
+        # Une écriture change la version, donc l'ETag
+        client.post('/api/assess-control', json={'control_id': 'A.5.1', 'status': 'Implemented'})
+        response = client.get('/api/statistics', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json()['statistics']['implemented'] == 1
+    
+    def test_assessment_event_stream(self, client):
+        """Test le flux SSE : snapshot puis delta après assess_control"""
+        import json
+        import web_app
+        
+        response = client.post('/new-assessment',
+                               json={'organization': 'Test Corp', 'assessor': 'Jane Doe'})
+        assessment_id = response.get_json()['assessment_id']
+        
+        stream = client.get(f'/api/assessments/{assessment_id}/events', buffered=False)
+        assert stream.status_code == 200
+        assert stream.mimetype == 'text/event-stream'
+        chunks = iter(stream.response)
+        assert b'event: snapshot' in next(chunks)
+        assert web_app.event_broker.subscriber_count(assessment_id) == 1
+        
+        client.post('/api/assess-control', json={'control_id': 'A.5.1', 'status': 'Implemented'})
+        message = next(chunks).decode('utf-8')
+        assert 'event: control' in message
+        event = json.loads(message.split('data: ', 1)[1])
+        assert event['version'] == 1
+        assert event['control']['control_id'] == 'A.5.1'
+        assert event['domain_score'] == {'Organizational controls': 100.0}
+        
+        stream.close()
+        assert web_app.event_broker.subscriber_count(assessment_id) == 0
+        assert client.get(f'/api/assessments/{"0" * 32}/events').status_code == 404
+    
+    def test_event_stream_limit(self, client, monkeypatch):
+        """Test que les flux SSE au-delà de la limite du worker sont refusés (503)"""
+        import web_app
+        
+        monkeypatch.setattr(web_app.event_broker, 'max_subscribers', 1)
+        response = client.post('/new-assessment',
+                               json={'organization': 'Test Corp', 'assessor': 'Jane Doe'})
+        assessment_id = response.get_json()['assessment_id']
+        
+        stream = client.get(f'/api/assessments/{assessment_id}/events', buffered=False)
+        assert stream.status_code == 200
+        response = client.get(f'/api/assessments/{assessment_id}/events')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+        stream.close()
+    
+    def test_charts_api_formats(self, client):
+        """Test l'API des graphiques en JSON/SVG et le tableau de bord en SVG"""
+        client.post('/new-assessment', json={'organization': 'Test Corp', 'assessor': 'Jane Doe'})
+        client.post('/api/assess-control', json={'control_id': 'A.5.1', 'status': 'Implemented'})
+        
+        response = client.get('/api/charts')
+        assert response.status_code == 200
+        assert response.get_json()['pie_chart']['values'] == [1, 0, 0, 0]
+        
+        svg = client.get('/api/charts?format=svg')
+        assert svg.get_json()['bar_chart'].startswith('<svg')
+        assert svg.headers['ETag'] != response.headers['ETag']
+        
+        assert client.get('/api/charts?format=gif').status_code == 400
+        assert b'<svg' in client.get('/dashboard').data
+    
+    def test_evidence_upload_and_attachments(self, client, tmp_path, monkeypatch):
+        """Test le dépôt dédupliqué d'une pièce et sa référence par empreinte"""
+        import io
+        import web_app
+        from modules.evidence_store import EvidenceStore
+        
+        monkeypatch.setattr(web_app, 'evidence_store', EvidenceStore(str(tmp_path)))
+        client.post('/new-assessment', json={'organization': 'Test Corp', 'assessor': 'Jane Doe'})
+        
+        def upload():
+            return client.post('/api/evidence', content_type='multipart/form-data',
+                               data={'file': (io.BytesIO(b'%PDF policy'), 'policy.pdf')})
+        
+        first = upload()
+        assert first.status_code == 201
+        blob = first.get_json()
+        assert upload().status_code == 200
+        
+        response = client.post('/api/assess-control', json={
+            'control_id': 'A.5.1', 'status': 'Implemented',
+            'attachments': [{'sha256': blob['sha256'], 'filename': 'policy.pdf'}]
+        })
+        assert response.status_code == 200
+        with client.session_transaction() as sess:
+            item = sess['assessment']['controls_assessment'][-1]
+        assert item['attachments'] == [{'sha256': blob['sha256'], 'filename': 'policy.pdf',
+                                        'size': 11}]
+        assert blob['sha256'] in web_app.evidence_store.pinned()
+        
+        response = client.post('/api/assess-control', json={
+            'control_id': 'A.5.2', 'status': 'Implemented', 'attachments': ['f' * 64]
+        })
+        assert response.status_code == 400
+        
+        download = client.get(blob['url'])
+        assert download.data == b'%PDF policy'
+        assert client.get('/api/evidence/not-a-hash').status_code == 404
+    
+    def test_metrics_and_catalog_version(self, client):
+        """Test l'exposition de la version du catalogue servie par le worker"""
+        import web_app
+        
+        version = web_app.catalog_registry.current().version
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert f'version="{version}"' in response.get_data(as_text=True)
+        assert client.get('/').headers['X-Catalog-Version'] == version
+    
+    def test_report_includes_peer_benchmark(self, client, monkeypatch):
+        """Test le calcul du rang des pairs lors de la génération du rapport"""
+        import web_app
+        from modules.peer_benchmark import PeerBenchmark
+        
+        peers = PeerBenchmark(min_peers=1)
+        monkeypatch.setattr(web_app, 'peer_benchmark', peers)
+        monkeypatch.setattr(web_app, '_peer_synced_at', None)
+        captured = {}
+        original = web_app.ReportGenerator
+        
+        def capture(*args, **kwargs):
+            captured.update(kwargs)
+            return original(*args, **kwargs)
+        
+        monkeypatch.setattr(web_app, 'ReportGenerator', capture)
+        client.post('/new-assessment', json={'organization': 'Test Corp', 'assessor': 'Jane Doe',
+                                             'sector': 'Finance'})
+        assert client.get('/api/report').status_code == 200
+        assert captured['benchmark']['sector'] == 'Finance'
+    
+    def test_sector_must_be_a_string(self, client, tmp_path, monkeypatch):
+        """Test qu'un secteur non textuel est refusé (400) au lieu d'une erreur 500"""
+        import web_app
+        from modules.assessment_store import AssessmentStore
+        
+        monkeypatch.setattr(web_app, 'assessment_store', AssessmentStore(str(tmp_path)))
+        for sector in (None, 42, ['Finance']):
+            data = {'organization': 'Test Corp', 'assessor': 'Jane Doe', 'sector': sector}
+            expected = 200 if sector is None else 400
+            assert client.post('/new-assessment', json=data).status_code == expected
+            expected = 201 if sector is None else 400
+            assert client.post('/api/assessments', json=data).status_code == expected
+    
+    def test_organization_and_assessor_must_be_strings(self, client, tmp_path, monkeypatch):
+        """Test qu'une organisation ou un évaluateur non textuel est refusé (400)"""
+        import web_app
+        from modules.assessment_store import AssessmentStore
+        
+        monkeypatch.setattr(web_app, 'assessment_store', AssessmentStore(str(tmp_path)))
+        for field in ('organization', 'assessor'):
+            for value in (None, 5, ['Test Corp']):
+                data = {'organization': 'Test Corp', 'assessor': 'Jane Doe', field: value}
+                assert client.post('/new-assessment', json=data).status_code == 400
+                assert client.post('/api/assessments', json=data).status_code == 400
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_portfolio_heatmap_tiles(self, client, monkeypatch):
+        """Test la heatmap du portefeuille et le zoom sur une tranche"""
+        import web_app
+        from modules.peer_benchmark import PeerBenchmark
+        
+        peers = PeerBenchmark()
+        for index in range(30):
+            peers.update(f'src{index}', {'metadata': {'organization': f'Org {index}',
+                                                      'sector': 'Finance' if index % 2 else None}},
+                         {'overall_score': float(index), 'domain_scores': {'D1': float(index)}})
+        monkeypatch.setattr(web_app, 'peer_benchmark', peers)
+        monkeypatch.setattr(web_app, '_peer_synced_at', float('inf'))
+        monkeypatch.setattr(web_app, '_heatmaps', {})
+        monkeypatch.setitem(web_app.app.config, 'PEER_MIN_COUNT', 1)
+        
+        assert client.get('/portfolio').status_code == 200
+        tile = client.get('/api/portfolio/heatmap?rows=5').get_json()
+        assert tile['total'] == 30 and len(tile['y']) == 5
+        start, end = tile['ranges'][1]
+        zoomed = client.get(f'/api/portfolio/heatmap?start={start}&end={end}').get_json()
+        assert zoomed['y'] == [f'Org {i}' for i in range(start, end)]
+        assert client.get('/api/portfolio/heatmap?sector=Finance').get_json()['total'] == 15
+        
+        # Secteur inconnu : refusé, sans entrée dans le cache
+        assert client.get('/api/portfolio/heatmap?sector=Nowhere').status_code == 404
+        assert set(web_app._heatmaps) == {None, 'Finance'}
+        
+        # Tranches d'au moins PEER_MIN_COUNT organisations, jamais nommées
+        monkeypatch.setitem(web_app.app.config, 'PEER_MIN_COUNT', 5)
+        web_app._heatmaps.clear()
+        zoomed = client.get('/api/portfolio/heatmap?start=0&end=1').get_json()
+        assert zoomed['y'] == ['5 organizations (0% - 4%)']
+        assert client.get('/api/portfolio/heatmap?rows=0').status_code == 400
+        assert client.get('/api/portfolio/heatmap?start=x').status_code == 400
+    
+    def test_aggregation_cube_query(self, client, monkeypatch):
+        """Test les agrégats du portefeuille (regroupement et filtres)"""
+        import web_app
+        from modules.aggregation_cube import AggregationCube
+        
+        cube = AggregationCube()
+        monkeypatch.setattr(web_app, 'aggregation_cube', cube)
+        monkeypatch.setattr(web_app, '_peer_synced_at', float('inf'))
+        cube.update('a', {'metadata': {'organization': 'Acme', 'date': '2026-01-10'},
+                          'controls_assessment': [
+                              {'control_id': 'A.5.1', 'domain': 'Organizational controls',
+                               'status': 'Implemented'},
+                              {'control_id': 'A.8.5', 'domain': 'Technological controls',
+                               'status': 'Not Implemented'}]})
+        
+        response = client.get('/api/cube?group_by=domain,period&domain=Organizational+controls')
+        assert response.status_code == 200
+        assert response.get_json()['rows'] == [{
+            'domain': 'Organizational controls', 'period': '2026-Q1', 'total': 1, 'score': 100.0,
+            'counts': {'Implemented': 1, 'Partially Implemented': 0, 'Not Implemented': 0,
+                       'Not Applicable': 0}}]
+        assert client.get('/api/cube').get_json()['rows'][0]['score'] == 50.0
+        assert client.get('/api/cube?group_by=sector').status_code == 400
+    
+    def test_framework_projection(self, client, tmp_path, monkeypatch):
+        """Test la projection de l'évaluation de la session sur les référentiels de FRAMEWORKS_DIR"""
+        import json
+        import web_app
+        
+        (tmp_path / "iso27001_2013.json").write_text(json.dumps({
+            "framework": {"id": "iso27001-2013", "name": "ISO/IEC 27001:2013"},
+            "controls": [{"id": "A.5.1.1", "title": "Policies", "domain": "A.5 Policies"}]
+        }), encoding='utf-8')
+        (tmp_path / "2022_to_2013.json").write_text(json.dumps({
+            "source": "iso27001-2022", "target": "iso27001-2013",
+            "mappings": [{"source": "A.5.1", "target": "A.5.1.1"}]
+        }), encoding='utf-8')
+        monkeypatch.setitem(web_app.app.config, 'FRAMEWORKS_DIR', str(tmp_path))
+        monkeypatch.setattr(web_app, '_frameworks', None)
+        
+        assert client.get('/api/frameworks').status_code == 400
+        client.post('/new-assessment', json={'organization': 'Test Corp', 'assessor': 'Jane Doe'})
+        client.post('/api/assess-control', json={'control_id': 'A.5.1', 'status': 'Implemented'})
+        
+        projection = client.get('/api/frameworks').get_json()['frameworks']['iso27001-2013']
+        assert projection['name'] == 'ISO/IEC 27001:2013'
+        assert projection['overall_score'] == 100.0
+        assert projection['domain_scores'] == {'A.5 Policies': 100.0}
+    
+    def test_search_typeahead(self, client, tmp_path, monkeypatch):
+        """Test la recherche dans le catalogue courant et les preuves des évaluations partagées"""
+        import web_app
+        from modules.assessment_store import AssessmentStore
+        from modules.search_index import SearchIndex
+        
+        index = SearchIndex()
+        index.index_controls([{'id': 'Z.1', 'title': 'Retired cryptography control'}])
+        monkeypatch.setattr(web_app, 'search_index', index)
+        monkeypatch.setattr(web_app, '_search_catalog_version', None)
+        monkeypatch.setattr(web_app, '_peer_synced_at', float('inf'))
+        monkeypatch.setattr(web_app, 'assessment_store', AssessmentStore(
+            str(tmp_path), on_persist=web_app._index_shared_assessment))
+        
+        # Catalogue réindexé à sa nouvelle version : Z.1 n'en fait plus partie
+        results = client.get('/api/search?q=crypt').get_json()['results']
+        assert [r['control_id'] for r in results] == ['A.8.24']
+        
+        assessment_id = client.post('/api/assessments', json={
+            'organization': 'Shared Corp', 'assessor': 'Jane Doe'}).get_json()['assessment_id']
+        client.post(f'/api/assessments/{assessment_id}/controls',
+                    json={'control_id': 'A.5.1', 'status': 'Implemented',
+                          'evidence': 'Policy stored in SharePoint', 'expected_version': 0})
+        response = client.get('/api/search?q=sharep&type=assessment_item').get_json()
+        assert response['count'] == 1
+        assert response['results'][0]['organization'] == 'Shared Corp'
+        
+        assert client.get('/api/search?q=a&limit=0').status_code == 400
+        assert client.get('/api/search?q=a&limit=x').status_code == 400
+        assert client.get('/api/search?q=a&type=note').status_code == 400
+    
+    def test_remediation_tracking(self, client, tmp_path, monkeypatch):
+        """Test les éléments de remédiation (session, évaluation partagée, échéances)"""
+        import web_app
+        from modules.assessment_store import AssessmentStore
+        from modules.remediation import RemediationIndex
+        
+        index = RemediationIndex()
+        monkeypatch.setattr(web_app, 'remediation_index', index)
+        monkeypatch.setattr(web_app, '_peer_synced_at', float('inf'))
+        monkeypatch.setattr(web_app, 'assessment_store', AssessmentStore(
+            str(tmp_path), on_persist=lambda assessment_id, assessment:
+                index.update(assessment_id, assessment)))
+        
+        # Évaluation de la session
+        assert client.post('/api/remediation', json={}).status_code == 400
+        with client.session_transaction() as sess:
+            sess['assessment'] = {
+                'metadata': {'organization': 'Test Corp', 'date': '2026-01-13T12:00:00'},
+                'controls_assessment': [{'control_id': 'A.8.1', 'control_title': 'Control',
+                                         'domain': 'Technological controls',
+                                         'status': 'Not Implemented'}]
+            }
+        response = client.post('/api/remediation', json={'owner': 'Alice', 'start': '2026-01-01'})
+        assert response.status_code == 201
+        item = response.get_json()['created'][0]
+        assert item['due_date'] in ('2026-01-31', '2026-04-01')
+        response = client.patch(f"/api/remediation/{item['id']}", json={'state': 'In Progress'})
+        assert response.get_json()['item']['state'] == 'In Progress'
+        assert client.patch('/api/remediation/unknown', json={}).status_code == 404
+        assert client.patch(f"/api/remediation/{item['id']}",
+                            json={'due_date': 'soon'}).status_code == 400
+        assert client.patch(f"/api/remediation/{item['id']}",
+                            json={'owner': 42}).status_code == 400
+        assert client.patch(f"/api/remediation/{item['id']}",
+                            json={'due_date': '2030-01-01', 'owner': 5}).status_code == 400
+        with client.session_transaction() as sess:
+            assert sess['assessment']['remediation'][0]['due_date'] == item['due_date']
+        assert client.post('/api/remediation', json={'owner': None}).status_code == 201
+        assert client.post('/api/remediation', json={'owner': 42}).status_code == 400
+        
+        # Évaluation partagée : indexée à chaque écriture
+        assessment_id = client.post('/api/assessments', json={
+            'organization': 'Shared Corp', 'assessor': 'Jane Doe'}).get_json()['assessment_id']
+        client.post(f'/api/assessments/{assessment_id}/controls',
+                    json={'control_id': 'A.5.1', 'status': 'Not Implemented',
+                          'expected_version': 0})
+        url = f'/api/assessments/{assessment_id}/remediation'
+        response = client.post(url, json={'owner': 'Bob', 'start': '2026-01-01',
+                                          'expected_version': 1})
+        assert response.status_code == 201
+        shared = response.get_json()['created'][0]
+        assert client.post(url, json={'expected_version': 1}).status_code == 409
+        response = client.patch(f"{url}/{shared['id']}", json={'due_date': '2026-02-10'},
+                                headers={'If-Match': '"2"'})
+        assert response.status_code == 200
+        assert client.patch(f'{url}/unknown', json={'expected_version': 3}).status_code == 404
+        
+        overdue = client.get('/api/remediation/overdue?owner=bob&today=2026-03-01').get_json()
+        assert [i['id'] for i in overdue['items']] == [shared['id']]
+        due = client.get('/api/remediation/due?days=7&today=2026-02-05').get_json()
+        assert due['count'] == 1
+        assert client.get('/api/remediation/due?today=2026-02-02').get_json()['count'] == 0
+        assert client.get('/api/remediation/due?days=x').status_code == 400
+        assert client.get('/api/remediation/due?days=9999999999').status_code == 400
@@ -1,147 +1,836 @@
 """
-Tests pour l'application Flask
+ISO 27001 Compliance Tool - Web Version (Flask)
 """
-import pytest
-
-# Essayer d'importer web_app, skip si non disponible
-try:
-    from web_app import app
-    WEB_APP_AVAILABLE = True
-except ImportError:
-    WEB_APP_AVAILABLE = False
-
-pytestmark = pytest.mark.skipif(
-    not WEB_APP_AVAILABLE,
-    reason="web_app module not available"
+import io
+import os
+import time
+import uuid
+from typing import Callable, Optional
+from flask import (
+    Flask, Response, jsonify, render_template, request, send_file, session, url_for
+)
+from config import Config
+from modules.catalog import CatalogRegistry
+from modules.compliance_checker import ComplianceChecker, bump_version, get_version
+from modules.visualizations import (
+    ComplianceVisualizations, CHART_FORMATS, portfolio_heatmap_data
+)
+from modules.report_generator import ReportGenerator
+from modules.stats_cache import StatisticsCache, assessment_etag
+from modules.events import EventBroker, Subscription, SubscriberLimitError, format_sse
+from modules.frameworks import DEFAULT_FRAMEWORK_ID, FrameworkRegistry
+from modules.evidence_store import EvidenceStore, BlobNotFoundError
+from modules.aggregation_cube import AggregationCube
+from modules.peer_benchmark import PeerBenchmark
+from modules.portfolio_heatmap import PortfolioHeatmap
+from modules.remediation import (
+    RemediationIndex, RemediationItemNotFoundError, add_remediation_items, update_remediation_item
+)
+from modules.search_index import SearchIndex
+from modules.sharding import ShardedAssessmentStore
+from modules.report_jobs import ReportJobQueue, JobNotFoundError, JobNotReadyError
+from modules.assessment_store import (
+    AssessmentStore, AssessmentNotFoundError, VersionConflictError
 )
 
-@pytest.fixture
-def client():
-    """Créer un client de test Flask"""
-    if not WEB_APP_AVAILABLE:
-        pytest.skip("web_app not available")
-    
-    app.config['TESTING'] = True
-    app.config['SECRET_KEY'] = 'test-secret-key'
-    
-    with app.test_client() as client:
-        yield client
-
-class TestWebApp:
-    
-    def test_index_page(self, client):
-        """Test la page d'accueil"""
-        response = client.get('/')
-        
-        assert response.status_code == 200
-        assert b'ISO 27001' in response.data
-    
-    def test_new_assessment(self, client):
-        """Test le démarrage d'une nouvelle évaluation"""
-        import json
-        
-        data = {
-            'organization': 'Test Corp',
-            'assessor': 'Jane Doe'
-        }
-        
-        response = client.post('/new-assessment',
-                              data=json.dumps(data),
-                              content_type='application/json')
-        
-        assert response.status_code == 200
-        json_data = response.get_json()
-        assert 'message' in json_data
-        assert 'assessment_id' in json_data
-    
-    def test_new_assessment_missing_data(self, client):
-        """Test avec des données manquantes"""
-        import json
-        
-        data = {
-            'organization': 'Test Corp'
-            # assessor manquant
-        }
-        
-        response = client.post('/new-assessment',
-                              data=json.dumps(data),
-                              content_type='application/json')
-        
-        assert response.status_code == 400
-    
-    def test_dashboard_without_assessment(self, client):
-        """Test l'accès au dashboard sans évaluation"""
-        response = client.get('/dashboard')
-        
-        assert response.status_code == 200
-        assert b'No active assessment' in response.data or b'ISO 27001' in response.data
-    
-    def test_dashboard_with_assessment(self, client):
-        """Test l'accès au dashboard avec une évaluation active"""
-        # Créer une évaluation d'abord
-        with client.session_transaction() as sess:
-            sess['assessment'] = {
-                'metadata': {
-                    'organization': 'Test Corp',
-                    'assessor': 'Jane Doe',
-                    'date': '2026-01-13T12:00:00',
-                    'standard': 'ISO/IEC 27001:2022'
-                },
-                'controls_assessment': []
-            }
-            sess['organization'] = 'Test Corp'
-        
-        response = client.get('/dashboard')
-        
-        assert response.status_code == 200
-        assert b'Test Corp' in response.data
-    
-    def test_assess_control_api(self, client):
-        """Test l'API d'évaluation de contrôle"""
-        import json
-        
-        # Créer une session avec évaluation
-        with client.session_transaction() as sess:
-            sess['assessment'] = {
-                'metadata': {
-                    'organization': 'Test Corp',
-                    'assessor': 'Jane Doe',
-                    'date': '2026-01-13T12:00:00',
-                    'standard': 'ISO/IEC 27001:2022'
-                },
-                'controls_assessment': []
-            }
-        
-        data = {
-            'control_id': 'A.5.1',
-            'status': 'Implemented',
-            'evidence': 'Test evidence',
-            'comments': 'Test comment'
+app = Flask(__name__)
+app.config.from_object(Config)
+
+report_jobs = ReportJobQueue(
+    max_workers=Config.REPORT_WORKERS,
+    ttl_seconds=Config.REPORT_CACHE_TTL,
+    use_processes=Config.REPORT_USE_PROCESSES
+)
+
+# Catalogue des contrôles : chargé une fois (avant le fork avec gunicorn
+# --preload) puis rechargé à chaud quand le fichier change
+catalog_registry = CatalogRegistry(Config.CONTROLS_FILE, Config.CATALOG_RELOAD_INTERVAL)
+
+# Statistiques, gaps et graphiques calculés une fois par version d'évaluation
+stats_cache = StatisticsCache(Config.STATS_CACHE_SIZE)
+
+# Pièces justificatives, stockées une fois par contenu (SHA-256)
+evidence_store = EvidenceStore(Config.EVIDENCE_DIR)
+
+# Diffusion SSE des mises à jour (abonnés du processus courant)
+event_broker = EventBroker(Config.SSE_QUEUE_SIZE, Config.SSE_MAX_STREAMS,
+                           Config.SSE_RELAY_DIR, Config.SSE_POLL_INTERVAL)
+
+# Rangs centiles du portefeuille, mis à jour à chaque écriture
+peer_benchmark = PeerBenchmark(Config.PEER_MIN_COUNT)
+_peer_synced_at = None
+# Comptes par statut organisation × domaine × catégorie × trimestre
+aggregation_cube = AggregationCube(catalog_registry=catalog_registry)
+# Éléments de remédiation ouverts du portefeuille, par échéance
+remediation_index = RemediationIndex()
+# Recherche plein texte : catalogue (réindexé à chaque version) et preuves du portefeuille
+search_index = SearchIndex()
+_search_catalog_version = None
+# Référentiels de projection : (version du catalogue, registre)
+_frameworks = None
+# Heatmaps du portefeuille par secteur : (génération de peer_benchmark, heatmap)
+_heatmaps = {}
+
+def _index_shared_assessment(assessment_id: str, assessment: dict) -> None:
+    """Met à jour les index du portefeuille (même source que la relecture du répertoire)"""
+    source = os.path.abspath(assessment_store.path(assessment_id))
+    peer_benchmark.update(source, assessment)
+    aggregation_cube.update(source, assessment)
+    remediation_index.update(source, assessment)
+    search_index.update(source, assessment)
+
+# Évaluations partagées entre évaluateurs (et entre workers, via le disque),
+# réparties entre plusieurs répertoires si SHARD_DIRS est défini
+if Config.SHARD_DIRS:
+    assessment_store = ShardedAssessmentStore(Config.SHARD_DIRS, Config.SHARD_VNODES,
+                                              catalog_registry=catalog_registry,
+                                              on_persist=_index_shared_assessment)
+else:
+    assessment_store = AssessmentStore(Config.SHARED_ASSESSMENTS_DIR,
+                                       catalog_registry=catalog_registry,
+                                       on_persist=_index_shared_assessment)
+
+def _portfolio_roots() -> list:
+    """Répertoires du portefeuille : archive et shards situés hors de celle-ci"""
+    archive = os.path.join(os.path.abspath(app.config['ASSESSMENTS_DIR']), '')
+    return [app.config['ASSESSMENTS_DIR']] + [
+        directory for directory in app.config['SHARD_DIRS']
+        if not os.path.abspath(directory).startswith(archive)
+    ]
+
+def _get_checker() -> ComplianceChecker:
+    """Crée un checker lié à l'évaluation de la session"""
+    checker = ComplianceChecker(catalog=catalog_registry.current())
+    checker.assessment = session.get('assessment', {})
+    return checker
+
+def _sync_peers() -> None:
+    """
+    Met à jour les index du portefeuille (rangs des pairs, cube, remédiations, recherche)
+
+    L'archive est relue au plus toutes les PEER_SYNC_INTERVAL secondes, et
+    seulement pour les fichiers modifiés (écritures des autres workers ou
+    évaluations archivées).
+    """
+    global _peer_synced_at
+    now = time.monotonic()
+    if _peer_synced_at is None or now - _peer_synced_at >= app.config['PEER_SYNC_INTERVAL']:
+        _peer_synced_at = now
+        roots = _portfolio_roots()
+        peer_benchmark.sync_all(roots)
+        for root in roots:
+            aggregation_cube.sync(root)
+            remediation_index.sync(root)
+            search_index.sync(root)
+
+def _peer_benchmark(assessment: dict, stats: dict) -> dict:
+    """Positionnement de l'évaluation parmi les pairs"""
+    _sync_peers()
+    return peer_benchmark.benchmark(assessment, stats)
+
+def _portfolio_heatmap(sector: str = None) -> Optional[PortfolioHeatmap]:
+    """
+    Heatmap du portefeuille, reconstruite seulement si les scores ont changé
+
+    Returns:
+        None pour un secteur absent du portefeuille (le cache ne contient
+        que des secteurs connus)
+    """
+    _sync_peers()
+    if sector is not None and not peer_benchmark.has_sector(sector):
+        return None
+    generation = peer_benchmark.generation
+    cached = _heatmaps.get(sector)
+    if cached is None or cached[0] != generation:
+        # Les heatmaps des générations précédentes sont abandonnées
+        for key, (built, _) in list(_heatmaps.items()):
+            if built != generation:
+                _heatmaps.pop(key, None)
+        cached = _heatmaps[sector] = (generation, PortfolioHeatmap(
+            peer_benchmark.latest_scores(sector), min_bucket=app.config['PEER_MIN_COUNT']))
+    return cached[1]
+
+def _search_index() -> SearchIndex:
+    """Index de recherche à jour (catalogue courant, portefeuille relu)"""
+    global _search_catalog_version
+    _sync_peers()
+    catalog = catalog_registry.current()
+    if _search_catalog_version != catalog.version:
+        search_index.index_controls(catalog.controls)
+        _search_catalog_version = catalog.version
+    return search_index
+
+def _framework_registry() -> FrameworkRegistry:
+    """Registre des référentiels, recompilé quand le catalogue change"""
+    global _frameworks
+    catalog = catalog_registry.current()
+    cached = _frameworks
+    if cached is None or cached[0] != catalog.version:
+        registry = FrameworkRegistry()
+        registry.add_catalog(DEFAULT_FRAMEWORK_ID, catalog.controls, "ISO/IEC 27001:2022")
+        if os.path.isdir(app.config['FRAMEWORKS_DIR']):
+            registry.load_directory(app.config['FRAMEWORKS_DIR'])
+        cached = _frameworks = (catalog.version, registry)
+    return cached[1]
+
+def _build_charts(stats: dict, fmt: str = 'png') -> dict:
+    """
+    Génère les graphiques de l'évaluation
+
+    'png' (base64) pour le PDF, 'svg' pour le tableau de bord, 'json' pour
+    un rendu côté client.
+    """
+    viz = ComplianceVisualizations(stats)
+    return {
+        'pie_chart': viz.generate_status_pie_chart(format=fmt),
+        'bar_chart': viz.generate_domain_bar_chart(format=fmt)
+    }
+
+def _session_etag(assessment: dict) -> str:
+    """ETag de l'évaluation de la session (identifiant + version)"""
+    return assessment_etag(assessment, session.get('assessment_id'))
+
+def _not_modified(etag: str):
+    """Réponse 304 si le client possède déjà cette version, sinon None"""
+    if not request.if_none_match.contains(etag):
+        return None
+    return _with_etag(Response(status=304), etag)
+
+def _with_etag(response: Response, etag: str) -> Response:
+    """Ajoute l'ETag ; le client doit revalider à chaque affichage"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+def _resolve_attachments(raw) -> list:
+    """
+    Références de pièces d'une requête ([empreinte] ou [{"sha256", "filename"}])
+
+    Raises:
+        ValueError: format invalide ou pièce inconnue
+    """
+    if not isinstance(raw, list):
+        raise ValueError('attachments must be a list')
+    attachments = []
+    for reference in raw:
+        if isinstance(reference, str):
+            reference = {'sha256': reference}
+        if not isinstance(reference, dict):
+            raise ValueError('Invalid attachment reference')
+        sha256 = reference.get('sha256')
+        try:
+            size = evidence_store.size(sha256)
+        except BlobNotFoundError:
+            raise ValueError(f'Unknown attachment: {sha256}') from None
+        attachments.append({
+            'sha256': sha256,
+            'filename': str(reference.get('filename') or sha256),
+            'size': size
+        })
+    return attachments
+
+def _score_snapshot(assessment_id: str, assessment: dict) -> dict:
+    """Scores de l'évaluation (via le cache par version)"""
+    stats = stats_cache.statistics(assessment_etag(assessment, assessment_id),
+                                   assessment)['statistics']
+    return {
+        'version': get_version(assessment),
+        'overall_score': stats['overall_score'],
+        'domain_scores': stats['domain_scores']
+    }
+
+def _publish_control_update(assessment_id: str, load_assessment: Callable[[], dict],
+                            control_id: str, status: str) -> None:
+    """
+    Diffuse le delta d'une écriture aux abonnés SSE de l'évaluation
+
+    Les scores sont calculés une fois par écriture (et seulement s'il y a
+    des abonnés, dans ce worker ou un autre), quel que soit le nombre de
+    tableaux de bord ouverts.
+    """
+    if not assessment_id or not event_broker.has_subscribers(assessment_id):
+        return
+    snapshot = _score_snapshot(assessment_id, load_assessment())
+    domain = catalog_registry.current().controls_by_id[control_id]['domain']
+    event_broker.publish(assessment_id, 'control', {
+        'version': snapshot['version'],
+        'control': {'control_id': control_id, 'status': status, 'domain': domain},
+        'overall_score': snapshot['overall_score'],
+        'domain_score': {domain: snapshot['domain_scores'].get(domain)}
+    }, event_id=snapshot['version'])
+
+def _event_stream(subscription: Subscription, snapshot: dict):
+    """Flux SSE : état initial puis deltas, avec commentaires de keep-alive"""
+    with subscription:
+        yield format_sse('snapshot', snapshot, snapshot['version'])
+        while True:
+            message = subscription.get(timeout=app.config['SSE_KEEPALIVE'])
+            if message is not None:
+                yield message
+            elif subscription.closed:
+                return
+            else:
+                yield ": keepalive\n\n"
+
+@app.after_request
+def add_catalog_version(response: Response) -> Response:
+    """Version du catalogue servie par ce worker"""
+    response.headers['X-Catalog-Version'] = catalog_registry.current().version
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Métriques Prometheus du worker (version du catalogue servie)"""
+    return Response(catalog_registry.prometheus_metrics(),
+                    mimetype='text/plain; version=0.0.4')
+
+@app.route('/')
+def index():
+    """Page d'accueil"""
+    return render_template('index.html')
+
+@app.route('/new-assessment', methods=['POST'])
+def new_assessment():
+    """Démarre une nouvelle évaluation"""
+    data = request.get_json(silent=True) or {}
+    organization = data.get('organization', '')
+    assessor = data.get('assessor', '')
+    if not isinstance(organization, str) or not isinstance(assessor, str):
+        return jsonify({'error': 'organization and assessor must be strings'}), 400
+    organization, assessor = organization.strip(), assessor.strip()
+    
+    if not organization or not assessor:
+        return jsonify({'error': 'organization and assessor are required'}), 400
+    
+    sector = data.get('sector')
+    if sector is not None and not isinstance(sector, str):
+        return jsonify({'error': 'sector must be a string'}), 400
+    
+    checker = ComplianceChecker(catalog=catalog_registry.current())
+    assessment = checker.start_assessment(organization, assessor,
+                                          (sector or '').strip() or None)
+    assessment_id = uuid.uuid4().hex
+    
+    session['assessment'] = assessment
+    session['assessment_id'] = assessment_id
+    session['organization'] = organization
+    
+    return jsonify({
+        'message': f'Assessment started for {organization}',
+        'assessment_id': assessment_id
+    })
+
+@app.route('/dashboard')
+def dashboard():
+    """Tableau de bord de l'évaluation en cours"""
+    assessment = session.get('assessment')
+    if not assessment:
+        return render_template('dashboard.html', assessment=None)
+    
+    etag = _session_etag(assessment)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    cached = stats_cache.statistics(etag, assessment)
+    stats = cached['statistics']
+    
+    return _with_etag(app.make_response(render_template(
+        'dashboard.html',
+        assessment=assessment,
+        stats=stats,
+        gaps=cached['gaps'],
+        charts=stats_cache.charts(etag, lambda: _build_charts(stats, 'svg'), 'svg')
+    )), etag)
+
+@app.route('/api/assess-control', methods=['POST'])
+def assess_control():
+    """Évalue un contrôle de l'évaluation en cours"""
+    if 'assessment' not in session:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        attachments = _resolve_attachments(data.get('attachments', []))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    checker = _get_checker()
+    
+    try:
+        success = checker.assess_control(
+            data.get('control_id', ''),
+            data.get('status', ''),
+            data.get('evidence', ''),
+            data.get('comments', ''),
+            attachments
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not success:
+        return jsonify({'error': f"Unknown control: {data.get('control_id')}"}), 400
+    
+    # L'évaluation de session n'est pas sur disque : ses pièces sont
+    # épinglées pour que le ramasse-miettes les conserve
+    for attachment in attachments:
+        evidence_store.pin(attachment['sha256'])
+    session['assessment'] = checker.assessment
+    _publish_control_update(session.get('assessment_id'), lambda: checker.assessment,
+                            data['control_id'], data['status'])
+    return jsonify({
+        'message': f"Control {data['control_id']} assessed",
+        'version': checker.assessment['metadata']['version']
+    })
+
+@app.route('/api/statistics')
+def get_statistics():
+    """Statistiques et gaps de l'évaluation en cours"""
+    if 'assessment' not in session:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    assessment = session['assessment']
+    etag = _session_etag(assessment)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    cached = stats_cache.statistics(etag, assessment)
+    return _with_etag(jsonify({
+        'statistics': cached['statistics'],
+        'gaps': cached['gaps'],
+        'version': assessment['metadata'].get('version', 0)
+    }), etag)
+
+@app.route('/api/frameworks')
+def get_frameworks():
+    """
+    Projection de l'évaluation en cours sur les autres référentiels
+
+    Scores global et par domaine, contrôles couverts par les correspondances
+    de FRAMEWORKS_DIR.
+    """
+    if 'assessment' not in session:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    registry = _framework_registry()
+    projections = registry.project(session['assessment'])
+    return jsonify({
+        'frameworks': {
+            framework_id: {'name': registry.frameworks[framework_id]['name'], **projection}
+            for framework_id, projection in projections.items()
         }
-        
-        response = client.post('/api/assess-control',
-                              data=json.dumps(data),
-                              content_type='application/json')
-        
-        assert response.status_code == 200
-    
-    def test_get_statistics_api(self, client):
-        """Test l'API des statistiques"""
-        # Créer une session avec évaluation
-        with client.session_transaction() as sess:
-            sess['assessment'] = {
-                'metadata': {
-                    'organization': 'Test Corp',
-                    'assessor': 'Jane Doe',
-                    'date': '2026-01-13T12:00:00',
-                    'standard': 'ISO/IEC 27001:2022'
-                },
-                'controls_assessment': []
-            }
-        
-        response = client.get('/api/statistics')
-        
-        assert response.status_code == 200
-        json_data = response.get_json()
-        assert 'statistics' in json_data
-        assert 'gaps' in json_data
+    })
+
+@app.route('/api/charts')
+def get_charts():
+    """
+    Graphiques de l'évaluation en cours (?format=json|svg|png, défaut json)
+
+    Le format JSON (séries de données) pèse quelques centaines d'octets,
+    contre ~10 Ko en SVG et ~180 Ko en PNG base64.
+    """
+    if 'assessment' not in session:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    fmt = request.args.get('format', 'json')
+    if fmt not in CHART_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(CHART_FORMATS)}'}), 400
+    
+    assessment = session['assessment']
+    version_etag = _session_etag(assessment)
+    # Une même version a un ETag par format
+    etag = f"{version_etag}-{fmt}"
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    stats = stats_cache.statistics(version_etag, assessment)['statistics']
+    charts = stats_cache.charts(version_etag, lambda: _build_charts(stats, fmt), fmt)
+    return _with_etag(jsonify({'format': fmt, **charts}), etag)
+
+@app.route('/api/search')
+def search():
+    """
+    Recherche par préfixe (typeahead) dans le catalogue et les preuves du portefeuille
+
+    ?q= : texte saisi ; ?type=control|assessment_item : filtre ;
+    ?limit= : nombre de résultats (au plus SEARCH_MAX_RESULTS).
+    """
+    doc_type = request.args.get('type')
+    if doc_type not in (None, 'control', 'assessment_item'):
+        return jsonify({'error': 'type must be control or assessment_item'}), 400
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not 1 <= limit <= app.config['SEARCH_MAX_RESULTS']:
+        return jsonify({'error': f"limit must be between 1 and {app.config['SEARCH_MAX_RESULTS']}"}), 400
+    
+    query = request.args.get('q', '')
+    results = _search_index().search(query, limit, doc_type)
+    return jsonify({'query': query, 'results': results, 'count': len(results)})
+
+@app.route('/portfolio')
+def portfolio():
+    """Heatmap du portefeuille (tuiles chargées par /api/portfolio/heatmap)"""
+    return render_template('portfolio.html')
+
+@app.route('/api/portfolio/heatmap')
+def portfolio_heatmap():
+    """
+    Tuile de la heatmap organisations × domaines
+
+    ?start=&end= : plage d'organisations (triées par score global) ;
+    ?rows= : nombre maximal de lignes (tranches) ; ?sector= : filtre.
+    Une tranche compte au moins PEER_MIN_COUNT organisations.
+    """
+    try:
+        start = int(request.args.get('start', 0))
+        end = request.args.get('end')
+        end = None if end is None else int(end)
+        rows = int(request.args.get('rows', app.config['HEATMAP_ROWS']))
+    except ValueError:
+        return jsonify({'error': 'start, end and rows must be integers'}), 400
+    if not 1 <= rows <= app.config['HEATMAP_MAX_ROWS']:
+        return jsonify({'error': f"rows must be between 1 and {app.config['HEATMAP_MAX_ROWS']}"}), 400
+    
+    sector = request.args.get('sector', '').strip() or None
+    heatmap = _portfolio_heatmap(sector)
+    if heatmap is None:
+        return jsonify({'error': f"Unknown sector: {sector}"}), 404
+    tile = heatmap.tile(start, end, rows)
+    return jsonify({'sector': sector, **portfolio_heatmap_data(tile)})
+
+@app.route('/api/cube')
+def query_cube():
+    """
+    Comptes par statut et scores du portefeuille, agrégés
+
+    ?group_by=domain,period : dimensions de regroupement (organization,
+    domain, category, period ; aucune = total) ; ?domain=...&period=... :
+    filtres, répétables.
+    """
+    group_by = [name for name in request.args.get('group_by', '').split(',') if name]
+    filters = {name: request.args.getlist(name) for name in ('organization', 'domain',
+                                                             'category', 'period')
+               if name in request.args}
+    _sync_peers()
+    try:
+        rows = aggregation_cube.query(group_by, filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'group_by': group_by, 'filters': filters, 'rows': rows})
+
+@app.route('/api/report')
+def download_report():
+    """
+    Génère le rapport PDF en mémoire et le renvoie au client
+
+    Aucun fichier n'est écrit sur disque : pas de collision de noms entre
+    utilisateurs concurrents ni de relecture du fichier.
+    """
+    assessment = session.get('assessment')
+    if not assessment:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    etag = _session_etag(assessment)
+    cached = stats_cache.statistics(etag, assessment)
+    stats = cached['statistics']
+    report_gen = ReportGenerator(assessment, stats, cached['gaps'],
+                                 benchmark=_peer_benchmark(assessment, stats))
+    
+    buffer = io.BytesIO()
+    report_gen.generate_pdf(None, stats_cache.charts(etag, lambda: _build_charts(stats)),
+                            output=buffer)
+    buffer.seek(0)
+    
+    organization = assessment['metadata']['organization'].replace(' ', '_')
+    return send_file(
+        buffer,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f"{organization}_ISO27001_Report.pdf"
+    )
+
+@app.route('/api/reports', methods=['POST'])
+def submit_report_job():
+    """Soumet la génération du rapport en arrière-plan"""
+    assessment = session.get('assessment')
+    if not assessment:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    stats = stats_cache.statistics(_session_etag(assessment), assessment)['statistics']
+    options = {
+        'include_appendix': bool(data.get('include_appendix', False)),
+        'benchmark': _peer_benchmark(assessment, stats)
+    }
+    job = report_jobs.submit(assessment, options)
+    
+    return jsonify({
+        **job,
+        'status_url': url_for('report_job_status', job_id=job['job_id']),
+        'download_url': url_for('download_report_job', job_id=job['job_id'])
+    }), 202
+
+@app.route('/api/reports/<job_id>')
+def report_job_status(job_id):
+    """Statut d'un job de rapport"""
+    try:
+        return jsonify(report_jobs.status(job_id))
+    except JobNotFoundError:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+
+@app.route('/api/reports/<job_id>/download')
+def download_report_job(job_id):
+    """Télécharge le PDF d'un job terminé"""
+    try:
+        pdf_bytes = report_jobs.result(job_id)
+    except JobNotFoundError:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    except JobNotReadyError:
+        return jsonify(report_jobs.status(job_id)), 409
+    except Exception as e:
+        return jsonify({'error': f'Report generation failed: {e}'}), 500
+    
+    return send_file(
+        io.BytesIO(pdf_bytes),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f"ISO27001_Report_{job_id}.pdf"
+    )
+
+@app.route('/api/assessments', methods=['POST'])
+def create_shared_assessment():
+    """Crée une évaluation partagée entre plusieurs évaluateurs"""
+    data = request.get_json(silent=True) or {}
+    organization = data.get('organization', '')
+    assessor = data.get('assessor', '')
+    if not isinstance(organization, str) or not isinstance(assessor, str):
+        return jsonify({'error': 'organization and assessor must be strings'}), 400
+    organization, assessor = organization.strip(), assessor.strip()
+    
+    if not organization or not assessor:
+        return jsonify({'error': 'organization and assessor are required'}), 400
+    
+    sector = data.get('sector')
+    if sector is not None and not isinstance(sector, str):
+        return jsonify({'error': 'sector must be a string'}), 400
+    
+    assessment_id, assessment = assessment_store.create(organization, assessor,
+                                                        (sector or '').strip() or None)
+    return jsonify({
+        'assessment_id': assessment_id,
+        'version': assessment['metadata']['version']
+    }), 201
+
+@app.route('/api/assessments/<assessment_id>')
+def get_shared_assessment(assessment_id):
+    """Retourne une évaluation partagée et sa version"""
+    try:
+        assessment = assessment_store.get(assessment_id)
+    except AssessmentNotFoundError:
+        return jsonify({'error': 'Unknown assessment'}), 404
+    
+    return jsonify({'assessment': assessment, 'version': assessment['metadata']['version']})
+
+@app.route('/api/assessments/<assessment_id>/controls', methods=['POST'])
+def assess_shared_control(assessment_id):
+    """
+    Évalue un contrôle d'une évaluation partagée
+
+    La version attendue est obligatoire (champ expected_version ou en-tête
+    If-Match) : 409 si l'évaluation a été modifiée entre-temps.
+    """
+    data = request.get_json(silent=True) or {}
+    expected = data.get('expected_version', request.headers.get('If-Match', '').strip('"'))
+    try:
+        expected = int(expected)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'expected_version is required'}), 428
+    
+    try:
+        version = assessment_store.assess_control(
+            assessment_id, expected,
+            data.get('control_id', ''),
+            data.get('status', ''),
+            data.get('evidence', ''),
+            data.get('comments', ''),
+            _resolve_attachments(data.get('attachments', []))
+        )
+    except AssessmentNotFoundError:
+        return jsonify({'error': 'Unknown assessment'}), 404
+    except VersionConflictError as e:
+        return jsonify({'error': str(e), 'current_version': e.actual}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    _publish_control_update(assessment_id, lambda: assessment_store.get(assessment_id),
+                            data['control_id'], data['status'])
+    return jsonify({'message': f"Control {data['control_id']} assessed", 'version': version})
+
+def _remediation_changes(data: dict) -> dict:
+    """Champs modifiables d'un élément de remédiation présents dans la requête"""
+    return {field: data[field] for field in ('owner', 'due_date', 'state') if field in data}
+
+@app.route('/api/remediation', methods=['POST'])
+def create_remediation():
+    """Crée les éléments de remédiation des gaps de l'évaluation en cours"""
+    if 'assessment' not in session:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    assessment = session['assessment']
+    try:
+        created = add_remediation_items(assessment, data.get('owner', ''), data.get('start'),
+                                        catalog_registry.current().controls_by_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    bump_version(assessment)
+    session['assessment'] = assessment
+    return jsonify({'created': created, 'version': assessment['metadata']['version']}), 201
+
+@app.route('/api/remediation/<item_id>', methods=['PATCH'])
+def update_remediation(item_id):
+    """Modifie le responsable, l'échéance ou l'état d'un élément de l'évaluation en cours"""
+    if 'assessment' not in session:
+        return jsonify({'error': 'No active assessment'}), 400
+    
+    assessment = session['assessment']
+    try:
+        item = update_remediation_item(assessment, item_id,
+                                       **_remediation_changes(request.get_json(silent=True) or {}))
+    except RemediationItemNotFoundError:
+        return jsonify({'error': 'Unknown remediation item'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    bump_version(assessment)
+    session['assessment'] = assessment
+    return jsonify({'item': item, 'version': assessment['metadata']['version']})
+
+@app.route('/api/assessments/<assessment_id>/remediation', methods=['POST'])
+@app.route('/api/assessments/<assessment_id>/remediation/<item_id>', methods=['PATCH'])
+def shared_remediation(assessment_id, item_id=None):
+    """
+    Crée (POST) ou modifie (PATCH) les éléments de remédiation d'une
+    évaluation partagée, avec la version attendue comme pour les contrôles
+    """
+    data = request.get_json(silent=True) or {}
+    expected = data.get('expected_version', request.headers.get('If-Match', '').strip('"'))
+    try:
+        expected = int(expected)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'expected_version is required'}), 428
+    
+    result = {}
+    def mutate(assessment):
+        if item_id is None:
+            result['created'] = add_remediation_items(
+                assessment, data.get('owner', ''), data.get('start'),
+                catalog_registry.current().controls_by_id)
+        else:
+            result['item'] = update_remediation_item(assessment, item_id,
+                                                     **_remediation_changes(data))
+    
+    try:
+        version = assessment_store.update(assessment_id, expected, mutate)
+    except AssessmentNotFoundError:
+        return jsonify({'error': 'Unknown assessment'}), 404
+    except RemediationItemNotFoundError:
+        return jsonify({'error': 'Unknown remediation item'}), 404
+    except VersionConflictError as e:
+        return jsonify({'error': str(e), 'current_version': e.actual}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({**result, 'version': version}), 201 if item_id is None else 200
+
+@app.route('/api/remediation/overdue')
+@app.route('/api/remediation/due')
+def remediation_due():
+    """
+    Éléments ouverts du portefeuille, par échéance
+
+    /overdue : échéance dépassée ; /due?days=7 : à échéance dans les N
+    jours. ?owner= restreint à un responsable, ?limit= borne la réponse.
+    """
+    owner = request.args.get('owner')
+    try:
+        limit = request.args.get('limit')
+        limit = None if limit is None else int(limit)
+        _sync_peers()
+        if request.path.endswith('/overdue'):
+            items = remediation_index.overdue(request.args.get('today'), owner, limit)
+        else:
+            items = remediation_index.due_within(int(request.args.get('days', 7)), owner,
+                                                 request.args.get('today'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items, 'count': len(items)})
+
+@app.route('/api/evidence', methods=['POST'])
+def upload_evidence():
+    """
+    Dépose une pièce justificative (multipart, champ "file")
+
+    Le contenu est haché pendant sa copie ; un fichier déjà connu n'est pas
+    stocké une seconde fois. La réponse donne l'empreinte à citer dans le
+    champ "attachments" de /api/assess-control.
+    """
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({'error': 'file is required'}), 400
+    
+    blob = evidence_store.put(upload.stream)
+    return jsonify({
+        **blob,
+        'filename': upload.filename,
+        'url': url_for('download_evidence', sha256=blob['sha256'])
+    }), 200 if blob['deduplicated'] else 201
+
+@app.route('/api/evidence/<sha256>')
+def download_evidence(sha256):
+    """Télécharge une pièce (contenu immuable : cache long)"""
+    if not evidence_store.exists(sha256):
+        return jsonify({'error': 'Unknown evidence'}), 404
+    
+    filename = request.args.get('filename') or sha256
+    return send_file(evidence_store.path(sha256), mimetype='application/octet-stream', as_attachment=True,
+                     download_name=filename, etag=sha256, max_age=31536000)
+
+@app.route('/api/assessments/<assessment_id>/events')
+def assessment_events(assessment_id):
+    """
+    Flux Server-Sent Events des mises à jour d'une évaluation
+
+    Accepte l'évaluation de la session ou une évaluation partagée. Le
+    premier événement ("snapshot") donne la version et les scores courants,
+    les suivants ("control") le contrôle modifié, le score global et celui
+    de son domaine. "resync" signale des événements perdus (client trop
+    lent) : recharger /api/statistics.
+
+    Les écritures traitées par un autre worker arrivent par le répertoire
+    de relais (SSE_RELAY_DIR), avec jusqu'à SSE_POLL_INTERVAL de retard.
+    Chaque flux occupe un thread : au-delà de SSE_MAX_STREAMS flux dans
+    ce worker, réponse 503 avec Retry-After.
+    """
+    if assessment_id == session.get('assessment_id') and session.get('assessment'):
+        assessment = session['assessment']
+    else:
+        try:
+            assessment = assessment_store.get(assessment_id)
+        except AssessmentNotFoundError:
+            return jsonify({'error': 'Unknown assessment'}), 404
+    
+    snapshot = _score_snapshot(assessment_id, assessment)
+    try:
+        subscription = event_broker.subscribe(assessment_id)
+    except SubscriberLimitError:
+        return jsonify({'error': 'Too many event streams'}), 503, {'Retry-After': '5'}
+    return Response(
+        _event_stream(subscription, snapshot),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+if __name__ == '__main__':
+    app.run(debug=True)